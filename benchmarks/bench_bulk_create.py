@@ -0,0 +1,139 @@
+"""
+Compare the throughput of creating documents in bulk with a number of workers.
+
+The documents are created with :meth:`drc_cmis.client.CMISClient.create_documents`
+(browser binding) against a local stub server, which answers the requests of the
+adapter after a fixed latency, like a DMS on the network. With one worker the
+documents are created one after the other, like with ``create_document``.
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import django
+from django.conf import settings
+
+
+def properties(object_id, object_type_id, **extra):
+    return {
+        "cmis:objectId": {"value": object_id, "type": "id"},
+        "cmis:objectTypeId": {"value": object_type_id, "type": "id"},
+        "cmis:name": {"value": object_id, "type": "string"},
+        **extra,
+    }
+
+
+class StubDMSHandler(BaseHTTPRequestHandler):
+    """Answers the requests of the browser binding for creating documents"""
+
+    latency = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, data):
+        time.sleep(self.latency)
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # the folders of the 'other' folder path
+        self.respond({"properties": properties("folder", "cmis:folder")})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Content-Type"].startswith("multipart/form-data"):
+            data = {"cmisaction": "setContent"}
+        else:
+            data = {key: value[0] for key, value in parse_qs(body.decode()).items()}
+
+        if data["cmisaction"] == "query":
+            self.respond({"results": [], "numItems": 0, "hasMoreItems": False})
+        else:
+            self.respond({"properties": properties("document;1.0", "D:drc:document")})
+
+
+def setup_django(database):
+    settings.configure(
+        INSTALLED_APPS=["solo", "drc_cmis"],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": database}
+        },
+        USE_TZ=True,
+        CMIS_MAPPER_FILE=os.path.join("test_app", "cmis_mapper.json"),
+    )
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def measure(client, count, max_workers):
+    from drc_cmis.utils.bulk import NewDocument
+
+    documents = (
+        NewDocument(
+            f"DOC-{index}",
+            "123456782",
+            {"titel": f"Document {index}", "bestandsnaam": "document.txt"},
+            content=io.BytesIO(b"some file content"),
+        )
+        for index in range(count)
+    )
+    start = time.perf_counter()
+    results = list(client.create_documents(documents, max_workers=max_workers))
+    duration = time.perf_counter() - start
+    errors = [result.error for result in results if not result.ok]
+    assert not errors, errors[0]
+    return duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument(
+        "--latency", type=float, default=20, help="latency of the stub in ms"
+    )
+    args = parser.parse_args()
+
+    StubDMSHandler.latency = args.latency / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubDMSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/browser"
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup_django(os.path.join(directory, "db.sqlite3"))
+
+        from drc_cmis.browser.client import CMISDRCClient
+        from drc_cmis.models import CMISConfig
+
+        CMISConfig.objects.create(client_url=base_url, binding="BROWSER")
+        client = CMISDRCClient()
+        client._repository_info = {"vendorName": "Alfresco", "rootFolderId": "root"}
+
+        print(f"{'workers':>7} {'duration (s)':>12} {'documents/s':>11}")
+        for max_workers in args.workers:
+            duration = measure(client, args.documents, max_workers)
+            print(
+                f"{max_workers:>7} {duration:>12.2f} "
+                f"{args.documents / duration:>11.1f}"
+            )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
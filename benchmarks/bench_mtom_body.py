@@ -0,0 +1,80 @@
+"""
+Compare the peak memory use of building the MTOM body of a document upload.
+
+The legacy body is built by concatenating the envelope and the whole attachment
+into one ``bytes`` object. The :class:`drc_cmis.webservice.mtom.MTOMBody` yields
+the body in chunks, reading the attachment incrementally. The attachment is a
+temporary file, like an uploaded document, and the body is consumed the way
+``requests`` sends it.
+"""
+
+import argparse
+import tempfile
+import tracemalloc
+
+from drc_cmis.webservice.mtom import MTOMBody, format_headers
+
+BOUNDARY = "------=_Part_52_1132425564.1594208078802"
+
+ENVELOPE_HEADERS = {
+    "Content-Type": 'application/xop+xml; charset=UTF-8; type="application/soap+xml"',
+    "Content-Transfer-Encoding": "8bit",
+    "Content-ID": "<rootpart@soapui.org>",
+}
+
+ENVELOPE = '<?xml version="1.0" ?><soapenv:Envelope/>'
+
+
+def legacy_body(content_stream):
+    """The concatenation the streaming body replaced"""
+    body = f"\n{BOUNDARY}\n{format_headers(ENVELOPE_HEADERS)}\n{ENVELOPE}\n\n".encode(
+        "utf-8"
+    )
+    file_attachment_headers = {
+        "Content-Type": "application/octet-stream",
+        "Content-Transfer-Encoding": "binary",
+        "Content-ID": "<content>",
+    }
+    content_stream.seek(0)
+    body += f"{BOUNDARY}\n{format_headers(file_attachment_headers)}\n".encode("utf-8")
+    body += content_stream.read()
+    body += f"{BOUNDARY}--\n".encode("utf-8")
+    return [body]
+
+
+def streaming_body(content_stream):
+    return MTOMBody(BOUNDARY, ENVELOPE_HEADERS, ENVELOPE, [("content", content_stream)])
+
+
+def measure(build_body, content_stream):
+    tracemalloc.start()
+    size = 0
+    for chunk in build_body(content_stream):
+        size += len(chunk)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 64])
+    args = parser.parse_args()
+
+    print(f"{'size (MiB)':>10} {'legacy peak (MiB)':>18} {'streaming peak (MiB)':>21}")
+    for size in args.sizes:
+        with tempfile.TemporaryFile() as content_stream:
+            content_stream.write(b"\0" * (size * 1024 * 1024))
+
+            legacy_size, legacy_peak = measure(legacy_body, content_stream)
+            streaming_size, streaming_peak = measure(streaming_body, content_stream)
+            assert legacy_size == streaming_size
+
+        print(
+            f"{size:>10} {legacy_peak / 2 ** 20:>18.2f} "
+            f"{streaming_peak / 2 ** 20:>21.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compare the minidom based decoding of SOAP query responses with the streaming decoder.
+
+The responses are built from the recorded query response in ``tests/responses``,
+repeating its objects to get larger result sets. Both the duration and the peak
+memory use (as traced by ``tracemalloc``) are reported.
+"""
+
+import argparse
+import os
+import re
+import time
+import tracemalloc
+from xml.dom import minidom
+
+from cmislib.util import parsePropValue
+
+from drc_cmis.webservice.decoder import iter_objects_from_xml
+
+FIXTURE = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    "tests",
+    "responses",
+    "alfresco-soap-query.xml",
+)
+
+
+def legacy_extract_object_properties_from_xml(xml_data, cmis_action):
+    """The minidom implementation the streaming decoder replaced"""
+
+    def extract_properties(xml_node):
+        properties = {}
+        for property_node in xml_node.getElementsByTagName("ns2:properties"):
+            for child_node in property_node.childNodes:
+                try:
+                    property_name = child_node.attributes["propertyDefinitionId"].value
+                except KeyError:
+                    continue
+
+                node_values = child_node.getElementsByTagName("ns2:value")
+                if len(node_values) == 0 or len(node_values[0].childNodes) == 0:
+                    properties[property_name] = {"value": None}
+                else:
+                    properties[property_name] = {
+                        "value": parsePropValue(
+                            node_values[0].childNodes[0].data, child_node.localName
+                        )
+                    }
+        return properties
+
+    parsed_xml = minidom.parseString(xml_data)
+
+    all_objects = []
+    for action_node in parsed_xml.getElementsByTagName(f"{cmis_action}Response"):
+        for child_node in action_node.childNodes:
+            node_name = child_node.nodeName
+
+            if node_name == "objectId":
+                extracted_properties = {
+                    node_name: {"value": child_node.firstChild.nodeValue}
+                }
+                all_objects.append({"properties": extracted_properties})
+            if node_name == "object":
+                extracted_properties = extract_properties(child_node)
+                all_objects.append({"properties": extracted_properties})
+            if node_name == "objects" or node_name == "parents":
+                if len(child_node.getElementsByTagName("objects")) > 0:
+                    for object_nodes in child_node.childNodes:
+                        if len(object_nodes.getElementsByTagName("ns2:properties")) > 0:
+                            extracted_properties = extract_properties(object_nodes)
+                            all_objects.append({"properties": extracted_properties})
+                elif len(child_node.getElementsByTagName("ns2:properties")) > 0:
+                    extracted_properties = extract_properties(child_node)
+                    all_objects.append({"properties": extracted_properties})
+
+    return all_objects
+
+
+def make_response(num_objects):
+    with open(FIXTURE) as fixture:
+        response = fixture.read()
+
+    objects = re.findall(r"<objects><ns2:properties>.*?</objects>", response)
+    repeated = "".join(objects[i % len(objects)] for i in range(num_objects))
+    start = response.index(objects[0])
+    end = response.index(objects[-1]) + len(objects[-1])
+    return response[:start] + repeated + response[end:]
+
+
+def measure(func, xml_data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(xml_data)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("sizes", nargs="*", type=int, default=[10, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    print(
+        f"{'objects':>8} {'minidom (ms)':>13} {'minidom (MiB)':>14} "
+        f"{'streaming (ms)':>15} {'streaming (MiB)':>16}"
+    )
+    for size in args.sizes:
+        xml_data = make_response(size)
+
+        legacy, legacy_duration, legacy_peak = measure(
+            lambda data: legacy_extract_object_properties_from_xml(data, "query"),
+            xml_data,
+        )
+        # count the objects without keeping them, as a consumer iterating would
+        streaming, duration, peak = measure(
+            lambda data: sum(1 for _ in iter_objects_from_xml(data, "query")),
+            xml_data,
+        )
+        assert legacy == list(iter_objects_from_xml(xml_data, "query"))
+        assert streaming == size
+
+        print(
+            f"{size:>8} {legacy_duration * 1000:>13.1f} {legacy_peak / 2**20:>14.1f} "
+            f"{duration * 1000:>15.1f} {peak / 2**20:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
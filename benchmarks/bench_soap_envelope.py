@@ -0,0 +1,70 @@
+"""
+Compare the build time of a ``createDocument`` SOAP envelope with 30 properties.
+
+The DOM builder (:func:`drc_cmis.webservice.utils.make_soap_envelope`) creates a
+``minidom`` document and serialises it, the template builder
+(:func:`drc_cmis.webservice.envelope.render_soap_envelope`) writes the envelope
+from cached fragments. Both produce the same XML.
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import uuid
+
+import django
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "test_app.settings")
+django.setup()
+
+from drc_cmis.webservice.envelope import render_soap_envelope  # noqa: E402
+from drc_cmis.webservice.utils import make_soap_envelope  # noqa: E402
+
+
+def make_arguments(num_properties):
+    properties = {
+        f"drc:document__property{index}": {
+            "type": "propertyString",
+            "value": f"https://openzaak.utrechtproeftuin.nl/zaken/api/v1/{index}",
+        }
+        for index in range(num_properties)
+    }
+    return {
+        "cmis_action": "createDocument",
+        "auth": ("admin", "admin"),
+        "repository_id": str(uuid.uuid4()),
+        "folder_id": f"workspace://SpacesStore/{uuid.uuid4()}",
+        "properties": properties,
+        "content_id": str(uuid.uuid4()),
+        "content_filename": "filename.txt",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--properties", type=int, default=30)
+    args = parser.parse_args()
+
+    kwargs = make_arguments(args.properties)
+
+    dom = timeit.timeit(
+        lambda: make_soap_envelope(**kwargs).toxml(), number=args.number
+    )
+    template = timeit.timeit(
+        lambda: render_soap_envelope(**kwargs).toxml(), number=args.number
+    )
+
+    def per_call(total):
+        return total / args.number * 1e6
+
+    print(f"{'builder':>10} {'per envelope (us)':>18}")
+    print(f"{'dom':>10} {per_call(dom):>18.2f}")
+    print(f"{'template':>10} {per_call(template):>18.2f}")
+    print(f"speedup: {dom / template:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Compare the per-call latency of the URL mapping lookups.
+
+The legacy lookup scans all patterns with ``in`` and sorts the matches. The
+:class:`drc_cmis.utils.matching.PatternMatcher` either checks its pre-sorted
+patterns one by one (scan) or does a single pass over the URL (automaton), and
+``find`` picks one of them depending on the number of patterns.
+
+Note that the legacy lookup did two database queries on top of this.
+"""
+
+import argparse
+import timeit
+
+from drc_cmis.utils.matching import PatternMatcher
+
+
+def legacy_find_matching_pattern(url, patterns):
+    matching_patterns = []
+    for pattern in patterns:
+        if pattern in url:
+            matching_patterns.append(pattern)
+
+    if len(matching_patterns) == 0:
+        return None
+    elif len(matching_patterns) > 1:
+        return sorted(matching_patterns, key=len, reverse=True)[0]
+    else:
+        return matching_patterns[0]
+
+
+def make_patterns(count):
+    patterns = ["https://openzaak.utrechtproeftuin.nl/"]
+    for index in range(count - 1):
+        patterns.append(f"https://api{index}.utrechtproeftuin.nl/component{index}/")
+    patterns.append("https://openzaak.utrechtproeftuin.nl/zaken/")
+    return patterns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    url = (
+        "https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaakinformatieobjecten/"
+        "fc345347-3115-4f0a-8808-e392d66e1886"
+    )
+
+    print(
+        f"{'mappings':>10} {'legacy (us)':>12} {'scan (us)':>10} "
+        f"{'automaton (us)':>15} {'find (us)':>10}"
+    )
+    for count in (5, 50, 500):
+        patterns = make_patterns(count)
+        matcher = PatternMatcher(patterns)
+        assert matcher.find(url) == legacy_find_matching_pattern(url, patterns)
+
+        legacy = timeit.timeit(
+            lambda: legacy_find_matching_pattern(url, patterns), number=args.number
+        )
+        scan = timeit.timeit(lambda: matcher._scan(url), number=args.number)
+        walk = timeit.timeit(lambda: matcher._walk(url), number=args.number)
+        find = timeit.timeit(lambda: matcher.find(url), number=args.number)
+
+        def per_call(total):
+            return total / args.number * 1e6
+
+        print(
+            f"{count:>10} {per_call(legacy):>12.2f} {per_call(scan):>10.2f} "
+            f"{per_call(walk):>15.2f} {per_call(find):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
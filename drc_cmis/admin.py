@@ -25,7 +25,10 @@ class CMISConnectionJSONView(View):
         try:
             from .client_builder import get_cmis_client
 
-            return _("OK ({})").format(get_cmis_client().vendor)
+            client = get_cmis_client()
+            # check the actual connection rather than the cached repository info
+            client.invalidate_repository_info()
+            return _("OK ({})").format(client.vendor)
         except KeyError:
             return _("Error: Unable to retrieve vendor)")
         except Exception as e:
@@ -20,6 +20,9 @@ class CMISConfig(AppConfig):
     app_name = "cmis"
 
     def ready(self):
+        # connect the signal receivers invalidating the cached configuration
+        from . import cache  # noqa
+
         maps = {
             "ZAAKTYPE_MAP": ZAAKTYPE_MAP,
             "ZAAK_MAP": ZAAK_MAP,
@@ -0,0 +1,533 @@
+"""
+CMIS clients for asyncio applications.
+
+The requests are made with `httpx`_, which is installed with the ``async`` extra
+(``pip install drc-cmis[async]``). The queries, properties and folder paths are
+built, and the responses decoded, with the same code as in the synchronous clients
+of the bindings.
+
+.. _httpx: https://www.python-httpx.org/
+"""
+
+import asyncio
+import datetime
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar, Union
+from uuid import UUID
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from .cache import (
+    ConfigSnapshot,
+    FolderCacheScope,
+    aget_config_snapshot,
+    folder_path_cache,
+)
+from .client import CMISClient, is_name_conflict, is_object_not_found
+from .utils import folder as folder_utils
+from .utils.exceptions import (
+    CmisBaseException,
+    CmisObjectNotFoundException,
+    CmisRuntimeException,
+    DocumentDoesNotExistError,
+    DocumentExistsError,
+)
+from .utils.mapper import mapper
+from .utils.query import QueryPage, set_projection
+from .utils.utils import extract_latest_version
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+Document = TypeVar("Document")
+Folder = TypeVar("Folder")
+ObjectInformatieObject = TypeVar("ObjectInformatieObject")
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCMISClient:
+    """
+    Base class of the CMIS clients with coroutines for the requests.
+
+    The configuration and the repository info are loaded by :meth:`prepare`, which
+    every coroutine awaits first. The requests are built with the (sync) helpers of
+    the synchronous clients, using the loaded configuration snapshot, and the
+    Django cache is accessed in a thread. The domain objects returned by the client
+    only hold the data of the objects: use the coroutines of the client to work
+    with them.
+
+    The folders of the folder paths are cached like in the synchronous clients,
+    but they are created without holding a folder path lock. Conflicting creates
+    are recovered from instead.
+
+    :param http_client: the ``httpx.AsyncClient`` to make the requests with, to
+        share its connection pool. By default the client creates its own, which
+        is closed by :meth:`aclose`.
+    """
+
+    document_type = None
+    gebruiksrechten_type = None
+    oio_type = None
+    folder_type = None
+    zaakfolder_type = None
+    zaaktypefolder_type = None
+
+    # the parts without requests are shared with the synchronous clients
+    get_return_type = CMISClient.get_return_type
+    get_object_type_id_prefix = CMISClient.get_object_type_id_prefix
+    get_date_path_context = staticmethod(CMISClient.get_date_path_context)
+    get_zaak_folder_path = CMISClient.get_zaak_folder_path
+    get_other_folder_path = CMISClient.get_other_folder_path
+    build_document_query_statement = staticmethod(
+        CMISClient.build_document_query_statement
+    )
+    get_already_locked_error = staticmethod(CMISClient.get_already_locked_error)
+    check_unlock = staticmethod(CMISClient.check_unlock)
+
+    def __init__(self, http_client=None):
+        if httpx is None:
+            raise ImproperlyConfigured(
+                "The async CMIS clients require httpx, install drc-cmis[async]."
+            )
+        self._owns_http_client = http_client is None
+        if http_client is None:
+            http_client = httpx.AsyncClient(timeout=None)
+        self.http_client = http_client
+
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._repository_info: Optional[dict] = None
+
+    async def aclose(self) -> None:
+        """Close the HTTP client, if it was created by this client"""
+        if self._owns_http_client:
+            await self.http_client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def prepare(self) -> None:
+        """Load the configuration snapshot and the repository info, if needed
+
+        Only the first call, and the first call after a new configuration snapshot
+        was loaded, make requests.
+        """
+        snapshot = await aget_config_snapshot()
+        if self._snapshot is None or self._snapshot.version != snapshot.version:
+            self._snapshot = snapshot
+            self.reset()
+        if self._repository_info is None:
+            self._repository_info = await self.fetch_repository_info()
+
+    def reset(self) -> None:
+        """Forget the state derived from the configuration"""
+        self._repository_info = None
+
+    @property
+    def config_snapshot(self) -> ConfigSnapshot:
+        """The configuration snapshot loaded by :meth:`prepare`
+
+        The requests are built with this snapshot, even if it expired in the
+        meantime, so that no database queries are made in the event loop.
+        """
+        if self._snapshot is None:
+            raise RuntimeError("The configuration is not loaded, await prepare()")
+        return self._snapshot
+
+    @property
+    def config(self):
+        """The configuration of the snapshot loaded by :meth:`prepare`"""
+        return self.config_snapshot.config
+
+    @property
+    def repository_info(self) -> dict:
+        if self._repository_info is None:
+            raise RuntimeError("The repository info is not loaded, await prepare()")
+        return self._repository_info
+
+    @property
+    def base_url(self) -> str:
+        return self.config.client_url
+
+    @property
+    def user(self) -> str:
+        return self.config.client_user
+
+    @property
+    def password(self) -> str:
+        return self.config.client_password
+
+    @property
+    def vendor(self) -> str:
+        return self.repository_info["vendorName"]
+
+    @property
+    def folder_cache_scope(self) -> FolderCacheScope:
+        """The scope of the folders cached by this client, see :class:`FolderPathCache`"""
+        return FolderCacheScope(self.base_url, self.repository_id, self.user)
+
+    async def fetch_repository_info(self) -> dict:
+        raise NotImplementedError
+
+    async def fetch_query_page(
+        self,
+        statement: str,
+        max_items: Optional[int],
+        skip_count: int,
+        decode: bool = True,
+    ) -> QueryPage:
+        """Make a query request and return the page of results
+
+        :param statement: string, the SQL statement
+        :param max_items: int, the number of results to request, or ``None`` for
+            all results.
+        :param skip_count: int, the number of results to skip
+        :param decode: whether to decode the objects in the response
+        """
+        raise NotImplementedError
+
+    # generic querying
+    async def query(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
+    ) -> list:
+        """Perform an SQL query in the DMS
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :param select: list of strings, the CMIS names of the properties to retrieve.
+            Defaults to all properties.
+        :return: list of either Folder, Document, Oio or Gebruiksrechten
+        """
+        await self.prepare()
+        return_type = self.get_return_type(return_type_name)
+        statement = self.build_query_statement(return_type_name, lhs, rhs, select)
+        page = await self.fetch_query_page(statement, None, 0)
+        return self.get_query_results(return_type, page.objects, select)
+
+    async def exists(
+        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+    ) -> bool:
+        """Check whether an SQL query in the DMS has any results
+
+        See :meth:`drc_cmis.client.CMISClient.exists`.
+        """
+        await self.prepare()
+        statement = self.build_query_statement(return_type_name, lhs, rhs, select=[])
+        page = await self.fetch_query_page(statement, 1, 0, decode=False)
+        return page.object_count > 0 or bool(page.num_items and page.num_items > 0)
+
+    async def check_document_exists(
+        self, identification: Union[str, UUID], bronorganisatie: str
+    ) -> None:
+        """Check if a document with the same (identificatie, bronorganisatie) already exists in the repository
+
+        :param identification: string, document ``identificatie``
+        :param bronorganisatie: string, document ``bronorganisatie``
+        """
+        cmis_identificatie = mapper("identificatie", type="document")
+        cmis_bronorganisatie = mapper("bronorganisatie", type="document")
+
+        lhs = [f"{cmis_identificatie} = '%s'", f"{cmis_bronorganisatie} = '%s'"]
+        if await self.exists("document", lhs, [str(identification), bronorganisatie]):
+            raise DocumentExistsError(
+                "Een document met dezelfde identificatie en bronorganisatie al bestaat."
+            )
+
+    async def get_document(
+        self,
+        drc_uuid: Optional[str],
+        filters: Optional[dict] = None,
+        select: Optional[List[str]] = None,
+    ) -> Document:
+        """Retrieve the latest version of the document with the given drc:document__uuid
+
+        If the document series is checked out, the private working copy is returned.
+
+        :param drc_uuid: string, value of the cmis property drc:document__uuid
+        :param filters: dict, filters to find the document
+        :param select: list of strings, the CMIS names of the properties to retrieve.
+            Defaults to all properties.
+        :return: Document, latest document version
+        """
+        if drc_uuid is None:
+            raise DocumentDoesNotExistError(
+                f"Document met drc:document__uuid {drc_uuid} bestaat niet in het "
+                "CMIS connection"
+            )
+
+        await self.prepare()
+        # the version label tells the pwc apart from the latest version
+        if select is not None:
+            select = [*select, "cmis:versionLabel"]
+
+        statement = self.build_document_query_statement(drc_uuid, filters, select)
+        page = await self.fetch_query_page(statement, None, 0)
+        document = extract_latest_version(self.document_type, page.objects, client=self)
+        set_projection([document], select)
+        return document
+
+    async def get_or_create_folder(
+        self, name: str, parent: Folder, properties: dict = None
+    ) -> Folder:
+        """Get or create a folder 'name/' in the parent folder
+
+        :param name: string, the name of the folder to create
+        :param parent: Folder, the parent folder
+        :param properties: dict, contains the properties of the folder to create
+        :return: Folder, the folder that was created/retrieved
+        """
+        await self.prepare()
+        if properties is None:
+            child_type = None
+        else:
+            child_type = properties.get("cmis:objectTypeId")
+
+        child_folder = await self.get_child_folder(parent, name, child_type)
+        if child_folder:
+            return child_folder
+
+        # Create new folder, as it doesn't exist yet
+        return await self.create_folder_or_get_existing(
+            name,
+            parent.objectId,
+            properties,
+            lambda: self.get_child_folder(parent, name, child_type),
+        )
+
+    async def create_folder_or_get_existing(
+        self,
+        name: str,
+        parent_id: str,
+        properties: Optional[dict],
+        get_existing: Callable[[], Awaitable[Optional[Folder]]],
+    ) -> Folder:
+        """Create a folder, or retrieve it if it was created concurrently
+
+        See :meth:`drc_cmis.client.CMISClient.create_folder_or_get_existing`.
+
+        :param get_existing: coroutine function, which retrieves the existing folder
+        :return: Folder, the folder that was created/retrieved
+        """
+        try:
+            return await self.create_folder(name, parent_id, properties)
+        except CmisBaseException as exc:
+            if not is_name_conflict(exc):
+                raise
+            folder = await get_existing()
+            if folder is None:
+                raise
+            logger.info("Folder %s was created concurrently, using it", name)
+            return folder
+
+    async def get_or_create_path(
+        self, path: List[Tuple[str, dict]], day: Optional[datetime.date] = None
+    ) -> Folder:
+        """Get or create the folders in the path, starting from the root folder
+
+        See :meth:`drc_cmis.client.CMISClient.get_or_create_path`, except that no
+        folder path lock is held.
+
+        :param path: list of tuples with the name and the properties of each folder
+        :param day: date, the date in the path (if any), which determines how long
+            the folders are cached. Defaults to today.
+        :return: Folder, the last folder in the path
+        """
+        await self.prepare()
+        if not path:
+            return await self.get_folder(self.root_folder_id)
+
+        paths = folder_utils.get_folder_paths(path)
+        cached = await folder_path_cache.aget_many(self.folder_cache_scope, paths)
+        if paths[-1] in cached:
+            return self.folder_type(cached[paths[-1]], client=self)
+        return await self._resolve_path(path, paths, cached, day)
+
+    async def _resolve_path(
+        self,
+        path: List[Tuple[str, dict]],
+        paths: List[str],
+        cached: dict,
+        day: Optional[datetime.date],
+    ) -> Folder:
+        depth = len(paths) - 1
+        while depth and paths[depth - 1] not in cached:
+            depth -= 1
+
+        parent_folder = None
+        if depth:
+            parent_folder = self.folder_type(cached[paths[depth - 1]], client=self)
+
+        resolved = {}
+        for index in range(len(paths) - 1, depth - 1, -1):
+            folder = await self.get_folder_by_path(paths[index])
+            if folder is not None:
+                parent_folder = resolved[paths[index]] = folder
+                depth = index + 1
+                break
+
+        # the folders below the deepest existing folder don't exist either
+        if parent_folder is None:
+            parent_id = self.root_folder_id
+        else:
+            parent_id = parent_folder.objectId
+        for index in range(depth, len(path)):
+            folder_name, props = path[index]
+            parent_folder = await self.create_folder_or_get_existing(
+                folder_name,
+                parent_id,
+                props,
+                lambda: self.get_folder_by_path(paths[index]),
+            )
+            parent_id = parent_folder.objectId
+            resolved[paths[index]] = parent_folder
+
+        await folder_path_cache.aset_many(self.folder_cache_scope, resolved, day)
+        return parent_folder
+
+    async def retry_with_fresh_folders(self, action: Callable[[], Awaitable[T]]) -> T:
+        """Run the action again with fresh folders if a cached folder no longer exists
+
+        See :meth:`drc_cmis.client.CMISClient.retry_with_fresh_folders`.
+
+        :param action: coroutine function, which resolves the folders it needs
+        """
+        try:
+            return await action()
+        except (CmisObjectNotFoundException, CmisRuntimeException) as exc:
+            if not is_object_not_found(exc):
+                raise
+            await folder_path_cache.ainvalidate(self.folder_cache_scope)
+            return await action()
+
+    async def get_or_create_zaak_folder(
+        self, zaaktype: dict, zaak: dict, day: Optional[datetime.date] = None
+    ) -> Folder:
+        """Get or create all the folders in the configurable 'zaak' folder path
+
+        :param day: date, used for the date folders in the path. Defaults to today.
+        """
+        await self.prepare()
+        if day is None:
+            day = timezone.now().date()
+        return await self.get_or_create_path(
+            self.get_zaak_folder_path(zaaktype, zaak, day), day
+        )
+
+    async def get_or_create_other_folder(
+        self, day: Optional[datetime.date] = None
+    ) -> Folder:
+        """Get or create all the folders in the configurable 'other' folder path
+
+        :param day: date, used for the date folders in the path. Defaults to today.
+        """
+        await self.prepare()
+        if day is None:
+            day = timezone.now().date()
+        return await self.get_or_create_path(self.get_other_folder_path(day), day)
+
+    async def get_related_data_folder(self) -> Folder:
+        """Get or create the 'Related data' folder in the 'other' folder path"""
+
+        async def get_folder() -> Folder:
+            other_folder = await self.get_or_create_other_folder()
+            return await self.get_or_create_folder("Related data", other_folder)
+
+        return await self.retry_with_fresh_folders(get_folder)
+
+    async def create_oio(
+        self, oio_data: dict, zaak_data: dict = None, zaaktype_data: dict = None
+    ) -> ObjectInformatieObject:
+        """Create ObjectInformatieObject which relates a document with a zaak or besluit
+
+        See :meth:`drc_cmis.client.CMISClient.create_oio` for the cases. The
+        document, the other oios and the gebruiksrechten of the document are
+        retrieved concurrently, as are the copies or moves of the document and its
+        gebruiksrechten.
+
+        :param oio_data: dict, the oio details.
+        :param zaak_data: dict, the zaak details.
+        :param zaaktype_data: dict, the zaaktype details.
+        :return: Oio created
+        """
+        if oio_data["object_type"] == "zaak" and (not zaak_data or not zaaktype_data):
+            raise ValueError(
+                "You must provide 'zaak_data' and 'zaaktype_data' when relating documents to zaken"
+            )
+
+        await self.prepare()
+        informatieobject = oio_data.get("informatieobject")
+        document_uuid = informatieobject.split("/")[-1]
+
+        if "object" in oio_data:
+            oio_data[oio_data["object_type"]] = oio_data.pop("object")
+
+        document, retrieved_oios, related_gebruiksrechten = await asyncio.gather(
+            self.get_document(drc_uuid=document_uuid),
+            # Check if there are other Oios related to the document
+            self.query(
+                return_type_name="oio",
+                lhs=["drc:oio__informatieobject = '%s'"],
+                rhs=[informatieobject],
+            ),
+            # Check if there are gebruiksrechten related to the document
+            self.query(
+                return_type_name="gebruiksrechten",
+                lhs=["drc:gebruiksrechten__informatieobject = '%s'"],
+                rhs=[informatieobject],
+            ),
+        )
+
+        async def get_destination_folders() -> Tuple[Folder, Folder]:
+            # If the related object is a besluit not related to a zaak,
+            # the oio for the besluit is created in the "Related data" of the temporary folder
+            if zaak_data is None and oio_data["object_type"] == "besluit":
+                destination_folder = await self.get_or_create_other_folder()
+            else:
+                destination_folder = await self.get_or_create_zaak_folder(
+                    zaaktype_data, zaak_data
+                )
+
+            related_data_folder = await self.get_or_create_folder(
+                "Related data", destination_folder
+            )
+            return destination_folder, related_data_folder
+
+        destination_folder, related_data_folder = await self.retry_with_fresh_folders(
+            get_destination_folders
+        )
+
+        # Case 1: Already related to a zaak. Copy the document to the destination folder.
+        if len(retrieved_oios) > 0:
+            await asyncio.gather(
+                self.copy_document(document, destination_folder),
+                *(
+                    self.copy_gebruiksrechten(gebruiksrechten, related_data_folder)
+                    for gebruiksrechten in related_gebruiksrechten
+                ),
+            )
+        # Case 2: Not related to a zaak. Move the document to the destination folder
+        else:
+            await asyncio.gather(
+                self.move_object(document, destination_folder),
+                *(
+                    self.move_object(gebruiksrechten, related_data_folder)
+                    for gebruiksrechten in related_gebruiksrechten
+                ),
+            )
+
+        # Create the Oio in the "Related data" folder
+        return await self.create_content_object(
+            data=oio_data, object_type="oio", destination_folder=related_data_folder
+        )
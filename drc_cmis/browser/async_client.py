@@ -0,0 +1,510 @@
+import logging
+from io import BytesIO
+from typing import BinaryIO, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from drc_cmis.async_client import AsyncCMISClient
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.browser.drc_document import (
+    CMISContentObject,
+    Document,
+    Folder,
+    Gebruiksrechten,
+    ObjectInformatieObject,
+    ZaakFolder,
+    ZaakTypeFolder,
+)
+from drc_cmis.browser.utils import create_json_request_body
+from drc_cmis.client import is_not_supported
+from drc_cmis.utils.exceptions import (
+    CmisBaseException,
+    CmisInvalidArgumentException,
+    CmisObjectNotFoundException,
+    CmisUpdateConflictException,
+    FolderDoesNotExistError,
+)
+from drc_cmis.utils.query import CMISQuery, QueryPage
+from drc_cmis.utils.streams import CHUNK_SIZE, aslice_chunks, aspool_chunks
+
+from .async_request import AsyncRequest
+from .fetcher import DEFAULT_REPOSITORY_ID, repo_info_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCMISDRCClient(AsyncCMISClient):
+    """Async CMIS client for Browser binding (CMIS 1.1), see :class:`CMISDRCClient`"""
+
+    document_type = Document
+    gebruiksrechten_type = Gebruiksrechten
+    oio_type = ObjectInformatieObject
+    folder_type = Folder
+    zaakfolder_type = ZaakFolder
+    zaaktypefolder_type = ZaakTypeFolder
+
+    # Whether documents are copied by the DMS, see copy_document
+    server_side_copy = True
+
+    # the browser binding uses the default repository at the base URL
+    repository_id = DEFAULT_REPOSITORY_ID
+
+    get_first_result = CMISDRCClient.get_first_result
+    get_all_results = CMISDRCClient.get_all_results
+    get_all_objects = CMISDRCClient.get_all_objects
+    build_query_statement = CMISDRCClient.build_query_statement
+    get_query_results = CMISDRCClient.get_query_results
+    get_source_properties = staticmethod(CMISDRCClient.get_source_properties)
+    get_gebruiksrechten_copy_properties = (
+        CMISDRCClient.get_gebruiksrechten_copy_properties
+    )
+    get_document_copy_properties = staticmethod(
+        CMISDRCClient.get_document_copy_properties
+    )
+    build_content_object_request_body = CMISDRCClient.build_content_object_request_body
+    get_new_document_properties = CMISDRCClient.get_new_document_properties
+    build_create_folder_request_body = staticmethod(
+        CMISDRCClient.build_create_folder_request_body
+    )
+    build_copy_from_source_request_body = staticmethod(
+        CMISDRCClient.build_copy_from_source_request_body
+    )
+    build_content_copy_request_body = CMISDRCClient.build_content_copy_request_body
+    get_lock_properties = staticmethod(CMISDRCClient.get_lock_properties)
+
+    def __init__(self, http_client=None):
+        super().__init__(http_client)
+        self._request = AsyncRequest(self.http_client)
+
+    async def get_request(self, url, params=None):
+        return await self._request.get_request(url, self.user, self.password, params)
+
+    async def get_stream(self, url, params=None, byte_range=None):
+        return await self._request.get_stream(
+            url, self.user, self.password, params, byte_range=byte_range
+        )
+
+    async def post_request(self, url, data, headers=None, files=None):
+        return await self._request.post_request(
+            url, data, self.user, self.password, headers, files
+        )
+
+    @property
+    def time_zone(self):
+        return self.config.time_zone
+
+    @property
+    def root_folder_url(self):
+        return f"{self.base_url}/root"
+
+    @property
+    def root_folder_id(self) -> str:
+        """Returns the objectId of the root folder"""
+        return self.repository_info["rootFolderId"]
+
+    async def fetch_repository_info(self) -> dict:
+        """Fetch the repository info and cache it"""
+        return await repo_info_fetcher.afetch(
+            self._request, self.base_url, self.user, self.password
+        )
+
+    async def fetch_query_page(
+        self,
+        statement: str,
+        max_items: Optional[int],
+        skip_count: int,
+        decode: bool = True,
+    ) -> QueryPage:
+        body = {"cmisaction": "query", "statement": statement}
+        if max_items is not None:
+            body.update(maxItems=max_items, skipCount=skip_count)
+        logger.debug("CMIS_ADAPTER: query: request data: %s", body)
+        response = await self.post_request(self.base_url, body)
+        logger.debug("CMIS_ADAPTER: query: response: %s", response)
+
+        objects = response.get("results")
+        return QueryPage(
+            objects=objects if decode else None,
+            has_more_items=response.get("hasMoreItems", False),
+            num_items=response.get("numItems"),
+            object_count=len(objects),
+        )
+
+    async def create_folder(
+        self, name: str, parent_id: str, properties: dict = None
+    ) -> Folder:
+        await self.prepare()
+        data = self.build_create_folder_request_body(name, parent_id, properties)
+        logger.debug("CMIS_ADAPTER: create_folder: request data: %s", data)
+
+        json_response = await self.post_request(self.root_folder_url, data=data)
+        logger.debug("CMIS_ADAPTER: create_folder: response data: %s", json_response)
+
+        return Folder(json_response, client=self)
+
+    async def get_folder(self, object_id: str) -> Folder:
+        """Retrieve folder with objectId given"""
+        await self.prepare()
+        query = CMISQuery("SELECT * FROM cmis:folder WHERE cmis:objectId = '%s'")
+        page = await self.fetch_query_page(query(object_id), None, 0)
+        if not page.objects:
+            error_string = (
+                f"Folder met objectId '{object_id}' bestaat niet in het CMIS connection"
+            )
+            raise FolderDoesNotExistError(error_string)
+        return Folder(page.objects[0], client=self)
+
+    async def get_folder_by_path(self, path: str) -> Optional[Folder]:
+        """Retrieve the folder with the given path, if it exists
+
+        :param path: string, the path from the root folder, e.g. /DRC/2026
+        :return: Folder or None
+        """
+        await self.prepare()
+        url = f"{self.root_folder_url}{quote(path)}"
+        logger.debug("CMIS_ADAPTER: get_folder_by_path: GET request url: %s", url)
+        try:
+            json_response = await self.get_request(
+                url, params={"cmisselector": "object"}
+            )
+        except CmisObjectNotFoundException:
+            return None
+        logger.debug(
+            "CMIS_ADAPTER: get_folder_by_path: response data: %s", json_response
+        )
+
+        folder = Folder(json_response, client=self)
+        # a document can have the same path
+        if getattr(folder, "baseTypeId", "cmis:folder") != "cmis:folder":
+            return None
+        return folder
+
+    async def get_child_folder(
+        self, parent: Folder, name: str, child_type: Union[str, dict] = None
+    ) -> Optional[Folder]:
+        """Get the folder in the parent folder that has a specific name
+
+        See :meth:`drc_cmis.browser.drc_document.Folder.get_child_folder`.
+        """
+        await self.prepare()
+        statement = parent.build_child_folder_statement(name, child_type)
+        page = await self.fetch_query_page(statement, None, 0)
+        if not page.objects:
+            return None
+        return Folder(page.objects[0], client=self)
+
+    async def get_parent_folders(self, cmis_object: CMISContentObject) -> List[Folder]:
+        """Get the parent folders of an object"""
+        await self.prepare()
+        params = {
+            "objectId": cmis_object.objectId,
+            "cmisselector": "parents",
+        }
+        logger.debug("CMIS_ADAPTER: get_parent_folders: request params: %s", params)
+        json_response = await self.get_request(self.root_folder_url, params=params)
+        logger.debug(
+            "CMIS_ADAPTER: get_parent_folders: response data: %s", json_response
+        )
+        return self.get_all_objects(json_response, Folder)
+
+    async def move_object(
+        self, cmis_object: CMISContentObject, target_folder: Folder
+    ) -> CMISContentObject:
+        """Move an object from its (first) parent folder to the target folder"""
+        source_folder = (await self.get_parent_folders(cmis_object))[0]
+
+        data = cmis_object.build_move_request_body(source_folder, target_folder)
+        logger.debug("CMIS_ADAPTER: move_object: request data: %s", data)
+
+        json_response = await self.post_request(self.root_folder_url, data=data)
+        logger.debug("CMIS_ADAPTER: move_object: response data: %s", json_response)
+        cmis_object.data = json_response
+        cmis_object.properties = json_response.get("properties")
+        return cmis_object
+
+    async def update_properties(
+        self, cmis_object: CMISContentObject, properties: dict
+    ) -> CMISContentObject:
+        """Update the properties of an object"""
+        await self.prepare()
+        data = cmis_object.build_update_request_body(properties)
+        logger.debug("CMIS_ADAPTER: update_properties: request data: %s", data)
+
+        json_response = await self.post_request(self.root_folder_url, data=data)
+        logger.debug(
+            "CMIS_ADAPTER: update_properties: response data: %s", json_response
+        )
+        cmis_object.data = json_response
+        cmis_object.properties = json_response.get("properties")
+        return cmis_object
+
+    async def copy_gebruiksrechten(
+        self, source_object: Gebruiksrechten, destination_folder: Folder
+    ) -> Gebruiksrechten:
+        """Copy a gebruiksrechten to a folder
+
+        :param source_object: Gebruiksrechten, the gebruiksrechten to copy
+        :param destination_folder: Folder, the folder in which to place the copied gebruiksrechten
+        :return: the copied object
+        """
+        await self.prepare()
+        properties = self.get_gebruiksrechten_copy_properties(source_object)
+        data = create_json_request_body(destination_folder, properties)
+        logger.debug("CMIS_ADAPTER: copy_gebruiksrechten: request data: %s", data)
+
+        json_response = await self.post_request(self.root_folder_url, data=data)
+        logger.debug(
+            "CMIS_ADAPTER: copy_gebruiksrechten: response data: %s", json_response
+        )
+
+        return Gebruiksrechten(json_response, client=self)
+
+    async def copy_document(
+        self, document: Document, destination_folder: Folder
+    ) -> Document:
+        """Copy document to a folder
+
+        See :meth:`drc_cmis.browser.client.CMISDRCClient.copy_document`.
+
+        :param document: Document, the document to copy
+        :param destination_folder: Folder, the folder in which to place the copied document
+        :return: the copied document
+        """
+        await self.prepare()
+        copy_properties = self.get_document_copy_properties(document)
+
+        if self.server_side_copy:
+            data = self.build_copy_from_source_request_body(
+                document, destination_folder, copy_properties
+            )
+            logger.debug("CMIS_ADAPTER: copy_document: request data: %s", data)
+            try:
+                json_response = await self.post_request(self.root_folder_url, data=data)
+            except CmisBaseException as exc:
+                if not is_not_supported(exc):
+                    raise
+                logger.info(
+                    "CMIS_ADAPTER: copy_document: createDocumentFromSource is not "
+                    "supported, copying the content instead"
+                )
+                self.server_side_copy = False
+            else:
+                logger.debug(
+                    "CMIS_ADAPTER: copy_document: response data: %s", json_response
+                )
+                return Document(json_response, client=self)
+
+        data = self.build_content_copy_request_body(
+            document, destination_folder, copy_properties
+        )
+        logger.debug("CMIS_ADAPTER: copy_document: request data: %s", data)
+
+        with await self.get_content_stream(document) as content:
+            json_response = await self.post_request(self.root_folder_url, data=data)
+            logger.debug(
+                "CMIS_ADAPTER: copy_document: response data: %s", json_response
+            )
+
+            cmis_doc = Document(json_response, client=self)
+            return await self.set_content_stream(
+                cmis_doc, content, filename=document.bestandsnaam
+            )
+
+    async def create_content_object(
+        self, data: dict, object_type: str, destination_folder: Folder = None
+    ) -> CMISContentObject:
+        """Create a Gebruiksrechten or a ObjectInformatieObject
+
+        :param data: dict, properties of the object to create
+        :param object_type: string, either "gebruiksrechten" or "oio"
+        :param destination_folder: Folder, a folder where to create the object. If not provided,
+            the object will be placed in a temporary folder.
+        :return: Either a Gebruiksrechten or ObjectInformatieObject
+        """
+        assert object_type in [
+            "gebruiksrechten",
+            "oio",
+        ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
+
+        await self.prepare()
+        if destination_folder is None:
+            destination_folder = await self.get_related_data_folder()
+
+        json_data = self.build_content_object_request_body(
+            data, object_type, destination_folder
+        )
+        logger.debug("CMIS_ADAPTER: create_content_object: request data: %s", json_data)
+        json_response = await self.post_request(self.root_folder_url, data=json_data)
+        logger.debug(
+            "CMIS_ADAPTER: create_content_object: response data: %s", json_response
+        )
+
+        if object_type == "gebruiksrechten":
+            return Gebruiksrechten(json_response, client=self)
+        elif object_type == "oio":
+            return ObjectInformatieObject(json_response, client=self)
+
+    async def create_document(
+        self,
+        identification: str,
+        bronorganisatie: str,
+        data: dict,
+        content: BytesIO = None,
+        check_if_already_exists: bool = True,
+        folder: Optional[Folder] = None,
+    ) -> Document:
+        """Create a cmis document.
+
+        See :meth:`drc_cmis.browser.client.CMISDRCClient.create_document` for the
+        parameters.
+        """
+        await self.prepare()
+        if check_if_already_exists and identification and bronorganisatie:
+            await self.check_document_exists(identification, bronorganisatie)
+
+        properties = self.get_new_document_properties(
+            identification, bronorganisatie, data
+        )
+        if content is None:
+            content = BytesIO()
+
+        async def create_in_other_folder() -> dict:
+            # Create Document in default folder
+            other_folder = folder or await self.get_or_create_other_folder()
+
+            json_data = create_json_request_body(other_folder, dict(properties))
+            logger.debug("CMIS_ADAPTER: create_document: request data: %s", json_data)
+
+            return await self.post_request(self.root_folder_url, data=json_data)
+
+        json_response = await self.retry_with_fresh_folders(create_in_other_folder)
+        logger.debug("CMIS_ADAPTER: create_document: response data: %s", json_response)
+        cmis_doc = Document(json_response, client=self)
+        content.seek(0)
+        return await self.set_content_stream(
+            cmis_doc, content, filename=data.get("bestandsnaam")
+        )
+
+    async def set_content_stream(
+        self, document: Document, content: BinaryIO, filename: Optional[str] = None
+    ) -> Document:
+        """Upload the content of a document, which is streamed from the file"""
+        await self.prepare()
+        data, files = document.build_set_content_request(content, filename)
+        logger.debug("CMIS_ADAPTER: set_content_stream: request data: %s", data)
+
+        json_response = await self.post_request(
+            self.root_folder_url, data=data, files=files
+        )
+        logger.debug(
+            "CMIS_ADAPTER: set_content_stream: response data: %s", json_response
+        )
+        return Document(json_response, client=self)
+
+    async def get_content_stream(
+        self,
+        document: Document,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> BinaryIO:
+        """Retrieve the content of the document.
+
+        The content is spooled to a file while it is received, see
+        :func:`drc_cmis.utils.streams.aspool_chunks`.
+
+        :param document: Document, the document of which to retrieve the content
+        :param byte_range: tuple, the first and last (inclusive, optional) byte of the
+            content to retrieve.
+        :return: file-like object with the content.
+        """
+        await self.prepare()
+        params = {"objectId": document.objectId, "cmisaction": "content"}
+        logger.debug("CMIS_ADAPTER: get_content_stream: request params: %s", params)
+        response = await self.get_stream(
+            self.root_folder_url, params=params, byte_range=byte_range
+        )
+        chunks = response.aiter_bytes(CHUNK_SIZE)
+        if byte_range is not None and response.status_code != 206:
+            # the DMS ignored the range, so skip the rest of the content here
+            chunks = aslice_chunks(chunks, *byte_range)
+        try:
+            return await aspool_chunks(chunks)
+        finally:
+            await response.aclose()
+
+    async def checkout(self, document: Document) -> Document:
+        """Check out the document and return the private working copy"""
+        await self.prepare()
+        data = document.build_checkout_request_body()
+        logger.debug("CMIS_ADAPTER: checkout: request data: %s", data)
+        json_response = await self.post_request(self.root_folder_url, data=data)
+        logger.debug("CMIS_ADAPTER: checkout: response data: %s", json_response)
+        return Document(json_response, client=self)
+
+    async def checkin(
+        self, document: Document, checkin_comment: str, major: bool = True
+    ) -> Document:
+        """Check in the private working copy and return the new version"""
+        await self.prepare()
+        props = document.build_checkin_request_body(checkin_comment, major)
+        logger.debug("CMIS_ADAPTER: checkin: request data: %s", props)
+
+        json_response = await self.post_request(self.root_folder_url, props)
+        logger.debug("CMIS_ADAPTER: checkin: response data: %s", json_response)
+        return Document(json_response, client=self)
+
+    async def get_private_working_copy(self, document: Document) -> Optional[Document]:
+        """Retrieve the private working copy version of a document"""
+        await self.prepare()
+        if document.versionSeriesCheckedOutId is None:
+            params = {"objectId": document.objectId, "cmisselector": "versions"}
+            logger.debug("CMIS_ADAPTER: get_all_versions: request params: %s", params)
+            all_versions = await self.get_request(self.root_folder_url, params=params)
+            for data in all_versions:
+                version = Document(data, client=self)
+                if version.versionLabel == "pwc":
+                    return version
+            return None
+
+        # http://docs.oasis-open.org/cmis/CMIS/v1.1/os/CMIS-v1.1-os.html#x1-5590004
+        params = {
+            "cmisselector": "object",  # get the object rather than the content
+            "objectId": document.versionSeriesCheckedOutId,
+        }
+        logger.debug(
+            "CMIS_ADAPTER: get_private_working_copy: request params: %s", params
+        )
+        data = await self.get_request(self.root_folder_url, params)
+        logger.debug("CMIS_ADAPTER: get_private_working_copy: response data: %s", data)
+        return Document(data, client=self)
+
+    async def lock_document(self, drc_uuid: str, lock: str) -> None:
+        """
+        Check out the CMIS document and store the lock value for check in/unlock.
+        """
+        cmis_doc = await self.get_document(drc_uuid)
+
+        already_locked = self.get_already_locked_error()
+
+        try:
+            pwc = await self.checkout(cmis_doc)
+        except CmisInvalidArgumentException:
+            raise already_locked
+
+        if pwc.lock:
+            raise already_locked
+
+        try:
+            # store the lock value on the PWC so we can compare it later
+            await self.update_properties(pwc, self.get_lock_properties(lock))
+        except CmisUpdateConflictException as exc:
+            raise already_locked from exc
+
+    async def unlock_document(
+        self, drc_uuid: str, lock: str, force: bool = False
+    ) -> Document:
+        """Unlock a document with objectId workspace://SpacesStore/<uuid>"""
+        cmis_doc = await self.get_document(drc_uuid)
+        pwc = await self.get_private_working_copy(cmis_doc)
+
+        self.check_unlock(pwc.lock, lock, force)
+        await self.update_properties(pwc, self.get_lock_properties(""))
+        return await self.checkin(pwc, "Updated via Documenten API")
@@ -0,0 +1,155 @@
+import logging
+from json.decoder import JSONDecodeError
+from typing import Optional, Tuple
+
+from drc_cmis.instrumentation import (
+    BROWSER,
+    get_browser_action,
+    parsing,
+    round_trip,
+)
+from drc_cmis.utils.exceptions import CmisBaseException, CmisNoValidResponse
+from drc_cmis.utils.streams import aiter_chunks
+
+from .multipart import FormDataBody
+from .request import STATUS_EXCEPTIONS
+
+logger = logging.getLogger(__name__)
+
+
+def encode_form_data(data: dict) -> dict:
+    """Convert the form fields to strings, like :mod:`requests` does
+
+    Fields without a value are left out.
+    """
+    encoded = {}
+    for key, value in data.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            encoded[key] = [str(item) for item in value]
+        else:
+            encoded[key] = str(value)
+    return encoded
+
+
+class AsyncRequest:
+    """
+    Like :class:`drc_cmis.browser.request.Request`, with an ``httpx.AsyncClient``.
+
+    :param http_client: the ``httpx.AsyncClient`` to make the requests with
+    """
+
+    def __init__(self, http_client):
+        self.http_client = http_client
+
+    async def get_request(self, url, user, password, params=None):
+        logger.debug(f"GET: {url} | {params}")
+        headers = {"Accept": "application/json"}
+        with round_trip(BROWSER, get_browser_action(params), url) as trip:
+            response = await self.http_client.get(
+                url, params=params, auth=(user, password), headers=headers
+            )
+            trip.record_response(response)
+        raise_for_status(response, url)
+
+        if response.headers.get("Content-Type", "").startswith("application/json"):
+            with parsing(trip):
+                return response.json()
+        return response.content
+
+    async def get_stream(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        params: Optional[dict] = None,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    ):
+        """Make a GET request, without reading the content of the response yet
+
+        :param byte_range: tuple, the first and last (inclusive, optional) byte to
+            request with a ``Range`` header.
+        :return: the ``httpx.Response``, which has to be closed by the caller
+            with ``aclose()``.
+        """
+        logger.debug(f"GET (stream): {url} | {params} | {byte_range}")
+        headers = {}
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        request = self.http_client.build_request(
+            "GET", url, params=params, headers=headers
+        )
+        with round_trip(BROWSER, get_browser_action(params), url) as trip:
+            response = await self.http_client.send(
+                request, auth=(user, password), stream=True
+            )
+            trip.record_response(response, stream=True)
+        if response.is_error:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+            raise_for_status(response, url)
+        return response
+
+    async def post_request(self, url, data, user, password, headers=None, files=None):
+        logger.debug(f"POST: {url} | {data}")
+        action = get_browser_action(data)
+        if headers is None:
+            headers = {"Accept": "application/json"}
+        data = encode_form_data(data)
+        if files:
+            # stream the files, instead of reading them into memory
+            body = FormDataBody(data, files)
+            headers = {**headers, "Content-Type": body.content_type}
+            if hasattr(body, "len"):
+                headers["Content-Length"] = str(body.len)
+            body_kwargs = {"content": aiter_chunks(body)}
+        else:
+            body_kwargs = {"data": data}
+        with round_trip(BROWSER, action, url) as trip:
+            response = await self.http_client.post(
+                url, auth=(user, password), headers=headers, **body_kwargs
+            )
+            trip.record_response(response)
+        raise_for_status(response, url)
+
+        try:
+            with parsing(trip):
+                if response.headers.get("Content-Type", "").startswith(
+                    "application/json"
+                ):
+                    return response.json()
+                else:
+                    return response.content.decode("UTF-8")
+        except JSONDecodeError:
+            if not response.text:
+                return None
+            raise CmisNoValidResponse(
+                status=response.status_code,
+                url=url,
+                message=response.text,
+                code="invalid_response",
+            )
+
+
+def raise_for_status(response, url: str) -> None:
+    """Raise the CMIS exception for the status of an unsuccessful ``httpx`` response"""
+    if not response.is_error:
+        return
+
+    try:
+        error = response.json()
+    except JSONDecodeError:
+        error = {"message": response.text}
+
+    exception_class = STATUS_EXCEPTIONS.get(response.status_code, CmisBaseException)
+    raise exception_class(
+        status=response.status_code,
+        url=url,
+        message=error.get("message"),
+        code=error.get("exception"),
+    )
@@ -3,10 +3,9 @@ import logging
 import uuid
 from io import BytesIO
 from typing import List, Optional, Union
+from urllib.parse import quote
 from uuid import UUID
 
-from django.utils.crypto import constant_time_compare
-
 from drc_cmis.browser.drc_document import (
     CMISContentObject,
     Document,
@@ -21,22 +20,28 @@ from drc_cmis.browser.utils import create_json_request_body
 from drc_cmis.client import CMISClient
 from drc_cmis.utils.exceptions import (
     CmisInvalidArgumentException,
+    CmisNotSupportedException,
+    CmisObjectNotFoundException,
     CmisUpdateConflictException,
     DocumentDoesNotExistError,
-    DocumentExistsError,
-    DocumentLockedException,
     FolderDoesNotExistError,
     GetFirstException,
-    LockDidNotMatchException,
 )
 from drc_cmis.utils.mapper import mapper
-from drc_cmis.utils.query import CMISQuery
+from drc_cmis.utils.query import (
+    CMISQuery,
+    QueryPage,
+    QueryPager,
+    format_select,
+    set_projection,
+)
 from drc_cmis.utils.utils import (
-    build_query_filters,
     extract_latest_version,
     get_random_string,
 )
 
+from .fetcher import DEFAULT_REPOSITORY_ID, repo_info_fetcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,11 +58,24 @@ class CMISDRCClient(CMISClient):
     _request = None
     _repository_info = None
 
+    # Whether documents are copied by the DMS, see copy_document
+    server_side_copy = True
+
+    # the browser binding uses the default repository at the base URL
+    repository_id = DEFAULT_REPOSITORY_ID
+
     def get_request(self, url, params=None):
         if not self._request:
             self._request = Request()
         return self._request.get_request(url, self.user, self.password, params)
 
+    def get_stream(self, url, params=None, byte_range=None):
+        if not self._request:
+            self._request = Request()
+        return self._request.get_stream(
+            url, self.user, self.password, params, byte_range=byte_range
+        )
+
     def post_request(self, url, data, headers=None, files=None):
         if not self._request:
             self._request = Request()
@@ -92,16 +110,17 @@ class CMISDRCClient(CMISClient):
     @property
     def repository_info(self) -> dict:
         if not self._repository_info:
-            logger.debug(
-                "CMIS_ADAPTER: get_repository_info: GET request url: %s", self.base_url
-            )
+            self._repository_info = self.fetch_repository_info()
+        return self._repository_info
 
-            response = self.get_request(self.base_url)
+    def fetch_repository_info(self) -> dict:
+        """Fetch the repository info and cache it"""
+        return repo_info_fetcher.fetch(self.base_url, self.user, self.password)
 
-            logger.debug("CMIS_ADAPTER: get_repository_info: response: %s", response)
-            self._repository_info = response["-default-"]
-
-        return self._repository_info
+    def invalidate_repository_info(self) -> None:
+        """Make sure the repository info is retrieved again from the DMS"""
+        repo_info_fetcher.invalidate(self.base_url, self.user)
+        self._repository_info = None
 
     @property
     def root_folder_id(self) -> str:
@@ -112,38 +131,104 @@ class CMISDRCClient(CMISClient):
         if len(json.get("results")) == 0:
             raise GetFirstException()
 
-        return return_type(json.get("results")[0])
+        return return_type(json.get("results")[0], client=self)
 
     def get_all_results(self, json, return_type):
         results = []
         for item in json.get("results"):
-            results.append(return_type(item))
+            results.append(return_type(item, client=self))
         return results
 
     def get_all_objects(self, json, return_type):
         objects = []
         for item in json:
-            objects.append(return_type(item.get("object")))
+            objects.append(return_type(item.get("object"), client=self))
         return objects
 
     # generic querying
     def query(
-        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
     ):
+        pager = self.get_query_pager(return_type_name, lhs, rhs, select=select)
+        return pager.get_results(pager.fetch_page(None, 0).objects)
+
+    def get_query_pager(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
+    ) -> QueryPager:
         return_type = self.get_return_type(return_type_name)
-        table = return_type.table
-        where = (" WHERE " + " AND ".join(lhs)) if lhs else ""
-        query = CMISQuery("SELECT * FROM %s%s" % (table, where))
-        statement = query(*rhs) if rhs else query()
+        statement = self.build_query_statement(return_type_name, lhs, rhs, select)
 
-        body = {"cmisaction": "query", "statement": statement}
-        logger.debug("CMIS_ADAPTER: query: request data: %s", body)
-        response = self.post_request(self.base_url, body)
-        logger.debug("CMIS_ADAPTER: query: response: %s", response)
+        # the pages may be fetched in another thread, which shouldn't load the config
+        if not self._request:
+            self._request = Request()
+        request, url, auth = self._request, self.base_url, (self.user, self.password)
+
+        def fetch_page(
+            max_items: Optional[int], skip_count: int, decode: bool = True
+        ) -> QueryPage:
+            body = {"cmisaction": "query", "statement": statement}
+            if max_items is not None:
+                body.update(maxItems=max_items, skipCount=skip_count)
+            logger.debug("CMIS_ADAPTER: query: request data: %s", body)
+            response = request.post_request(url, body, *auth)
+            logger.debug("CMIS_ADAPTER: query: response: %s", response)
+
+            objects = response.get("results")
+            return QueryPage(
+                objects=objects if decode else None,
+                has_more_items=response.get("hasMoreItems", False),
+                num_items=response.get("numItems"),
+                object_count=len(objects),
+            )
+
+        def get_results(objects: List[dict]) -> list:
+            return self.get_query_results(return_type, objects, select)
+
+        return QueryPager(fetch_page, get_results)
 
-        return self.get_all_results(response, return_type)
+    def build_query_statement(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
+    ) -> str:
+        """Return the SQL statement of a query, see :meth:`query`"""
+        table = self.get_return_type(return_type_name).table
+        where = (" WHERE " + " AND ".join(lhs)) if lhs else ""
+        query = CMISQuery("SELECT %s FROM %s%s" % (format_select(select), table, where))
+        return query(*rhs) if rhs else query()
+
+    def get_query_results(
+        self, return_type: type, objects: List[dict], select: Optional[List[str]]
+    ) -> list:
+        """Turn the objects in the response to a query into the return type"""
+        results = self.get_all_results({"results": objects}, return_type)
+        set_projection(results, select)
+        return results
 
     def create_folder(self, name: str, parent_id: str, properties: dict = None):
+        data = self.build_create_folder_request_body(name, parent_id, properties)
+        logger.debug("CMIS_ADAPTER: create_folder: request data: %s", data)
+
+        json_response = self.post_request(self.root_folder_url, data=data)
+        logger.debug("CMIS_ADAPTER: create_folder: response data: %s", json_response)
+
+        return Folder(json_response, client=self)
+
+    @staticmethod
+    def build_create_folder_request_body(
+        name: str, parent_id: str, properties: Optional[dict] = None
+    ) -> dict:
+        """Return the request data to create a folder, see :meth:`create_folder`"""
         data = {
             "objectId": parent_id,
             "cmisaction": "createFolder",
@@ -159,13 +244,7 @@ class CMISDRCClient(CMISClient):
                 data[f"propertyId[{prop_count}]"] = prop
                 data[f"propertyValue[{prop_count}]"] = value
                 prop_count += 1
-
-        logger.debug("CMIS_ADAPTER: create_folder: request data: %s", data)
-
-        json_response = self.post_request(self.root_folder_url, data=data)
-        logger.debug("CMIS_ADAPTER: create_folder: response data: %s", json_response)
-
-        return Folder(json_response)
+        return data
 
     def get_folder(self, object_id: str) -> Folder:
         """Retrieve folder with objectId given"""
@@ -185,6 +264,28 @@ class CMISDRCClient(CMISClient):
             )
             raise FolderDoesNotExistError(error_string)
 
+    def get_folder_by_path(self, path: str) -> Optional[Folder]:
+        """Retrieve the folder with the given path, if it exists
+
+        :param path: string, the path from the root folder, e.g. /DRC/2026
+        :return: Folder or None
+        """
+        url = f"{self.root_folder_url}{quote(path)}"
+        logger.debug("CMIS_ADAPTER: get_folder_by_path: GET request url: %s", url)
+        try:
+            json_response = self.get_request(url, params={"cmisselector": "object"})
+        except CmisObjectNotFoundException:
+            return None
+        logger.debug(
+            "CMIS_ADAPTER: get_folder_by_path: response data: %s", json_response
+        )
+
+        folder = Folder(json_response, client=self)
+        # a document can have the same path
+        if getattr(folder, "baseTypeId", "cmis:folder") != "cmis:folder":
+            return None
+        return folder
+
     def copy_gebruiksrechten(
         self, source_object: Gebruiksrechten, destination_folder: Folder
     ) -> Gebruiksrechten:
@@ -194,75 +295,140 @@ class CMISDRCClient(CMISClient):
         :param destination_folder: Folder, the folder in which to place the copied gebruiksrechten
         :return: the copied object
         """
-        # copy the properties from the source object
-        properties = {
+        properties = self.get_gebruiksrechten_copy_properties(source_object)
+        data = create_json_request_body(destination_folder, properties)
+        logger.debug("CMIS_ADAPTER: copy_gebruiksrechten: request data: %s", data)
+
+        json_response = self.post_request(self.root_folder_url, data=data)
+        logger.debug(
+            "CMIS_ADAPTER: copy_gebruiksrechten: response data: %s", json_response
+        )
+
+        return Gebruiksrechten(json_response, client=self)
+
+    @staticmethod
+    def get_source_properties(source_object: CMISContentObject) -> dict:
+        """Return the (non-CMIS) properties of an object to copy"""
+        return {
             property_name: property_details["value"]
             for property_name, property_details in source_object.properties.items()
             if "cmis:" not in property_name
         }
 
-        file_name = get_random_string()
-
+    def get_gebruiksrechten_copy_properties(
+        self, source_object: Gebruiksrechten
+    ) -> dict:
+        """Return the properties of a copy of the gebruiksrechten"""
+        properties = self.get_source_properties(source_object)
         properties.update(
             **{
                 "cmis:objectTypeId": source_object.objectTypeId,
-                "cmis:name": file_name,
+                "cmis:name": get_random_string(),
                 mapper(
                     "kopie_van", type="gebruiksrechten"
                 ): source_object.objectId,  # Keep tack of where this is copied from.
                 mapper("uuid", type="gebruiksrechten"): str(uuid.uuid4()),
             }
         )
-
-        data = create_json_request_body(destination_folder, properties)
-        logger.debug("CMIS_ADAPTER: copy_gebruiksrechten: request data: %s", data)
-
-        json_response = self.post_request(self.root_folder_url, data=data)
-        logger.debug(
-            "CMIS_ADAPTER: copy_gebruiksrechten: response data: %s", json_response
-        )
-
-        return Gebruiksrechten(json_response)
+        return properties
+
+    @staticmethod
+    def get_document_copy_properties(document: Document) -> dict:
+        """Return the properties of a copy that differ from the source document"""
+        return {
+            "cmis:objectTypeId": document.objectTypeId,
+            mapper("titel", type="document"): f"{document.titel} - copy",
+            "drc:kopie_van": document.uuid,  # Keep tack of where this is copied from.
+            "drc:document__uuid": str(uuid.uuid4()),
+            # Update the cmis:name to make it more unique
+            "cmis:name": f"{document.titel}-{get_random_string()}",
+        }
 
     def copy_document(self, document: Document, destination_folder: Folder) -> Document:
         """Copy document to a folder
 
+        The document is copied by the DMS (``createDocumentFromSource``) if it
+        supports that. Otherwise the content is streamed from the source document
+        into a new document.
+
         :param document: Document, the document to copy
         :param destination_folder: Folder, the folder in which to place the copied document
         :return: the copied document
         """
+        copy_properties = self.get_document_copy_properties(document)
+
+        if self.server_side_copy:
+            try:
+                return self._copy_document_from_source(
+                    document, destination_folder, copy_properties
+                )
+            except CmisNotSupportedException:
+                logger.info(
+                    "CMIS_ADAPTER: copy_document: createDocumentFromSource is not "
+                    "supported, copying the content instead"
+                )
+                self.server_side_copy = False
+
+        data = self.build_content_copy_request_body(
+            document, destination_folder, copy_properties
+        )
+        logger.debug("CMIS_ADAPTER: copy_document: request data: %s", data)
 
-        # copy the properties from the source document
-        properties = {
-            property_name: property_details["value"]
-            for property_name, property_details in document.properties.items()
-            if "cmis:" not in property_name
-        }
+        with document.get_content_stream(stream=True) as content:
+            json_response = self.post_request(self.root_folder_url, data=data)
+            logger.debug(
+                "CMIS_ADAPTER: copy_document: response data: %s", json_response
+            )
 
-        properties.update(
-            **{
-                "cmis:objectTypeId": document.objectTypeId,
-                mapper("titel", type="document"): f"{document.titel} - copy",
-                "drc:kopie_van": document.uuid,  # Keep tack of where this is copied from.
-                "drc:document__uuid": str(uuid.uuid4()),
-            }
-        )
+            cmis_doc = Document(json_response, client=self)
+            return cmis_doc.set_content_stream(content, filename=document.bestandsnaam)
 
-        # Update the cmis:name to make it more unique
-        file_name = f"{document.titel}-{get_random_string()}"
-        properties["cmis:name"] = file_name
+    def _copy_document_from_source(
+        self, document: Document, destination_folder: Folder, properties: dict
+    ) -> Document:
+        """Let the DMS copy the document, including its content
 
-        data = create_json_request_body(destination_folder, properties)
+        :param properties: dict, the properties that differ from the source document
+        """
+        data = self.build_copy_from_source_request_body(
+            document, destination_folder, properties
+        )
         logger.debug("CMIS_ADAPTER: copy_document: request data: %s", data)
 
-        content = document.get_content_stream()
         json_response = self.post_request(self.root_folder_url, data=data)
         logger.debug("CMIS_ADAPTER: copy_document: response data: %s", json_response)
 
-        cmis_doc = Document(json_response)
-        content.seek(0)
+        return Document(json_response, client=self)
+
+    @staticmethod
+    def build_copy_from_source_request_body(
+        document: Document, destination_folder: Folder, properties: dict
+    ) -> dict:
+        """Return the request data to let the DMS copy the document
+
+        :param properties: dict, the properties that differ from the source document
+        """
+        data = create_json_request_body(
+            destination_folder,
+            dict(properties),
+            cmis_action="createDocumentFromSource",
+        )
+        data["sourceId"] = document.objectId
+        return data
 
-        return cmis_doc.set_content_stream(content, filename=document.bestandsnaam)
+    def build_content_copy_request_body(
+        self, document: Document, destination_folder: Folder, copy_properties: dict
+    ) -> dict:
+        """Return the request data to create a copy of which the content is copied
+        by the client
+
+        :param copy_properties: dict, the properties that differ from the source
+            document, see :meth:`get_document_copy_properties`
+        """
+        # copy the properties from the source document
+        properties = self.get_source_properties(document)
+        properties.update(copy_properties)
+        return create_json_request_body(destination_folder, properties)
 
     def create_content_object(
         self, data: dict, object_type: str, destination_folder: Folder = None
@@ -281,9 +447,34 @@ class CMISDRCClient(CMISClient):
         ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
 
         if destination_folder is None:
-            other_folder = self.get_or_create_other_folder()
-            destination_folder = self.get_or_create_folder("Related data", other_folder)
 
+            def get_related_data_folder() -> Folder:
+                other_folder = self.get_or_create_other_folder()
+                return self.get_or_create_folder("Related data", other_folder)
+
+            destination_folder = self.retry_with_fresh_folders(get_related_data_folder)
+
+        json_data = self.build_content_object_request_body(
+            data, object_type, destination_folder
+        )
+        logger.debug("CMIS_ADAPTER: create_content_object: request data: %s", json_data)
+        json_response = self.post_request(self.root_folder_url, data=json_data)
+        logger.debug(
+            "CMIS_ADAPTER: create_content_object: response data: %s", json_response
+        )
+
+        if object_type == "gebruiksrechten":
+            return Gebruiksrechten(json_response, client=self)
+        elif object_type == "oio":
+            return ObjectInformatieObject(json_response, client=self)
+
+    def build_content_object_request_body(
+        self, data: dict, object_type: str, destination_folder: Folder
+    ) -> dict:
+        """Return the request data to create a Gebruiksrechten or a ObjectInformatieObject
+
+        See :meth:`create_content_object` for the parameters.
+        """
         properties = {
             mapper(key, type=object_type): value
             for key, value in data.items()
@@ -316,24 +507,20 @@ class CMISDRCClient(CMISClient):
             json_data[f"propertyValue[{prop_count}]"] = prop_value
             prop_count += 1
 
-        logger.debug("CMIS_ADAPTER: create_content_object: request data: %s", json_data)
-        json_response = self.post_request(self.root_folder_url, data=json_data)
-        logger.debug(
-            "CMIS_ADAPTER: create_content_object: response data: %s", json_response
-        )
-
-        if object_type == "gebruiksrechten":
-            return Gebruiksrechten(json_response)
-        elif object_type == "oio":
-            return ObjectInformatieObject(json_response)
+        return json_data
 
     def get_content_object(
-        self, drc_uuid: Union[str, UUID], object_type: str
+        self,
+        drc_uuid: Union[str, UUID],
+        object_type: str,
+        select: Optional[List[str]] = None,
     ) -> CMISContentObject:
         """Get the gebruiksrechten/oio with specified uuid
 
         :param drc_uuid: string or UUID, the value of drc:oio__uuid or drc:gebruiksrechten__uuid
         :param object_type: string, either "gebruiksrechten" or "oio"
+        :param select: list of str, the CMIS names of the properties to retrieve.
+            Defaults to all.
         :return: Either a Gebruiksrechten or ObjectInformatieObject
         """
 
@@ -342,7 +529,9 @@ class CMISDRCClient(CMISClient):
             "oio",
         ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
 
-        query = CMISQuery("SELECT * FROM drc:%s WHERE drc:%s__uuid = '%s'")
+        query = CMISQuery(
+            f"SELECT {format_select(select)} FROM drc:%s WHERE drc:%s__uuid = '%s'"
+        )
 
         data = {
             "cmisaction": "query",
@@ -356,7 +545,7 @@ class CMISDRCClient(CMISClient):
         )
 
         try:
-            return self.get_first_result(
+            content_object = self.get_first_result(
                 json_response, self.get_return_type(object_type)
             )
         except GetFirstException:
@@ -364,6 +553,9 @@ class CMISDRCClient(CMISClient):
             error_string = f"{object_title} met uuid {drc_uuid} bestaat niet in het CMIS connection"
             raise DocumentDoesNotExistError(error_string)
 
+        set_projection([content_object], select)
+        return content_object
+
     def create_document(
         self,
         identification: str,
@@ -371,6 +563,7 @@ class CMISDRCClient(CMISClient):
         data: dict,
         content: BytesIO = None,
         check_if_already_exists: bool = True,
+        folder: Optional[Folder] = None,
     ) -> Document:
         """Create a cmis document.
 
@@ -378,45 +571,65 @@ class CMISDRCClient(CMISClient):
         :param bronorganisatie: string, The identifier of the organisation.
         :param data: dict, A dict with all the data that needs to be saved on the document.
         :param content: BytesIO, The content of the document.
+        :param check_if_already_exists: Bool, whether to check if the document with given identificatie/bronorganisatie
+        already exists in the DMS.
+        :param folder: Folder, the folder to create the document in. Defaults to the
+            folder of the 'other' folder path. A folder passed in is not resolved
+            again if it no longer exists, that is up to the caller.
         :return: document
         """
-        if identification and bronorganisatie:
+        if check_if_already_exists and identification and bronorganisatie:
             self.check_document_exists(identification, bronorganisatie)
 
-        data.setdefault("versie", 1)
-        data.setdefault(
-            "object_type_id",
-            f"{self.get_object_type_id_prefix('document')}drc:document",
+        properties = self.get_new_document_properties(
+            identification, bronorganisatie, data
         )
-        data["bronorganisatie"] = bronorganisatie
-        data["identificatie"] = identification
-
         if content is None:
             content = BytesIO()
 
-        # Create Document in default folder
-        other_folder = self.get_or_create_other_folder()
+        def create_in_other_folder() -> dict:
+            # Create Document in default folder
+            other_folder = folder or self.get_or_create_other_folder()
 
-        properties = Document.build_properties(data, new=True)
+            json_data = create_json_request_body(other_folder, dict(properties))
+            logger.debug("CMIS_ADAPTER: create_document: request data: %s", json_data)
 
-        json_data = create_json_request_body(other_folder, properties)
-        logger.debug("CMIS_ADAPTER: create_document: request data: %s", json_data)
+            return self.post_request(self.root_folder_url, data=json_data)
 
-        json_response = self.post_request(self.root_folder_url, data=json_data)
+        if folder is None:
+            json_response = self.retry_with_fresh_folders(create_in_other_folder)
+        else:
+            json_response = create_in_other_folder()
         logger.debug("CMIS_ADAPTER: create_document: response data: %s", json_response)
-        cmis_doc = Document(json_response)
+        cmis_doc = Document(json_response, client=self)
         content.seek(0)
         return cmis_doc.set_content_stream(content, filename=data.get("bestandsnaam"))
 
+    def get_new_document_properties(
+        self, identification: str, bronorganisatie: str, data: dict
+    ) -> dict:
+        """Complete the data of a new document and return its properties"""
+        data.setdefault("versie", 1)
+        data.setdefault(
+            "object_type_id",
+            f"{self.get_object_type_id_prefix('document')}drc:document",
+        )
+        data["bronorganisatie"] = bronorganisatie
+        data["identificatie"] = identification
+        return Document.build_properties(data, new=True)
+
+    @staticmethod
+    def get_lock_properties(lock: str) -> dict:
+        """Return the properties to store the lock value of a document"""
+        return {mapper("lock"): lock}
+
     def lock_document(self, drc_uuid: str, lock: str):
         """
         Check out the CMIS document and store the lock value for check in/unlock.
         """
         cmis_doc = self.get_document(drc_uuid)
 
-        already_locked = DocumentLockedException(
-            "Document was already checked out", code="double_lock"
-        )
+        already_locked = self.get_already_locked_error()
 
         try:
             pwc = cmis_doc.checkout()
@@ -428,7 +641,7 @@ class CMISDRCClient(CMISClient):
 
         try:
             # store the lock value on the PWC so we can compare it later
-            pwc.update_properties({mapper("lock"): lock})
+            pwc.update_properties(self.get_lock_properties(lock))
         except CmisUpdateConflictException as exc:
             raise already_locked from exc
 
@@ -439,20 +652,23 @@ class CMISDRCClient(CMISClient):
         cmis_doc = self.get_document(drc_uuid)
         pwc = cmis_doc.get_private_working_copy()
 
-        if constant_time_compare(pwc.lock, lock) or force:
-            pwc.update_properties({mapper("lock"): ""})
-            new_doc = pwc.checkin("Updated via Documenten API")
-            return new_doc
-
-        raise LockDidNotMatchException("Lock did not match", code="unlock-failed")
+        self.check_unlock(pwc.lock, lock, force)
+        pwc.update_properties(self.get_lock_properties(""))
+        return pwc.checkin("Updated via Documenten API")
 
     def get_document(
-        self, drc_uuid: Optional[str], via_identification=None, filters=None
+        self,
+        drc_uuid: Optional[str],
+        via_identification=None,
+        filters=None,
+        select: Optional[List[str]] = None,
     ):
         """
         Given a cmis document instance.
 
         :param drc_uuid: str, the drc:document__uuid
+        :param select: list of str, the CMIS names of the properties to retrieve.
+            Defaults to all.
         :return: :class:`AtomPubDocument` object, the latest version of this document
         """
         assert (
@@ -466,46 +682,22 @@ class CMISDRCClient(CMISClient):
         if uuid is None:
             raise does_not_exist
 
-        # this always selects the latest version, and if there is a pwc, also the pwc is returned
-        query = CMISQuery(
-            "SELECT * FROM drc:document WHERE drc:document__uuid = '%s' %s"
-        )
+        # the version label tells the pwc apart from the latest version
+        if select is not None:
+            select = [*select, "cmis:versionLabel"]
+
+        statement = self.build_document_query_statement(drc_uuid, filters, select)
 
-        filter_string = build_query_filters(
-            filters, filter_string="AND ", strip_end=True
-        )
         data = {
             "cmisaction": "query",
-            "statement": query(drc_uuid, filter_string),
+            "statement": statement,
         }
         logger.debug("CMIS_ADAPTER: get_document: request data: %s", data)
         json_response = self.post_request(self.base_url, data)
         logger.debug("CMIS_ADAPTER: get_document: response data: %s", json_response)
 
-        return extract_latest_version(self.document_type, json_response.get("results"))
-
-    def check_document_exists(
-        self, identification: Union[str, UUID], bronorganisatie: str
-    ):
-        """Check if a document with the same (identificatie, bronorganisatie) already exists in the repository"""
-
-        cmis_identificatie = mapper("identificatie", type="document")
-        cmis_bronorganisatie = mapper("bronorganisatie", type="document")
-
-        query = CMISQuery(
-            f"SELECT * FROM drc:document WHERE {cmis_identificatie} = '%s' AND {cmis_bronorganisatie} = '%s'"
+        document = extract_latest_version(
+            self.document_type, json_response.get("results"), client=self
         )
-
-        data = {
-            "cmisaction": "query",
-            "statement": query(str(identification), bronorganisatie),
-        }
-        logger.debug("CMIS_ADAPTER: check_document_exists: request data: %s", data)
-        json_response = self.post_request(self.base_url, data)
-        logger.debug(
-            "CMIS_ADAPTER: check_document_exists: response data: %s", json_response
-        )
-        if json_response["numItems"] > 0:
-            raise DocumentExistsError(
-                "Een document met dezelfde identificatie en bronorganisatie al bestaat."
-            )
+        set_projection([document], select)
+        return document
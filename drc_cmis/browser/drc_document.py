@@ -3,15 +3,17 @@ import logging
 import mimetypes
 import uuid
 from datetime import date
-from io import BytesIO
-from typing import List, Optional, Union
+from io import SEEK_END, BytesIO
+from typing import BinaryIO, List, Optional, Tuple, Union
 
 from django.utils import timezone
 
 import pytz
 from furl import furl
 
+from drc_cmis.cache import ConfigSnapshot, folder_path_cache
 from drc_cmis.mixins import RearrangeFilesOnDeleteMixin
+from drc_cmis.utils.exceptions import PropertyNotSelectedError
 from drc_cmis.utils.mapper import (
     DOCUMENT_MAP,
     GEBRUIKSRECHTEN_MAP,
@@ -20,7 +22,14 @@ from drc_cmis.utils.mapper import (
     ZAAKTYPE_MAP,
     mapper,
 )
-from drc_cmis.utils.query import CMISQuery
+from drc_cmis.utils.query import CMISQuery, format_select, set_projection
+from drc_cmis.utils.streams import (
+    CHUNK_SIZE,
+    ResponseStream,
+    get_content_length,
+    slice_chunks,
+    spool_chunks,
+)
 from drc_cmis.utils.utils import extract_latest_version, get_random_string
 
 logger = logging.getLogger(__name__)
@@ -30,13 +39,18 @@ class CMISBaseObject:
     name_map = None
     type_name = None
     type_class = None
+    # the properties selected in the query that retrieved the object, if not all
+    projection = None
 
-    def __init__(self, data):
+    def __init__(self, data, client=None):
         self.data = data
 
-        from drc_cmis.browser.client import CMISDRCClient
+        if client is None:
+            from drc_cmis.browser.client import CMISDRCClient
+            from drc_cmis.client_builder import get_shared_client
 
-        self.client = CMISDRCClient()
+            client = get_shared_client(CMISDRCClient)
+        self.client = client
 
         # Convert any timestamps to datetime objects
         properties = data.get("properties", {})
@@ -62,13 +76,23 @@ class CMISBaseObject:
             convert_name = self.name_map.get(name)
 
         if convert_name not in self.properties:
+            if self.projection is not None:
+                raise PropertyNotSelectedError(
+                    f"Property '{convert_name}' was not selected in the query"
+                )
             raise AttributeError(f"No property '{convert_name}'")
 
         return self.properties[convert_name]["value"]
 
     @classmethod
-    def build_properties(cls, data: dict) -> dict:
-        """Construct property dictionary."""
+    def build_properties(
+        cls, data: dict, snapshot: Optional[ConfigSnapshot] = None
+    ) -> dict:
+        """Construct property dictionary.
+
+        The ``snapshot`` is accepted for compatibility with the web service binding,
+        the properties don't depend on the configuration.
+        """
 
         props = {}
         for key, value in data.items():
@@ -115,23 +139,43 @@ class CMISContentObject(CMISBaseObject):
     def move_object(self, target_folder: "Folder"):
         source_folder = self.get_parent_folders()[0]
 
-        data = {
+        data = self.build_move_request_body(source_folder, target_folder)
+        logger.debug("CMIS_ADAPTER: move_object: request data: %s", data)
+
+        # invoke the URL
+        json_response = self.client.post_request(self.client.root_folder_url, data=data)
+        logger.debug("CMIS_ADAPTER: move_object: response data: %s", json_response)
+        self.data = json_response
+        self.properties = json_response.get("properties")
+        return self
+
+    def build_move_request_body(
+        self, source_folder: "Folder", target_folder: "Folder"
+    ) -> dict:
+        """Return the request data to move the object to the target folder"""
+        return {
             "objectId": self.objectId,
             "cmisaction": "move",
             "sourceFolderId": source_folder.objectId,
             "targetFolderId": target_folder.objectId,
         }
 
-        logger.debug("CMIS_ADAPTER: move_object: request data: %s", data)
+    def _update_properties(self, properties: dict) -> "CMISContentObject":
+        data = self.build_update_request_body(properties)
+        logger.debug("CMIS_ADAPTER: update_properties: request data: %s", data)
 
         # invoke the URL
         json_response = self.client.post_request(self.client.root_folder_url, data=data)
-        logger.debug("CMIS_ADAPTER: move_object: response data: %s", json_response)
+        logger.debug(
+            "CMIS_ADAPTER: update_properties: response data: %s", json_response
+        )
         self.data = json_response
         self.properties = json_response.get("properties")
+
         return self
 
-    def _update_properties(self, properties: dict) -> "CMISContentObject":
+    def build_update_request_body(self, properties: dict) -> dict:
+        """Return the request data to update the properties of the object"""
         data = {"objectId": self.objectId, "cmisaction": "update"}
         prop_count = 0
         for prop_key, prop_value in properties.items():
@@ -145,17 +189,7 @@ class CMISContentObject(CMISBaseObject):
             data["propertyId[%s]" % prop_count] = prop_key
             data["propertyValue[%s]" % prop_count] = prop_value
             prop_count += 1
-        logger.debug("CMIS_ADAPTER: update_properties: request data: %s", data)
-
-        # invoke the URL
-        json_response = self.client.post_request(self.client.root_folder_url, data=data)
-        logger.debug(
-            "CMIS_ADAPTER: update_properties: response data: %s", json_response
-        )
-        self.data = json_response
-        self.properties = json_response.get("properties")
-
-        return self
+        return data
 
 
 class Document(CMISContentObject):
@@ -195,11 +229,15 @@ class Document(CMISContentObject):
         return props
 
     def checkout(self):
-        data = {"objectId": self.objectId, "cmisaction": "checkOut"}
+        data = self.build_checkout_request_body()
         logger.debug("CMIS_ADAPTER: checkout: request data: %s", data)
         json_response = self.client.post_request(self.client.root_folder_url, data=data)
         logger.debug("CMIS_ADAPTER: checkout: response data: %s", json_response)
-        return Document(json_response)
+        return Document(json_response, client=self.client)
+
+    def build_checkout_request_body(self) -> dict:
+        """Return the request data to check out the document"""
+        return {"objectId": self.objectId, "cmisaction": "checkOut"}
 
     def update_content(self, content: BytesIO, filename: Optional[str] = None):
         self.set_content_stream(content, filename)
@@ -235,7 +273,7 @@ class Document(CMISContentObject):
             logger.debug(
                 "CMIS_ADAPTER: get_private_working_copy: response data: %s", data
             )
-            return type(self)(data)
+            return type(self)(data, client=self.client)
 
     def get_latest_version(self):
         """Get the latest version or the PWC"""
@@ -251,23 +289,46 @@ class Document(CMISContentObject):
             "CMIS_ADAPTER: get_latest_version: response data: %s", json_response
         )
 
-        return extract_latest_version(type(self), json_response.get("results"))
+        return extract_latest_version(
+            type(self), json_response.get("results"), client=self.client
+        )
 
     def checkin(self, checkin_comment, major=True):
-        props = {
-            "objectId": self.objectId,
-            "cmisaction": "checkIn",
-            "checkinComment": checkin_comment,
-            "major": major,
-        }
+        props = self.build_checkin_request_body(checkin_comment, major)
         logger.debug("CMIS_ADAPTER: checkin: request data: %s", props)
 
         # invoke the URL
         json_response = self.client.post_request(self.client.root_folder_url, props)
         logger.debug("CMIS_ADAPTER: checkin: response data: %s", json_response)
-        return Document(json_response)
+        return Document(json_response, client=self.client)
+
+    def build_checkin_request_body(
+        self, checkin_comment: str, major: bool = True
+    ) -> dict:
+        """Return the request data to check in the private working copy"""
+        return {
+            "objectId": self.objectId,
+            "cmisaction": "checkIn",
+            "checkinComment": checkin_comment,
+            "major": major,
+        }
 
     def set_content_stream(self, content_file: BytesIO, filename: Optional[str] = None):
+        data, files = self.build_set_content_request(content_file, filename)
+        logger.debug("CMIS_ADAPTER: set_content_stream: request data: %s", data)
+
+        json_response = self.client.post_request(
+            self.client.root_folder_url, data=data, files=files
+        )
+        logger.debug(
+            "CMIS_ADAPTER: set_content_stream: response data: %s", json_response
+        )
+        return Document(json_response, client=self.client)
+
+    def build_set_content_request(
+        self, content_file: BytesIO, filename: Optional[str] = None
+    ) -> Tuple[dict, dict]:
+        """Return the request data and files to set the content of the document"""
         data = {"objectId": self.objectId, "cmisaction": "setContent"}
 
         mimetype = None
@@ -281,27 +342,53 @@ class Document(CMISContentObject):
             mimetype = "application/binary"
 
         files = {self.name: (self.name, content_file, mimetype)}
-        logger.debug("CMIS_ADAPTER: set_content_stream: request data: %s", data)
-
-        json_response = self.client.post_request(
-            self.client.root_folder_url, data=data, files=files
-        )
-        logger.debug(
-            "CMIS_ADAPTER: set_content_stream: response data: %s", json_response
-        )
-        return Document(json_response)
-
-    def get_content_stream(self) -> BytesIO:
+        return data, files
+
+    def get_content_stream(
+        self,
+        stream: bool = False,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> BinaryIO:
+        """Retrieve the content of the document.
+
+        By default, the content is downloaded into a (spooled) file, see
+        :func:`drc_cmis.utils.streams.spool_chunks`.
+
+        :param stream: whether to return a :class:`drc_cmis.utils.streams.ResponseStream`
+            that reads the content from the connection while it is consumed. It has to
+            be closed by the caller.
+        :param byte_range: tuple, the first and last (inclusive, optional) byte of the
+            content to retrieve.
+        :return: file-like object with the content.
+        """
         params = {"objectId": self.objectId, "cmisaction": "content"}
         logger.debug("CMIS_ADAPTER: get_content_stream: request params: %s", params)
-        file_content = self.client.get_request(
-            self.client.root_folder_url, params=params
+        response = self.client.get_stream(
+            self.client.root_folder_url, params=params, byte_range=byte_range
         )
+
+        chunks = content_length = None
+        if byte_range is not None and response.status_code != 206:
+            # the DMS ignored the range, so skip the rest of the content here
+            start, end = byte_range
+            chunks = slice_chunks(response.iter_content(CHUNK_SIZE), start, end)
+            size = get_content_length(response)
+            if size is not None:
+                last = size - 1 if end is None else min(end, size - 1)
+                content_length = max(last + 1 - start, 0)
+        content = ResponseStream(response, chunks, content_length=content_length)
+
+        if stream:
+            return content
+
+        with content:
+            file_content = spool_chunks(content)
         logger.debug(
             "CMIS_ADAPTER: get_content_stream: retrieved file length %i",
-            len(file_content),
+            file_content.seek(0, SEEK_END),
         )
-        return BytesIO(file_content)
+        file_content.seek(0)
+        return file_content
 
     def get_all_versions(self) -> List["Document"]:
         """
@@ -319,7 +406,7 @@ class Document(CMISContentObject):
             self.client.root_folder_url, params=params
         )
         logger.debug("CMIS_ADAPTER: get_all_versions: response data: %s", all_versions)
-        return [Document(data) for data in all_versions]
+        return [Document(data, client=self.client) for data in all_versions]
 
     def delete_object(self) -> None:
         """
@@ -401,7 +488,7 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
                 or document["properties"]["drc:kopie_van"]["value"]
                 == informatieobject_uuid
             ):
-                return Document(document)
+                return Document(document, client=self.client)
         else:
             logger.error(
                 "Could not find the document %s in zaakfolder %s before deleting the OIO.",
@@ -433,7 +520,7 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
             )
             return
 
-        return Gebruiksrechten(gebruiksrechten_files[0])
+        return Gebruiksrechten(gebruiksrechten_files[0], client=self.client)
 
 
 class Folder(CMISBaseObject):
@@ -471,15 +558,39 @@ class Folder(CMISBaseObject):
         return self.client.get_all_results(json_response, Folder)
 
     def get_child_folder(
-        self, name: str, child_type: Union[str, dict] = None
+        self,
+        name: str,
+        child_type: Union[str, dict] = None,
+        select: Optional[List[str]] = None,
     ) -> Optional["Folder"]:
         """Get a folder in the current folder that has a specific name
 
         :param name: str, the cmis:name of the folder to retrieve
         :param child_type: str or dict, Contains the object type ID of the children folders to retrieve.
         If it is a dict, then the child type is the value of the key "value".
+        :param select: list of str, the CMIS names of the properties to retrieve. Defaults to all.
         """
+        data = {
+            "cmisaction": "query",
+            "statement": self.build_child_folder_statement(name, child_type, select),
+        }
+        logger.debug("CMIS_ADAPTER: get_child_folder: request data: %s", data)
+        json_response = self.client.post_request(self.client.base_url, data=data)
+        logger.debug("CMIS_ADAPTER: get_child_folder: response data: %s", json_response)
+        if json_response["numItems"] == 0:
+            return None
 
+        child_folder = self.client.get_first_result(json_response, Folder)
+        set_projection([child_folder], select)
+        return child_folder
+
+    def build_child_folder_statement(
+        self,
+        name: str,
+        child_type: Union[str, dict] = None,
+        select: Optional[List[str]] = None,
+    ) -> str:
+        """Return the query for a folder in the current folder, see :meth:`get_child_folder`"""
         if child_type is not None:
             if isinstance(child_type, dict):
                 object_type_id = child_type["value"]
@@ -494,26 +605,22 @@ class Folder(CMISBaseObject):
             object_type_id = "cmis:folder"
 
         query = CMISQuery(
-            f"SELECT * FROM {object_type_id} WHERE IN_FOLDER('%s') AND cmis:name = '%s'"
+            f"SELECT {format_select(select)} FROM {object_type_id} "
+            "WHERE IN_FOLDER('%s') AND cmis:name = '%s'"
         )
-
-        data = {
-            "cmisaction": "query",
-            "statement": query(str(self.objectId), name),
-        }
-        logger.debug("CMIS_ADAPTER: get_child_folder: request data: %s", data)
-        json_response = self.client.post_request(self.client.base_url, data=data)
-        logger.debug("CMIS_ADAPTER: get_child_folder: response data: %s", json_response)
-        if json_response["numItems"] == 0:
-            return None
-
-        return self.client.get_first_result(json_response, Folder)
+        return query(str(self.objectId), name)
 
     def delete_tree(self, **kwargs):
         data = {"objectId": self.objectId, "cmisaction": "deleteTree"}
         logger.debug("CMIS_ADAPTER: delete_tree: request data: %s", data)
-        json_response = self.client.post_request(self.client.root_folder_url, data=data)
-        logger.debug("CMIS_ADAPTER: delete_tree: response data: %s", json_response)
+        try:
+            json_response = self.client.post_request(
+                self.client.root_folder_url, data=data
+            )
+            logger.debug("CMIS_ADAPTER: delete_tree: response data: %s", json_response)
+        finally:
+            # some folders may be deleted, even if others could not be
+            folder_path_cache.invalidate(self.client.folder_cache_scope)
 
     def get_children_documents(self, convert_to_document_type=True):
         """Get documents in the current folder"""
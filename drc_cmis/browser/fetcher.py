@@ -0,0 +1,69 @@
+import logging
+
+from drc_cmis.cache import RepositoryInfoFetcher
+from drc_cmis.connections import use_cmis_connection_pool
+from drc_cmis.instrumentation import register_vendor
+
+from .request import Request
+
+logger = logging.getLogger(__name__)
+
+# the id of the repository at the base URL of the browser binding
+DEFAULT_REPOSITORY_ID = "-default-"
+
+
+class BrowserRepositoryInfoFetcher(RepositoryInfoFetcher):
+    """
+    Retrieve the information about the default repository in the DMS
+
+    Caching is done based on the base URL and user.
+    """
+
+    key_prefix = "drc_cmis:browser:repository_info"
+
+    @use_cmis_connection_pool
+    def fetch(self, base_url: str, user: str, password: str) -> dict:
+        def fetch_repository_info():
+            logger.debug(
+                "CMIS_ADAPTER: get_repository_info: GET request url: %s", base_url
+            )
+
+            response = Request().get_request(base_url, user, password)
+
+            logger.debug("CMIS_ADAPTER: get_repository_info: response: %s", response)
+            return response[DEFAULT_REPOSITORY_ID]
+
+        repository_info = self.get_or_fetch((base_url, user), fetch_repository_info)
+        register_vendor(base_url, repository_info.get("vendorName"))
+        return repository_info
+
+    async def afetch(self, request, base_url: str, user: str, password: str) -> dict:
+        """Like :meth:`fetch`, with a :class:`drc_cmis.browser.async_request.AsyncRequest`"""
+
+        async def fetch_repository_info():
+            logger.debug(
+                "CMIS_ADAPTER: get_repository_info: GET request url: %s", base_url
+            )
+
+            response = await request.get_request(base_url, user, password)
+
+            logger.debug("CMIS_ADAPTER: get_repository_info: response: %s", response)
+            return response[DEFAULT_REPOSITORY_ID]
+
+        repository_info = await self.aget_or_fetch(
+            (base_url, user), fetch_repository_info
+        )
+        register_vendor(base_url, repository_info.get("vendorName"))
+        return repository_info
+
+    def invalidate(self, base_url: str, user: str) -> None:
+        super().invalidate(base_url, user)
+
+
+# sentinel instance
+repo_info_fetcher = BrowserRepositoryInfoFetcher()
+"""
+Sentinel repository info fetcher instance, used by :class:`drc_cmis.browser.client.CMISDRCClient`.
+Note that you can set ``repo_info_fetcher.cache`` to use another cache backend than
+the one configured with ``settings.CMIS_CACHE``.
+"""
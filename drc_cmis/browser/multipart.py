@@ -0,0 +1,113 @@
+"""
+Streaming writer for multipart/form-data request bodies.
+
+:mod:`requests` reads the files passed as ``files`` into memory to encode the body.
+The :class:`FormDataBody` reads them in chunks while the request is sent instead.
+"""
+
+import uuid
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from drc_cmis.utils.streams import CHUNK_SIZE, get_stream_size, rewind
+
+# the escaping of field names and file names used by browsers (HTML5)
+PARAM_ESCAPES = str.maketrans({'"': "%22", "\r": "%0D", "\n": "%0A"})
+
+
+def format_disposition(name: str, filename: Optional[str] = None) -> str:
+    disposition = f'form-data; name="{name.translate(PARAM_ESCAPES)}"'
+    if filename is not None:
+        disposition += f'; filename="{filename.translate(PARAM_ESCAPES)}"'
+    return disposition
+
+
+class FormDataBody:
+    """
+    The body of a multipart/form-data request with files.
+
+    Iterating over it yields the body in chunks. Like :class:`MTOMBody`, the size is
+    set as ``len`` if the size of all files can be determined.
+
+    :param data: dict, the form fields. Lists are sent as repeated fields and
+        ``None`` values are left out, like :mod:`requests` does.
+    :param files: dict of field names and tuples of the file name, the I/O stream
+        and (optionally) the content type.
+    :param boundary: string, the multipart boundary. Defaults to a random string.
+    """
+
+    def __init__(self, data: dict, files: dict, boundary: Optional[str] = None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+        self.fields_part = b"".join(
+            self._get_field_part(name, value) for name, value in self._iter_fields(data)
+        )
+        self.files = [
+            (self._get_file_header(name, *file_tuple), file_tuple[1])
+            for name, file_tuple in files.items()
+        ]
+        self.closing_boundary = f"--{self.boundary}--\r\n".encode("utf-8")
+
+        size = self._get_size()
+        if size is not None:
+            self.len = size
+
+    @staticmethod
+    def _iter_fields(data: dict) -> Iterator[Tuple[str, object]]:
+        for name, values in (data or {}).items():
+            if isinstance(values, (str, bytes)) or not hasattr(values, "__iter__"):
+                values = [values]
+            for value in values:
+                if value is not None:
+                    yield name, value
+
+    def _get_field_part(self, name: str, value) -> bytes:
+        if not isinstance(value, bytes):
+            value = str(value).encode("utf-8")
+        header = (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: {format_disposition(name)}\r\n\r\n"
+        ).encode("utf-8")
+        return header + value + b"\r\n"
+
+    def _get_file_header(
+        self,
+        name: str,
+        filename: str,
+        content_stream: BinaryIO,
+        content_type: Optional[str] = None,
+    ) -> bytes:
+        header = (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: {format_disposition(name, filename)}\r\n"
+        )
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return f"{header}\r\n".encode("utf-8")
+
+    def _get_size(self) -> Optional[int]:
+        size = len(self.fields_part) + len(self.closing_boundary)
+        for header, content_stream in self.files:
+            stream_size = get_stream_size(content_stream)
+            if stream_size is None:
+                return None
+            size += len(header) + stream_size + len(b"\r\n")
+        return size
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.fields_part:
+            yield self.fields_part
+
+        for header, content_stream in self.files:
+            yield header
+
+            rewind(content_stream)
+            while True:
+                chunk = content_stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+            yield b"\r\n"
+
+        yield self.closing_boundary
@@ -1,5 +1,9 @@
 import logging
+from contextlib import closing
 from json.decoder import JSONDecodeError
+from typing import Optional, Tuple
+
+import requests
 
 from drc_cmis.utils.exceptions import (
     CmisBaseException,
@@ -13,6 +17,8 @@ from drc_cmis.utils.exceptions import (
 )
 
 from ..connections import get_session
+from ..instrumentation import BROWSER, get_browser_action, parsing, round_trip
+from .multipart import FormDataBody
 
 logger = logging.getLogger(__name__)
 
@@ -26,91 +32,73 @@ class Request:
     def get_request(self, url, user, password, params=None):
         logger.debug(f"GET: {url} | {params}")
         headers = {"Accept": "application/json"}
-        response = self.session.get(
-            url, params=params, auth=(user, password), headers=headers
-        )
-        if not response.ok:
-            raise Exception("Error with the query")
+        with round_trip(BROWSER, get_browser_action(params), url) as trip:
+            response = self.session.get(
+                url, params=params, auth=(user, password), headers=headers
+            )
+            trip.record_response(response)
+        raise_for_status(response, url)
 
         if response.headers.get("Content-Type").startswith("application/json"):
-            return response.json()
+            with parsing(trip):
+                return response.json()
         return response.content
 
+    def get_stream(
+        self,
+        url: str,
+        user: str,
+        password: str,
+        params: Optional[dict] = None,
+        byte_range: Optional[Tuple[int, Optional[int]]] = None,
+    ) -> requests.Response:
+        """Make a GET request, without reading the content of the response yet
+
+        :param byte_range: tuple, the first and last (inclusive, optional) byte to
+            request with a ``Range`` header.
+        :return: the response, which has to be closed by the caller.
+        """
+        logger.debug(f"GET (stream): {url} | {params} | {byte_range}")
+        headers = {}
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        with round_trip(BROWSER, get_browser_action(params), url) as trip:
+            response = self.session.get(
+                url, params=params, auth=(user, password), headers=headers, stream=True
+            )
+            trip.record_response(response, stream=True)
+        if not response.ok:
+            with closing(response):
+                raise_for_status(response, url)
+        return response
+
     def post_request(self, url, data, user, password, headers=None, files=None):
         logger.debug(f"POST: {url} | {data}")
+        action = get_browser_action(data)
         if headers is None:
             headers = {"Accept": "application/json"}
-        response = self.session.post(
-            url,
-            data=data,
-            auth=(user, password),
-            files=files,
-            headers=headers,
-        )
-        if not response.ok:
-            error = response.json()
-            if response.status_code == 401:
-                raise CmisPermissionDeniedException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 400:
-                raise CmisInvalidArgumentException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 404:
-                raise CmisObjectNotFoundException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 403:
-                raise CmisPermissionDeniedException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 405:
-                raise CmisNotSupportedException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 409:
-                raise CmisUpdateConflictException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            elif response.status_code == 500:
-                raise CmisRuntimeException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
-            else:
-                raise CmisBaseException(
-                    status=response.status_code,
-                    url=url,
-                    message=error.get("message"),
-                    code=error.get("exception"),
-                )
+        if files:
+            # stream the files, instead of letting requests read them into memory
+            data = FormDataBody(data, files)
+            headers = {**headers, "Content-Type": data.content_type}
+        with round_trip(BROWSER, action, url) as trip:
+            response = self.session.post(
+                url,
+                data=data,
+                auth=(user, password),
+                headers=headers,
+            )
+            trip.record_response(response)
+        raise_for_status(response, url)
 
         try:
-            if response.headers.get("Content-Type").startswith("application/json"):
-                return response.json()
-            else:
-                return response.content.decode("UTF-8")
+            with parsing(trip):
+                if response.headers.get("Content-Type").startswith("application/json"):
+                    return response.json()
+                else:
+                    return response.content.decode("UTF-8")
         except JSONDecodeError:
             if not response.text:
                 return None
@@ -120,3 +108,33 @@ class Request:
                 message=response.text,
                 code="invalid_response",
             )
+
+
+STATUS_EXCEPTIONS = {
+    400: CmisInvalidArgumentException,
+    401: CmisPermissionDeniedException,
+    403: CmisPermissionDeniedException,
+    404: CmisObjectNotFoundException,
+    405: CmisNotSupportedException,
+    409: CmisUpdateConflictException,
+    500: CmisRuntimeException,
+}
+
+
+def raise_for_status(response: requests.Response, url: str) -> None:
+    """Raise the CMIS exception for the status of an unsuccessful response"""
+    if response.ok:
+        return
+
+    try:
+        error = response.json()
+    except JSONDecodeError:
+        error = {"message": response.text}
+
+    exception_class = STATUS_EXCEPTIONS.get(response.status_code, CmisBaseException)
+    raise exception_class(
+        status=response.status_code,
+        url=url,
+        message=error.get("message"),
+        code=error.get("exception"),
+    )
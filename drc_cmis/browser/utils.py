@@ -3,14 +3,16 @@ import datetime
 from drc_cmis.browser.drc_document import Folder
 
 
-def create_json_request_body(target_folder: Folder, properties: dict) -> dict:
+def create_json_request_body(
+    target_folder: Folder, properties: dict, cmis_action: str = "createDocument"
+) -> dict:
     """Create the body of the JSON request from the target folder and the document properties
 
     The target properties are already converted to CMIS names.
     """
     data = {
         "objectId": target_folder.objectId,
-        "cmisaction": "createDocument",
+        "cmisaction": cmis_action,
         "propertyId[0]": "cmis:name",
         "propertyValue[0]": properties.pop("cmis:name"),
     }
@@ -0,0 +1,462 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import CMISConfig, UrlMapping
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "aget_config_snapshot",
+    "get_cache",
+    "get_config",
+    "get_config_snapshot",
+    "invalidate_config",
+    "FolderCacheScope",
+    "FolderPathCache",
+    "folder_path_cache",
+    "folder_path_lock",
+    "RepositoryInfoFetcher",
+]
+
+
+DEFAULT_CONFIG_CACHE_TTL = 60
+
+DEFAULT_REPOSITORY_INFO_CACHE_TTL = 60 * 60
+
+DEFAULT_FOLDER_LOCK_TIMEOUT = 10
+
+FOLDER_LOCK_BACKENDS = (None, "process", "cache")
+
+
+class ConfigSnapshot(NamedTuple):
+    """
+    Immutable view on the CMIS configuration, shared by all clients in the process.
+
+    The ``config`` instance is shared as well, so it must be treated as read-only.
+    """
+
+    version: int
+    config: CMISConfig
+    # tuples of (long_pattern, short_pattern)
+    url_mappings: Tuple[Tuple[str, str], ...]
+    loaded_at: float
+
+
+class ConfigCache:
+    """
+    Process-wide cache of the :class:`drc_cmis.models.CMISConfig` and its URL mappings.
+
+    The snapshot is reloaded when it is older than ``settings.CMIS_CONFIG_CACHE_TTL``
+    seconds (``None`` means it never expires) or when it was invalidated. Saving or
+    deleting a ``CMISConfig``/``UrlMapping`` invalidates the snapshot of the current
+    process, the TTL takes care of the other processes.
+
+    Every loaded snapshot gets a new version number, so that consumers deriving data
+    from the snapshot can detect that they need to refresh it.
+    """
+
+    def __init__(self):
+        # re-entrant: loading may create the configuration, which fires the
+        # invalidation signal from within the lock
+        self._lock = threading.RLock()
+        self._snapshot = None
+        self._version = 0
+
+    @property
+    def ttl(self):
+        return getattr(settings, "CMIS_CONFIG_CACHE_TTL", DEFAULT_CONFIG_CACHE_TTL)
+
+    def _is_expired(self, snapshot: ConfigSnapshot) -> bool:
+        ttl = self.ttl
+        if ttl is None:
+            return False
+        return time.monotonic() - snapshot.loaded_at >= ttl
+
+    def _load(self) -> ConfigSnapshot:
+        config = CMISConfig.get_solo()
+        url_mappings = tuple(
+            config.urlmapping_set.values_list("long_pattern", "short_pattern")
+        )
+        self._version += 1
+        logger.debug("Loaded CMIS configuration snapshot version %d", self._version)
+        return ConfigSnapshot(
+            version=self._version,
+            config=config,
+            url_mappings=url_mappings,
+            loaded_at=time.monotonic(),
+        )
+
+    def get_loaded(self) -> Optional[ConfigSnapshot]:
+        """Return the snapshot if it doesn't have to be (re)loaded"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._is_expired(snapshot):
+            return snapshot
+        return None
+
+    def get(self) -> ConfigSnapshot:
+        snapshot = self.get_loaded()
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            # another thread may have reloaded the snapshot in the meantime
+            snapshot = self._snapshot
+            if snapshot is None or self._is_expired(snapshot):
+                snapshot = self._snapshot = self._load()
+        return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+
+config_cache = ConfigCache()
+
+
+def get_config_snapshot() -> ConfigSnapshot:
+    return config_cache.get()
+
+
+def get_config() -> CMISConfig:
+    """Return the (shared, read-only) CMIS configuration."""
+    return config_cache.get().config
+
+
+async def aget_config_snapshot() -> ConfigSnapshot:
+    """Return the configuration snapshot in async code
+
+    Loading the snapshot queries the database, which is done in a thread with
+    ``sync_to_async``. A loaded snapshot is returned directly.
+    """
+    snapshot = config_cache.get_loaded()
+    if snapshot is None:
+        snapshot = await _sync_to_async(config_cache.get)()
+    return snapshot
+
+
+def _sync_to_async(func):
+    """Wrap a function querying the database or the cache, to await it"""
+    from asgiref.sync import sync_to_async
+
+    return sync_to_async(func)
+
+
+def invalidate_config() -> None:
+    config_cache.invalidate()
+
+
+@receiver(post_save, sender=CMISConfig)
+@receiver(post_save, sender=UrlMapping)
+@receiver(post_delete, sender=UrlMapping)
+def invalidate_config_on_change(sender, **kwargs):
+    invalidate_config()
+
+
+def get_cache():
+    """Return the Django cache backend used for data retrieved from the DMS."""
+    return caches[getattr(settings, "CMIS_CACHE", DEFAULT_CACHE_ALIAS)]
+
+
+class RepositoryInfoFetcher:
+    """
+    Base class to retrieve the information about a repository in the DMS.
+
+    The repository info is stored in the Django cache configured with
+    ``settings.CMIS_CACHE`` for ``settings.CMIS_REPOSITORY_INFO_CACHE_TTL`` seconds.
+    Subclasses implement the actual request and determine what identifies a
+    repository.
+    """
+
+    key_prefix = "drc_cmis:repository_info"
+
+    def __init__(self, cache=None):
+        self._cache = cache
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else get_cache()
+
+    @cache.setter
+    def cache(self, value):
+        self._cache = value
+
+    @property
+    def timeout(self):
+        return getattr(
+            settings,
+            "CMIS_REPOSITORY_INFO_CACHE_TTL",
+            DEFAULT_REPOSITORY_INFO_CACHE_TTL,
+        )
+
+    def get_cache_key(self, *parts: str) -> str:
+        digest = hashlib.md5("|".join(str(part) for part in parts).encode("utf-8"))
+        return f"{self.key_prefix}:{digest.hexdigest()}"
+
+    def get_or_fetch(self, key_parts: tuple, fetch) -> dict:
+        cache_key = self.get_cache_key(*key_parts)
+        repository_info = self.cache.get(cache_key)
+        if repository_info is None:
+            repository_info = fetch()
+            self.cache.set(cache_key, repository_info, self.timeout)
+        return repository_info
+
+    async def aget_or_fetch(self, key_parts: tuple, fetch) -> dict:
+        """Like :meth:`get_or_fetch`, with a coroutine function to fetch the info
+
+        The cache is accessed in a thread, as cache backends may block.
+        """
+        cache_key = self.get_cache_key(*key_parts)
+        repository_info = await _sync_to_async(self.cache.get)(cache_key)
+        if repository_info is None:
+            repository_info = await fetch()
+            await _sync_to_async(self.cache.set)(
+                cache_key, repository_info, self.timeout
+            )
+        return repository_info
+
+    def invalidate(self, *key_parts: str) -> None:
+        self.cache.delete(self.get_cache_key(*key_parts))
+
+
+class FolderCacheScope(NamedTuple):
+    """The DMS, repository and user of which folders are cached"""
+
+    base_url: str
+    repository_id: str
+    user: str
+
+
+class FolderPathCache:
+    """
+    Cache of the folders in the configured folder paths, by their rendered path.
+
+    The folders are stored in the Django cache configured with ``settings.CMIS_CACHE``
+    with keys like ``/DRC/2026/10/17``, until the end of the day. The paths contain
+    the date, so the entries are of no use after that.
+
+    Only the properties needed to use a folder as a parent are stored, for each
+    :class:`FolderCacheScope`: users with different permissions may see different
+    folders. Deleting folders with the adapter invalidates all the entries of a
+    repository, for all users. The entries of each repository (identified by the
+    base URL and repository id) share a generation number, which is incremented to
+    invalidate them.
+    """
+
+    key_prefix = "drc_cmis:folder_path"
+    cached_properties = ("cmis:objectId", "cmis:objectTypeId", "cmis:name")
+
+    def __init__(self, cache=None):
+        self._cache = cache
+
+    @property
+    def cache(self):
+        return self._cache if self._cache is not None else get_cache()
+
+    @cache.setter
+    def cache(self, value):
+        self._cache = value
+
+    def get_timeout(self, day: Optional[date] = None) -> int:
+        """The number of seconds until the end of the day, defaults to today"""
+        now = timezone.now()
+        if day is None:
+            day = now.date()
+        end = datetime.combine(
+            day + timedelta(days=1), datetime.min.time(), tzinfo=now.tzinfo
+        )
+        return max(math.ceil((end - now).total_seconds()), 1)
+
+    def get_cache_key(self, *parts: str) -> str:
+        digest = hashlib.md5("|".join(str(part) for part in parts).encode("utf-8"))
+        return f"{self.key_prefix}:{digest.hexdigest()}"
+
+    def _get_generation_key(self, scope: FolderCacheScope) -> str:
+        return self.get_cache_key("generation", scope.base_url, scope.repository_id)
+
+    def _get_generation(self, scope: FolderCacheScope) -> int:
+        return self.cache.get(self._get_generation_key(scope), 0)
+
+    def _get_folder_key(
+        self, scope: FolderCacheScope, generation: int, path: str
+    ) -> str:
+        return self.get_cache_key(*scope, generation, path)
+
+    def get_many(
+        self, scope: FolderCacheScope, paths: Iterable[str]
+    ) -> Dict[str, dict]:
+        """Return the data of the cached folders, by path"""
+        generation = self._get_generation(scope)
+        keys = {self._get_folder_key(scope, generation, path): path for path in paths}
+        cached = self.cache.get_many(list(keys))
+        return {keys[key]: data for key, data in cached.items()}
+
+    def set_many(
+        self,
+        scope: FolderCacheScope,
+        folders: Dict[str, object],
+        day: Optional[date] = None,
+    ) -> None:
+        """Store the folders (domain objects), by path
+
+        :param day: date, the date in the paths of the folders. They are stored
+            until the end of that day, by default the end of today.
+        """
+        if not folders:
+            return
+
+        generation = self._get_generation(scope)
+        data = {
+            self._get_folder_key(scope, generation, path): self.get_folder_data(folder)
+            for path, folder in folders.items()
+        }
+        self.cache.set_many(data, self.get_timeout(day))
+
+    async def aget_many(
+        self, scope: FolderCacheScope, paths: Iterable[str]
+    ) -> Dict[str, dict]:
+        """Like :meth:`get_many`, for async code"""
+        return await _sync_to_async(self.get_many)(scope, list(paths))
+
+    async def aset_many(
+        self,
+        scope: FolderCacheScope,
+        folders: Dict[str, object],
+        day: Optional[date] = None,
+    ) -> None:
+        """Like :meth:`set_many`, for async code"""
+        if folders:
+            await _sync_to_async(self.set_many)(scope, folders, day)
+
+    def get_folder_data(self, folder) -> dict:
+        properties = {
+            name: {
+                "value": folder.properties[name]["value"],
+                "type": folder.properties[name].get("type"),
+            }
+            for name in self.cached_properties
+            if name in folder.properties
+        }
+        return {"properties": properties}
+
+    def invalidate(self, scope: FolderCacheScope) -> None:
+        """Forget all the folder paths of the repository, for all users"""
+        generation_key = self._get_generation_key(scope)
+        # the generation has to outlive the entries it invalidates
+        self.cache.set(generation_key, self._get_generation(scope) + 1, None)
+
+    async def ainvalidate(self, scope: FolderCacheScope) -> None:
+        """Like :meth:`invalidate`, for async code"""
+        await _sync_to_async(self.invalidate)(scope)
+
+
+folder_path_cache = FolderPathCache()
+
+
+class FolderPathLock:
+    """
+    Lock to let only one worker at a time create the folders of a path.
+
+    ``settings.CMIS_FOLDER_LOCK_BACKEND`` selects the kind of lock:
+
+    * ``None``: no locking. Conflicting creates are recovered from afterwards.
+    * ``"process"``: a lock per path, shared by the threads of the process.
+    * ``"cache"``: a lock per path in the Django cache configured with
+      ``settings.CMIS_CACHE``, shared by all processes that use the cache.
+
+    Waiting for a lock gives up after ``settings.CMIS_FOLDER_LOCK_TIMEOUT``
+    seconds, which is also when a lock in the cache expires.
+    """
+
+    key_prefix = "drc_cmis:folder_lock"
+    poll_interval = 0.05
+
+    def __init__(self, stripes: int = 64):
+        # a fixed set of locks, so that the number of locks doesn't grow with the
+        # number of paths
+        self._process_locks = [threading.Lock() for _ in range(stripes)]
+
+    @property
+    def backend(self):
+        backend = getattr(settings, "CMIS_FOLDER_LOCK_BACKEND", None)
+        if backend not in FOLDER_LOCK_BACKENDS:
+            raise ValueError(f"Unknown CMIS_FOLDER_LOCK_BACKEND {backend!r}")
+        return backend
+
+    @property
+    def timeout(self):
+        return getattr(
+            settings, "CMIS_FOLDER_LOCK_TIMEOUT", DEFAULT_FOLDER_LOCK_TIMEOUT
+        )
+
+    def get_cache_key(self, *parts: str) -> str:
+        digest = hashlib.md5("|".join(str(part) for part in parts).encode("utf-8"))
+        return f"{self.key_prefix}:{digest.hexdigest()}"
+
+    @contextmanager
+    def _process_lock(self, key: str) -> Iterator[bool]:
+        lock = self._process_locks[hash(key) % len(self._process_locks)]
+        acquired = lock.acquire(timeout=self.timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+    @contextmanager
+    def _cache_lock(self, key: str) -> Iterator[bool]:
+        cache = get_cache()
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.timeout
+
+        acquired = cache.add(key, token, self.timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            acquired = cache.add(key, token, self.timeout)
+
+        try:
+            yield acquired
+        finally:
+            # the lock may have expired and been taken by another worker
+            if acquired and cache.get(key) == token:
+                cache.delete(key)
+
+    @contextmanager
+    def __call__(self, base_url: str, path: str) -> Iterator[bool]:
+        """Hold the lock for the path, yield whether a lock was held
+
+        If the lock can't be acquired in time, the block is run without it.
+        """
+        backend = self.backend
+        if backend is None:
+            yield False
+            return
+
+        key = self.get_cache_key(base_url, path)
+        with self._process_lock(key) as acquired:
+            if backend == "process":
+                if not acquired:
+                    logger.warning("Timeout waiting for the lock of folder %s", path)
+                yield acquired
+                return
+
+            with self._cache_lock(key) as acquired:
+                if not acquired:
+                    logger.warning("Timeout waiting for the lock of folder %s", path)
+                yield acquired
+
+
+folder_path_lock = FolderPathLock()
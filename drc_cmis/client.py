@@ -1,20 +1,69 @@
+import datetime
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
 from io import BytesIO
-from typing import List, Optional, TypeVar, Union
+from threading import Lock
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from uuid import UUID
 
+from django.db import close_old_connections
 from django.utils import timezone
 from django.utils.crypto import constant_time_compare
 
-from cmislib.exceptions import UpdateConflictException
+from cmislib.exceptions import CmisException, UpdateConflictException
+from requests import RequestException
 
-from .models import CMISConfig, Vendor
+from .cache import (
+    ConfigSnapshot,
+    FolderCacheScope,
+    folder_path_cache,
+    folder_path_lock,
+    get_config_snapshot,
+)
+from .models import Vendor
 from .utils import folder as folder_utils
+from .utils.bulk import (
+    BulkResult,
+    NewDocument,
+    get_bulk_batch_size,
+    get_bulk_max_workers,
+    iter_batches,
+)
 from .utils.exceptions import (
+    CmisBaseException,
+    CmisContentAlreadyExistsException,
+    CmisNameConstraintViolationException,
+    CmisNotSupportedException,
+    CmisObjectNotFoundException,
+    CmisRuntimeException,
+    DMSException,
     DocumentConflictException,
+    DocumentExistsError,
     DocumentLockConflictException,
+    DocumentLockedException,
     DocumentNotLockedException,
     FolderDoesNotExistError,
+    LockDidNotMatchException,
 )
+from .utils.mapper import mapper
+from .utils.query import (
+    CMISQuery,
+    format_select,
+    get_query_page_size,
+    iter_query_pages,
+)
+from .utils.utils import build_query_filters
 
 # The Document/Folder/Oio/Gebruiksrechten classes used in practice depend on the client
 # (different classes exist for the webservice and browser binding)
@@ -22,6 +71,46 @@ Document = TypeVar("Document")
 Gebruiksrechten = TypeVar("Gebruiksrechten")
 Folder = TypeVar("Folder")
 ObjectInformatieObject = TypeVar("ObjectInformatieObject")
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# the errors of a request to the DMS, which don't stop a bulk operation
+DMS_ERRORS = (CmisBaseException, CmisException, DMSException, RequestException)
+
+# the errors creating a single document, also because of its (incomplete) data
+DOCUMENT_ERRORS = DMS_ERRORS + (KeyError, ValueError)
+
+# the CMIS errors for an object with a name that is already used in the folder
+NAME_CONFLICT_ERRORS = ("contentAlreadyExists", "nameConstraintViolation")
+
+
+def is_name_conflict(exc: CmisBaseException) -> bool:
+    """Return whether the error means that an object with the name already exists"""
+    if isinstance(
+        exc, (CmisContentAlreadyExistsException, CmisNameConstraintViolationException)
+    ):
+        return True
+    # the bindings report the CMIS error in the code or in the message
+    details = f"{exc.code} {exc.message}"
+    return any(error in details for error in NAME_CONFLICT_ERRORS)
+
+
+def is_not_supported(exc: CmisBaseException) -> bool:
+    """Return whether the error means that the DMS does not support the operation"""
+    if isinstance(exc, CmisNotSupportedException):
+        return True
+    # SOAP faults are returned with status 500, with the CMIS error in the fault
+    details = f"{exc.code} {exc.message}"
+    return "notSupported" in details
+
+
+def is_object_not_found(exc: CmisBaseException) -> bool:
+    """Return whether the error means that an object does not exist"""
+    if isinstance(exc, CmisObjectNotFoundException):
+        return True
+    # some DMSs report it as a runtime error
+    return isinstance(exc, CmisRuntimeException) and "objectNotFound" in exc.message
 
 
 class CMISClient:
@@ -35,16 +124,26 @@ class CMISClient:
     folder_type = None
     zaakfolder_type = None
     zaaktypefolder_type = None
-    _config = None
 
     @property
     def config(self):
         """
         Lazily load the config so that no DB queries are done while Django is starting.
+
+        The config is taken from the process-wide snapshot, which is shared by all
+        clients and domain objects.
         """
-        if not self._config:
-            self._config = CMISConfig.get_solo()
-        return self._config
+        return self.config_snapshot.config
+
+    @property
+    def config_snapshot(self) -> ConfigSnapshot:
+        """The configuration snapshot to build the requests with"""
+        return get_config_snapshot()
+
+    @property
+    def folder_cache_scope(self) -> FolderCacheScope:
+        """The scope of the folders cached by this client, see :class:`FolderPathCache`"""
+        return FolderCacheScope(self.base_url, self.repository_id, self.user)
 
     def get_other_base_folder_name(self):
         return self.config.get_other_base_folder_name()
@@ -94,6 +193,259 @@ class CMISClient:
 
         return ""
 
+    def query_iter(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        page_size: Optional[int] = None,
+        prefetch: bool = True,
+        select: Optional[List[str]] = None,
+    ) -> Iterator:
+        """Perform an SQL query in the DMS and yield the results, page by page
+
+        The results are requested with ``maxItems`` and ``skipCount``, so only one
+        page of results is held in memory. While a page is consumed, the next page is
+        fetched in the background.
+
+        Results added or removed while iterating can shift the pages, which may cause
+        results to be skipped or repeated.
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :param page_size: int, number of results per request. Defaults to
+            ``settings.CMIS_QUERY_PAGE_SIZE``.
+        :param prefetch: whether to fetch the next page in the background
+        :param select: list of strings, the CMIS names of the properties to retrieve.
+            Defaults to all properties.
+        :return: iterator over the results, either Folder, Document, Oio or Gebruiksrechten
+        """
+        pager = self.get_query_pager(return_type_name, lhs, rhs, select=select)
+        pages = iter_query_pages(
+            pager.fetch_page, page_size or get_query_page_size(), prefetch=prefetch
+        )
+        for page in pages:
+            yield from pager.get_results(page.objects)
+
+    def exists(
+        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+    ) -> bool:
+        """Check whether an SQL query in the DMS has any results
+
+        At most one result is requested (``maxItems=1``), of which only the objectId
+        is selected and the response is not decoded into objects.
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :return: whether there is at least one result
+        """
+        pager = self.get_query_pager(return_type_name, lhs, rhs, select=[])
+        page = pager.fetch_page(1, 0, decode=False)
+        return page.object_count > 0 or bool(page.num_items and page.num_items > 0)
+
+    def count(
+        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+    ) -> int:
+        """Count the results of an SQL query in the DMS
+
+        The count is taken from ``numItems`` in the response to a query for a single
+        result. If the DMS doesn't report it, the results are counted page by page,
+        without decoding them.
+
+        :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
+        :param lhs: list of strings, with the LHS of the SQL query
+        :param rhs: list of strings, with the RHS of the SQL query
+        :return: the number of results
+        """
+        pager = self.get_query_pager(return_type_name, lhs, rhs, select=[])
+        page = pager.fetch_page(1, 0, decode=False)
+        # a negative number means that the total is not known
+        if page.num_items is not None and page.num_items >= 0:
+            return page.num_items
+
+        total = page.object_count
+        page_size = get_query_page_size()
+        while page.has_more_items and page.object_count:
+            page = pager.fetch_page(page_size, total, decode=False)
+            total += page.object_count
+        return total
+
+    def check_document_exists(
+        self, identification: Union[str, UUID], bronorganisatie: str
+    ) -> None:
+        """Check if a document with the same (identificatie, bronorganisatie) already exists in the repository
+
+        :param identification: string, document ``identificatie``
+        :param bronorganisatie: string, document ``bronorganisatie``
+        """
+        cmis_identificatie = mapper("identificatie", type="document")
+        cmis_bronorganisatie = mapper("bronorganisatie", type="document")
+
+        lhs = [f"{cmis_identificatie} = '%s'", f"{cmis_bronorganisatie} = '%s'"]
+        if self.exists("document", lhs, [str(identification), bronorganisatie]):
+            raise DocumentExistsError(
+                "Een document met dezelfde identificatie en bronorganisatie al bestaat."
+            )
+
+    @staticmethod
+    def build_document_query_statement(
+        drc_uuid: str,
+        filters: Optional[dict] = None,
+        select: Optional[List[str]] = None,
+    ) -> str:
+        """Return the query for the latest version of a document, see ``get_document``
+
+        This always selects the latest version, and if there is a pwc, Alfresco
+        returns both the pwc and the latest major version, while Corsa only returns
+        the pwc.
+        """
+        query = CMISQuery(
+            f"SELECT {format_select(select)} FROM drc:document "
+            "WHERE drc:document__uuid = '%s' %s"
+        )
+        filter_string = build_query_filters(
+            filters, filter_string="AND ", strip_end=True
+        )
+        return query(drc_uuid, filter_string)
+
+    def get_existing_documents(
+        self, documents: Iterable[NewDocument]
+    ) -> Set[Tuple[str, str]]:
+        """Return the (identificatie, bronorganisatie) of the documents that exist
+
+        The documents are looked up with a single ``IN (...)`` query.
+
+        :param documents: the documents to look up, without an identificatie or
+            bronorganisatie they are skipped.
+        :return: set of tuples of the identificatie and bronorganisatie
+        """
+        identifications = sorted(
+            {
+                str(document.identification)
+                for document in documents
+                if document.identification and document.bronorganisatie
+            }
+        )
+        if not identifications:
+            return set()
+
+        cmis_identificatie = mapper("identificatie", type="document")
+        cmis_bronorganisatie = mapper("bronorganisatie", type="document")
+
+        placeholders = ", ".join(["'%s'"] * len(identifications))
+        results = self.query_iter(
+            "document",
+            lhs=[f"{cmis_identificatie} IN ({placeholders})"],
+            rhs=identifications,
+            prefetch=False,
+            select=[cmis_identificatie, cmis_bronorganisatie],
+        )
+        return {
+            (str(document.identificatie), document.bronorganisatie)
+            for document in results
+        }
+
+    def create_documents(
+        self, documents: Iterable[NewDocument], max_workers: Optional[int] = None
+    ) -> Iterator[BulkResult]:
+        """Create many documents, with parallel requests
+
+        The folder of the 'other' folder path is resolved once. The documents are
+        read in batches of ``settings.CMIS_BULK_BATCH_SIZE``, for which the
+        existing documents are looked up with a single query. The documents are
+        then created (and their content uploaded) by a pool of threads. Only a
+        limited number of documents is waiting to be created at any time, so the
+        documents can be read lazily.
+
+        :param documents: iterable of :class:`drc_cmis.utils.bulk.NewDocument`
+        :param max_workers: int, the number of parallel requests. Defaults to
+            ``settings.CMIS_BULK_MAX_WORKERS``.
+        :return: iterator over a :class:`drc_cmis.utils.bulk.BulkResult` per
+            document, in the order in which they are done. A failed document has
+            the exception as ``error``.
+        """
+        max_workers = max_workers or get_bulk_max_workers()
+        folder = self.get_or_create_other_folder()
+        folder_lock = Lock()
+
+        def get_fresh_folder(stale_folder: Folder) -> Folder:
+            nonlocal folder
+            # the threads that used the stale folder only resolve it once
+            with folder_lock:
+                if folder is stale_folder:
+                    folder = self.get_or_create_other_folder()
+                return folder
+
+        def create(index: int, document: NewDocument) -> BulkResult:
+            used_folders = []
+
+            def create_in_folder() -> Document:
+                # the cached folder paths are forgotten before the retry
+                current = get_fresh_folder(used_folders[-1]) if used_folders else folder
+                used_folders.append(current)
+                return self.create_document(
+                    document.identification,
+                    document.bronorganisatie,
+                    dict(document.data),
+                    content=document.content,
+                    check_if_already_exists=False,
+                    folder=current,
+                )
+
+            try:
+                created = self.retry_with_fresh_folders(create_in_folder)
+            except DOCUMENT_ERRORS as exc:
+                logger.warning("Creating document %d failed: %s", index, exc)
+                return BulkResult(index, document, error=exc)
+            finally:
+                # like at the end of a request, don't keep the connections opened
+                # by the thread to load the configuration
+                close_old_connections()
+            return BulkResult(index, document, document=created)
+
+        seen = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for batch in iter_batches(enumerate(documents), get_bulk_batch_size()):
+                try:
+                    existing = self.get_existing_documents(doc for _, doc in batch)
+                except DMS_ERRORS as exc:
+                    for index, document in batch:
+                        yield BulkResult(index, document, error=exc)
+                    continue
+
+                for index, document in batch:
+                    key = (str(document.identification), document.bronorganisatie)
+                    if document.identification and document.bronorganisatie:
+                        if key in existing or key in seen:
+                            yield BulkResult(
+                                index,
+                                document,
+                                error=DocumentExistsError(
+                                    "Een document met dezelfde identificatie en "
+                                    "bronorganisatie al bestaat."
+                                ),
+                            )
+                            continue
+                        seen.add(key)
+
+                    # limit the number of documents waiting for a thread
+                    if len(pending) >= 2 * max_workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                    # run in the context of the caller, e.g. to collect its stats
+                    pending.add(
+                        executor.submit(copy_context().run, create, index, document)
+                    )
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
     def get_all_versions(self, document: Document) -> List[Document]:
         """Get all versions of a document from the CMS"""
         return document.get_all_versions()
@@ -118,7 +470,39 @@ class CMISClient:
             return child_folder
 
         # Create new folder, as it doesn't exist yet
-        return self.create_folder(name, parent.objectId, properties)
+        return self.create_folder_or_get_existing(
+            name,
+            parent.objectId,
+            properties,
+            lambda: parent.get_child_folder(name=name, child_type=child_type),
+        )
+
+    def create_folder_or_get_existing(
+        self,
+        name: str,
+        parent_id: str,
+        properties: Optional[dict],
+        get_existing: Callable[[], Optional[Folder]],
+    ) -> Folder:
+        """Create a folder, or retrieve it if it was created concurrently
+
+        Another worker can create a folder with the same name between checking
+        that it doesn't exist and creating it. The DMS then refuses the name, and
+        the folder created by the other worker is used instead.
+
+        :param get_existing: callable, which retrieves the existing folder
+        :return: Folder, the folder that was created/retrieved
+        """
+        try:
+            return self.create_folder(name, parent_id, properties)
+        except CmisBaseException as exc:
+            if not is_name_conflict(exc):
+                raise
+            folder = get_existing()
+            if folder is None:
+                raise
+            logger.info("Folder %s was created concurrently, using it", name)
+            return folder
 
     def get_folder_by_name(self, name: str, parent: Folder) -> Folder:
         child_folder = parent.get_child_folder(
@@ -145,6 +529,7 @@ class CMISClient:
                 folder.delete_tree()
             except FolderDoesNotExistError:
                 pass
+        folder_path_cache.invalidate(self.folder_cache_scope)
 
     def update_document(
         self, drc_uuid: str, lock: str, data: dict, content: Optional[BytesIO] = None
@@ -196,6 +581,24 @@ class CMISClient:
 
         return cmis_doc
 
+    @staticmethod
+    def get_already_locked_error() -> DocumentLockedException:
+        """Return the error raised when locking a document that is checked out"""
+        return DocumentLockedException(
+            "Document was already checked out", code="double_lock"
+        )
+
+    @staticmethod
+    def check_unlock(current_lock: Optional[str], lock: str, force: bool) -> None:
+        """Raise an error if the lock doesn't match the lock of the document
+
+        :param current_lock: string, the lock stored on the private working copy
+        :param lock: string, the lock given to unlock the document
+        :param force: bool, whether to unlock the document regardless of the lock
+        """
+        if not (constant_time_compare(current_lock, lock) or force):
+            raise LockDidNotMatchException("Lock did not match", code="unlock-failed")
+
     def update_gebruiksrechten(self, drc_uuid: str, data: dict) -> Gebruiksrechten:
         """Update a gebruiksrechten
 
@@ -261,18 +664,24 @@ class CMISClient:
         if "object" in oio_data:
             oio_data[oio_data["object_type"]] = oio_data.pop("object")
 
-        # If the related object is a besluit not related to a zaak,
-        # the oio for the besluit is created in the "Related data" of the temporary folder
-        if zaak_data is None and oio_data["object_type"] == "besluit":
-            destination_folder = self.get_or_create_other_folder()
-        else:
-            # Get or create the destination folder
-            destination_folder = self.get_or_create_zaak_folder(
-                zaaktype_data, zaak_data
+        def get_destination_folders() -> Tuple[Folder, Folder]:
+            # If the related object is a besluit not related to a zaak,
+            # the oio for the besluit is created in the "Related data" of the temporary folder
+            if zaak_data is None and oio_data["object_type"] == "besluit":
+                destination_folder = self.get_or_create_other_folder()
+            else:
+                # Get or create the destination folder
+                destination_folder = self.get_or_create_zaak_folder(
+                    zaaktype_data, zaak_data
+                )
+
+            related_data_folder = self.get_or_create_folder(
+                "Related data", destination_folder
             )
+            return destination_folder, related_data_folder
 
-        related_data_folder = self.get_or_create_folder(
-            "Related data", destination_folder
+        destination_folder, related_data_folder = self.retry_with_fresh_folders(
+            get_destination_folders
         )
 
         # Check if there are other Oios related to the document
@@ -349,29 +758,140 @@ class CMISClient:
         document = self.get_document(drc_uuid=drc_uuid)
         document.delete_object()
 
-    def get_or_create_zaak_folder(self, zaaktype: dict, zaak: dict) -> Folder:
-        """Get or create all the folders in the configurable 'zaak' folder path"""
-        path_elements = folder_utils.get_folder_structure(self.config.zaak_folder_path)
+    def get_or_create_path(
+        self, path: List[Tuple[str, dict]], day: Optional[datetime.date] = None
+    ) -> Folder:
+        """Get or create the folders in the path, starting from the root folder
+
+        The folders are cached by their path, see
+        :class:`drc_cmis.cache.FolderPathCache`. Folders that are not cached are
+        looked up by path, starting with the full path, so an existing folder is
+        retrieved with a single request. Only the folders below the deepest
+        existing folder are created, while holding the lock of the path (see
+        :class:`drc_cmis.cache.FolderPathLock`).
+
+        :param path: list of tuples with the name and the properties of each folder
+        :param day: date, the date in the path (if any), which determines how long
+            the folders are cached. Defaults to today.
+        :return: Folder, the last folder in the path
+        """
+        if not path:
+            return self.get_folder(self.root_folder_id)
+
+        paths = folder_utils.get_folder_paths(path)
+        cached = folder_path_cache.get_many(self.folder_cache_scope, paths)
+        if paths[-1] not in cached:
+            with folder_path_lock(self.base_url, paths[-1]) as locked:
+                if locked:
+                    # the folders may have been created while waiting for the lock
+                    cached = folder_path_cache.get_many(self.folder_cache_scope, paths)
+                if paths[-1] not in cached:
+                    return self._resolve_path(path, paths, cached, day)
+        return self.folder_type(cached[paths[-1]], client=self)
+
+    def _resolve_path(
+        self,
+        path: List[Tuple[str, dict]],
+        paths: List[str],
+        cached: dict,
+        day: Optional[datetime.date],
+    ) -> Folder:
+        depth = len(paths) - 1
+        while depth and paths[depth - 1] not in cached:
+            depth -= 1
+
+        parent_folder = None
+        if depth:
+            parent_folder = self.folder_type(cached[paths[depth - 1]], client=self)
+
+        resolved = {}
+        for index in range(len(paths) - 1, depth - 1, -1):
+            folder = self.get_folder_by_path(paths[index])
+            if folder is not None:
+                parent_folder = resolved[paths[index]] = folder
+                depth = index + 1
+                break
+
+        # the folders below the deepest existing folder don't exist either
+        if parent_folder is None:
+            parent_id = self.root_folder_id
+        else:
+            parent_id = parent_folder.objectId
+        for index in range(depth, len(path)):
+            folder_name, props = path[index]
+            parent_folder = self.create_folder_or_get_existing(
+                folder_name,
+                parent_id,
+                props,
+                lambda: self.get_folder_by_path(paths[index]),
+            )
+            parent_id = parent_folder.objectId
+            resolved[paths[index]] = parent_folder
 
-        parent_folder = self.get_folder(self.root_folder_id)
-        now = timezone.now()
+        folder_path_cache.set_many(self.folder_cache_scope, resolved, day)
+        return parent_folder
+
+    def retry_with_fresh_folders(self, action: Callable[[], T]) -> T:
+        """Run the action again with fresh folders if a cached folder no longer exists
+
+        Folders deleted outside of the adapter are only noticed when the DMS reports
+        that an object does not exist. The cached folder paths are then forgotten
+        and the action, which resolves the folders it needs, is run once more.
+        """
+        try:
+            return action()
+        except (CmisObjectNotFoundException, CmisRuntimeException) as exc:
+            if not is_object_not_found(exc):
+                raise
+            folder_path_cache.invalidate(self.folder_cache_scope)
+            return action()
+
+    @staticmethod
+    def get_date_path_context(day: datetime.date) -> dict:
+        """Return the names of the date folders in the folder paths"""
+        return {
+            folder_utils.YEAR_PATH_ELEMENT_TEMPLATE.folder_name: (str(day.year), {}),
+            folder_utils.MONTH_PATH_ELEMENT_TEMPLATE.folder_name: (str(day.month), {}),
+            folder_utils.DAY_PATH_ELEMENT_TEMPLATE.folder_name: (str(day.day), {}),
+        }
+
+    def get_or_create_zaak_folder(
+        self, zaaktype: dict, zaak: dict, day: Optional[datetime.date] = None
+    ) -> Folder:
+        """Get or create all the folders in the configurable 'zaak' folder path
+
+        :param day: date, used for the date folders in the path. Defaults to today.
+        """
+        if day is None:
+            day = timezone.now().date()
+        return self.get_or_create_path(
+            self.get_zaak_folder_path(zaaktype, zaak, day), day
+        )
+
+    def get_zaak_folder_path(
+        self, zaaktype: dict, zaak: dict, day: datetime.date
+    ) -> List[Tuple[str, dict]]:
+        """Return the names and properties of the folders in the 'zaak' folder path"""
+        path_elements = folder_utils.get_folder_structure(self.config.zaak_folder_path)
 
         zaaktype.setdefault(
             "object_type_id",
             f"{self.get_object_type_id_prefix('zaaktypefolder')}drc:zaaktypefolder",
         )
-        zaaktype_properties = self.zaaktypefolder_type.build_properties(zaaktype)
+        zaaktype_properties = self.zaaktypefolder_type.build_properties(
+            zaaktype, snapshot=self.config_snapshot
+        )
 
         zaak.setdefault(
             "object_type_id",
             f"{self.get_object_type_id_prefix('zaakfolder')}drc:zaakfolder",
         )
-        zaak_properties = self.zaakfolder_type.build_properties(zaak)
+        zaak_properties = self.zaakfolder_type.build_properties(
+            zaak, snapshot=self.config_snapshot
+        )
 
         ctx = {
-            folder_utils.YEAR_PATH_ELEMENT_TEMPLATE.folder_name: (str(now.year), {}),
-            folder_utils.MONTH_PATH_ELEMENT_TEMPLATE.folder_name: (str(now.month), {}),
-            folder_utils.DAY_PATH_ELEMENT_TEMPLATE.folder_name: (str(now.day), {}),
+            **self.get_date_path_context(day),
             folder_utils.ZAAKTYPE_PATH_ELEMENT_TEMPLATE.folder_name: (
                 f"zaaktype-{zaaktype.get('omschrijving')}-{zaaktype.get('identificatie')}",
                 zaaktype_properties,
@@ -382,29 +902,55 @@ class CMISClient:
             ),
         }
 
-        for pe in path_elements:
-            folder_name, props = ctx.get(pe.folder_name, (pe.folder_name, {}))
+        return [ctx.get(pe.folder_name, (pe.folder_name, {})) for pe in path_elements]
 
-            parent_folder = self.get_or_create_folder(folder_name, parent_folder, props)
+    def get_or_create_other_folder(self, day: Optional[datetime.date] = None) -> Folder:
+        """Get or create all the folders in the configurable 'other' folder path
 
-        return parent_folder
+        :param day: date, used for the date folders in the path. Defaults to today.
+        """
+        if day is None:
+            day = timezone.now().date()
+        return self.get_or_create_path(self.get_other_folder_path(day), day)
 
-    def get_or_create_other_folder(self) -> Folder:
-        """Get or create all the folders in the configurable 'other' folder path"""
+    def get_other_folder_path(self, day: datetime.date) -> List[Tuple[str, dict]]:
+        """Return the names and properties of the folders in the 'other' folder path"""
         path_elements = folder_utils.get_folder_structure(self.config.other_folder_path)
+        ctx = self.get_date_path_context(day)
+        return [ctx.get(pe.folder_name, (pe.folder_name, {})) for pe in path_elements]
 
-        parent_folder = self.get_folder(self.root_folder_id)
-        now = timezone.now()
+    def prewarm_folders(self, days: int = 1) -> List[Folder]:
+        """Create the date folders of today and the next days ahead of time
 
-        ctx = {
-            folder_utils.YEAR_PATH_ELEMENT_TEMPLATE.folder_name: (str(now.year), {}),
-            folder_utils.MONTH_PATH_ELEMENT_TEMPLATE.folder_name: (str(now.month), {}),
-            folder_utils.DAY_PATH_ELEMENT_TEMPLATE.folder_name: (str(now.day), {}),
-        }
-
-        for pe in path_elements:
-            folder_name, props = ctx.get(pe.folder_name, (pe.folder_name, {}))
-
-            parent_folder = self.get_or_create_folder(folder_name, parent_folder, props)
+        The folders in the 'other' folder path are created for every day, and
+        cached until the end of that day. The 'zaak' folder path depends on the
+        zaak, so only the folders before the zaaktype/zaak folders are created,
+        if those contain date folders.
 
-        return parent_folder
+        :param days: int, the number of days after today to create the folders for
+        :return: list of the deepest folders that were created/retrieved
+        """
+        zaak_path_elements = []
+        for pe in folder_utils.get_folder_structure(self.config.zaak_folder_path):
+            if pe.folder_name in (
+                folder_utils.ZAAKTYPE_PATH_ELEMENT_TEMPLATE.folder_name,
+                folder_utils.ZAAK_PATH_ELEMENT_TEMPLATE.folder_name,
+            ):
+                break
+            zaak_path_elements.append(pe)
+
+        today = timezone.now().date()
+        folders = []
+        for offset in range(days + 1):
+            day = today + datetime.timedelta(days=offset)
+            folders.append(self.get_or_create_other_folder(day))
+
+            ctx = self.get_date_path_context(day)
+            if any(pe.folder_name in ctx for pe in zaak_path_elements):
+                path = [
+                    ctx.get(pe.folder_name, (pe.folder_name, {}))
+                    for pe in zaak_path_elements
+                ]
+                folders.append(self.get_or_create_path(path, day))
+
+        return folders
@@ -1,3 +1,4 @@
+from threading import local
 from typing import Type, Union
 
 from django.conf import settings
@@ -7,7 +8,7 @@ from vng_api_common.models import APICredential
 from zds_client.client import Client
 
 from drc_cmis.browser.client import CMISDRCClient
-from drc_cmis.models import CMISConfig
+from drc_cmis.cache import get_config, get_config_snapshot
 from drc_cmis.webservice.client import SOAPCMISClient
 
 try:
@@ -18,13 +19,35 @@ except ImportError:
         return Client
 
 
+_shared_clients = local()
+
+
+def get_shared_client(client_class: type) -> Union[CMISDRCClient, SOAPCMISClient]:
+    """
+    Return the client instance of the given class shared within the current thread.
+
+    Clients keep state (the request object, repository info, main repository ID), so
+    sharing them avoids repeating that work for every object. The clients are
+    discarded whenever a new configuration snapshot is loaded.
+    """
+    version = get_config_snapshot().version
+    if getattr(_shared_clients, "version", None) != version:
+        _shared_clients.version = version
+        _shared_clients.clients = {}
+
+    clients = _shared_clients.clients
+    if client_class not in clients:
+        clients[client_class] = client_class()
+    return clients[client_class]
+
+
 def get_cmis_client() -> Union[CMISDRCClient, SOAPCMISClient]:
-    """Build the CMIS client with the binding specified in the configuration"""
-    config = CMISConfig.get_solo()
+    """Return the (shared) CMIS client with the binding specified in the configuration"""
+    config = get_config()
     if config.binding == "WEBSERVICE":
-        return SOAPCMISClient()
+        return get_shared_client(SOAPCMISClient)
     else:
-        return CMISDRCClient()
+        return get_shared_client(CMISDRCClient)
 
 
 def get_zds_client(url: str):
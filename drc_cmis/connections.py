@@ -1,15 +1,199 @@
 import logging
+import os
 from contextlib import ContextDecorator
-from threading import local
+from threading import Lock, local
+from time import monotonic
+from typing import Optional
 
+from django.conf import settings
 from django.core import signals
+from django.dispatch import receiver
+from django.test.signals import setting_changed
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
 
 logger = logging.getLogger(__name__)
 
 
-__all__ = ["get_session", "use_cmis_connection_pool"]
+__all__ = [
+    "get_connection_pool_settings",
+    "get_session",
+    "reset_connection_pool",
+    "use_cmis_connection_pool",
+]
+
+
+DEFAULT_CONNECTION_POOL = {
+    # number of hosts to keep a pool of connections for
+    "POOL_SIZE": 10,
+    # number of connections kept open for reuse, per host
+    "MAX_CONNECTIONS_PER_HOST": 32,
+    # whether to wait for a free connection when MAX_CONNECTIONS_PER_HOST are in
+    # use, rather than opening an extra connection which is closed after use
+    "BLOCK": False,
+    # seconds after which an idle connection is closed instead of reused
+    "KEEP_ALIVE_TIMEOUT": 15,
+    # seconds after which a connection is closed instead of reused
+    "MAX_CONNECTION_AGE": 300,
+}
+
+
+def get_connection_pool_settings() -> dict:
+    """Return the ``CMIS_CONNECTION_POOL`` setting, completed with the defaults"""
+    return {
+        **DEFAULT_CONNECTION_POOL,
+        **getattr(settings, "CMIS_CONNECTION_POOL", {}),
+    }
+
+
+class ExpiringConnectionPoolMixin:
+    """
+    Close pooled connections which were idle or open for too long, instead of
+    reusing them.
+
+    The DMS (or a load balancer in front of it) closes idle connections after a
+    while, reusing such a connection fails the request.
+    """
+
+    keep_alive_timeout: Optional[float] = None
+    max_connection_age: Optional[float] = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        now = monotonic()
+        if conn.sock is not None and self._is_expired(conn, now):
+            logger.debug("Closing expired connection: %s", self.host)
+            conn.close()
+        if conn.sock is None:
+            # the connection is (re)opened for this request
+            conn.cmis_connected_at = now
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.cmis_released_at = monotonic()
+        super()._put_conn(conn)
+
+    def _is_expired(self, conn, now: float) -> bool:
+        released_at = getattr(conn, "cmis_released_at", None)
+        if (
+            self.keep_alive_timeout is not None
+            and released_at is not None
+            and now - released_at > self.keep_alive_timeout
+        ):
+            return True
+
+        connected_at = getattr(conn, "cmis_connected_at", None)
+        return (
+            self.max_connection_age is not None
+            and connected_at is not None
+            and now - connected_at > self.max_connection_age
+        )
+
+
+class ExpiringHTTPConnectionPool(ExpiringConnectionPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class ExpiringHTTPSConnectionPool(ExpiringConnectionPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class ExpiringPoolManager(PoolManager):
+    def __init__(
+        self, *args, keep_alive_timeout=None, max_connection_age=None, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_connection_age = max_connection_age
+        self.pool_classes_by_scheme = {
+            "http": ExpiringHTTPConnectionPool,
+            "https": ExpiringHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.keep_alive_timeout = self.keep_alive_timeout
+        pool.max_connection_age = self.max_connection_age
+        return pool
+
+
+class CMISHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter with the process-wide pool of connections to the DMS.
+
+    The adapter is mounted on all sessions, closing a session leaves the pooled
+    connections open. Use :meth:`close_connections` to close them.
+    """
+
+    def __init__(self, keep_alive_timeout=None, max_connection_age=None, **kwargs):
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_connection_age = max_connection_age
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        # save these values for pickling
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+
+        self.poolmanager = ExpiringPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            keep_alive_timeout=self.keep_alive_timeout,
+            max_connection_age=self.max_connection_age,
+            **pool_kwargs,
+        )
+
+    def close(self):
+        # called when a session is closed, which only ends its use of the pool
+        pass
+
+    def close_connections(self):
+        super().close()
+
+
+class ConnectionPoolHandler:
+    """Holds the process-wide :class:`CMISHTTPAdapter`, created on first use"""
+
+    def __init__(self):
+        self._adapter = None
+        self._lock = Lock()
+
+    def get_adapter(self) -> CMISHTTPAdapter:
+        adapter = self._adapter
+        if adapter is not None:
+            return adapter
+
+        with self._lock:
+            if self._adapter is None:
+                pool_settings = get_connection_pool_settings()
+                self._adapter = CMISHTTPAdapter(
+                    keep_alive_timeout=pool_settings["KEEP_ALIVE_TIMEOUT"],
+                    max_connection_age=pool_settings["MAX_CONNECTION_AGE"],
+                    pool_connections=pool_settings["POOL_SIZE"],
+                    pool_maxsize=pool_settings["MAX_CONNECTIONS_PER_HOST"],
+                    pool_block=pool_settings["BLOCK"],
+                )
+            return self._adapter
+
+    def reset(self, close: bool = True) -> None:
+        with self._lock:
+            adapter, self._adapter = self._adapter, None
+        if adapter is not None and close:
+            adapter.close_connections()
+
+
+connection_pool = ConnectionPoolHandler()
+
+
+def reset_connection_pool():
+    """Close the pooled connections, and apply the ``CMIS_CONNECTION_POOL`` setting"""
+    connection_pool.reset()
 
 
 class SessionHandler:
@@ -24,6 +208,9 @@ class SessionHandler:
             return self._session.session
 
         session = requests.Session()
+        adapter = connection_pool.get_adapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
         self._session.session = session
         return session
 
@@ -31,7 +218,7 @@ class SessionHandler:
         if not hasattr(self._session, "session"):
             return
 
-        # close the requests session
+        # close the requests session, the pooled connections stay open
         self._session.session.close()
 
         # clear the thread local
@@ -54,13 +241,14 @@ def close_old_session(**kwargs):
 
 class CMISConnectionPool(ContextDecorator):
     """
-    Use and close a connection pool for CMIS requests in a given block.
+    Use a session for CMIS requests in a given block.
 
     An instance can be used either as a decorator or as a context manager.
 
     The wrapped block will make use of a :class:`requests.Session` instance, which
-    enables connection pooling. After the block is executed, the session is closed
-    to prevent leaking resources.
+    uses the process-wide connection pool. After the block is executed, the session
+    is closed, but the pooled connections are kept open for the next block (until
+    they expire, see the ``CMIS_CONNECTION_POOL`` setting).
     """
 
     def __enter__(self):
@@ -90,9 +278,10 @@ def use_cmis_connection_pool(func=None):
     """
     Decorator or context manager to use a ``requests.Session`` connection pool.
 
-    Obtain a session with ``drc_cmis.connections.get_session`` to make use of a
+    Obtain a session with ``drc_cmis.connections.get_session`` to make use of the
     connection pool. You can and should explicitly mark the block(s) where this pool
-    applies. The session will be closed once the outer block exits.
+    applies. The session will be closed once the outer block exits, the connections
+    in the pool are kept open.
 
     Usage:
 
@@ -111,3 +300,21 @@ def use_cmis_connection_pool(func=None):
 
 # always clean up at the end of a request-response cycle by closing any open session
 signals.request_finished.connect(close_old_session)
+
+
+@receiver(setting_changed)
+def reset_connection_pool_on_setting_change(setting, **kwargs):
+    if setting == "CMIS_CONNECTION_POOL":
+        reset_connection_pool()
+
+
+def forget_connections_after_fork():
+    # a forked process (e.g. a worker of a preloading server) must not use the
+    # connections of its parent, forget them without closing them
+    connection_pool.reset(close=False)
+    if hasattr(sessions._session, "session"):
+        del sessions._session.session
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=forget_connections_after_fork)
@@ -0,0 +1,475 @@
+"""
+Instrumentation of the round trips to the DMS.
+
+The transports of both bindings measure every round trip with :func:`round_trip`,
+labelled with the binding and the CMIS action. The time spent decoding the
+responses is measured separately, with :func:`parsing` and :func:`measure_parsing`.
+
+The measurements are:
+
+* added to the :class:`CMISStats` collected by the current context, see
+  :func:`collect_cmis_stats`;
+* exported to the metrics sinks in the ``CMIS_METRICS_SINKS`` setting, see
+  :mod:`drc_cmis.metrics`;
+* listed one by one by the recorders of the current context, see
+  :func:`record_cmis_calls` and :func:`assert_max_cmis_calls`.
+
+Without a collector or sinks, measuring a round trip only costs a few clock reads.
+"""
+
+import logging
+import re
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from .metrics import get_metrics_sinks
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "CMISCallRecorder",
+    "CMISStats",
+    "RoundTrip",
+    "TracedBytes",
+    "TracedText",
+    "assert_max_cmis_calls",
+    "collect_cmis_stats",
+    "get_browser_action",
+    "get_cmis_stats",
+    "get_soap_action",
+    "measure_parsing",
+    "parsing",
+    "record_cmis_calls",
+    "register_vendor",
+    "round_trip",
+    "trace_response",
+]
+
+
+BROWSER = "browser"
+
+WEBSERVICE = "webservice"
+
+_current_stats: ContextVar[Optional["CMISStats"]] = ContextVar(
+    "drc_cmis_stats", default=None
+)
+
+_current_recorder: ContextVar[Optional["CMISCallRecorder"]] = ContextVar(
+    "drc_cmis_call_recorder", default=None
+)
+
+# the round trip being made in the current context
+_current_trip: ContextVar[Optional["RoundTrip"]] = ContextVar(
+    "drc_cmis_round_trip", default=None
+)
+
+# the vendors of the DMSs, by their base URL
+_vendors: Dict[str, str] = {}
+
+# the action is the first element in the body of the SOAP envelope
+SOAP_ACTION_RE = re.compile(r"<(?:\w+:)?Body\b[^>]*>\s*<(?:\w+:)?(\w+)")
+
+
+def get_content_length(headers) -> int:
+    try:
+        return int(headers.get("Content-Length") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def get_browser_action(params: Optional[dict]) -> str:
+    """Return the CMIS action of a browser binding request, like ``query``
+
+    :param params: the query parameters of a GET request, or the form data of a
+        POST request.
+    """
+    if not params:
+        # a GET request of the repository URL returns the repository info
+        return "repositoryInfo"
+    return params.get("cmisaction") or params.get("cmisselector") or ""
+
+
+def get_soap_action(soap_envelope: str) -> str:
+    """Return the CMIS action of a SOAP envelope, like ``query``"""
+    match = SOAP_ACTION_RE.search(soap_envelope)
+    return match.group(1) if match is not None else ""
+
+
+def register_vendor(base_url: str, vendor: Optional[str]) -> None:
+    """Label the round trips to the URLs starting with the base URL with the vendor"""
+    if vendor and _vendors.get(base_url) != vendor:
+        _vendors[base_url] = vendor
+
+
+def get_vendor(url: str) -> str:
+    for base_url, vendor in list(_vendors.items()):
+        if url.startswith(base_url):
+            return vendor
+    return ""
+
+
+def get_operation(frame) -> str:
+    """Return the outermost ``drc_cmis`` function in the stack, like ``CMISDRCClient.get_document``
+
+    This is the operation of the client the calling code asked for, which may take
+    several round trips.
+    """
+    operation = ""
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith("drc_cmis."):
+            code = frame.f_code
+            operation = getattr(code, "co_qualname", code.co_name)
+        elif operation:
+            break
+        frame = frame.f_back
+    return operation
+
+
+class RoundTrip:
+    """
+    Measurements of a single request to the DMS and its response.
+
+    :param binding: string, ``"browser"`` or ``"webservice"``
+    :param action: string, the CMIS action, or a callable returning it. The
+        callable is only called when the action is used as a label.
+    :param url: string, the URL of the request
+    """
+
+    __slots__ = (
+        "binding",
+        "_action",
+        "url",
+        "started",
+        "duration",
+        "parse_duration",
+        "status",
+        "request_bytes",
+        "response_bytes",
+        "operation",
+    )
+
+    def __init__(self, binding: str, action: Union[str, Callable[[], str]], url: str):
+        self.binding = binding
+        self._action = action
+        self.url = url
+        self.started = perf_counter()
+        self.duration = 0.0
+        self.parse_duration = 0.0
+        self.status: Optional[int] = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # only determined for recorded round trips
+        self.operation = ""
+
+    def __repr__(self):
+        return (
+            f"<RoundTrip {self.binding} {self.action} status={self.status} "
+            f"duration={self.duration:.3f}s>"
+        )
+
+    @property
+    def action(self) -> str:
+        if callable(self._action):
+            self._action = self._action() or ""
+        return self._action
+
+    @property
+    def vendor(self) -> str:
+        return get_vendor(self.url)
+
+    @property
+    def status_label(self) -> str:
+        """The status as a label, ``"error"`` if no response was received"""
+        return "error" if self.status is None else str(self.status)
+
+    def record_response(self, response, stream: bool = False) -> None:
+        """Record the status and sizes of a ``requests`` or ``httpx`` response
+
+        :param stream: whether the content of the response is not read yet, in
+            which case the announced ``Content-Length`` is recorded.
+        """
+        self.status = response.status_code
+        self.request_bytes = get_content_length(response.request.headers)
+        if stream:
+            self.response_bytes = get_content_length(response.headers)
+        else:
+            self.response_bytes = len(response.content)
+
+
+class CMISStats:
+    """
+    Totals of the round trips to the DMS made in a context, like a request.
+
+    The round trips are also added to the stats of the enclosing context, if any.
+    """
+
+    def __init__(self, parent: Optional["CMISStats"] = None):
+        self.parent = parent
+        self.round_trips = 0
+        self.duration = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # round trips can be made by threads working for the context
+        self._lock = Lock()
+
+    def __repr__(self):
+        return (
+            f"<CMISStats round_trips={self.round_trips} "
+            f"duration={self.duration:.3f}s request_bytes={self.request_bytes} "
+            f"response_bytes={self.response_bytes}>"
+        )
+
+    def add(self, trip: RoundTrip) -> None:
+        with self._lock:
+            self.round_trips += 1
+            self.duration += trip.duration
+            self.request_bytes += trip.request_bytes
+            self.response_bytes += trip.response_bytes
+        if self.parent is not None:
+            self.parent.add(trip)
+
+
+class CMISCallRecorder:
+    """
+    The round trips to the DMS made in a context, in the order they were made.
+
+    Every round trip is labelled with the client operation that made it, see
+    :meth:`format_calls`. The round trips are also added to the recorder of the
+    enclosing context, if any.
+    """
+
+    def __init__(self, parent: Optional["CMISCallRecorder"] = None):
+        self.parent = parent
+        self.started = perf_counter()
+        self.calls: List[RoundTrip] = []
+        # round trips can be made by threads working for the context
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"<CMISCallRecorder calls={len(self)}>"
+
+    def __len__(self):
+        return len(self.calls)
+
+    def __iter__(self) -> Iterator[RoundTrip]:
+        return iter(list(self.calls))
+
+    @property
+    def actions(self) -> List[str]:
+        """The CMIS actions of the round trips, like ``["query", "getObject"]``"""
+        return [trip.action for trip in self]
+
+    @property
+    def duration(self) -> float:
+        return sum(trip.duration for trip in self)
+
+    def add(self, trip: RoundTrip) -> None:
+        with self._lock:
+            self.calls.append(trip)
+        if self.parent is not None:
+            self.parent.add(trip)
+
+    def format_calls(self, indent: str = "  ") -> str:
+        """Return the round trips as a tree, grouped by the operation that made them
+
+        For example::
+
+            CMISDRCClient.get_document: 2 calls, 35.2 ms
+              +0.1 ms browser query 200 20.1 ms
+              +20.4 ms browser object 200 15.1 ms
+        """
+        lines = []
+        group: List[RoundTrip] = []
+
+        def add_group():
+            duration = sum(trip.duration for trip in group) * 1000
+            calls = "call" if len(group) == 1 else "calls"
+            operation = group[0].operation or "<unknown>"
+            lines.append(f"{operation}: {len(group)} {calls}, {duration:.1f} ms")
+            for trip in group:
+                lines.append(
+                    f"{indent}+{(trip.started - self.started) * 1000:.1f} ms "
+                    f"{trip.binding} {trip.action} {trip.status_label} "
+                    f"{trip.duration * 1000:.1f} ms"
+                )
+
+        for trip in sorted(self, key=lambda trip: trip.started):
+            if group and trip.operation != group[0].operation:
+                add_group()
+                group = []
+            group.append(trip)
+        if group:
+            add_group()
+        return "\n".join(lines)
+
+
+@contextmanager
+def record_cmis_calls() -> Iterator[CMISCallRecorder]:
+    """Record the round trips made in the block, see :class:`CMISCallRecorder`
+
+    Recording costs a walk of the stack per round trip, to determine its operation.
+    Threads started in the block only contribute when they run in a copy of the
+    context, see :func:`contextvars.copy_context`.
+    """
+    recorder = CMISCallRecorder(parent=_current_recorder.get())
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+
+
+@contextmanager
+def assert_max_cmis_calls(num: int) -> Iterator[CMISCallRecorder]:
+    """Assert that the block makes at most ``num`` round trips to the DMS
+
+    Like Django's ``assertNumQueries``, the round trips are listed when the
+    assertion fails. The assertion is skipped if the block raises.
+    """
+    with record_cmis_calls() as recorder:
+        yield recorder
+
+    if len(recorder) > num:
+        raise AssertionError(
+            f"{len(recorder)} CMIS calls were made, expected at most {num}:\n"
+            f"{recorder.format_calls()}"
+        )
+
+
+def get_cmis_stats() -> Optional[CMISStats]:
+    """Return the stats collected by the current context, if any"""
+    return _current_stats.get()
+
+
+@contextmanager
+def collect_cmis_stats() -> Iterator[CMISStats]:
+    """Collect the stats of the round trips made in the block
+
+    Threads started in the block only contribute when they run in a copy of the
+    context, see :func:`contextvars.copy_context`.
+    """
+    stats = CMISStats(parent=_current_stats.get())
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def round_trip(
+    binding: str = "", action: Union[str, Callable[[], str]] = "", url: str = ""
+) -> Iterator[RoundTrip]:
+    """Measure a round trip to the DMS, made in the block
+
+    Decoding measured with :func:`parsing` in the block is attributed to the round
+    trip, and excluded from its duration. After the block, pass the round trip to
+    :func:`parsing`, or tag the response with :func:`trace_response`.
+
+    See :class:`RoundTrip` for the parameters.
+    """
+    trip = RoundTrip(binding, action, url)
+    token = _current_trip.set(trip)
+    try:
+        yield trip
+    finally:
+        _current_trip.reset(token)
+        trip.duration = perf_counter() - trip.started - trip.parse_duration
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add(trip)
+
+        recorder = _current_recorder.get()
+        if recorder is not None:
+            # start above this generator
+            trip.operation = get_operation(sys._getframe(1))
+            recorder.add(trip)
+
+        for sink in get_metrics_sinks():
+            try:
+                sink.record_round_trip(trip)
+            except Exception:
+                logger.exception("Recording the round trip in %r failed", sink)
+
+
+@contextmanager
+def parsing(trip: Optional[RoundTrip] = None) -> Iterator[None]:
+    """Measure the decoding of the response of a round trip, in the block
+
+    :param trip: the round trip, by default the one made in the current context,
+        see :func:`round_trip`. Without a round trip, nothing is measured.
+    """
+    if trip is None:
+        trip = _current_trip.get()
+    if trip is None:
+        yield
+        return
+
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        duration = perf_counter() - started
+        trip.parse_duration += duration
+        for sink in get_metrics_sinks():
+            try:
+                sink.record_parsing(trip, duration)
+            except Exception:
+                logger.exception("Recording the parse time in %r failed", sink)
+
+
+class TracedText(str):
+    """The (decoded) text of a response, tagged with its round trip"""
+
+    round_trip: Optional[RoundTrip] = None
+
+
+class TracedBytes(bytes):
+    """The content of a response, tagged with its round trip"""
+
+    round_trip: Optional[RoundTrip] = None
+
+
+def trace_response(content: Union[str, bytes], trip: RoundTrip) -> Union[str, bytes]:
+    """Tag the content of the response with the round trip
+
+    The functions decorated with :func:`measure_parsing` attribute the decoding of
+    tagged content to the round trip, also after the :func:`round_trip` block.
+    Without metrics sinks, the content is returned as is.
+    """
+    if not get_metrics_sinks():
+        return content
+    traced = (TracedBytes if isinstance(content, bytes) else TracedText)(content)
+    traced.round_trip = trip
+    return traced
+
+
+def measure_parsing(func):
+    """Decorator measuring the function as decoding of a response, see :func:`parsing`
+
+    The decoding is attributed to the round trip of the first argument, if it is
+    tagged with :func:`trace_response`, or else to the round trip made in the
+    current context. A text or bytes result is tagged with the same round trip, so
+    decoding it further is attributed as well.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        trip = getattr(args[0], "round_trip", None) if args else None
+        if trip is None:
+            trip = _current_trip.get()
+        if trip is None:
+            return func(*args, **kwargs)
+        with parsing(trip):
+            result = func(*args, **kwargs)
+        if isinstance(result, (str, bytes)):
+            return trace_response(result, trip)
+        return result
+
+    return wrapper
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from drc_cmis.client_builder import get_cmis_client
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the date folders of today and the next days in the DMS ahead of "
+        "time, and cache them. Run it daily, for example from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=1,
+            help="The number of days after today to create the folders for.",
+        )
+
+    def handle(self, *args, **options):
+        cmis_client = get_cmis_client()
+        folders = cmis_client.prewarm_folders(days=options["days"])
+        self.stdout.write(f"Prepared {len(folders)} folders")
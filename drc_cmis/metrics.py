@@ -0,0 +1,298 @@
+"""
+Export of the metrics of the round trips to the DMS.
+
+The round trips measured by :mod:`drc_cmis.instrumentation` are passed to the sinks
+configured in the ``CMIS_METRICS_SINKS`` setting, for example:
+
+.. code-block:: python
+
+    CMIS_METRICS_SINKS = [
+        {"BACKEND": "drc_cmis.metrics.PrometheusSink"},
+        {
+            "BACKEND": "drc_cmis.metrics.StatsdSink",
+            "OPTIONS": {"host": "statsd.local", "port": 8125},
+        },
+    ]
+
+Every round trip is labelled with the binding, the CMIS action, the status (or
+``error`` if no response was received) and the vendor of the DMS.
+
+A sink is a subclass of :class:`MetricsSink`, the ``OPTIONS`` are passed to its
+constructor.
+"""
+
+import logging
+import socket
+from threading import Lock
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils.module_loading import import_string
+
+try:
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
+if TYPE_CHECKING:
+    from .instrumentation import RoundTrip
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = [
+    "MetricsSink",
+    "PrometheusSink",
+    "StatsdSink",
+    "get_metrics_sinks",
+    "reset_metrics_sinks",
+]
+
+
+# seconds, from a fast query to a large upload
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+PARSE_DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+class MetricsSink:
+    """Receives the measurements of the round trips to the DMS"""
+
+    def record_round_trip(self, trip: "RoundTrip") -> None:
+        """Record a round trip, after its response was received"""
+        raise NotImplementedError
+
+    def record_parsing(self, trip: "RoundTrip", duration: float) -> None:
+        """Record the time spent decoding (part of) the response of a round trip"""
+        raise NotImplementedError
+
+
+class PrometheusSink(MetricsSink):
+    """
+    Export the metrics with `prometheus_client`_, installed with ``drc-cmis[prometheus]``.
+
+    The metrics are registered in the default registry, and are exposed by the
+    metrics endpoint of the application:
+
+    * ``drc_cmis_request_duration_seconds``: histogram of the round trip latency;
+    * ``drc_cmis_request_bytes_total`` and ``drc_cmis_response_bytes_total``:
+      the bytes sent and received;
+    * ``drc_cmis_parse_duration_seconds``: histogram of the time spent decoding
+      the responses, labelled with the binding and action only.
+
+    .. _prometheus_client: https://github.com/prometheus/client_python
+
+    :param namespace: string, the prefix of the metric names
+    :param buckets: the buckets of the latency histogram, in seconds
+    """
+
+    labels = ("binding", "action", "status", "vendor")
+
+    # the metrics can only be registered once per process
+    _metrics = {}
+    _lock = Lock()
+
+    def __init__(
+        self, namespace: str = "drc_cmis", buckets: Sequence[float] = DURATION_BUCKETS
+    ):
+        if prometheus_client is None:
+            raise ImproperlyConfigured(
+                "The Prometheus metrics require prometheus_client, install "
+                "drc-cmis[prometheus]."
+            )
+        with self._lock:
+            if namespace not in self._metrics:
+                self._metrics[namespace] = self.create_metrics(namespace, buckets)
+        (
+            self.duration,
+            self.request_bytes,
+            self.response_bytes,
+            self.parse_duration,
+        ) = self._metrics[namespace]
+
+    def create_metrics(self, namespace: str, buckets: Sequence[float]) -> tuple:
+        return (
+            prometheus_client.Histogram(
+                "request_duration_seconds",
+                "Duration of the round trips to the DMS",
+                self.labels,
+                namespace=namespace,
+                buckets=buckets,
+            ),
+            prometheus_client.Counter(
+                "request_bytes",
+                "Bytes sent to the DMS",
+                self.labels,
+                namespace=namespace,
+            ),
+            prometheus_client.Counter(
+                "response_bytes",
+                "Bytes received from the DMS",
+                self.labels,
+                namespace=namespace,
+            ),
+            prometheus_client.Histogram(
+                "parse_duration_seconds",
+                "Duration of decoding the responses of the DMS",
+                ("binding", "action"),
+                namespace=namespace,
+                buckets=PARSE_DURATION_BUCKETS,
+            ),
+        )
+
+    def record_round_trip(self, trip: "RoundTrip") -> None:
+        labels = (trip.binding, trip.action, trip.status_label, trip.vendor)
+        self.duration.labels(*labels).observe(trip.duration)
+        if trip.request_bytes:
+            self.request_bytes.labels(*labels).inc(trip.request_bytes)
+        if trip.response_bytes:
+            self.response_bytes.labels(*labels).inc(trip.response_bytes)
+
+    def record_parsing(self, trip: "RoundTrip", duration: float) -> None:
+        self.parse_duration.labels(trip.binding, trip.action).observe(duration)
+
+
+class StatsdSink(MetricsSink):
+    """
+    Send the metrics to a statsd server, over UDP.
+
+    The metrics of a round trip are sent in one packet, and sending never blocks
+    nor raises. The metrics are:
+
+    * ``<prefix>.request.duration``: the round trip latency (timer, in ms);
+    * ``<prefix>.request.errors``: counts the unsuccessful round trips;
+    * ``<prefix>.request.bytes`` and ``<prefix>.response.bytes``: the bytes sent
+      and received (counters);
+    * ``<prefix>.parse.duration``: the time spent decoding the responses.
+
+    :param host: string, the host of the statsd server
+    :param port: int, the port of the statsd server
+    :param prefix: string, the prefix of the metric names
+    :param tags: whether to send the labels as (DogStatsD) tags. By default, the
+        binding and action are part of the metric names, like
+        ``<prefix>.<binding>.<action>.request.duration``, and the status and vendor
+        are left out.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8125,
+        prefix: str = "drc_cmis",
+        tags: bool = False,
+    ):
+        self.address = (self.resolve(host), port)
+        self.prefix = prefix
+        self.tags = tags
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    @staticmethod
+    def resolve(host: str) -> str:
+        # don't look up the host for every packet
+        try:
+            return socket.gethostbyname(host)
+        except OSError:
+            return host
+
+    def __repr__(self):
+        return f"<StatsdSink {self.address[0]}:{self.address[1]}>"
+
+    def format(self, trip: "RoundTrip", metrics: List[Tuple[str, str]]) -> bytes:
+        if self.tags:
+            prefix = self.prefix
+            tags = (
+                f"|#binding:{trip.binding},action:{trip.action},"
+                f"status:{trip.status_label},vendor:{trip.vendor}"
+            )
+        else:
+            prefix = f"{self.prefix}.{trip.binding}.{trip.action}"
+            tags = ""
+        return "\n".join(
+            f"{prefix}.{name}:{value}{tags}" for name, value in metrics
+        ).encode("utf-8")
+
+    def send(self, data: bytes) -> None:
+        try:
+            self.socket.sendto(data, self.address)
+        except OSError as exc:
+            logger.debug("Sending the metrics to statsd failed: %s", exc)
+
+    def record_round_trip(self, trip: "RoundTrip") -> None:
+        metrics = [("request.duration", f"{trip.duration * 1000:.3f}|ms")]
+        if trip.status is None or trip.status >= 400:
+            metrics.append(("request.errors", "1|c"))
+        if trip.request_bytes:
+            metrics.append(("request.bytes", f"{trip.request_bytes}|c"))
+        if trip.response_bytes:
+            metrics.append(("response.bytes", f"{trip.response_bytes}|c"))
+        self.send(self.format(trip, metrics))
+
+    def record_parsing(self, trip: "RoundTrip", duration: float) -> None:
+        self.send(self.format(trip, [("parse.duration", f"{duration * 1000:.3f}|ms")]))
+
+
+class MetricsSinkHandler:
+    """Holds the sinks of the ``CMIS_METRICS_SINKS`` setting, created on first use"""
+
+    def __init__(self):
+        self._sinks: Optional[Tuple[MetricsSink, ...]] = None
+        self._lock = Lock()
+
+    def get(self) -> Tuple[MetricsSink, ...]:
+        sinks = self._sinks
+        if sinks is not None:
+            return sinks
+
+        with self._lock:
+            if self._sinks is None:
+                self._sinks = tuple(
+                    self.create_sink(config)
+                    for config in getattr(settings, "CMIS_METRICS_SINKS", [])
+                )
+            return self._sinks
+
+    @staticmethod
+    def create_sink(config: dict) -> MetricsSink:
+        sink_class = import_string(config["BACKEND"])
+        return sink_class(**config.get("OPTIONS", {}))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sinks = None
+
+
+metrics_sinks = MetricsSinkHandler()
+
+
+def get_metrics_sinks() -> Tuple[MetricsSink, ...]:
+    """Return the sinks of the ``CMIS_METRICS_SINKS`` setting"""
+    return metrics_sinks.get()
+
+
+def reset_metrics_sinks() -> None:
+    """Create the sinks again, from the current ``CMIS_METRICS_SINKS`` setting"""
+    metrics_sinks.reset()
+
+
+@receiver(setting_changed)
+def reset_metrics_sinks_on_setting_change(setting, **kwargs):
+    if setting == "CMIS_METRICS_SINKS":
+        reset_metrics_sinks()
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import random
+from contextlib import ExitStack
+from time import perf_counter
+from typing import Optional
+
+from django.conf import settings
+
+from .connections import use_cmis_connection_pool
+from .instrumentation import (
+    CMISCallRecorder,
+    CMISStats,
+    collect_cmis_stats,
+    record_cmis_calls,
+)
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = ["CMISConnectionPoolMiddleware"]
+
+
+class CMISConnectionPoolMiddleware:
+    """
+    Use the CMIS connection pool for the whole request, and collect its CMIS stats.
+
+    The stats of the round trips to the DMS made while handling the request are
+    available as ``request.cmis_stats``, see
+    :class:`drc_cmis.instrumentation.CMISStats`. With the ``CMIS_STATS_HEADERS``
+    setting, they are added to the response headers as well.
+
+    With the ``CMIS_SLOW_REQUEST_THRESHOLD`` setting, the round trips of (a sample
+    of, see ``CMIS_SLOW_REQUEST_SAMPLE_RATE``) the requests are recorded, and
+    logged as a call tree when the request is slow.
+
+    The middleware supports both sync and async requests. Async views don't use
+    the thread-local session, so for them only the stats are collected.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # only async requests (Django >= 3.1) need asgiref
+            from asgiref.sync import markcoroutinefunction
+
+            # mark the instance as a coroutine function, like Django's MiddlewareMixin
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = perf_counter()
+        with ExitStack() as stack:
+            stats = stack.enter_context(collect_cmis_stats())
+            recorder = self.record_calls(stack)
+            stack.enter_context(use_cmis_connection_pool())
+            request.cmis_stats = stats
+            response = self.get_response(request)
+        self.log_slow_request(request, perf_counter() - started, recorder)
+        return self.process_response(response, stats)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        with ExitStack() as stack:
+            stats = stack.enter_context(collect_cmis_stats())
+            recorder = self.record_calls(stack)
+            request.cmis_stats = stats
+            response = await self.get_response(request)
+        self.log_slow_request(request, perf_counter() - started, recorder)
+        return self.process_response(response, stats)
+
+    @staticmethod
+    def record_calls(stack: ExitStack) -> Optional[CMISCallRecorder]:
+        if getattr(settings, "CMIS_SLOW_REQUEST_THRESHOLD", None) is None:
+            return None
+        if random.random() >= getattr(settings, "CMIS_SLOW_REQUEST_SAMPLE_RATE", 1.0):
+            return None
+        return stack.enter_context(record_cmis_calls())
+
+    @staticmethod
+    def log_slow_request(
+        request, duration: float, recorder: Optional[CMISCallRecorder]
+    ) -> None:
+        if recorder is None or duration < settings.CMIS_SLOW_REQUEST_THRESHOLD:
+            return
+
+        logger.warning(
+            "Slow request %s %s took %.1f ms, of which %d CMIS calls took %.1f ms:\n%s",
+            request.method,
+            request.path,
+            duration * 1000,
+            len(recorder),
+            recorder.duration * 1000,
+            recorder.format_calls(),
+        )
+
+    def process_response(self, response, stats: CMISStats):
+        if getattr(settings, "CMIS_STATS_HEADERS", False):
+            response["X-CMIS-Round-Trips"] = str(stats.round_trips)
+            response["X-CMIS-Duration"] = f"{stats.duration * 1000:.1f}"
+            response["X-CMIS-Request-Bytes"] = str(stats.request_bytes)
+            response["X-CMIS-Response-Bytes"] = str(stats.response_bytes)
+        return response
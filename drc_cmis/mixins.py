@@ -35,8 +35,15 @@ class RearrangeFilesOnDeleteMixin:
             if gebruiksrechten_file:
                 gebruiksrechten_file.delete_object()
         else:
-            default_folder = self.client.get_or_create_other_folder()
-            document_to_unrelate.move_object(default_folder)
+
+            def move_to_default_folder():
+                default_folder = self.client.get_or_create_other_folder()
+                document_to_unrelate.move_object(default_folder)
+                return default_folder
+
+            default_folder = self.client.retry_with_fresh_folders(
+                move_to_default_folder
+            )
             if gebruiksrechten_file:
                 default_related_data_folder = self.client.get_or_create_folder(
                     "Related data", default_folder
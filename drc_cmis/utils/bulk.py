@@ -0,0 +1,55 @@
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, TypeVar
+
+from django.conf import settings
+
+DEFAULT_BULK_MAX_WORKERS = 8
+
+DEFAULT_BULK_BATCH_SIZE = 100
+
+T = TypeVar("T")
+
+
+def get_bulk_max_workers() -> int:
+    return getattr(settings, "CMIS_BULK_MAX_WORKERS", DEFAULT_BULK_MAX_WORKERS)
+
+
+def get_bulk_batch_size() -> int:
+    return getattr(settings, "CMIS_BULK_BATCH_SIZE", DEFAULT_BULK_BATCH_SIZE)
+
+
+class NewDocument(NamedTuple):
+    """A document to create with :meth:`drc_cmis.client.CMISClient.create_documents`
+
+    The fields are the arguments of ``create_document``.
+    """
+
+    identification: str
+    bronorganisatie: str
+    data: dict
+    content: Optional[BinaryIO] = None
+
+
+class BulkResult(NamedTuple):
+    """The outcome of creating one of the documents in bulk"""
+
+    # the position of the item in the input
+    index: int
+    item: NewDocument
+    # the created document, if it was created
+    document: Optional[object] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of at most ``size`` items, without reading ahead"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
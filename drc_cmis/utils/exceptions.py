@@ -39,6 +39,12 @@ class GetFirstException(Exception):
     pass
 
 
+class PropertyNotSelectedError(AttributeError):
+    """The property was left out of the query that retrieved the object"""
+
+    pass
+
+
 class CmisBaseException(Exception):
     """Common base class for all exceptions."""
 
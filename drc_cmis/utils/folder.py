@@ -1,6 +1,6 @@
 import re
 from collections import namedtuple
-from typing import List
+from typing import List, Tuple
 
 from django.core.exceptions import ValidationError
 
@@ -63,3 +63,15 @@ def get_folder_structure(path: str) -> List[PathElement]:
         )
 
     return result
+
+
+def get_folder_paths(path: List[Tuple[str, dict]]) -> List[str]:
+    """Return the path from the root folder of every folder in the path
+
+    :param path: list of tuples with the name and the properties of each folder
+    :return: list of paths, e.g. ``["/DRC", "/DRC/2026"]``
+    """
+    return [
+        "/" + "/".join(name for name, _ in path[: index + 1])
+        for index in range(len(path))
+    ]
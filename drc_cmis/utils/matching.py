@@ -0,0 +1,115 @@
+from collections import deque
+from typing import Iterable, Optional, Tuple
+
+
+class PatternMatcher:
+    """
+    Find the longest of a fixed set of patterns occurring anywhere in a string.
+
+    The patterns are compiled into an Aho-Corasick automaton (a trie with failure
+    links), so that a lookup is a single pass over the string, regardless of the
+    number of patterns. If several patterns of the same length occur, the one that
+    comes first in ``patterns`` wins.
+
+    For a small number of patterns, checking the (pre-sorted) patterns one by one
+    is faster in Python than walking the automaton, so that is done instead, and
+    the automaton is only built when it is walked for the first time. Both give
+    the same result.
+
+    Usage:
+    >>> matcher = PatternMatcher(["https://oz.nl", "https://oz.nl/zaken"])
+    >>> matcher.find("https://oz.nl/zaken/api/v1/zaken/1")
+    'https://oz.nl/zaken'
+    """
+
+    # up to this number of patterns, the patterns are checked one by one
+    scan_threshold = 100
+
+    def __init__(self, patterns: Iterable[str]):
+        # rank the patterns once, so that a lower rank means a better match
+        self.patterns = sorted(
+            (pattern for pattern in dict.fromkeys(patterns) if pattern),
+            key=len,
+            reverse=True,
+        )
+
+        # the automaton, see _build_automaton. It is assigned at once when it is
+        # complete, as the matcher may be shared between threads.
+        self._automaton: Optional[Tuple[list, list, list]] = None
+
+    def _build_automaton(self) -> Tuple[list, list, list]:
+        # node 0 is the root, every node maps a character to a child node
+        goto = [{}]
+        fail = [0]
+        # rank of the best pattern ending in a node (including the failure links)
+        best = [None]
+
+        for rank, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                child = goto[node].get(char)
+                if child is None:
+                    child = len(goto)
+                    goto[node][char] = child
+                    goto.append({})
+                    fail.append(0)
+                    best.append(None)
+                node = child
+            best[node] = rank
+
+        self._build_failure_links(goto, fail, best)
+        return goto, fail, best
+
+    @staticmethod
+    def _build_failure_links(goto: list, fail: list, best: list) -> None:
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                fail[child] = state
+
+                if best[state] is not None and (
+                    best[child] is None or best[state] < best[child]
+                ):
+                    best[child] = best[state]
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the longest pattern occurring in ``text``, or ``None``."""
+        if len(self.patterns) <= self.scan_threshold:
+            return self._scan(text)
+        return self._walk(text)
+
+    def _scan(self, text: str) -> Optional[str]:
+        for pattern in self.patterns:
+            if pattern in text:
+                return pattern
+        return None
+
+    def _walk(self, text: str) -> Optional[str]:
+        automaton = self._automaton
+        if automaton is None:
+            # threads racing to build it each build a complete automaton
+            automaton = self._automaton = self._build_automaton()
+        goto, fail, best = automaton
+
+        node = 0
+        found = None
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            rank = best[node]
+            if rank is not None and (found is None or rank < found):
+                found = rank
+                if found == 0:
+                    # nothing beats the longest pattern
+                    break
+
+        return self.patterns[found] if found is not None else None
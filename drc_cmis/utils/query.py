@@ -1,3 +1,16 @@
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from django.conf import settings
+
+DEFAULT_QUERY_PAGE_SIZE = 100
+
+# a column, like ``drc:document__identificatie``, or a placeholder for a value
+QUERY_TOKEN_RE = re.compile(r"(\w+:\w+)|%s")
+
+
 class CMISQuery:
     """
     Small, not feature-complete utility class for building CMIS queries with
@@ -31,3 +44,121 @@ class CMISQuery:
             value = value.replace("'", "\\'")
             value = value.replace('"', '\\"')
         return value
+
+
+def get_placeholder_columns(lhs: Iterable[str]) -> List[Optional[str]]:
+    """Return the column each placeholder in the conditions of a query is compared to
+
+    A placeholder belongs to the last column before it in its condition, so all
+    placeholders of ``drc:document__identificatie IN ('%s', '%s')`` belong to
+    ``drc:document__identificatie``. A placeholder without a column, like in
+    ``IN_TREE('%s')``, belongs to ``None``.
+
+    :param lhs: the conditions of the query, with ``%s`` placeholders
+    """
+    columns = []
+    for condition in lhs:
+        column = None
+        for match in QUERY_TOKEN_RE.finditer(condition):
+            if match.group(1) is not None:
+                column = match.group(1)
+            else:
+                columns.append(column)
+    return columns
+
+
+def get_query_page_size() -> int:
+    return getattr(settings, "CMIS_QUERY_PAGE_SIZE", DEFAULT_QUERY_PAGE_SIZE)
+
+
+def get_select_columns(select: Iterable[str]) -> List[str]:
+    """Return the properties to select, the objectId is always needed"""
+    return ["cmis:objectId", *(name for name in select if name != "cmis:objectId")]
+
+
+def format_select(select: Optional[Iterable[str]] = None) -> str:
+    """Return the select list of a query
+
+    :param select: the CMIS names of the properties to retrieve, ``None`` for all
+    """
+    if select is None:
+        return "*"
+    return ", ".join(get_select_columns(select))
+
+
+def set_projection(cmis_objects: Iterable, select: Optional[Iterable[str]]) -> None:
+    """Mark the objects as retrieved with only the selected properties"""
+    if select is None:
+        return
+    projection = frozenset(get_select_columns(select))
+    for cmis_object in cmis_objects:
+        cmis_object.projection = projection
+
+
+class QueryPage(NamedTuple):
+    """A page of query results, as decoded from the response"""
+
+    # the objects, in the format of the browser binding. ``None`` if the objects
+    # were not decoded.
+    objects: Optional[List[dict]]
+    has_more_items: bool
+    # the total number of results, if the DMS reports it
+    num_items: Optional[int] = None
+    # the number of objects in the page
+    object_count: Optional[int] = None
+
+
+class QueryPager(NamedTuple):
+    """
+    The binding specific parts of a query.
+
+    ``fetch_page(max_items, skip_count, decode=True)`` only makes the request, so
+    that it can be called from another thread. Without ``decode``, only the number of
+    objects in the page is determined. ``get_results(objects)`` turns the objects of
+    a page into instances of the return type.
+    """
+
+    fetch_page: Callable[..., QueryPage]
+    get_results: Callable[[List[dict]], list]
+
+
+def iter_query_pages(
+    fetch_page: Callable[[Optional[int], int], QueryPage],
+    page_size: int,
+    prefetch: bool = True,
+) -> Iterator[QueryPage]:
+    """Fetch the pages of a query, using maxItems and skipCount
+
+    :param fetch_page: callable, fetches the page for the max items and skip count
+    :param page_size: int, the number of results to request per page
+    :param prefetch: whether to fetch the next page in a background thread while
+        the current page is processed.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    next_page: Optional[Future] = None
+    try:
+        skip_count = 0
+        page = fetch_page(page_size, skip_count)
+        while True:
+            skip_count += len(page.objects)
+            # an empty page would be requested over and over
+            has_next_page = page.has_more_items and bool(page.objects)
+            if has_next_page and executor is not None:
+                next_page = executor.submit(
+                    copy_context().run, fetch_page, page_size, skip_count
+                )
+
+            yield page
+
+            if not has_next_page:
+                return
+            if next_page is not None:
+                page, next_page = next_page.result(), None
+            else:
+                page = fetch_page(page_size, skip_count)
+    finally:
+        # the iteration was stopped early
+        if next_page is not None:
+            next_page.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
@@ -0,0 +1,223 @@
+import io
+from tempfile import SpooledTemporaryFile
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+)
+
+from django.conf import settings
+
+import requests
+
+DEFAULT_CONTENT_MAX_MEMORY_SIZE = 2621440  # 2.5 MiB
+
+CHUNK_SIZE = 64 * 1024
+
+
+def get_content_max_memory_size() -> int:
+    return getattr(
+        settings, "CMIS_CONTENT_MAX_MEMORY_SIZE", DEFAULT_CONTENT_MAX_MEMORY_SIZE
+    )
+
+
+def spool_chunks(chunks: Iterable[bytes]) -> BinaryIO:
+    """Write the chunks to a file, which is only kept in memory while it is small
+
+    Content larger than ``settings.CMIS_CONTENT_MAX_MEMORY_SIZE`` is written to a
+    temporary file on disk.
+
+    :param chunks: iterable of bytes, the content
+    :return: file-like object with the content, positioned at the start.
+    """
+    spooled_file = SpooledTemporaryFile(max_size=get_content_max_memory_size())
+    for chunk in chunks:
+        spooled_file.write(chunk)
+    spooled_file.seek(0)
+    return spooled_file
+
+
+def in_thread(func: Callable) -> Callable[..., Awaitable]:
+    """Wrap a function doing blocking (file) I/O, to await it in a worker thread"""
+    from asgiref.sync import sync_to_async
+
+    return sync_to_async(func, thread_sensitive=False)
+
+
+async def aspool_chunks(chunks: AsyncIterable[bytes]) -> BinaryIO:
+    """Like :func:`spool_chunks`, for chunks that are received asynchronously
+
+    Once the content no longer fits in memory, the chunks are written to the
+    temporary file in a worker thread.
+    """
+    max_size = get_content_max_memory_size()
+    spooled_file = SpooledTemporaryFile(max_size=max_size)
+    write = in_thread(spooled_file.write)
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_size:
+            await write(chunk)
+        else:
+            spooled_file.write(chunk)
+    spooled_file.seek(0)
+    return spooled_file
+
+
+async def aiter_chunks(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    """Yield the chunks of a (streaming) request body to an async HTTP client
+
+    The chunks are read from the (file-backed) body in a worker thread.
+    """
+    iterator = iter(chunks)
+    read = in_thread(next)
+    while True:
+        chunk = await read(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def iter_file(stream: BinaryIO) -> Iterator[bytes]:
+    """Yield the content of a file in chunks, from the current position"""
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def rewind(stream: BinaryIO) -> bool:
+    """Move to the start of the stream, if it is seekable"""
+    seekable = getattr(stream, "seekable", None)
+    if seekable is not None and not seekable():
+        return False
+    try:
+        stream.seek(0)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+    return True
+
+
+def get_stream_size(stream: BinaryIO) -> Optional[int]:
+    """Return the size of a seekable stream, without changing its position"""
+    if not rewind(stream):
+        return None
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(0)
+    return size
+
+
+def get_content_length(response: requests.Response) -> Optional[int]:
+    """Return the size of the content of the response, if it is known"""
+    # the length of encoded content differs from what is read
+    if "Content-Length" not in response.headers:
+        return None
+    if "Content-Encoding" in response.headers:
+        return None
+    return int(response.headers["Content-Length"])
+
+
+def slice_chunks(
+    chunks: Iterable[bytes], start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """Yield the bytes ``start`` up to and including ``end`` of the chunks"""
+    position = 0
+    for chunk in chunks:
+        chunk_start = position
+        position += len(chunk)
+        if position <= start:
+            continue
+
+        offset = max(start - chunk_start, 0)
+        stop = None if end is None else end + 1 - chunk_start
+        yield chunk[offset:stop]
+
+        if end is not None and position > end:
+            return
+
+
+async def aslice_chunks(
+    chunks: AsyncIterable[bytes], start: int = 0, end: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """Like :func:`slice_chunks`, for chunks that are received asynchronously"""
+    position = 0
+    async for chunk in chunks:
+        chunk_start = position
+        position += len(chunk)
+        if position <= start:
+            continue
+
+        offset = max(start - chunk_start, 0)
+        stop = None if end is None else end + 1 - chunk_start
+        yield chunk[offset:stop]
+
+        if end is not None and position > end:
+            return
+
+
+class ResponseStream(io.RawIOBase):
+    """
+    Read-only file-like object over the content of a streamed response.
+
+    The content is read from the connection as it is requested, so it is never
+    held in memory as a whole. Iterating over the stream yields the content in
+    chunks. Close the stream when done, to release the connection.
+
+    :param response: response of a request made with ``stream=True``
+    :param chunks: iterable of bytes, the content to read. Defaults to the
+        content of the response.
+    :param content_length: the size of the content, if it differs from the
+        ``Content-Length`` of the response.
+    """
+
+    def __init__(
+        self,
+        response: requests.Response,
+        chunks: Optional[Iterable[bytes]] = None,
+        content_length: Optional[int] = None,
+    ):
+        self.response = response
+        if chunks is None:
+            chunks = response.iter_content(CHUNK_SIZE)
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+        if content_length is None:
+            content_length = get_content_length(response)
+        self.content_length = content_length
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.response.headers.get("Content-Type")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b""
+                return 0
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self._buffer:
+            chunk, self._buffer = self._buffer, b""
+            yield chunk
+        yield from self._chunks
+
+    def close(self) -> None:
+        if not self.closed:
+            self.response.close()
+        super().close()
@@ -58,7 +58,9 @@ def build_query_filters(
     return filter_string
 
 
-def extract_latest_version(object_type: type, extracted_data: List) -> Document:
+def extract_latest_version(
+    object_type: type, extracted_data: List, client=None
+) -> Document:
     """Get the latest version
 
     If there is a private working copy, then the pwc is returned.
@@ -66,6 +68,7 @@ def extract_latest_version(object_type: type, extracted_data: List) -> Document:
     :param object_type: type of the object to be returned
     :param extracted_data: dict, the results of a query
     "SELECT * FROM drc:document WHERE drc:document__uuid = '<uuid>'"
+    :param client: the client that retrieved the data, passed on to the returned object
     :return: Document, the latest not locked version of a document
     """
     error_string = "Document bestaat niet in het CMIS connection"
@@ -74,10 +77,10 @@ def extract_latest_version(object_type: type, extracted_data: List) -> Document:
     if len(extracted_data) == 0:
         raise does_not_exist
     elif len(extracted_data) == 1:
-        return object_type(extracted_data[0])
+        return object_type(extracted_data[0], client=client)
     elif len(extracted_data) == 2:
         # In this case there is both the latest version and pwc
         # return the latest version
         for doc_data in extracted_data:
             if doc_data["properties"]["cmis:versionLabel"]["value"] == "pwc":
-                return object_type(doc_data)
+                return object_type(doc_data, client=client)
@@ -0,0 +1,543 @@
+import logging
+import uuid
+from io import BytesIO
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from drc_cmis.async_client import AsyncCMISClient
+from drc_cmis.client import is_not_supported
+from drc_cmis.utils.exceptions import (
+    CmisBaseException,
+    CmisObjectNotFoundException,
+    CmisRepositoryDoesNotExist,
+    CmisRuntimeException,
+    CmisUpdateConflictException,
+    DocumentNotLockedException,
+    FolderDoesNotExistError,
+)
+from drc_cmis.utils.query import QueryPage
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import (
+    CHECKOUT_FALLBACK_ERRORS,
+    CMISContentObject,
+    Document,
+    Folder,
+    Gebruiksrechten,
+    ObjectInformatieObject,
+    ZaakFolder,
+    ZaakTypeFolder,
+)
+from drc_cmis.webservice.utils import (
+    extract_object_properties_from_xml,
+    extract_repository_ids_from_xml,
+    extract_xml_from_soap,
+)
+
+from .async_request import AsyncSOAPRequest
+from .envelope import render_soap_envelope
+from .fetcher import repo_info_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSOAPCMISClient(AsyncCMISClient):
+    """Async CMIS client for Web service binding (CMIS 1.0), see :class:`SOAPCMISClient`"""
+
+    document_type = Document
+    gebruiksrechten_type = Gebruiksrechten
+    oio_type = ObjectInformatieObject
+    folder_type = Folder
+    zaakfolder_type = ZaakFolder
+    zaaktypefolder_type = ZaakTypeFolder
+
+    # Builds the SOAP envelopes, see SOAPCMISClient.envelope_builder
+    envelope_builder = staticmethod(render_soap_envelope)
+
+    # Whether documents are copied by the DMS, see copy_document
+    server_side_copy = True
+
+    build_query_statement = SOAPCMISClient.build_query_statement
+    get_query_page = staticmethod(SOAPCMISClient.get_query_page)
+    get_query_results = SOAPCMISClient.get_query_results
+    get_source_properties = staticmethod(SOAPCMISClient.get_source_properties)
+    get_gebruiksrechten_copy_properties = (
+        SOAPCMISClient.get_gebruiksrechten_copy_properties
+    )
+    get_document_copy_properties = staticmethod(
+        SOAPCMISClient.get_document_copy_properties
+    )
+    get_content_object_properties = SOAPCMISClient.get_content_object_properties
+    get_new_document_properties = SOAPCMISClient.get_new_document_properties
+    get_content_copy_properties = SOAPCMISClient.get_content_copy_properties
+    get_folder_properties = staticmethod(SOAPCMISClient.get_folder_properties)
+    get_lock_properties = staticmethod(SOAPCMISClient.get_lock_properties)
+    build_envelope = SOAPCMISClient.build_envelope
+
+    def __init__(self, http_client=None):
+        super().__init__(http_client)
+        self._request = None
+        self._main_repo_id = None
+
+    def reset(self) -> None:
+        super().reset()
+        self._request = AsyncSOAPRequest(self.base_url, self.http_client)
+        self._main_repo_id = None
+
+    async def request(
+        self,
+        path: str,
+        soap_envelope: str,
+        attachments: Optional[List[Tuple[str, BinaryIO]]] = None,
+        keep_binary: bool = False,
+    ) -> Union[str, bytes]:
+        """Make request with MTOM attachment, see :meth:`SOAPCMISClient.request`"""
+        return await self._request.request(
+            path, soap_envelope, attachments=attachments, keep_binary=keep_binary
+        )
+
+    async def request_content(self, path: str, soap_envelope: str) -> BinaryIO:
+        """Make request and return the content of the MTOM attachment in the response"""
+        return await self._request.request_content(path, soap_envelope)
+
+    async def request_object(self, path: str, soap_envelope: str, action: str) -> dict:
+        """Make the request and return the (first) object in the response"""
+        soap_response = await self.request(path, soap_envelope=soap_envelope)
+        xml_response = extract_xml_from_soap(soap_response)
+        return extract_object_properties_from_xml(xml_response, action)[0]
+
+    @property
+    def main_repo_id(self) -> str:
+        """The ID of the CMS main repository, retrieved by :meth:`prepare`"""
+        if self._main_repo_id is None:
+            raise RuntimeError("The repository ID is not loaded, await prepare()")
+        return self._main_repo_id
+
+    @property
+    def repository_id(self) -> str:
+        return self.main_repo_id
+
+    async def fetch_main_repo_id(self) -> str:
+        configured_main_repo_id = self.config.main_repo_id
+        if configured_main_repo_id:
+            return configured_main_repo_id
+
+        # Retrieving the IDs of all repositories in the CMS
+        soap_envelope = self.envelope_builder(
+            auth=(self.user, self.password), cmis_action="getRepositories"
+        )
+        soap_response = await self.request(
+            "RepositoryService", soap_envelope=soap_envelope.toxml()
+        )
+        xml_response = extract_xml_from_soap(soap_response)
+        all_repositories_ids = extract_repository_ids_from_xml(xml_response)
+
+        # If no main repository ID is configured, take the ID of the first repository returned.
+        if configured_main_repo_id == "":
+            return all_repositories_ids[0]
+        if configured_main_repo_id not in all_repositories_ids:
+            raise CmisRepositoryDoesNotExist(
+                "The configured repository ID does not exist."
+            )
+        return configured_main_repo_id
+
+    async def fetch_repository_info(self) -> dict:
+        """Fetch the repository info and cache it"""
+        if self._main_repo_id is None:
+            self._main_repo_id = await self.fetch_main_repo_id()
+        logger.debug("Fetching information for repository %s", self._main_repo_id)
+        return await repo_info_fetcher.afetch(
+            self._request,
+            self._main_repo_id,
+            self.user,
+            self.password,
+            envelope_builder=self.envelope_builder,
+        )
+
+    @property
+    def root_folder_id(self) -> str:
+        """Get the ID of the folder where all folders/documents will be created"""
+        return self.repository_info["root_folder_id"]
+
+    async def fetch_query_page(
+        self,
+        statement: str,
+        max_items: Optional[int],
+        skip_count: int,
+        decode: bool = True,
+    ) -> QueryPage:
+        soap_envelope = self.build_envelope(
+            statement=statement,
+            cmis_action="query",
+            max_items=None if max_items is None else str(max_items),
+            skip_count=None if max_items is None else str(skip_count),
+        )
+
+        try:
+            soap_response = await self.request(
+                "DiscoveryService", soap_envelope=soap_envelope
+            )
+        # Corsa raises an error if the query retrieves 0 results
+        except CmisRuntimeException as exc:
+            if "objectNotFound" in exc.message:
+                return QueryPage(
+                    objects=[] if decode else None,
+                    has_more_items=False,
+                    num_items=0,
+                    object_count=0,
+                )
+            raise exc
+
+        return self.get_query_page(soap_response, decode)
+
+    async def get_object(
+        self, object_id: str, object_type: type = Document
+    ) -> CMISContentObject:
+        """Retrieve the object with the given objectId
+
+        :param object_id: string, objectId of the object
+        :param object_type: type, type of the object to return
+        """
+        await self.prepare()
+        soap_envelope = self.build_envelope(
+            object_id=object_id, cmis_action="getObject"
+        )
+        extracted_data = await self.request_object(
+            "ObjectService", soap_envelope, "getObject"
+        )
+        return object_type(extracted_data, client=self)
+
+    async def create_folder(
+        self, name: str, parent_id: str, data: dict = None
+    ) -> Folder:
+        """Create a new folder inside a parent, see :meth:`SOAPCMISClient.create_folder`"""
+        await self.prepare()
+        soap_envelope = self.build_envelope(
+            folder_id=parent_id,
+            properties=self.get_folder_properties(name, data),
+            cmis_action="createFolder",
+        )
+        extracted_data = await self.request_object(
+            "ObjectService", soap_envelope, "createFolder"
+        )
+
+        # Creating a folder only returns the objectId
+        return await self.get_folder(extracted_data["properties"]["objectId"]["value"])
+
+    async def get_folder(self, object_id: str) -> Folder:
+        """Retrieve folder with given objectId"""
+        try:
+            return await self.get_object(object_id, Folder)
+        except CmisRuntimeException as exc:
+            if "objectNotFound" in exc.message:
+                error_string = f"Folder met objectId '{object_id}' bestaat niet in het CMIS connection"
+                raise FolderDoesNotExistError(error_string)
+            raise exc
+
+    async def get_folder_by_path(self, path: str) -> Optional[Folder]:
+        """Retrieve the folder with the given path, if it exists
+
+        :param path: string, the path from the root folder, e.g. /DRC/2026
+        :return: Folder or None
+        """
+        await self.prepare()
+        soap_envelope = self.build_envelope(path=path, cmis_action="getObjectByPath")
+        try:
+            extracted_data = await self.request_object(
+                "ObjectService", soap_envelope, "getObjectByPath"
+            )
+        except CmisObjectNotFoundException:
+            return None
+        except CmisRuntimeException as exc:
+            if "objectNotFound" in exc.message:
+                return None
+            raise exc
+
+        folder = Folder(extracted_data, client=self)
+        # a document can have the same path
+        if getattr(folder, "baseTypeId", "cmis:folder") != "cmis:folder":
+            return None
+        return folder
+
+    async def get_child_folder(
+        self, parent: Folder, name: str, child_type: dict = None
+    ) -> Optional[Folder]:
+        """Get the folder in the parent folder that has a specific name
+
+        See :meth:`drc_cmis.webservice.drc_document.Folder.get_child_folder`.
+        """
+        await self.prepare()
+        statement = parent.build_child_folder_statement(name, child_type)
+        page = await self.fetch_query_page(statement, None, 0)
+        if not page.objects:
+            return None
+        return type(parent)(page.objects[0], client=self)
+
+    async def get_parent_folders(self, cmis_object: CMISContentObject) -> List[Folder]:
+        """Get all the parent folders of an object"""
+        await self.prepare()
+        soap_envelope = self.build_envelope(
+            object_id=cmis_object.objectId, cmis_action="getObjectParents"
+        )
+        soap_response = await self.request(
+            "NavigationService", soap_envelope=soap_envelope
+        )
+        xml_response = extract_xml_from_soap(soap_response)
+        extracted_data = extract_object_properties_from_xml(
+            xml_response, "getObjectParents"
+        )
+        return [Folder(data, client=self) for data in extracted_data]
+
+    async def move_object(
+        self, cmis_object: CMISContentObject, target_folder: Folder
+    ) -> CMISContentObject:
+        """Move an object from its (first) parent folder to the target folder"""
+        source_folder = (await self.get_parent_folders(cmis_object))[0]
+
+        soap_envelope = cmis_object.build_move_envelope(source_folder, target_folder)
+        extracted_data = await self.request_object(
+            "ObjectService", soap_envelope, "moveObject"
+        )
+        return type(cmis_object)(extracted_data, client=self)
+
+    async def update_properties(
+        self, cmis_object: CMISContentObject, properties: dict
+    ) -> CMISContentObject:
+        """Update the properties of an object and return the updated object"""
+        await self.prepare()
+        soap_envelope = cmis_object.build_update_envelope(properties)
+        extracted_data = await self.request_object(
+            "ObjectService", soap_envelope, "updateProperties"
+        )
+        return await self.get_object(
+            extracted_data["properties"]["objectId"]["value"], type(cmis_object)
+        )
+
+    async def create_object(
+        self,
+        folder: Folder,
+        properties: dict,
+        content: Optional[BinaryIO] = None,
+        content_filename: Optional[str] = None,
+    ) -> str:
+        """Create a document (or content object) and return its objectId"""
+        attachments = kwargs = None
+        if content is not None:
+            content_id = str(uuid.uuid4())
+            attachments = [(content_id, content)]
+            kwargs = {"content_id": content_id, "content_filename": content_filename}
+
+        soap_envelope = self.build_envelope(
+            folder_id=folder.objectId,
+            properties=properties,
+            cmis_action="createDocument",
+            **(kwargs or {}),
+        )
+        soap_response = await self.request(
+            "ObjectService", soap_envelope=soap_envelope, attachments=attachments
+        )
+
+        # Creating the document only returns its ID
+        xml_response = extract_xml_from_soap(soap_response)
+        extracted_data = extract_object_properties_from_xml(
+            xml_response, "createDocument"
+        )[0]
+        return extracted_data["properties"]["objectId"]["value"]
+
+    async def copy_gebruiksrechten(
+        self, source_object: Gebruiksrechten, destination_folder: Folder
+    ) -> Gebruiksrechten:
+        """Copy a gebruiksrechten to a folder
+
+        :param source_object: Gebruiksrechten, the gebruiksrechten to copy
+        :param destination_folder: Folder, the folder in which to place the copied gebruiksrechten
+        :return: the copied object
+        """
+        await self.prepare()
+        cmis_properties = self.get_gebruiksrechten_copy_properties(source_object)
+        object_id = await self.create_object(destination_folder, cmis_properties)
+        return await self.get_object(object_id, Gebruiksrechten)
+
+    async def copy_document(
+        self, document: Document, destination_folder: Folder
+    ) -> Document:
+        """Copy document to a folder
+
+        See :meth:`drc_cmis.webservice.client.SOAPCMISClient.copy_document`.
+
+        :param document: Document, the document to copy
+        :param destination_folder: Folder, the folder in which to place the copied document
+        :return: the copied document
+        """
+        await self.prepare()
+        copy_properties = self.get_document_copy_properties(document)
+
+        if self.server_side_copy:
+            soap_envelope = self.build_envelope(
+                source_id=document.objectId,
+                folder_id=destination_folder.objectId,
+                properties=copy_properties,
+                cmis_action="createDocumentFromSource",
+            )
+            try:
+                extracted_data = await self.request_object(
+                    "ObjectService", soap_envelope, "createDocumentFromSource"
+                )
+            except CmisBaseException as exc:
+                if not is_not_supported(exc):
+                    raise
+                logger.info(
+                    "CMIS_ADAPTER: copy_document: createDocumentFromSource is not "
+                    "supported, copying the content instead"
+                )
+                self.server_side_copy = False
+            else:
+                return await self.get_object(
+                    extracted_data["properties"]["objectId"]["value"], type(document)
+                )
+
+        cmis_properties, filename = self.get_content_copy_properties(
+            document, copy_properties
+        )
+        with await self.get_content_stream(document) as content:
+            object_id = await self.create_object(
+                destination_folder,
+                cmis_properties,
+                content=content,
+                content_filename=filename,
+            )
+        return await self.get_object(object_id, type(document))
+
+    async def create_content_object(
+        self, data: dict, object_type: str, destination_folder: Folder = None
+    ) -> CMISContentObject:
+        """Create a Gebruiksrechten or a ObjectInformatieObject
+
+        :param data: dict, properties of the object to create
+        :param object_type: string, either "gebruiksrechten" or "oio"
+        :param destination_folder: Folder, the folder in which to place the object
+        :return: Either a Gebruiksrechten or ObjectInformatieObject
+        """
+        assert object_type in [
+            "gebruiksrechten",
+            "oio",
+        ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
+
+        await self.prepare()
+        if destination_folder is None:
+            destination_folder = await self.get_related_data_folder()
+
+        properties = self.get_content_object_properties(data, object_type)
+        object_id = await self.create_object(destination_folder, properties)
+        return await self.get_object(object_id, self.get_return_type(object_type))
+
+    async def create_document(
+        self,
+        identification: str,
+        bronorganisatie: str,
+        data: dict,
+        content: BytesIO = None,
+        check_if_already_exists: bool = True,
+        folder: Optional[Folder] = None,
+    ) -> Document:
+        """Create a custom Document (with the EnkelvoudigInformatieObject properties)
+
+        See :meth:`drc_cmis.webservice.client.SOAPCMISClient.create_document` for
+        the parameters.
+        """
+        await self.prepare()
+        if check_if_already_exists and identification and bronorganisatie:
+            await self.check_document_exists(identification, bronorganisatie)
+
+        properties = self.get_new_document_properties(
+            identification, bronorganisatie, data
+        )
+        if content is None:
+            content = BytesIO()
+
+        async def create_in_other_folder() -> str:
+            # Create Document in default folder
+            other_folder = folder or await self.get_or_create_other_folder()
+            return await self.create_object(
+                other_folder,
+                properties,
+                content=content,
+                content_filename=data.get("bestandsnaam"),
+            )
+
+        object_id = await self.retry_with_fresh_folders(create_in_other_folder)
+        return await self.get_object(object_id, Document)
+
+    async def get_content_stream(self, document: Document) -> BinaryIO:
+        """Retrieve the content of the document, spooled to a (temporary) file"""
+        await self.prepare()
+        soap_envelope = self.build_envelope(
+            object_id=document.objectId, cmis_action="getContentStream"
+        )
+        return await self.request_content("ObjectService", soap_envelope)
+
+    async def checkout(self, document: Document) -> Document:
+        """Check out the document and return the private working copy"""
+        await self.prepare()
+        try:
+            extracted_data = await self.request_object(
+                "VersioningService", document.build_checkout_envelope(), "checkOut"
+            )
+            pwc_id = extracted_data["properties"]["objectId"]["value"]
+        except CHECKOUT_FALLBACK_ERRORS:
+            pwc_document = await self.get_document(document.uuid)
+            pwc_id = pwc_document.objectId
+
+        return await self.get_object(pwc_id, type(document))
+
+    async def checkin(
+        self, document: Document, checkin_comment: str, major: bool = True
+    ) -> Document:
+        """Check in the private working copy and return the new version"""
+        await self.prepare()
+        soap_envelope = document.build_checkin_envelope(checkin_comment, major)
+        extracted_data = await self.request_object(
+            "VersioningService", soap_envelope, "checkIn"
+        )
+        return await self.get_object(
+            extracted_data["properties"]["objectId"]["value"], type(document)
+        )
+
+    async def lock_document(self, drc_uuid: str, lock: str) -> None:
+        """Lock a EnkelvoudigInformatieObject with given drc:document__uuid
+
+        :param drc_uuid: string, the value of drc:document__uuid
+        :param lock: string, value of the lock
+        """
+        cmis_doc = await self.get_document(drc_uuid)
+
+        already_locked = self.get_already_locked_error()
+
+        try:
+            pwc = await self.checkout(cmis_doc)
+            if pwc.lock:
+                raise already_locked
+
+            # store the lock value on the PWC so we can compare it later
+            await self.update_properties(pwc, self.get_lock_properties(lock))
+        except CmisUpdateConflictException as exc:
+            raise already_locked from exc
+
+    async def unlock_document(
+        self, drc_uuid: str, lock: str, force: bool = False
+    ) -> Document:
+        """Unlock a document with given uuid
+
+        :param drc_uuid: string, the value of drc:document__uuid
+        :param lock: string, value of the lock
+        :param force: bool, whether to force the unlocking
+        :return: Document, the unlocked document
+        """
+        cmis_doc = await self.get_document(drc_uuid)
+
+        if not cmis_doc.isVersionSeriesCheckedOut:
+            raise DocumentNotLockedException(
+                "Document is not checked out and/or locked."
+            )
+
+        self.check_unlock(cmis_doc.lock, lock, force)
+        await self.update_properties(cmis_doc, self.get_lock_properties(""))
+        return await self.checkin(cmis_doc, "Updated via Documenten API")
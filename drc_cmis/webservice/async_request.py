@@ -0,0 +1,147 @@
+import logging
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from drc_cmis.instrumentation import (
+    WEBSERVICE,
+    get_soap_action,
+    round_trip,
+    trace_response,
+)
+from drc_cmis.utils.exceptions import CmisBaseException, CmisNoValidResponse
+from drc_cmis.utils.streams import aiter_chunks, aspool_chunks, in_thread, iter_file
+from drc_cmis.wire import log_request, log_response
+
+from .mtom import (
+    CHUNK_SIZE,
+    InvalidMultipartMessage,
+    MTOMBody,
+    get_boundary,
+    read_attachment,
+)
+from .request import STATUS_EXCEPTIONS, SOAPRequest
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSOAPRequest:
+    """
+    Like :class:`drc_cmis.webservice.request.SOAPRequest`, with an ``httpx.AsyncClient``.
+
+    :param base_url: string, the base URL of the SOAP services
+    :param http_client: the ``httpx.AsyncClient`` to make the requests with
+    """
+
+    _boundary = SOAPRequest._boundary
+    _headers = SOAPRequest._headers
+    _envelope_headers = SOAPRequest._envelope_headers
+
+    def __init__(self, base_url, http_client):
+        self.base_url = base_url
+        self.http_client = http_client
+
+    async def request(
+        self,
+        path: str,
+        soap_envelope: str,
+        attachments: Optional[List[Tuple[str, BinaryIO]]] = None,
+        keep_binary: bool = False,
+    ) -> Union[str, bytes]:
+        """Make request with MTOM attachment.
+
+        See :meth:`drc_cmis.webservice.request.SOAPRequest.request` for the
+        parameters.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        log_request(url, soap_envelope)
+
+        with round_trip(
+            WEBSERVICE, lambda: get_soap_action(soap_envelope), url
+        ) as trip:
+            soap_response = await self._post(url, soap_envelope, attachments)
+            trip.record_response(soap_response)
+        log_response(url, soap_response.status_code, soap_response.content)
+        raise_for_status(soap_response, url)
+
+        if keep_binary:
+            return trace_response(soap_response.content, trip)
+        return trace_response(soap_response.content.decode("utf-8"), trip)
+
+    async def request_content(self, path: str, soap_envelope: str) -> BinaryIO:
+        """Make request and return the content of the MTOM attachment in the response.
+
+        The response is spooled to a (temporary) file while it is received, and
+        then parsed with :func:`drc_cmis.webservice.mtom.read_attachment` in a
+        worker thread.
+
+        :param path: string, path where to post the request
+        :param soap_envelope: string, XML of the request
+        :return: file-like object with the content of the attachment
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        log_request(url, soap_envelope)
+
+        with round_trip(
+            WEBSERVICE, lambda: get_soap_action(soap_envelope), url
+        ) as trip:
+            soap_response = await self._post(url, soap_envelope, stream=True)
+            trip.record_response(soap_response, stream=True)
+        try:
+            if soap_response.is_error:
+                await soap_response.aread()
+                log_response(url, soap_response.status_code, soap_response.content)
+                raise_for_status(soap_response, url)
+
+            body = await aspool_chunks(soap_response.aiter_bytes(CHUNK_SIZE))
+        finally:
+            await soap_response.aclose()
+
+        with body:
+            try:
+                envelope, content = await in_thread(read_attachment)(
+                    iter_file(body),
+                    get_boundary(soap_response.headers.get("Content-Type", "")),
+                )
+            except InvalidMultipartMessage as exc:
+                raise CmisNoValidResponse(
+                    status=soap_response.status_code,
+                    url=url,
+                    message=str(exc),
+                    code=soap_response.status_code,
+                )
+
+        log_response(url, soap_response.status_code, envelope)
+        return content
+
+    async def _post(
+        self,
+        url: str,
+        soap_envelope: str,
+        attachments: Optional[List[Tuple[str, BinaryIO]]] = None,
+        stream: bool = False,
+    ):
+        body = MTOMBody(
+            self._boundary, self._envelope_headers, soap_envelope, attachments
+        )
+        headers = dict(self._headers)
+        if hasattr(body, "len"):
+            headers["Content-Length"] = str(body.len)
+        request = self.http_client.build_request(
+            "POST", url, content=aiter_chunks(body), headers=headers
+        )
+        return await self.http_client.send(request, stream=stream)
+
+
+def raise_for_status(soap_response, url: str) -> None:
+    """Raise the CMIS exception for the status of an unsuccessful ``httpx`` response"""
+    if not soap_response.is_error:
+        return
+
+    exception_class = STATUS_EXCEPTIONS.get(
+        soap_response.status_code, CmisBaseException
+    )
+    raise exception_class(
+        status=soap_response.status_code,
+        url=url,
+        message=soap_response.text,
+        code=soap_response.status_code,
+    )
@@ -1,31 +1,34 @@
 import logging
-import re
 import uuid
 from io import BytesIO
 from typing import BinaryIO, List, Optional, Tuple, Union
 from uuid import UUID
 
 from django.conf import settings
-from django.utils.crypto import constant_time_compare
 
 from cmislib.domain import CmisId
 
-from drc_cmis.client import CMISClient
+from drc_cmis.client import CMISClient, is_not_supported
 from drc_cmis.utils.exceptions import (
+    CmisBaseException,
+    CmisObjectNotFoundException,
     CmisRepositoryDoesNotExist,
     CmisRuntimeException,
     CmisUpdateConflictException,
     DocumentDoesNotExistError,
-    DocumentExistsError,
-    DocumentLockedException,
     DocumentNotLockedException,
     FolderDoesNotExistError,
-    LockDidNotMatchException,
 )
 from drc_cmis.utils.mapper import mapper, reverse_mapper
-from drc_cmis.utils.query import CMISQuery
+from drc_cmis.utils.query import (
+    CMISQuery,
+    QueryPage,
+    QueryPager,
+    format_select,
+    get_placeholder_columns,
+    set_projection,
+)
 from drc_cmis.utils.utils import (
-    build_query_filters,
     extract_latest_version,
     get_random_string,
 )
@@ -46,17 +49,18 @@ from drc_cmis.webservice.drc_document import (
     ObjectInformatieObject,
     ZaakFolder,
     ZaakTypeFolder,
+    expand_url_attributes,
 )
 from drc_cmis.webservice.request import SOAPRequest
 from drc_cmis.webservice.utils import (
     extract_object_properties_from_xml,
+    extract_query_page_from_xml,
     extract_repository_ids_from_xml,
     extract_xml_from_soap,
-    make_soap_envelope,
-    pretty_xml,
-    shrink_url,
+    shrink_urls,
 )
 
+from .envelope import render_soap_envelope
 from .fetcher import repo_info_fetcher
 
 logger = logging.getLogger(__name__)
@@ -72,10 +76,18 @@ class SOAPCMISClient(CMISClient):
     zaakfolder_type = ZaakFolder
     zaaktypefolder_type = ZaakTypeFolder
 
+    # Builds the SOAP envelopes, takes the arguments of
+    # :func:`drc_cmis.webservice.utils.make_soap_envelope`. Set it to that function
+    # to build the envelopes as a DOM instead.
+    envelope_builder = staticmethod(render_soap_envelope)
+
     _main_repo_id = None
     _repository_info = None
     _request = None
 
+    # Whether documents are copied by the DMS, see copy_document
+    server_side_copy = True
+
     def request(
         self,
         path: str,
@@ -99,6 +111,24 @@ class SOAPCMISClient(CMISClient):
             path, soap_envelope, attachments=attachments, keep_binary=keep_binary
         )
 
+    def request_content(self, path: str, soap_envelope: str) -> BinaryIO:
+        """Make request and return the content of the MTOM attachment in the response.
+
+        :param path: string, path where to post the request
+        :param soap_envelope: string, XML of the request
+        :return: file-like object with the content of the attachment
+        """
+        if not self._request:
+            self._request = SOAPRequest(self.base_url)
+        return self._request.request_content(path, soap_envelope)
+
+    def build_envelope(self, **kwargs) -> str:
+        """Return the XML of the SOAP envelope for the main repository"""
+        soap_envelope = self.envelope_builder(
+            auth=(self.user, self.password), repository_id=self.main_repo_id, **kwargs
+        )
+        return soap_envelope.toxml()
+
     @property
     def user(self):
         return self.config.client_user
@@ -121,6 +151,10 @@ class SOAPCMISClient(CMISClient):
         """Get ID of the CMS main repository"""
         return self.get_main_repo_id()
 
+    @property
+    def repository_id(self) -> str:
+        return self.main_repo_id
+
     def get_main_repo_id(self, cache: bool = True) -> str:
         configured_main_repo_id = self.config.main_repo_id
         if configured_main_repo_id and cache:
@@ -128,18 +162,15 @@ class SOAPCMISClient(CMISClient):
 
         if self._main_repo_id is None:
             # Retrieving the IDs of all repositories in the CMS
-            soap_envelope = make_soap_envelope(
+            soap_envelope = self.envelope_builder(
                 auth=(self.user, self.password), cmis_action="getRepositories"
             )
 
-            logger.debug(soap_envelope.toprettyxml())
-
             soap_response = self.request(
                 "RepositoryService", soap_envelope=soap_envelope.toxml()
             )
 
             xml_response = extract_xml_from_soap(soap_response)
-            logger.debug(pretty_xml(xml_response))
 
             all_repositories_ids = extract_repository_ids_from_xml(xml_response)
 
@@ -166,9 +197,18 @@ class SOAPCMISClient(CMISClient):
         """Fetch the repository info and cache it"""
         logger.debug("Fetching information for repository %s", self.main_repo_id)
         return repo_info_fetcher.fetch(
-            self.main_repo_id, self.base_url, self.user, self.password
+            self.main_repo_id,
+            self.base_url,
+            self.user,
+            self.password,
+            envelope_builder=self.envelope_builder,
         )
 
+    def invalidate_repository_info(self) -> None:
+        """Make sure the repository info is retrieved again from the DMS"""
+        repo_info_fetcher.invalidate(self.main_repo_id, self.base_url, self.user)
+        self._repository_info = None
+
     @property
     def root_folder_id(self) -> str:
         """Get the ID of the folder where all folders/documents will be created"""
@@ -179,73 +219,140 @@ class SOAPCMISClient(CMISClient):
         return self.repository_info["vendorName"]
 
     def query(
-        self, return_type_name: str, lhs: List[str] = None, rhs: List[str] = None
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
     ) -> List[CMISBaseObject]:
         """Perform an SQL query in the DMS
 
         :param return_type_name: string, either Folder, Document, Oio or Gebruiksrechten
         :param lhs: list of strings, with the LHS of the SQL query
         :param rhs: list of strings, with the RHS of the SQL query
+        :param select: list of strings, the CMIS names of the properties to retrieve.
+            Defaults to all properties.
         :return: type, either Folder, Document, Oio or Gebruiksrechten
         """
+        pager = self.get_query_pager(return_type_name, lhs, rhs, select=select)
+        return pager.get_results(pager.fetch_page(None, 0).objects)
+
+    def get_query_pager(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
+    ) -> QueryPager:
+        """Prepare an SQL query in the DMS, of which the results can be paged
+
+        See :meth:`query` for the parameters.
+        """
+        return_type = self.get_return_type(return_type_name)
+        statement = self.build_query_statement(return_type_name, lhs, rhs, select)
 
+        # the pages may be fetched in another thread, which shouldn't load the config
+        if not self._request:
+            self._request = SOAPRequest(self.base_url)
+        auth, repository_id = (self.user, self.password), self.main_repo_id
+
+        def fetch_page(
+            max_items: Optional[int], skip_count: int, decode: bool = True
+        ) -> QueryPage:
+            soap_envelope = self.envelope_builder(
+                auth=auth,
+                repository_id=repository_id,
+                statement=statement,
+                cmis_action="query",
+                max_items=None if max_items is None else str(max_items),
+                skip_count=None if max_items is None else str(skip_count),
+            )
+
+            try:
+                soap_response = self.request(
+                    "DiscoveryService", soap_envelope=soap_envelope.toxml()
+                )
+            # Corsa raises an error if the query retrieves 0 results
+            except CmisRuntimeException as exc:
+                if "objectNotFound" in exc.message:
+                    return QueryPage(
+                        objects=[] if decode else None,
+                        has_more_items=False,
+                        num_items=0,
+                        object_count=0,
+                    )
+                else:
+                    raise exc
+
+            return self.get_query_page(soap_response, decode)
+
+        def get_results(objects: List[dict]) -> List[CMISBaseObject]:
+            return self.get_query_results(return_type, objects, select)
+
+        return QueryPager(fetch_page, get_results)
+
+    def build_query_statement(
+        self,
+        return_type_name: str,
+        lhs: List[str] = None,
+        rhs: List[str] = None,
+        select: Optional[List[str]] = None,
+    ) -> str:
+        """Return the SQL statement of a query, see :meth:`query`"""
         return_type = self.get_return_type(return_type_name)
 
         processed_rhs = rhs
         # Any query that filters based on URL fields needs to be converted to use the short URL version
         if settings.CMIS_URL_MAPPING_ENABLED and lhs is not None and rhs is not None:
-            processed_rhs = []
-
-            # Join all the queries and find which fields are used to filter
-            joined_lhs = " ".join(lhs)
-            column_names = re.findall(r"([a-z]+?:.+?__[a-z]+)", joined_lhs)
+            processed_rhs = list(rhs)
 
-            for index, item_rhs in enumerate(rhs):
-                column_name = column_names[index]
+            url_indices = []
+            columns = get_placeholder_columns(lhs)
+            for index, (column_name, item_rhs) in enumerate(zip(columns, rhs)):
+                if column_name is None or item_rhs == "":
+                    continue
                 property_name = reverse_mapper(
                     column_name, type=return_type_name.lower()
                 )
                 if (
                     property_name is not None
                     and get_type(return_type.type_class, property_name) == QueriableUrl
-                    and item_rhs != ""
                 ):
-                    processed_rhs.append(shrink_url(item_rhs))
-                else:
-                    processed_rhs.append(item_rhs)
+                    url_indices.append(index)
+
+            short_urls = shrink_urls(
+                (processed_rhs[index] for index in url_indices), self.config_snapshot
+            )
+            for index, short_url in zip(url_indices, short_urls):
+                processed_rhs[index] = short_url
 
         table = return_type.table
         where = (" WHERE " + " AND ".join(lhs)) if lhs else ""
-        query = CMISQuery("SELECT * FROM %s%s" % (table, where))
-        statement = query(*processed_rhs) if processed_rhs else query()
-
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            statement=statement,
-            cmis_action="query",
-        )
-
-        logger.debug(soap_envelope.toprettyxml())
-
-        try:
-            soap_response = self.request(
-                "DiscoveryService", soap_envelope=soap_envelope.toxml()
-            )
-        # Corsa raises an error if the query retrieves 0 results
-        except CmisRuntimeException as exc:
-            if "objectNotFound" in exc.message:
-                return []
-            else:
-                raise exc
+        query = CMISQuery("SELECT %s FROM %s%s" % (format_select(select), table, where))
+        return query(*processed_rhs) if processed_rhs else query()
 
+    @staticmethod
+    def get_query_page(soap_response: str, decode: bool = True) -> QueryPage:
+        """Decode the page of results in the response to a query"""
         xml_response = extract_xml_from_soap(soap_response)
+        objects, has_more_items, num_items = extract_query_page_from_xml(
+            xml_response, decode
+        )
+        return QueryPage(
+            objects=objects if decode else None,
+            has_more_items=has_more_items,
+            num_items=num_items,
+            object_count=len(objects),
+        )
 
-        logger.debug(pretty_xml(xml_response))
-
-        extracted_data = extract_object_properties_from_xml(xml_response, "query")
-
-        return [return_type(cmis_object) for cmis_object in extracted_data]
+    def get_query_results(
+        self, return_type: type, objects: List[dict], select: Optional[List[str]]
+    ) -> List[CMISBaseObject]:
+        """Turn the objects in the response to a query into the return type"""
+        results = [return_type(cmis_object, client=self) for cmis_object in objects]
+        expand_url_attributes(results, self.config_snapshot)
+        set_projection(results, select)
+        return results
 
     def create_folder(self, name: str, parent_id: str, data: dict = None) -> Folder:
         """Create a new folder inside a parent
@@ -257,31 +364,14 @@ class SOAPCMISClient(CMISClient):
         :return: Folder, the created folder
         """
 
-        object_type_id = CmisId("cmis:folder")
-
-        properties = {
-            "cmis:objectTypeId": {"value": object_type_id, "type": "propertyId"},
-            "cmis:name": {"value": name, "type": "propertyString"},
-        }
-
-        if data is not None:
-            properties.update(data)
-
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
+        soap_envelope = self.build_envelope(
             folder_id=parent_id,
-            properties=properties,
+            properties=self.get_folder_properties(name, data),
             cmis_action="createFolder",
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
-        soap_response = self.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
-        )
+        soap_response = self.request("ObjectService", soap_envelope=soap_envelope)
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(
             xml_response, "createFolder"
@@ -292,18 +382,28 @@ class SOAPCMISClient(CMISClient):
 
         return self.get_folder(folder_id)
 
+    @staticmethod
+    def get_folder_properties(name: str, data: Optional[dict] = None) -> dict:
+        """Return the properties of a new folder, see :meth:`create_folder`"""
+        properties = {
+            "cmis:objectTypeId": {"value": CmisId("cmis:folder"), "type": "propertyId"},
+            "cmis:name": {"value": name, "type": "propertyString"},
+        }
+
+        if data is not None:
+            properties.update(data)
+        return properties
+
     def get_folder(self, object_id: str) -> Folder:
         """Retrieve folder with given objectId"""
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             object_id=object_id,
             cmis_action="getObject",
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
         try:
             soap_response = self.request(
                 "ObjectService", soap_envelope=soap_envelope.toxml()
@@ -316,93 +416,181 @@ class SOAPCMISClient(CMISClient):
                 raise exc
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
             0
         ]
-        return Folder(extracted_data)
+        return Folder(extracted_data, client=self)
 
-    def copy_document(self, document: Document, destination_folder: Folder) -> Document:
-        """Copy document to a folder
+    def get_folder_by_path(self, path: str) -> Optional[Folder]:
+        """Retrieve the folder with the given path, if it exists
 
-        :param document: Document, the document to copy
-        :param destination_folder: Folder, the folder in which to place the copied document
-        :return: the copied document
+        :param path: string, the path from the root folder, e.g. /DRC/2026
+        :return: Folder or None
         """
+        soap_envelope = self.envelope_builder(
+            auth=(self.user, self.password),
+            repository_id=self.main_repo_id,
+            path=path,
+            cmis_action="getObjectByPath",
+        )
 
-        # copy the properties from the source document
+        try:
+            soap_response = self.request(
+                "ObjectService", soap_envelope=soap_envelope.toxml()
+            )
+        except CmisObjectNotFoundException:
+            return None
+        except CmisRuntimeException as exc:
+            if "objectNotFound" in exc.message:
+                return None
+            raise exc
+
+        xml_response = extract_xml_from_soap(soap_response)
+        extracted_data = extract_object_properties_from_xml(
+            xml_response, "getObjectByPath"
+        )[0]
+        folder = Folder(extracted_data, client=self)
+        # a document can have the same path
+        if getattr(folder, "baseTypeId", "cmis:folder") != "cmis:folder":
+            return None
+        return folder
+
+    @staticmethod
+    def get_source_properties(
+        source_object: CMISContentObject, data_class: type, object_type: str
+    ) -> Tuple[dict, dict]:
+        """Return the properties of an object to copy
+
+        :return: tuple of the properties by their DRC name and the URL properties
+            (which are already in the 'short' form) by their CMIS name
+        """
         drc_properties = {}
         drc_url_properties = {}
-        for property_name, property_details in document.properties.items():
+        for property_name, property_details in source_object.properties.items():
             if (
                 "cmis:" not in property_name and property_details["value"] is not None
             ) or property_name == "cmis:objectTypeId":
-                drc_property_name = reverse_mapper(property_name, type="document")
+                drc_property_name = reverse_mapper(property_name, type=object_type)
 
                 # Urls are handled separately, because they are already in the 'short' form
-                if (
-                    get_type(EnkelvoudigInformatieObject, drc_property_name)
-                    == QueriableUrl
-                ):
+                if get_type(data_class, drc_property_name) == QueriableUrl:
                     drc_url_properties[property_name] = {
                         "value": property_details["value"],
                         "type": "propertyString",
                     }
                 else:
                     drc_properties[drc_property_name] = property_details["value"]
-
-        cmis_properties = Document.build_properties(drc_properties, new=False)
+        return drc_properties, drc_url_properties
+
+    def get_gebruiksrechten_copy_properties(
+        self, source_object: Gebruiksrechten
+    ) -> dict:
+        """Return the properties of a copy of the gebruiksrechten"""
+        drc_properties, drc_url_properties = self.get_source_properties(
+            source_object, GebruiksRechtDoc, "gebruiksrechten"
+        )
+        cmis_properties = Gebruiksrechten.build_properties(
+            drc_properties, snapshot=self.config_snapshot
+        )
 
         cmis_properties.update(
             **{
                 "cmis:objectTypeId": {
-                    "value": document.objectTypeId,
+                    "value": source_object.objectTypeId,
                     "type": "propertyId",
                 },
-                mapper("titel", type="document"): {
-                    "value": f"{document.titel} - copy",
-                    "type": "propertyString",
+                mapper("kopie_van", type="gebruiksrechten"): {
+                    "value": source_object.objectId,
+                    "type": "propertyString",  # Keep tack of where this is copied from.
                 },
-                "drc:kopie_van": {
-                    "value": document.uuid,
-                    "type": "propertyString",
-                },  # Keep tack of where this is copied from.
-                "drc:document__uuid": {
+                "cmis:name": {"value": get_random_string(), "type": "propertyString"},
+                "drc:gebruiksrechten__uuid": {
                     "value": str(uuid.uuid4()),
                     "type": "propertyString",
                 },
                 **drc_url_properties,
             }
         )
+        return cmis_properties
+
+    @staticmethod
+    def get_document_copy_properties(document: Document) -> dict:
+        """Return the properties of a copy that differ from the source document"""
+        return {
+            "cmis:objectTypeId": {
+                "value": document.objectTypeId,
+                "type": "propertyId",
+            },
+            mapper("titel", type="document"): {
+                "value": f"{document.titel} - copy",
+                "type": "propertyString",
+            },
+            "drc:kopie_van": {
+                "value": document.uuid,
+                "type": "propertyString",
+            },  # Keep tack of where this is copied from.
+            "drc:document__uuid": {
+                "value": str(uuid.uuid4()),
+                "type": "propertyString",
+            },
+            # Update the cmis:name to make it more unique
+            "cmis:name": {
+                "value": f"{document.titel}-{get_random_string()}",
+                "type": "propertyString",
+            },
+        }
+
+    def copy_document(self, document: Document, destination_folder: Folder) -> Document:
+        """Copy document to a folder
+
+        The document is copied by the DMS (``createDocumentFromSource``) if it
+        supports that. Otherwise the content is streamed from the source document
+        into a new document.
+
+        :param document: Document, the document to copy
+        :param destination_folder: Folder, the folder in which to place the copied document
+        :return: the copied document
+        """
+        copy_properties = self.get_document_copy_properties(document)
 
-        # Update the cmis:name to make it more unique
-        file_name = f"{document.titel}-{get_random_string()}"
-        cmis_properties["cmis:name"] = {"value": file_name, "type": "propertyString"}
+        if self.server_side_copy:
+            try:
+                return self._copy_document_from_source(
+                    document, destination_folder, copy_properties
+                )
+            except CmisBaseException as exc:
+                if not is_not_supported(exc):
+                    raise
+                logger.info(
+                    "CMIS_ADAPTER: copy_document: createDocumentFromSource is not "
+                    "supported, copying the content instead"
+                )
+                self.server_side_copy = False
+
+        cmis_properties, filename = self.get_content_copy_properties(
+            document, copy_properties
+        )
 
-        # Create copy document
+        # Create copy document, the content is spooled to a file and then streamed
         content_id = str(uuid.uuid4())
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
+        soap_envelope = self.build_envelope(
             folder_id=destination_folder.objectId,
             properties=cmis_properties,
             cmis_action="createDocument",
             content_id=content_id,
-            content_filename=drc_properties.get("bestandsnaam"),
+            content_filename=filename,
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
-        soap_response = self.request(
-            "ObjectService",
-            soap_envelope=soap_envelope.toxml(),
-            attachments=[(content_id, document.get_content_stream())],
-        )
+        with document.get_content_stream() as content:
+            soap_response = self.request(
+                "ObjectService",
+                soap_envelope=soap_envelope,
+                attachments=[(content_id, content)],
+            )
 
         # Creating the document only returns its ID
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(
             xml_response, "createDocument"
@@ -411,6 +599,50 @@ class SOAPCMISClient(CMISClient):
 
         return document.get_document(copy_document_id)
 
+    def get_content_copy_properties(
+        self, document: Document, copy_properties: dict
+    ) -> Tuple[dict, Optional[str]]:
+        """Return the properties of a copy of which the content is copied by the client
+
+        :param copy_properties: dict, the properties that differ from the source
+            document, see :meth:`get_document_copy_properties`
+        :return: tuple of the properties and the filename of the content
+        """
+        # copy the properties from the source document
+        drc_properties, drc_url_properties = self.get_source_properties(
+            document, EnkelvoudigInformatieObject, "document"
+        )
+        cmis_properties = Document.build_properties(
+            drc_properties, new=False, snapshot=self.config_snapshot
+        )
+        cmis_properties.update(**copy_properties, **drc_url_properties)
+        return cmis_properties, drc_properties.get("bestandsnaam")
+
+    def _copy_document_from_source(
+        self, document: Document, destination_folder: Folder, properties: dict
+    ) -> Document:
+        """Let the DMS copy the document, including its content
+
+        :param properties: dict, the properties that differ from the source document
+        """
+        soap_envelope = self.build_envelope(
+            source_id=document.objectId,
+            folder_id=destination_folder.objectId,
+            properties=properties,
+            cmis_action="createDocumentFromSource",
+        )
+        soap_response = self.request("ObjectService", soap_envelope=soap_envelope)
+
+        # Copying the document only returns its ID
+        xml_response = extract_xml_from_soap(soap_response)
+
+        extracted_data = extract_object_properties_from_xml(
+            xml_response, "createDocumentFromSource"
+        )[0]
+        copy_document_id = extracted_data["properties"]["objectId"]["value"]
+
+        return document.get_document(copy_document_id)
+
     def copy_gebruiksrechten(
         self, source_object: Gebruiksrechten, destination_folder: Folder
     ) -> Gebruiksrechten:
@@ -420,57 +652,16 @@ class SOAPCMISClient(CMISClient):
         :param destination_folder: Folder, the folder in which to place the copied gebruiksrechten
         :return: the copied object
         """
-
-        # copy the properties from the source document
-        drc_properties = {}
-        drc_url_properties = {}
-        for property_name, property_details in source_object.properties.items():
-            if (
-                "cmis:" not in property_name and property_details["value"] is not None
-            ) or property_name == "cmis:objectTypeId":
-                drc_property_name = reverse_mapper(
-                    property_name, type="gebruiksrechten"
-                )
-
-                # Urls are handled separately, because they are already in the 'short' form
-                if get_type(GebruiksRechtDoc, drc_property_name) == QueriableUrl:
-                    drc_url_properties[property_name] = {
-                        "value": property_details["value"],
-                        "type": "propertyString",
-                    }
-                else:
-                    drc_properties[drc_property_name] = property_details["value"]
-
-        cmis_properties = Gebruiksrechten.build_properties(drc_properties)
-
-        cmis_properties.update(
-            **{
-                "cmis:objectTypeId": {
-                    "value": source_object.objectTypeId,
-                    "type": "propertyId",
-                },
-                mapper("kopie_van", type="gebruiksrechten"): {
-                    "value": source_object.objectId,
-                    "type": "propertyString",  # Keep tack of where this is copied from.
-                },
-                "cmis:name": {"value": get_random_string(), "type": "propertyString"},
-                "drc:gebruiksrechten__uuid": {
-                    "value": str(uuid.uuid4()),
-                    "type": "propertyString",
-                },
-                **drc_url_properties,
-            }
-        )
+        cmis_properties = self.get_gebruiksrechten_copy_properties(source_object)
 
         # Create copy gebruiksrechten
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             folder_id=destination_folder.objectId,
             properties=cmis_properties,
             cmis_action="createDocument",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         soap_response = self.request(
             "ObjectService",
@@ -480,35 +671,30 @@ class SOAPCMISClient(CMISClient):
         # Creating the document only returns its ID
         xml_response = extract_xml_from_soap(soap_response)
 
-        logger.debug(pretty_xml(xml_response))
-
         extracted_data = extract_object_properties_from_xml(
             xml_response, "createDocument"
         )[0]
         copy_gebruiksrechten_id = extracted_data["properties"]["objectId"]["value"]
 
         # Request all the properties of the newly created object
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             object_id=copy_gebruiksrechten_id,
             cmis_action="getObject",
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
         soap_response = self.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
             0
         ]
 
-        return Gebruiksrechten(extracted_data)
+        return Gebruiksrechten(extracted_data, client=self)
 
     def create_content_object(
         self, data: dict, object_type: str, destination_folder: Folder = None
@@ -527,33 +713,20 @@ class SOAPCMISClient(CMISClient):
 
         if object_type == "oio":
             return_type = ObjectInformatieObject
-            data_class = Oio
         elif object_type == "gebruiksrechten":
             return_type = Gebruiksrechten
-            data_class = GebruiksRechtDoc
 
         if destination_folder is None:
-            other_folder = self.get_or_create_other_folder()
-            destination_folder = self.get_or_create_folder("Related data", other_folder)
 
-        properties = return_type.build_properties(data)
+            def get_related_data_folder() -> Folder:
+                other_folder = self.get_or_create_other_folder()
+                return self.get_or_create_folder("Related data", other_folder)
 
-        properties.setdefault(
-            "cmis:objectTypeId",
-            {
-                "value": f"{self.get_object_type_id_prefix(object_type)}drc:{object_type}",
-                "type": "propertyId",
-            },
-        )
-        properties.setdefault(
-            "cmis:name", {"value": get_random_string(), "type": "propertyString"}
-        )
-        properties.setdefault(
-            mapper("uuid", type=object_type),
-            {"value": str(uuid.uuid4()), "type": get_cmis_type(data_class, "uuid")},
-        )
+            destination_folder = self.retry_with_fresh_folders(get_related_data_folder)
 
-        soap_envelope = make_soap_envelope(
+        properties = self.get_content_object_properties(data, object_type)
+
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             folder_id=destination_folder.objectId,
@@ -561,15 +734,12 @@ class SOAPCMISClient(CMISClient):
             cmis_action="createDocument",
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
         soap_response = self.request(
             "ObjectService",
             soap_envelope=soap_envelope.toxml(),
         )
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(
             xml_response, "createDocument"
@@ -577,35 +747,67 @@ class SOAPCMISClient(CMISClient):
         new_object_id = extracted_data["properties"]["objectId"]["value"]
 
         # Request all the properties of the newly created object
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             object_id=new_object_id,
             cmis_action="getObject",
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
         soap_response = self.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
             0
         ]
 
-        return return_type(extracted_data)
+        return return_type(extracted_data, client=self)
+
+    def get_content_object_properties(self, data: dict, object_type: str) -> dict:
+        """Return the properties of a new Gebruiksrechten or ObjectInformatieObject
+
+        See :meth:`create_content_object` for the parameters.
+        """
+        if object_type == "oio":
+            return_type = ObjectInformatieObject
+            data_class = Oio
+        elif object_type == "gebruiksrechten":
+            return_type = Gebruiksrechten
+            data_class = GebruiksRechtDoc
+
+        properties = return_type.build_properties(data, snapshot=self.config_snapshot)
+
+        properties.setdefault(
+            "cmis:objectTypeId",
+            {
+                "value": f"{self.get_object_type_id_prefix(object_type)}drc:{object_type}",
+                "type": "propertyId",
+            },
+        )
+        properties.setdefault(
+            "cmis:name", {"value": get_random_string(), "type": "propertyString"}
+        )
+        properties.setdefault(
+            mapper("uuid", type=object_type),
+            {"value": str(uuid.uuid4()), "type": get_cmis_type(data_class, "uuid")},
+        )
+        return properties
 
     def get_content_object(
-        self, drc_uuid: Union[str, UUID], object_type: str
+        self,
+        drc_uuid: Union[str, UUID],
+        object_type: str,
+        select: Optional[List[str]] = None,
     ) -> CMISContentObject:
         """Get the gebruiksrechten/oio with specified uuid
 
         :param drc_uuid: string or UUID, the value of drc:oio__uuid or drc:gebruiksrechten__uuid
         :param object_type: string, either "gebruiksrechten" or "oio"
+        :param select: list of strings, the CMIS names of the properties to retrieve.
+            Defaults to all properties.
         :return: Either a Gebruiksrechten or ObjectInformatieObject
         """
 
@@ -614,17 +816,17 @@ class SOAPCMISClient(CMISClient):
             "oio",
         ], "'object_type' can be only 'gebruiksrechten' or 'oio'"
 
-        query = CMISQuery("SELECT * FROM drc:%s WHERE drc:%s__uuid = '%s'")
+        query = CMISQuery(
+            f"SELECT {format_select(select)} FROM drc:%s WHERE drc:%s__uuid = '%s'"
+        )
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             statement=query(object_type, object_type, str(drc_uuid)),
             cmis_action="query",
         )
 
-        logger.debug(soap_envelope.toprettyxml())
-
         error_string = (
             f"{object_type.capitalize()} {object_type} met identificatie drc:{object_type}__uuid {drc_uuid} "
             f"bestaat niet in het CMIS connection"
@@ -643,16 +845,18 @@ class SOAPCMISClient(CMISClient):
                 raise exc
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "query")
         if len(extracted_data) == 0:
             raise does_not_exist
 
         if object_type == "oio":
-            return ObjectInformatieObject(extracted_data[0])
+            content_object = ObjectInformatieObject(extracted_data[0], client=self)
         elif object_type == "gebruiksrechten":
-            return Gebruiksrechten(extracted_data[0])
+            content_object = Gebruiksrechten(extracted_data[0], client=self)
+
+        set_projection([content_object], select)
+        return content_object
 
     def create_document(
         self,
@@ -661,6 +865,7 @@ class SOAPCMISClient(CMISClient):
         data: dict,
         content: BytesIO = None,
         check_if_already_exists: bool = True,
+        folder: Optional[Folder] = None,
     ) -> Document:
         """Create a custom Document (with the EnkelvoudigInformatieObject properties)
 
@@ -670,49 +875,48 @@ class SOAPCMISClient(CMISClient):
         :param content: BytesIO, the content of the document
         :param check_if_already_exists: Bool, whether to check if the document with given identificatie/bronorganisatie
         already exists in the DMS.
+        :param folder: Folder, the folder to create the document in. Defaults to the
+            folder of the 'other' folder path. A folder passed in is not resolved
+            again if it no longer exists, that is up to the caller.
         :return: Document, the document created
         """
 
         if check_if_already_exists and identification and bronorganisatie:
             self.check_document_exists(identification, bronorganisatie)
 
-        data.setdefault("versie", "1")
-        data.setdefault(
-            "object_type_id",
-            f"{self.get_object_type_id_prefix('document')}drc:document",
+        properties = self.get_new_document_properties(
+            identification, bronorganisatie, data
         )
-        data["bronorganisatie"] = bronorganisatie
-        data["identificatie"] = identification
-
         content_id = str(uuid.uuid4())
         if content is None:
             content = BytesIO()
 
-        # Create Document in default folder
-        other_folder = self.get_or_create_other_folder()
-
-        properties = Document.build_properties(data, new=True)
-
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            folder_id=other_folder.objectId,
-            properties=properties,
-            cmis_action="createDocument",
-            content_id=content_id,
-            content_filename=data.get("bestandsnaam"),
-        )
+        def create_in_other_folder() -> str:
+            # Create Document in default folder
+            other_folder = folder or self.get_or_create_other_folder()
+
+            soap_envelope = self.envelope_builder(
+                auth=(self.user, self.password),
+                repository_id=self.main_repo_id,
+                folder_id=other_folder.objectId,
+                properties=properties,
+                cmis_action="createDocument",
+                content_id=content_id,
+                content_filename=data.get("bestandsnaam"),
+            )
 
-        logger.debug(soap_envelope.toprettyxml())
+            return self.request(
+                "ObjectService",
+                soap_envelope=soap_envelope.toxml(),
+                attachments=[(content_id, content)],
+            )
 
-        soap_response = self.request(
-            "ObjectService",
-            soap_envelope=soap_envelope.toxml(),
-            attachments=[(content_id, content)],
-        )
+        if folder is None:
+            soap_response = self.retry_with_fresh_folders(create_in_other_folder)
+        else:
+            soap_response = create_in_other_folder()
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         # Creating the document only returns its ID
         extracted_data = extract_object_properties_from_xml(
@@ -721,25 +925,46 @@ class SOAPCMISClient(CMISClient):
         new_document_id = extracted_data["properties"]["objectId"]["value"]
 
         # Request all the properties of the newly created document
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
             object_id=new_document_id,
             cmis_action="getObject",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         soap_response = self.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
             0
         ]
 
-        return Document(extracted_data)
+        return Document(extracted_data, client=self)
+
+    def get_new_document_properties(
+        self, identification: str, bronorganisatie: str, data: dict
+    ) -> dict:
+        """Complete the data of a new document and return its properties"""
+        data.setdefault("versie", "1")
+        data.setdefault(
+            "object_type_id",
+            f"{self.get_object_type_id_prefix('document')}drc:document",
+        )
+        data["bronorganisatie"] = bronorganisatie
+        data["identificatie"] = identification
+        return Document.build_properties(data, new=True, snapshot=self.config_snapshot)
+
+    @staticmethod
+    def get_lock_properties(lock: str) -> dict:
+        """Return the properties to store the lock value of a document"""
+        return {
+            mapper("lock"): {
+                "value": lock,
+                "type": get_cmis_type(EnkelvoudigInformatieObject, "lock"),
+            }
+        }
 
     def lock_document(self, drc_uuid: str, lock: str):
         """Lock a EnkelvoudigInformatieObject with given drc:document__uuid
@@ -749,9 +974,7 @@ class SOAPCMISClient(CMISClient):
         """
         cmis_doc = self.get_document(drc_uuid)
 
-        already_locked = DocumentLockedException(
-            "Document was already checked out", code="double_lock"
-        )
+        already_locked = self.get_already_locked_error()
 
         try:
             pwc = cmis_doc.checkout()
@@ -759,13 +982,7 @@ class SOAPCMISClient(CMISClient):
                 raise already_locked
 
             # store the lock value on the PWC so we can compare it later
-            lock_property = {
-                mapper("lock"): {
-                    "value": lock,
-                    "type": get_cmis_type(EnkelvoudigInformatieObject, "lock"),
-                }
-            }
-            pwc.update_properties(lock_property)
+            pwc.update_properties(self.get_lock_properties(lock))
         except CmisUpdateConflictException as exc:
             raise already_locked from exc
 
@@ -786,26 +1003,25 @@ class SOAPCMISClient(CMISClient):
                 "Document is not checked out and/or locked."
             )
 
-        if constant_time_compare(cmis_doc.lock, lock) or force:
-            lock_property = {
-                mapper("lock"): {
-                    "value": "",
-                    "type": get_cmis_type(EnkelvoudigInformatieObject, "lock"),
-                }
-            }
-            cmis_doc.update_properties(lock_property)
-            return cmis_doc.checkin("Updated via Documenten API")
-
-        raise LockDidNotMatchException("Lock did not match", code="unlock-failed")
+        self.check_unlock(cmis_doc.lock, lock, force)
+        cmis_doc.update_properties(self.get_lock_properties(""))
+        return cmis_doc.checkin("Updated via Documenten API")
 
     # FIXME filters are useless because uuid is unique
-    def get_document(self, drc_uuid: str, filters: Optional[dict] = None) -> Document:
+    def get_document(
+        self,
+        drc_uuid: str,
+        filters: Optional[dict] = None,
+        select: Optional[List[str]] = None,
+    ) -> Document:
         """Retrieve a document in the main repository with given uuid (drc:document__uuid)
 
         If the document series is checked out, it returns the private working copy
 
         :param drc_uuid: string, value of the cmis property drc:document__uuid
         :param filters: dict, filters to find the document
+        :param select: list of strings, the CMIS names of the properties to retrieve.
+            Defaults to all properties.
         :return: Document, latest document version
         """
         error_string = f"Document met drc:document__uuid {drc_uuid} bestaat niet in het CMIS connection"
@@ -814,23 +1030,18 @@ class SOAPCMISClient(CMISClient):
         if drc_uuid is None:
             raise does_not_exist
 
-        # This always selects the latest version, and if there is a pwc,
-        # Alfresco returns both the pwc and the latest major version, while Corsa only returns the pwc.
-        query = CMISQuery(
-            "SELECT * FROM drc:document WHERE drc:document__uuid = '%s' %s"
-        )
+        # the version label tells the pwc apart from the latest version
+        if select is not None:
+            select = [*select, "cmis:versionLabel"]
 
-        filter_string = build_query_filters(
-            filters, filter_string="AND ", strip_end=True
-        )
+        statement = self.build_document_query_statement(drc_uuid, filters, select)
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.envelope_builder(
             auth=(self.user, self.password),
             repository_id=self.main_repo_id,
-            statement=query(drc_uuid, filter_string),
+            statement=statement,
             cmis_action="query",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         try:
             soap_response = self.request(
@@ -843,51 +1054,10 @@ class SOAPCMISClient(CMISClient):
             else:
                 raise exc
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "query")
-        return extract_latest_version(self.document_type, extracted_data)
-
-    def check_document_exists(
-        self, identification: Union[str, UUID], bronorganisatie: str
-    ) -> None:
-        """Check if a document with the same (identificatie, bronorganisatie) already exists in the repository
-
-        :param identification: string, document ``identificatie``
-        :param bronorganisatie: string, document ``bronorganisatie``
-        """
-        cmis_identificatie = mapper("identificatie", type="document")
-        cmis_bronorganisatie = mapper("bronorganisatie", type="document")
-
-        query = CMISQuery(
-            f"SELECT * FROM drc:document WHERE {cmis_identificatie} = '%s' AND {cmis_bronorganisatie} = '%s'"
+        document = extract_latest_version(
+            self.document_type, extracted_data, client=self
         )
-
-        soap_envelope = make_soap_envelope(
-            auth=(self.user, self.password),
-            repository_id=self.main_repo_id,
-            statement=query(str(identification), bronorganisatie),
-            cmis_action="query",
-        )
-        logger.debug(soap_envelope.toprettyxml())
-
-        try:
-            soap_response = self.request(
-                "DiscoveryService", soap_envelope=soap_envelope.toxml()
-            )
-        except CmisRuntimeException as exc:
-            # Corsa raises an error if the query gives no results, while Alfresco a 200
-            if "objectNotFound" in exc.message:
-                return
-            else:
-                raise exc
-
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
-
-        extracted_data = extract_object_properties_from_xml(xml_response, "query")
-
-        if len(extracted_data) > 0:
-            raise DocumentExistsError(
-                "Een document met dezelfde identificatie en bronorganisatie al bestaat."
-            )
+        set_projection([document], select)
+        return document
@@ -0,0 +1,234 @@
+"""
+Streaming decoder for the objects in the SOAP responses of the web service binding.
+
+The response is fed to a pull parser in chunks and every object is decoded as soon
+as its element is complete, after which the element is removed from the tree. The
+memory use therefore doesn't grow with the number of objects in the response.
+
+If ``lxml`` is installed it is used to parse the XML, otherwise the parser from
+the standard library is used.
+"""
+
+from typing import Iterator, List, Optional, Union
+from xml.etree import ElementTree
+
+from cmislib.util import parsePropValue
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+CMIS_CORE_NAMESPACE = "http://docs.oasis-open.org/ns/cmis/core/200908/"
+
+PROPERTIES_TAG = f"{{{CMIS_CORE_NAMESPACE}}}properties"
+VALUE_TAG = f"{{{CMIS_CORE_NAMESPACE}}}value"
+
+CHUNK_SIZE = 64 * 1024
+
+# the elements following the objects in a list of objects, like the query results
+PAGING_ELEMENTS = ("hasMoreItems", "numItems")
+
+
+def local_name(tag: str) -> str:
+    """Strip the namespace from an (ElementTree) element tag"""
+    return tag.rpartition("}")[2]
+
+
+def make_pull_parser(events=("start", "end")):
+    if lxml_etree is not None:
+        return lxml_etree.XMLPullParser(
+            events=events, resolve_entities=False, no_network=True
+        )
+    return ElementTree.XMLPullParser(events=events)
+
+
+def iter_parse(xml_data: Union[str, bytes], events=("start", "end")) -> Iterator:
+    """Feed the XML to a pull parser in chunks and yield the parse events"""
+    parser = make_pull_parser(events=events)
+    for start in range(0, len(xml_data), CHUNK_SIZE):
+        end = start + CHUNK_SIZE
+        parser.feed(xml_data[start:end])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def extract_properties(element, include_self: bool = True) -> dict:
+    """Extract the CMIS properties in the ``<properties>`` elements within the element
+
+    :param element: parsed XML element
+    :param include_self: whether the element itself may be a ``<properties>`` element
+    :return: dict, with the extracted properties.
+    """
+    return _extract_properties(element, include_self) or {}
+
+
+def _extract_properties(element, include_self: bool = True) -> Optional[dict]:
+    """Like :func:`extract_properties`, but ``None`` without ``<properties>``"""
+    properties = None
+    for properties_element in element.iter(PROPERTIES_TAG):
+        if not include_self and properties_element is element:
+            continue
+
+        if properties is None:
+            properties = {}
+
+        for property_element in properties_element:
+            property_name = property_element.get("propertyDefinitionId")
+            if property_name is None:
+                continue
+
+            value_element = next(property_element.iter(VALUE_TAG), None)
+            if value_element is None or value_element.text is None:
+                properties[property_name] = {"value": None}
+            else:
+                properties[property_name] = {
+                    "value": parsePropValue(
+                        value_element.text, local_name(property_element.tag)
+                    )
+                }
+    return properties
+
+
+def _has_properties(element, include_self: bool = True) -> Optional[dict]:
+    """Like :func:`_extract_properties`, but an empty dict if there are properties"""
+    for properties_element in element.iter(PROPERTIES_TAG):
+        if include_self or properties_element is not element:
+            return {}
+    return None
+
+
+class _ObjectList:
+    """
+    The decoded children of an ``<objects>`` or ``<parents>`` element.
+
+    If the element contains nested ``<objects>``, every child holding properties is
+    an object. Otherwise all properties in the element make up a single object.
+    Until nested ``<objects>`` are found, the properties of the children are kept
+    both ways, as it is only known which applies once the element is complete.
+    """
+
+    def __init__(self, decode: bool = True):
+        self.decode = decode
+        self.has_nested_objects = False
+        self.children = []
+
+    def add_child(self, element) -> List[dict]:
+        """Add a complete child element and return the objects decoded so far"""
+        if not self.decode:
+            # only whether the child holds properties matters, to count the objects
+            all_properties = _has_properties(element)
+            own_properties = all_properties
+            if element.tag == PROPERTIES_TAG:
+                own_properties = _has_properties(element, include_self=False)
+        else:
+            all_properties = _extract_properties(element)
+            if element.tag == PROPERTIES_TAG:
+                own_properties = _extract_properties(element, include_self=False)
+            else:
+                own_properties = all_properties
+        self.children.append((own_properties, all_properties))
+
+        if not self.has_nested_objects:
+            return []
+        # each child is an object, so they don't have to be kept any longer
+        return self.get_objects()
+
+    def get_objects(self) -> List[dict]:
+        """Return the remaining objects, once the element is complete"""
+        children, self.children = self.children, []
+
+        if self.has_nested_objects:
+            return [
+                {"properties": own_properties}
+                for own_properties, _ in children
+                if own_properties is not None
+            ]
+
+        found = False
+        properties = {}
+        for _, all_properties in children:
+            if all_properties is not None:
+                found = True
+                properties.update(all_properties)
+        return [{"properties": properties}] if found else []
+
+
+def iter_objects_from_xml(
+    xml_data: Union[str, bytes],
+    cmis_action: str,
+    decode: bool = True,
+    paging: Optional[dict] = None,
+) -> Iterator[dict]:
+    """Decode the objects in the response to a CMIS action, one by one.
+
+    See :func:`drc_cmis.webservice.utils.extract_object_properties_from_xml` for the
+    format of the objects.
+
+    :param decode: whether to decode the properties of the objects. If not, the
+        objects have no properties, which is enough to count them.
+    :param paging: dict, if given, the text of the ``hasMoreItems`` and
+        ``numItems`` elements in the list of objects is stored in it.
+    """
+    action_name = f"{cmis_action}Response"
+
+    # the elements from the root to the current element
+    stack = []
+    # depth of the current <actionResponse> element, if any
+    action_depth = None
+    object_list: Optional[_ObjectList] = None
+
+    for event, element in iter_parse(xml_data):
+        if event == "start":
+            stack.append(element)
+            if action_depth is None and local_name(element.tag) == action_name:
+                action_depth = len(stack)
+            continue
+
+        stack.pop()
+        depth = len(stack) + 1
+        name = local_name(element.tag)
+
+        if action_depth is None or depth <= action_depth:
+            if depth == action_depth:
+                action_depth = None
+                _remove(stack, element)
+            continue
+
+        if depth == action_depth + 1:
+            if name == "objectId":
+                yield {"properties": {name: {"value": element.text}}}
+            elif name == "object":
+                yield {"properties": extract_properties(element)}
+            elif object_list is not None:
+                yield from object_list.get_objects()
+            object_list = None
+            _remove(stack, element)
+            continue
+
+        action_child = stack[action_depth]
+        if local_name(action_child.tag) not in ("objects", "parents"):
+            continue
+
+        if object_list is None:
+            object_list = _ObjectList(decode)
+        if name == "objects":
+            object_list.has_nested_objects = True
+
+        if depth == action_depth + 2:
+            if name in PAGING_ELEMENTS:
+                if paging is not None:
+                    paging[name] = element.text
+            else:
+                yield from object_list.add_child(element)
+            _remove(stack, element)
+
+
+def _remove(stack: list, element) -> None:
+    """Remove a processed element from its parent, to free its memory"""
+    if stack:
+        # the parser may have added later siblings already, but the processed
+        # element is near the end of the children
+        stack[-1].remove(element)
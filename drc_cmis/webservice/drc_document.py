@@ -2,16 +2,20 @@ import datetime
 import logging
 import uuid
 from io import BytesIO
-from typing import List, Optional, Union
+from typing import BinaryIO, List, Optional, Union
 
 from django.conf import settings
 
 import pytz
 from furl import furl
 
+from drc_cmis.cache import ConfigSnapshot, folder_path_cache, get_config_snapshot
 from drc_cmis.mixins import RearrangeFilesOnDeleteMixin
-from drc_cmis.models import CMISConfig
-from drc_cmis.utils.exceptions import CmisRuntimeException, DocumentDoesNotExistError
+from drc_cmis.utils.exceptions import (
+    CmisRuntimeException,
+    DocumentDoesNotExistError,
+    PropertyNotSelectedError,
+)
 from drc_cmis.utils.mapper import (
     DOCUMENT_MAP,
     GEBRUIKSRECHTEN_MAP,
@@ -20,7 +24,7 @@ from drc_cmis.utils.mapper import (
     ZAAKTYPE_MAP,
     mapper,
 )
-from drc_cmis.utils.query import CMISQuery
+from drc_cmis.utils.query import CMISQuery, format_select, set_projection
 from drc_cmis.utils.utils import extract_latest_version, get_random_string
 from drc_cmis.webservice.data_models import (
     EnkelvoudigInformatieObject,
@@ -35,62 +39,141 @@ from drc_cmis.webservice.data_models import (
 )
 from drc_cmis.webservice.utils import (
     expand_url,
-    extract_content,
+    expand_urls,
     extract_object_properties_from_xml,
     extract_xml_from_soap,
-    make_soap_envelope,
-    pretty_xml,
-    shrink_url,
+    shrink_urls,
 )
 
 logger = logging.getLogger(__name__)
 
+# FIXME temporary solution due to alfresco raising a 500 AFTER locking the document:
+# the private working copy is looked up instead, see Document.checkout
+CHECKOUT_FALLBACK_ERRORS = (CmisRuntimeException,)
+
+
+def shrink_url_properties(
+    props: dict, prop_names: List[str], snapshot: Optional[ConfigSnapshot] = None
+) -> None:
+    """Shrink the URLs of the given properties in one go"""
+    if not prop_names:
+        return
+
+    short_urls = shrink_urls(
+        (props[prop_name]["value"] for prop_name in prop_names), snapshot
+    )
+    for prop_name, short_url in zip(prop_names, short_urls):
+        props[prop_name]["value"] = short_url
+
+
+def expand_url_attributes(
+    objects: List["CMISBaseObject"], snapshot: Optional[ConfigSnapshot] = None
+) -> None:
+    """
+    Expand the URL attributes of all the objects in one go.
+
+    The expanded URLs are stored on the objects, so that accessing these attributes
+    doesn't resolve the URL mappings again. URLs without a matching URL mapping are
+    left alone, these raise an error only when the attribute is accessed.
+    """
+    if not settings.CMIS_URL_MAPPING_ENABLED:
+        return
+
+    pending = []
+    for cmis_object in objects:
+        for name in cmis_object.get_url_attribute_names():
+            try:
+                value = cmis_object._resolve_attribute(name)
+            except AttributeError:
+                continue
+            if value is not None:
+                pending.append((cmis_object, name, value))
+
+    if not pending:
+        return
+
+    long_urls = expand_urls(
+        (value for *_, value in pending), skip_unmapped=True, snapshot=snapshot
+    )
+    for (cmis_object, name, _), long_url in zip(pending, long_urls):
+        if long_url is not None:
+            cmis_object._expanded_urls[name] = long_url
+
 
 class CMISBaseObject:
     name_map = None
     type_name = None
     type_class = None
+    # the properties selected in the query that retrieved the object, if not all
+    projection = None
 
-    def __init__(self, data):
+    def __init__(self, data, client=None):
         super().__init__()
 
-        from drc_cmis.webservice.client import SOAPCMISClient
+        if client is None:
+            from drc_cmis.client_builder import get_shared_client
+            from drc_cmis.webservice.client import SOAPCMISClient
+
+            client = get_shared_client(SOAPCMISClient)
 
         self.data = data
         self.properties = dict(data.get("properties", {}))
-        self.client = SOAPCMISClient()
+        self.client = client
+        # expanded URL attributes, see expand_url_attributes
+        self._expanded_urls = {}
 
     def __getattr__(self, name: str):
-        def resolve_attribute(name: str) -> str:
-            if name in self.properties:
-                return self.properties[name]["value"]
-
-            convert_name = f"cmis:{name}"
-            if convert_name in self.properties:
-                return self.properties[convert_name]["value"]
+        if name in self._expanded_urls:
+            return self._expanded_urls[name]
 
-            convert_name = f"drc:{name}"
-            if self.name_map is not None and name in self.name_map:
-                convert_name = self.name_map.get(name)
-
-            if convert_name not in self.properties:
-                raise AttributeError(f"No property '{convert_name}'")
-
-            return self.properties[convert_name]["value"]
-
-        value = resolve_attribute(name)
+        value = self._resolve_attribute(name)
 
         if (
             get_type(self.type_class, name) == QueriableUrl
             and settings.CMIS_URL_MAPPING_ENABLED
             and value is not None
         ):
-            return expand_url(value)
+            # async clients provide the snapshot they loaded beforehand
+            return expand_url(value, getattr(self.client, "config_snapshot", None))
 
         return value
 
+    def _resolve_attribute(self, name: str) -> str:
+        if name in self.properties:
+            return self.properties[name]["value"]
+
+        convert_name = f"cmis:{name}"
+        if convert_name in self.properties:
+            return self.properties[convert_name]["value"]
+
+        convert_name = f"drc:{name}"
+        if self.name_map is not None and name in self.name_map:
+            convert_name = self.name_map.get(name)
+
+        if convert_name not in self.properties:
+            if self.projection is not None:
+                raise PropertyNotSelectedError(
+                    f"Property '{convert_name}' was not selected in the query"
+                )
+            raise AttributeError(f"No property '{convert_name}'")
+
+        return self.properties[convert_name]["value"]
+
+    @classmethod
+    def get_url_attribute_names(cls) -> List[str]:
+        """Return the names of the attributes containing a (shrunk) URL"""
+        if cls.type_class is None:
+            return []
+        return [
+            name
+            for name, field_type in cls.type_class.__annotations__.items()
+            if field_type == QueriableUrl
+        ]
+
     @classmethod
-    def build_properties(cls, data: dict) -> dict:
+    def build_properties(
+        cls, data: dict, snapshot: Optional[ConfigSnapshot] = None
+    ) -> dict:
         """Construct property dictionary.
 
         The structure of the dictionary is (where ``property_name``, ``property_value``
@@ -104,10 +187,16 @@ class CMISBaseObject:
                         "type": property_type,
                     }
                 }
+
+        :param snapshot: the configuration snapshot to use. Defaults to the
+            current snapshot.
         """
-        config = CMISConfig.objects.get()
+        if snapshot is None:
+            snapshot = get_config_snapshot()
+        config = snapshot.config
 
         props = {}
+        url_props = []
         for key, value in data.items():
             prop_name = mapper(key, type=cls.type_name)
             if not prop_name:
@@ -120,7 +209,8 @@ class CMISBaseObject:
                     get_type(cls.type_class, key) == QueriableUrl
                     and settings.CMIS_URL_MAPPING_ENABLED
                 ):
-                    value = shrink_url(value)
+                    # shrunk in one go once all properties are known
+                    url_props.append(prop_name)
                 elif isinstance(value, datetime.datetime):
                     value = value.astimezone(pytz.timezone(config.time_zone)).strftime(
                         "%Y-%m-%dT%H:%M:%S.000Z"
@@ -131,6 +221,8 @@ class CMISBaseObject:
                     value = value.strftime("%Y-%m-%dT00:00:00.000Z")
                 props[prop_name] = {"value": str(value), "type": prop_type}
 
+        shrink_url_properties(props, url_props, snapshot)
+
         return props
 
 
@@ -138,68 +230,61 @@ class CMISContentObject(CMISBaseObject):
     def delete_object(self):
         """Delete all versions of an object"""
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             object_id=self.objectId,
             cmis_action="deleteObject",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
-        soap_response = self.client.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
-        )
-
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
+        self.client.request("ObjectService", soap_envelope=soap_envelope.toxml())
 
     def get_parent_folders(self) -> List["Folder"]:
         """Get all the parent folders of an object"""
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             object_id=self.objectId,
             cmis_action="getObjectParents",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         soap_response = self.client.request(
             "NavigationService", soap_envelope=soap_envelope.toxml()
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(
             xml_response, "getObjectParents"
         )
-        return [Folder(data) for data in extracted_data]
+        return [Folder(data, client=self.client) for data in extracted_data]
 
     def move_object(self, target_folder: "Folder") -> "CMISContentObject":
         """Move a document to the specified folder"""
 
         source_folder = self.get_parent_folders()[0]
 
-        soap_envelope = make_soap_envelope(
-            auth=(self.client.user, self.client.password),
-            repository_id=self.client.main_repo_id,
-            object_id=self.objectId,
-            target_folder_id=target_folder.objectId,
-            source_folder_id=source_folder.objectId,
-            cmis_action="moveObject",
-        )
-        logger.debug(soap_envelope.toprettyxml())
-
+        soap_envelope = self.build_move_envelope(source_folder, target_folder)
         soap_response = self.client.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
+            "ObjectService", soap_envelope=soap_envelope
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(xml_response, "moveObject")[
             0
         ]
 
-        return type(self)(extracted_data)
+        return type(self)(extracted_data, client=self.client)
+
+    def build_move_envelope(
+        self, source_folder: "Folder", target_folder: "Folder"
+    ) -> str:
+        """Return the SOAP envelope to move the object to the target folder"""
+        return self.client.build_envelope(
+            object_id=self.objectId,
+            target_folder_id=target_folder.objectId,
+            source_folder_id=source_folder.objectId,
+            cmis_action="moveObject",
+        )
 
     def _update_properties(self, properties: dict) -> dict:
         """
@@ -208,27 +293,25 @@ class CMISContentObject(CMISBaseObject):
         :param properties: dict, new properties to update
         :return: dict, properties of the updated object
         """
-        soap_envelope = make_soap_envelope(
-            auth=(self.client.user, self.client.password),
-            repository_id=self.client.main_repo_id,
-            properties=properties,
-            cmis_action="updateProperties",
-            object_id=self.objectId,
-        )
-        logger.debug(soap_envelope.toprettyxml())
-
         soap_response = self.client.request(
             "ObjectService",
-            soap_envelope=soap_envelope.toxml(),
+            soap_envelope=self.build_update_envelope(properties),
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(
             xml_response, "updateProperties"
         )[0]
 
         return extracted_data
 
+    def build_update_envelope(self, properties: dict) -> str:
+        """Return the SOAP envelope to update the properties of the object"""
+        return self.client.build_envelope(
+            properties=properties,
+            cmis_action="updateProperties",
+            object_id=self.objectId,
+        )
+
     def get_content_object(
         self, object_id: str, object_type: type
     ) -> "CMISContentObject":
@@ -238,24 +321,22 @@ class CMISContentObject(CMISBaseObject):
         :param object_type: type, type of the object to return
         :return: CMISContentObject
         """
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             object_id=object_id,
             cmis_action="getObject",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         soap_response = self.client.request(
             "ObjectService", soap_envelope=soap_envelope.toxml()
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(xml_response, "getObject")[
             0
         ]
 
-        return object_type(extracted_data)
+        return object_type(extracted_data, client=self.client)
 
 
 class Document(CMISContentObject):
@@ -265,7 +346,9 @@ class Document(CMISContentObject):
     type_class = EnkelvoudigInformatieObject
 
     @classmethod
-    def build_properties(cls, data: dict, new: bool = True) -> dict:
+    def build_properties(
+        cls, data: dict, new: bool = True, snapshot: Optional[ConfigSnapshot] = None
+    ) -> dict:
         """Construct property dictionary.
 
         The structure of the dictionary is (where ``property_name``, ``property_value``
@@ -279,11 +362,16 @@ class Document(CMISContentObject):
                         "type": property_type,
                     }
                 }
-        """
 
-        config = CMISConfig.objects.get()
+        :param snapshot: the configuration snapshot to use. Defaults to the
+            current snapshot.
+        """
+        if snapshot is None:
+            snapshot = get_config_snapshot()
+        config = snapshot.config
 
         props = {}
+        url_props = []
         for key, value in data.items():
             prop_name = mapper(key, type="document")
             if not prop_name:
@@ -297,7 +385,8 @@ class Document(CMISContentObject):
                     and get_type(EnkelvoudigInformatieObject, key) == QueriableUrl
                     and value != ""
                 ):
-                    value = shrink_url(value)
+                    # shrunk in one go once all properties are known
+                    url_props.append(prop_name)
                 elif isinstance(value, datetime.datetime):
                     value = value.astimezone(pytz.timezone(config.time_zone)).strftime(
                         "%Y-%m-%dT%H:%M:%S.000Z"
@@ -315,6 +404,8 @@ class Document(CMISContentObject):
                 prop_type = get_cmis_type(EnkelvoudigInformatieObject, key)
                 props[prop_name] = {"value": "", "type": prop_type}
 
+        shrink_url_properties(props, url_props, snapshot)
+
         # For documents that are not new, the uuid shouldn't be written
         props.pop(mapper("uuid"), None)
 
@@ -355,71 +446,66 @@ class Document(CMISContentObject):
     def checkout(self) -> "Document":
         """Checkout a private working copy of the document"""
 
-        soap_envelope = make_soap_envelope(
-            auth=(self.client.user, self.client.password),
-            repository_id=self.client.main_repo_id,
-            cmis_action="checkOut",
-            object_id=str(self.objectId),
-        )
-        logger.debug(soap_envelope.toprettyxml())
-
-        # FIXME temporary solution due to alfresco raising a 500 AFTER locking the document
         try:
             soap_response = self.client.request(
-                "VersioningService", soap_envelope=soap_envelope.toxml()
+                "VersioningService", soap_envelope=self.build_checkout_envelope()
             )
             xml_response = extract_xml_from_soap(soap_response)
-            logger.debug(pretty_xml(xml_response))
             extracted_data = extract_object_properties_from_xml(
                 xml_response, "checkOut"
             )[0]
             pwc_id = extracted_data["properties"]["objectId"]["value"]
-        except CmisRuntimeException:
+        except CHECKOUT_FALLBACK_ERRORS:
             pwc_document = self.get_latest_version()
             pwc_id = pwc_document.objectId
 
         return self.get_document(pwc_id)
 
-    def checkin(self, checkin_comment: str, major: bool = True) -> "Document":
-        soap_envelope = make_soap_envelope(
-            auth=(self.client.user, self.client.password),
-            repository_id=self.client.main_repo_id,
-            cmis_action="checkIn",
-            object_id=str(self.objectId),
-            major=str(major).lower(),
-            checkin_comment=checkin_comment,
+    def build_checkout_envelope(self) -> str:
+        """Return the SOAP envelope to check out the document"""
+        return self.client.build_envelope(
+            cmis_action="checkOut", object_id=str(self.objectId)
         )
-        logger.debug(soap_envelope.toprettyxml())
 
+    def checkin(self, checkin_comment: str, major: bool = True) -> "Document":
         soap_response = self.client.request(
-            "VersioningService", soap_envelope=soap_envelope.toxml()
+            "VersioningService",
+            soap_envelope=self.build_checkin_envelope(checkin_comment, major),
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "checkIn")[0]
         doc_id = extracted_data["properties"]["objectId"]["value"]
 
         return self.get_document(doc_id)
 
+    def build_checkin_envelope(self, checkin_comment: str, major: bool = True) -> str:
+        """Return the SOAP envelope to check in the private working copy"""
+        return self.client.build_envelope(
+            cmis_action="checkIn",
+            object_id=str(self.objectId),
+            major=str(major).lower(),
+            checkin_comment=checkin_comment,
+        )
+
     def get_all_versions(self) -> List["Document"]:
         object_id = self.objectId.split(";")[0]
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             cmis_action="getAllVersions",
             object_id=object_id,
         )
-        logger.debug(soap_envelope.toprettyxml())
         soap_response = self.client.request(
             "VersioningService", soap_envelope=soap_envelope.toxml()
         )
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(
             xml_response, "getAllVersions"
         )
-        return [Document(data) for data in extracted_data]
+        versions = [Document(data, client=self.client) for data in extracted_data]
+        expand_url_attributes(versions)
+        return versions
 
     def get_private_working_copy(self) -> Union["Document", None]:
         """Get the version of the document with version label 'pwc'"""
@@ -437,30 +523,23 @@ class Document(CMISContentObject):
         updated_properties = self._update_properties(properties)
         return self.get_document(updated_properties["properties"]["objectId"]["value"])
 
-    def get_content_stream(self) -> BytesIO:
-        soap_envelope = make_soap_envelope(
+    def get_content_stream(self) -> BinaryIO:
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             object_id=self.objectId,
             cmis_action="getContentStream",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
-        soap_response = self.client.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml(), keep_binary=True
+        return self.client.request_content(
+            "ObjectService", soap_envelope=soap_envelope.toxml()
         )
 
-        xml_response = extract_xml_from_soap(soap_response, binary=True)
-        logger.debug(pretty_xml(xml_response))
-
-        # FIXME find a better way to do this
-        return extract_content(soap_response)
-
     def set_content_stream(self, content: BytesIO, filename: Optional[str] = None):
         content_id = str(uuid.uuid4())
         attachments = [(content_id, content)]
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             object_id=self.objectId,
@@ -468,15 +547,12 @@ class Document(CMISContentObject):
             content_id=content_id,
             content_filename=filename,
         )
-        logger.debug(soap_envelope.toprettyxml())
 
-        soap_response = self.client.request(
+        self.client.request(
             "ObjectService",
             soap_envelope=soap_envelope.toxml(),
             attachments=attachments,
         )
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
     def delete_object(self):
         """
@@ -489,20 +565,17 @@ class Document(CMISContentObject):
         latest_version = self.get_latest_version()
 
         if latest_version.isVersionSeriesCheckedOut:
-            soap_envelope = make_soap_envelope(
+            soap_envelope = self.client.envelope_builder(
                 auth=(self.client.user, self.client.password),
                 repository_id=self.client.main_repo_id,
                 object_id=latest_version.objectId,
                 cmis_action="cancelCheckOut",
             )
-            logger.debug(soap_envelope.toprettyxml())
 
-            soap_response = self.client.request(
+            self.client.request(
                 "VersioningService",
                 soap_envelope=soap_envelope.toxml(),
             )
-            xml_response = extract_xml_from_soap(soap_response)
-            logger.debug(pretty_xml(xml_response))
 
             refreshed_document = self.get_latest_version()
             return refreshed_document.delete_object()
@@ -516,13 +589,12 @@ class Document(CMISContentObject):
         # Alfresco returns both the pwc and the latest major version, while Corsa only returns the pwc.
         query = CMISQuery("SELECT * FROM drc:document WHERE drc:document__uuid = '%s'")
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             statement=query(self.uuid),
             cmis_action="query",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         try:
             soap_response = self.client.request(
@@ -536,9 +608,8 @@ class Document(CMISContentObject):
             else:
                 raise exc
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
         extracted_data = extract_object_properties_from_xml(xml_response, "query")
-        return extract_latest_version(type(self), extracted_data)
+        return extract_latest_version(type(self), extracted_data, client=self.client)
 
 
 class Gebruiksrechten(CMISContentObject):
@@ -588,7 +659,7 @@ class ObjectInformatieObject(RearrangeFilesOnDeleteMixin, CMISContentObject):
                 or document["properties"]["drc:kopie_van"]["value"]
                 == informatieobject_uuid
             ):
-                return Document(document)
+                return Document(document, client=self.client)
         else:
             logger.error(
                 "Could not find the document %s in zaakfolder %s before deleting the OIO.",
@@ -641,13 +712,12 @@ class Folder(CMISBaseObject):
 
         query = CMISQuery(f"SELECT * FROM {object_type_id} WHERE cmis:parentId = '%s'")
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             statement=query(str(self.objectId)),
             cmis_action="query",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         try:
             soap_response = self.client.request(
@@ -660,40 +730,26 @@ class Folder(CMISBaseObject):
             else:
                 raise exc
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "query")
-        return [type(self)(folder) for folder in extracted_data]
+        return [type(self)(folder, client=self.client) for folder in extracted_data]
 
     def get_child_folder(
-        self, name: str, child_type: dict = None
+        self, name: str, child_type: dict = None, select: Optional[List[str]] = None
     ) -> Optional["Folder"]:
         """Get a folder in the current folder that has a specific name
 
         :param name: str, the cmis:name of the folder to retrieve
         :param child_type: dict, With keys "value" and "type". The value contains the object type ID of
         the children folders to retrieve.
+        :param select: list of str, the CMIS names of the properties to retrieve. Defaults to all.
         """
-        if child_type is not None:
-            object_type_id = child_type["value"]
-            # Alfresco case: the object type ID has an extra prefix (F:drc:zaakfolder, instead of drc:zaakfolder)
-            # The prefix needs to be removed for the query
-            if len(object_type_id.split(":")) > 2:
-                object_type_id = ":".join(object_type_id.split(":")[1:])
-        else:
-            object_type_id = "cmis:folder"
-
-        query = CMISQuery(
-            f"SELECT * FROM {object_type_id} WHERE cmis:parentId = '%s' AND cmis:name = '%s'"
-        )
-
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
-            statement=query(str(self.objectId), name),
+            statement=self.build_child_folder_statement(name, child_type, select),
             cmis_action="query",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         try:
             soap_response = self.client.request(
@@ -706,50 +762,67 @@ class Folder(CMISBaseObject):
             else:
                 raise exc
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "query")
         if len(extracted_data) == 0:
             return None
-        return type(self)(extracted_data[0])
+        child_folder = type(self)(extracted_data[0], client=self.client)
+        set_projection([child_folder], select)
+        return child_folder
+
+    def build_child_folder_statement(
+        self, name: str, child_type: dict = None, select: Optional[List[str]] = None
+    ) -> str:
+        """Return the query for a folder in the current folder, see :meth:`get_child_folder`"""
+        if child_type is not None:
+            object_type_id = child_type["value"]
+            # Alfresco case: the object type ID has an extra prefix (F:drc:zaakfolder, instead of drc:zaakfolder)
+            # The prefix needs to be removed for the query
+            if len(object_type_id.split(":")) > 2:
+                object_type_id = ":".join(object_type_id.split(":")[1:])
+        else:
+            object_type_id = "cmis:folder"
+
+        query = CMISQuery(
+            f"SELECT {format_select(select)} FROM {object_type_id} "
+            "WHERE cmis:parentId = '%s' AND cmis:name = '%s'"
+        )
+        return query(str(self.objectId), name)
 
     def delete_tree(self):
         """Delete the folder and all its contents"""
 
         # With Corsa, locked documents cause an error, so 'continue_on_failure' is needed
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             folder_id=self.objectId,
             cmis_action="deleteTree",
             continue_on_failure="true",
         )
-        logger.debug(soap_envelope.toprettyxml())
 
-        soap_response = self.client.request(
-            "ObjectService", soap_envelope=soap_envelope.toxml()
-        )
-        xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
+        try:
+            self.client.request("ObjectService", soap_envelope=soap_envelope.toxml())
+        finally:
+            # some folders may be deleted, even if others could not be
+            folder_path_cache.invalidate(self.client.folder_cache_scope)
 
     def get_children_documents(
         self, convert_to_document_type: bool = True
     ) -> List[Union[Document, dict]]:
 
-        soap_envelope = make_soap_envelope(
+        soap_envelope = self.client.envelope_builder(
             auth=(self.client.user, self.client.password),
             repository_id=self.client.main_repo_id,
             cmis_action="getChildren",
             folder_id=self.objectId,
         )
-        logger.debug(soap_envelope.toprettyxml())
 
         soap_response = self.client.request(
             "NavigationService", soap_envelope=soap_envelope.toxml()
         )
 
         xml_response = extract_xml_from_soap(soap_response)
-        logger.debug(pretty_xml(xml_response))
 
         extracted_data = extract_object_properties_from_xml(xml_response, "getChildren")
         documents = []
@@ -762,10 +835,12 @@ class Folder(CMISBaseObject):
                 == document_objecttype_id
             ):
                 if convert_to_document_type:
-                    documents.append(Document(object_data))
+                    documents.append(Document(object_data, client=self.client))
                 else:
                     documents.append(object_data)
 
+        if convert_to_document_type:
+            expand_url_attributes(documents)
         return documents
 
 
@@ -0,0 +1,244 @@
+"""
+Template based builder for the SOAP envelopes of the web service binding.
+
+Instead of building a DOM for every request, the envelope is written from
+pre-rendered fragments. The fragments that depend on the CMIS action or on a
+property are rendered once and cached. The result is the same as serialising the
+DOM built by :func:`drc_cmis.webservice.utils.make_soap_envelope`.
+"""
+
+import mimetypes
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+from xml.dom import minidom
+
+from django.utils import timezone
+
+from drc_cmis.utils.utils import get_random_string
+
+XML_DECLARATION = '<?xml version="1.0" ?>'
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+ENVELOPE_START = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns:ns="http://docs.oasis-open.org/ns/cmis/messaging/200908/" '
+    'xmlns:ns1="http://docs.oasis-open.org/ns/cmis/core/200908/">'
+    "<soapenv:Header>"
+    '<wsse:Security xmlns:wsse="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd" '
+    'xmlns:wsu="http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd">'
+)
+
+USERNAME_TOKEN_TEMPLATE = (
+    '<wsse:UsernameToken wsu:Id="UsernameToken-{header_id}">'
+    "<wsse:Username>{username}</wsse:Username>"
+    '<wsse:Password Type="http://docs.oasis-open.org/wss/2004/01/'
+    'oasis-200401-wss-username-token-profile-1.0#PasswordText">'
+    "{password}</wsse:Password>"
+    "</wsse:UsernameToken>"
+)
+
+TIMESTAMP_TEMPLATE = (
+    '<wsu:Timestamp wsu:Id="TS-{header_id}">'
+    "<wsu:Created>{created}</wsu:Created>"
+    "<wsu:Expires>{expires}</wsu:Expires>"
+    "</wsu:Timestamp>"
+)
+
+HEADER_END = "</wsse:Security></soapenv:Header><soapenv:Body>"
+
+ENVELOPE_END = "</soapenv:Body></soapenv:Envelope>"
+
+CONTENT_STREAM_TEMPLATE = (
+    "<ns:contentStream>"
+    "<ns:mimeType>{mimetype}</ns:mimeType>"
+    "<ns:stream>"
+    '<inc:Include xmlns:inc="http://www.w3.org/2004/08/xop/include" href="cid:{content_id}"/>'
+    "</ns:stream>"
+    "<ns:filename>{filename}</ns:filename>"
+    "</ns:contentStream>"
+)
+
+
+def escape(data: str) -> str:
+    """Escape text and attribute values, the same way as minidom does"""
+    if "&" in data:
+        data = data.replace("&", "&amp;")
+    if "<" in data:
+        data = data.replace("<", "&lt;")
+    if '"' in data:
+        data = data.replace('"', "&quot;")
+    if ">" in data:
+        data = data.replace(">", "&gt;")
+    return data
+
+
+def element(tag: str, text: str) -> str:
+    return f"<{tag}>{escape(text)}</{tag}>"
+
+
+@lru_cache(maxsize=None)
+def action_tags(cmis_action: str) -> Tuple[str, str, str]:
+    """Return the start, end and empty element tags of a CMIS action"""
+    return (
+        f"<ns:{cmis_action}>",
+        f"</ns:{cmis_action}>",
+        f"<ns:{cmis_action}/>",
+    )
+
+
+@lru_cache(maxsize=1024)
+def property_tags(prop_type: str, prop_name: str) -> Tuple[str, str]:
+    """Return the fragments before and after the value of a property"""
+    return (
+        f'<ns1:{prop_type} propertyDefinitionId="{escape(prop_name)}"><ns1:value>',
+        f"</ns1:value></ns1:{prop_type}>",
+    )
+
+
+class SoapEnvelope:
+    """
+    A rendered SOAP envelope.
+
+    It offers the serialisation methods of :class:`xml.dom.minidom.Document`
+    that are used on envelopes, so it can be used in their place.
+    """
+
+    def __init__(self, xml: str):
+        # the envelope, without the XML declaration
+        self.xml = xml
+
+    def __str__(self):
+        return self.toxml()
+
+    def toxml(self, encoding: Optional[str] = None):
+        if encoding is None:
+            return f"{XML_DECLARATION}{self.xml}"
+        return f'<?xml version="1.0" encoding="{encoding}"?>{self.xml}'.encode(encoding)
+
+    def toprettyxml(self, indent="\t", newl="\n", encoding=None):
+        # only used for logging, so the envelope is parsed on demand
+        return minidom.parseString(self.toxml()).toprettyxml(
+            indent=indent, newl=newl, encoding=encoding
+        )
+
+
+def render_soap_envelope(
+    cmis_action: str,
+    auth: Tuple[str, str],
+    repository_id: Optional[str] = None,
+    properties: Optional[dict] = None,
+    statement: Optional[str] = None,
+    object_id: Optional[str] = None,
+    folder_id: Optional[str] = None,
+    content_id: Optional[str] = None,
+    content_filename: Optional[str] = None,
+    major: Optional[str] = None,
+    checkin_comment: Optional[str] = None,
+    source_folder_id: Optional[str] = None,
+    target_folder_id: Optional[str] = None,
+    continue_on_failure: Optional[str] = None,
+    source_id: Optional[str] = None,
+    max_items: Optional[str] = None,
+    skip_count: Optional[str] = None,
+    path: Optional[str] = None,
+) -> SoapEnvelope:
+    """Render the SOAP envelope from the data provided
+
+    Takes the same arguments as :func:`drc_cmis.webservice.utils.make_soap_envelope`.
+
+    :return: the rendered envelope.
+    """
+    security_header_id = uuid.uuid4().hex
+    now = timezone.now()
+
+    parts = [
+        ENVELOPE_START,
+        USERNAME_TOKEN_TEMPLATE.format(
+            header_id=security_header_id,
+            username=escape(auth[0]),
+            password=escape(auth[1]),
+        ),
+        TIMESTAMP_TEMPLATE.format(
+            header_id=security_header_id,
+            created=now.strftime(TIMESTAMP_FORMAT),
+            expires=(now + timedelta(1)).strftime(TIMESTAMP_FORMAT),
+        ),
+        HEADER_END,
+    ]
+
+    action_start, action_end, action_empty = action_tags(cmis_action)
+    parts.append(action_start)
+    action_index = len(parts) - 1
+
+    if repository_id is not None:
+        parts.append(element("ns:repositoryId", str(repository_id)))
+
+    if source_id is not None:
+        parts.append(element("ns:sourceId", str(source_id)))
+
+    if path is not None:
+        parts.append(element("ns:path", path))
+
+    if properties is not None:
+        if properties:
+            parts.append("<ns:properties>")
+            for prop_name, prop_dict in properties.items():
+                value_start, value_end = property_tags(prop_dict["type"], prop_name)
+                parts.append(value_start)
+                parts.append(escape(prop_dict["value"]))
+                parts.append(value_end)
+            parts.append("</ns:properties>")
+        else:
+            parts.append("<ns:properties/>")
+
+    if statement is not None:
+        parts.append(element("ns:statement", statement))
+
+    if max_items is not None:
+        parts.append(element("ns:maxItems", max_items))
+
+    if skip_count is not None:
+        parts.append(element("ns:skipCount", skip_count))
+
+    if folder_id is not None:
+        parts.append(element("ns:folderId", str(folder_id)))
+
+    if object_id is not None:
+        parts.append(element("ns:objectId", str(object_id)))
+
+    if content_id is not None:
+        filename = content_filename or get_random_string()
+        mimetype, _encoding = mimetypes.guess_type(filename)
+        parts.append(
+            CONTENT_STREAM_TEMPLATE.format(
+                mimetype=escape(mimetype or "application/octet-stream"),
+                content_id=escape(content_id),
+                filename=escape(filename),
+            )
+        )
+
+    if major is not None:
+        parts.append(element("ns:major", major))
+
+    if checkin_comment is not None:
+        parts.append(element("ns:checkinComment", checkin_comment))
+
+    if source_folder_id is not None:
+        parts.append(element("ns:sourceFolderId", source_folder_id))
+
+    if target_folder_id is not None:
+        parts.append(element("ns:targetFolderId", target_folder_id))
+
+    if continue_on_failure is not None:
+        parts.append(element("ns:continueOnFailure", continue_on_failure))
+
+    if len(parts) == action_index + 1:
+        parts[action_index] = action_empty
+    else:
+        parts.append(action_end)
+
+    parts.append(ENVELOPE_END)
+    return SoapEnvelope("".join(parts))
@@ -1,47 +1,90 @@
+from drc_cmis.cache import RepositoryInfoFetcher
 from drc_cmis.connections import use_cmis_connection_pool
+from drc_cmis.instrumentation import register_vendor
 
+from .envelope import render_soap_envelope
 from .request import SOAPRequest
-from .utils import extract_repo_info_from_xml, extract_xml_from_soap, make_soap_envelope
+from .utils import extract_repo_info_from_xml, extract_xml_from_soap
 
 
-class SOAPRepositoryInfoFetcher:
+class SOAPRepositoryInfoFetcher(RepositoryInfoFetcher):
     """
     Retrieve the information about a repository in the DMS
 
-    Caching is done based on the repository ID.
+    Caching is done based on the base URL, user and repository ID.
     """
 
-    def __init__(self):
-        self.cache = {}
+    key_prefix = "drc_cmis:webservice:repository_info"
 
     @use_cmis_connection_pool
-    def fetch(self, repo_id: str, base_url: str, user: str, password: str) -> dict:
-        if repo_id in self.cache:
-            return self.cache[repo_id]
+    def fetch(
+        self,
+        repo_id: str,
+        base_url: str,
+        user: str,
+        password: str,
+        envelope_builder=render_soap_envelope,
+    ) -> dict:
+        def fetch_repository_info():
+            request = SOAPRequest(base_url)
 
-        request = SOAPRequest(base_url)
+            soap_envelope = envelope_builder(
+                auth=(user, password),
+                repository_id=repo_id,
+                cmis_action="getRepositoryInfo",
+            )
 
-        soap_envelope = make_soap_envelope(
-            auth=(user, password),
-            repository_id=repo_id,
-            cmis_action="getRepositoryInfo",
-        )
+            soap_response = request.request(
+                "RepositoryService", soap_envelope=soap_envelope.toxml()
+            )
+
+            xml_response = extract_xml_from_soap(soap_response)
+            return extract_repo_info_from_xml(xml_response)
 
-        soap_response = request.request(
-            "RepositoryService", soap_envelope=soap_envelope.toxml()
+        repository_info = self.get_or_fetch(
+            (base_url, user, repo_id), fetch_repository_info
         )
+        register_vendor(base_url, repository_info.get("vendorName"))
+        return repository_info
+
+    async def afetch(
+        self,
+        request,
+        repo_id: str,
+        user: str,
+        password: str,
+        envelope_builder=render_soap_envelope,
+    ) -> dict:
+        """Like :meth:`fetch`, with a :class:`drc_cmis.webservice.async_request.AsyncSOAPRequest`"""
 
-        xml_response = extract_xml_from_soap(soap_response)
+        async def fetch_repository_info():
+            soap_envelope = envelope_builder(
+                auth=(user, password),
+                repository_id=repo_id,
+                cmis_action="getRepositoryInfo",
+            )
 
-        self.cache[repo_id] = extract_repo_info_from_xml(xml_response)
+            soap_response = await request.request(
+                "RepositoryService", soap_envelope=soap_envelope.toxml()
+            )
+
+            xml_response = extract_xml_from_soap(soap_response)
+            return extract_repo_info_from_xml(xml_response)
+
+        repository_info = await self.aget_or_fetch(
+            (request.base_url, user, repo_id), fetch_repository_info
+        )
+        register_vendor(request.base_url, repository_info.get("vendorName"))
+        return repository_info
 
-        return self.cache[repo_id]
+    def invalidate(self, repo_id: str, base_url: str, user: str) -> None:
+        super().invalidate(base_url, user, repo_id)
 
 
-# sentinel instance, with a cache
+# sentinel instance
 repo_info_fetcher = SOAPRepositoryInfoFetcher()
 """
 Sentinel repository info fetcher instance, used by :class:`drc_cmis.webservice.client.SOAPCMISClient`.
-Note that you can mutate ``repo_info_fetcher.cache`` to replace it with another cache
-backend.
+Note that you can set ``repo_info_fetcher.cache`` to use another cache backend than
+the one configured with ``settings.CMIS_CACHE``.
 """
@@ -0,0 +1,234 @@
+"""
+Streaming writer and reader for MTOM (multipart/related) SOAP messages.
+
+The body of a request is yielded in chunks and the attachments are read
+incrementally. The body of a response is parsed as it is received. Neither
+requires holding a document in memory.
+"""
+
+import re
+from email.message import Message
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+from drc_cmis.utils.streams import get_stream_size, rewind, spool_chunks
+
+CHUNK_SIZE = 64 * 1024
+
+INCLUDE_HREF_RE = re.compile(rb"<(?:\w+:)?Include\b[^>]*?\bhref=\"cid:([^\"]+)\"")
+
+
+def format_headers(headers: dict) -> str:
+    return "".join(f"{key}: {value}\n" for key, value in headers.items())
+
+
+class MTOMBody:
+    """
+    The body of a SOAP request with MTOM attachments.
+
+    Iterating over it yields the body in chunks. If the size of all attachments can
+    be determined, it is set as ``len``, which :mod:`requests` uses for the
+    ``Content-Length`` header. Otherwise the body is sent with chunked transfer
+    encoding.
+
+    :param boundary: string, the multipart boundary, including the leading dashes
+    :param envelope_headers: dict, the MIME headers of the part with the envelope
+    :param soap_envelope: string, the XML of the envelope
+    :param attachments: list of tuples, each tuple contains the content ID used in
+        the XML (string) and the I/O stream for the attachment.
+    """
+
+    attachment_headers = {
+        "Content-Type": "application/octet-stream",
+        "Content-Transfer-Encoding": "binary",
+    }
+
+    def __init__(
+        self,
+        boundary: str,
+        envelope_headers: dict,
+        soap_envelope: str,
+        attachments: Optional[List[Tuple[str, BinaryIO]]] = None,
+    ):
+        self.boundary = boundary
+        self.envelope_part = (
+            f"\n{boundary}\n{format_headers(envelope_headers)}\n{soap_envelope}\n\n"
+        ).encode("utf-8")
+        self.attachments = [
+            (self._get_attachment_header(content_id), content_stream)
+            for content_id, content_stream in attachments or []
+        ]
+        self.closing_boundary = f"{boundary}--\n".encode("utf-8")
+
+        size = self._get_size()
+        if size is not None:
+            self.len = size
+
+    def _get_attachment_header(self, content_id: str) -> bytes:
+        headers = {**self.attachment_headers, "Content-ID": f"<{content_id}>"}
+        return f"{self.boundary}\n{format_headers(headers)}\n".encode("utf-8")
+
+    def _get_size(self) -> Optional[int]:
+        size = len(self.envelope_part) + len(self.closing_boundary)
+        for header, content_stream in self.attachments:
+            stream_size = get_stream_size(content_stream)
+            if stream_size is None:
+                return None
+            size += len(header) + stream_size
+        return size
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.envelope_part
+
+        for header, content_stream in self.attachments:
+            yield header
+
+            rewind(content_stream)
+            while True:
+                chunk = content_stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+        yield self.closing_boundary
+
+
+class InvalidMultipartMessage(Exception):
+    pass
+
+
+def get_boundary(content_type: str) -> Optional[str]:
+    """Return the boundary parameter of a multipart Content-Type header"""
+    message = Message()
+    message["Content-Type"] = content_type
+    return message.get_param("boundary")
+
+
+class MultipartReader:
+    """
+    Read the parts of a multipart body, while it is received.
+
+    :param chunks: iterable of bytes, the body of the message
+    :param boundary: string, the multipart boundary. If it is not given, it is
+        taken from the first line of the body.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], boundary: Optional[str] = None):
+        self._chunks = iter(chunks)
+        # the body may start with a delimiter, without the preceding line break
+        self._buffer = b"\r\n"
+        if boundary is None:
+            boundary = self._find_boundary()
+        self._delimiter = b"\r\n--" + boundary.encode("utf-8")
+
+    def _fill(self) -> bool:
+        """Add the next chunk to the buffer, return whether there was any"""
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += chunk
+                return True
+        return False
+
+    def _read_until(self, separator: bytes) -> bytes:
+        while True:
+            index = self._buffer.find(separator)
+            if index >= 0:
+                data = self._buffer[:index]
+                rest = index + len(separator)
+                self._buffer = self._buffer[rest:]
+                return data
+            if not self._fill():
+                raise InvalidMultipartMessage("Incomplete multipart message")
+
+    def _find_boundary(self) -> str:
+        while True:
+            line = self._read_until(b"\r\n").strip()
+            if line.startswith(b"--"):
+                self._buffer = b"\r\n" + line + b"\r\n" + self._buffer
+                return line[2:].decode("utf-8")
+
+    def _iter_body(self) -> Iterator[bytes]:
+        """Yield the body of the current part, up to the next delimiter"""
+        # keep enough of the buffer to recognise a delimiter split over chunks
+        keep = len(self._delimiter) - 1
+        while True:
+            index = self._buffer.find(self._delimiter)
+            if index >= 0:
+                if index:
+                    yield self._buffer[:index]
+                rest = index + len(self._delimiter)
+                self._buffer = self._buffer[rest:]
+                return
+
+            if len(self._buffer) > keep:
+                yield self._buffer[:-keep]
+                self._buffer = self._buffer[-keep:]
+            if not self._fill():
+                raise InvalidMultipartMessage("Incomplete multipart message")
+
+    def _read_headers(self) -> Dict[str, str]:
+        headers = {}
+        for line in self._read_until(b"\r\n\r\n").split(b"\r\n"):
+            name, _, value = line.decode("utf-8", errors="replace").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return headers
+
+    def __iter__(self) -> Iterator[Tuple[Dict[str, str], Iterator[bytes]]]:
+        """
+        Yield the headers and an iterator over the body of every part.
+
+        The body of a part has to be consumed before moving on to the next part,
+        the part is skipped otherwise.
+        """
+        # skip the preamble
+        for _chunk in self._iter_body():
+            pass
+
+        while True:
+            # the delimiter is followed by "--" after the last part
+            while len(self._buffer) < 2:
+                if not self._fill():
+                    return
+            if self._buffer.startswith(b"--"):
+                return
+
+            # the rest of the delimiter line is padding
+            self._read_until(b"\r\n")
+            headers = self._read_headers()
+            body = self._iter_body()
+            yield headers, body
+            for _chunk in body:
+                pass
+
+
+def read_attachment(
+    chunks: Iterable[bytes], boundary: Optional[str] = None
+) -> Tuple[bytes, BinaryIO]:
+    """Read the SOAP envelope and the attachment it refers to from a response
+
+    The attachment is the part with the Content-ID referred to by the
+    ``<xop:Include>`` element in the envelope. Its content is spooled to a file,
+    see :func:`drc_cmis.utils.streams.spool_chunks`.
+
+    :param chunks: iterable of bytes, the body of the response
+    :param boundary: string, the multipart boundary, if known
+    :return: tuple of the envelope and the content of the attachment.
+    """
+    parts = iter(MultipartReader(chunks, boundary))
+
+    root_part = next(parts, None)
+    if root_part is None:
+        raise InvalidMultipartMessage("Empty multipart message")
+    envelope = b"".join(root_part[1])
+
+    content_id = None
+    include = INCLUDE_HREF_RE.search(envelope)
+    if include is not None:
+        content_id = unquote(include.group(1).decode("utf-8"))
+
+    for headers, body in parts:
+        part_id = unquote(headers.get("content-id", "").strip("<>"))
+        if content_id is None or part_id == content_id:
+            return envelope, spool_chunks(body)
+
+    raise InvalidMultipartMessage("No attachment found in the message")
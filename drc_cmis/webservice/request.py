@@ -1,16 +1,35 @@
 import logging
+from contextlib import closing
 from typing import BinaryIO, List, Optional, Tuple, Union
 
+import requests
+
 from drc_cmis.connections import get_session
+from drc_cmis.instrumentation import (
+    WEBSERVICE,
+    get_soap_action,
+    round_trip,
+    trace_response,
+)
 from drc_cmis.utils.exceptions import (
     CmisBaseException,
     CmisInvalidArgumentException,
     CmisNotSupportedException,
+    CmisNoValidResponse,
     CmisObjectNotFoundException,
     CmisPermissionDeniedException,
     CmisRuntimeException,
     CmisUpdateConflictException,
 )
+from drc_cmis.wire import log_request, log_response
+
+from .mtom import (
+    CHUNK_SIZE,
+    InvalidMultipartMessage,
+    MTOMBody,
+    get_boundary,
+    read_attachment,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -57,97 +76,97 @@ class SOAPRequest:
         :return: string or bytes, the content of the response
         """
         url = f"{self.base_url}/{path.lstrip('/')}"
+        log_request(url, soap_envelope)
 
-        envelope_header = ""
-        for key, value in self._envelope_headers.items():
-            envelope_header += f"{key}: {value}\n"
+        with round_trip(
+            WEBSERVICE, lambda: get_soap_action(soap_envelope), url
+        ) as trip:
+            soap_response = self._post(url, soap_envelope, attachments)
+            trip.record_response(soap_response)
+        log_response(url, soap_response.status_code, soap_response.content)
+        raise_for_status(soap_response, url)
 
-        # Format the body of the request
-        body = f"\n{self._boundary}\n{envelope_header}\n{soap_envelope}\n\n".encode(
-            "utf-8"
-        )
+        if keep_binary:
+            return trace_response(soap_response.content, trip)
+        return trace_response(soap_response.content.decode("utf-8"), trip)
 
-        # Adding the attachments
-        if attachments is not None:
-            for attachment in attachments:
-                content_id, content_stream = attachment
-                file_attachment_headers = {
-                    "Content-Type": "application/octet-stream",
-                    "Content-Transfer-Encoding": "binary",
-                    "Content-ID": f"<{content_id}>",
-                }
-
-                xml_attachment_header = ""
-                for key, value in file_attachment_headers.items():
-                    xml_attachment_header += f"{key}: {value}\n"
-
-                content_stream.seek(0)
-                body += f"{self._boundary}\n{xml_attachment_header}\n".encode("utf-8")
-                body += content_stream.read()  # Reads binary
-
-        body += f"{self._boundary}--\n".encode("utf-8")
-        soap_response = self.session.post(
-            url, data=body, headers=self._headers, files=[]
-        )
-        if not soap_response.ok:
-            error = soap_response.text
-            if soap_response.status_code == 401:
-                raise CmisPermissionDeniedException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=401,
-                )
-            elif soap_response.status_code == 400:
-                raise CmisInvalidArgumentException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=400,
-                )
-            elif soap_response.status_code == 404:
-                raise CmisObjectNotFoundException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=404,
-                )
-            elif soap_response.status_code == 403:
-                raise CmisPermissionDeniedException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=403,
-                )
-            elif soap_response.status_code == 405:
-                raise CmisNotSupportedException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=405,
-                )
-            elif soap_response.status_code == 409:
-                raise CmisUpdateConflictException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=409,
-                )
-            elif soap_response.status_code == 500:
-                raise CmisRuntimeException(
-                    status=soap_response.status_code,
-                    url=url,
-                    message=error,
-                    code=500,
+    def request_content(self, path: str, soap_envelope: str) -> BinaryIO:
+        """Make request and return the content of the MTOM attachment in the response.
+
+        The response is parsed while it is received, and the content is spooled to a
+        (temporary) file, see :func:`drc_cmis.webservice.mtom.read_attachment`.
+
+        :param path: string, path where to post the request
+        :param soap_envelope: string, XML of the request
+        :return: file-like object with the content of the attachment
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        log_request(url, soap_envelope)
+
+        with round_trip(
+            WEBSERVICE, lambda: get_soap_action(soap_envelope), url
+        ) as trip:
+            soap_response = self._post(url, soap_envelope, stream=True)
+            trip.record_response(soap_response, stream=True)
+
+        with closing(soap_response):
+            if not soap_response.ok:
+                log_response(url, soap_response.status_code, soap_response.content)
+                raise_for_status(soap_response, url)
+
+            try:
+                envelope, content = read_attachment(
+                    soap_response.iter_content(CHUNK_SIZE),
+                    get_boundary(soap_response.headers.get("Content-Type", "")),
                 )
-            else:
-                raise CmisBaseException(
+            except InvalidMultipartMessage as exc:
+                raise CmisNoValidResponse(
                     status=soap_response.status_code,
                     url=url,
-                    message=error,
+                    message=str(exc),
                     code=soap_response.status_code,
                 )
 
-        if keep_binary:
-            return soap_response.content
-        return soap_response.content.decode("utf-8")
+        log_response(url, soap_response.status_code, envelope)
+        return content
+
+    def _post(
+        self,
+        url: str,
+        soap_envelope: str,
+        attachments: Optional[List[Tuple[str, BinaryIO]]] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        body = MTOMBody(
+            self._boundary, self._envelope_headers, soap_envelope, attachments
+        )
+        return self.session.post(
+            url, data=body, headers=self._headers, files=[], stream=stream
+        )
+
+
+STATUS_EXCEPTIONS = {
+    400: CmisInvalidArgumentException,
+    401: CmisPermissionDeniedException,
+    403: CmisPermissionDeniedException,
+    404: CmisObjectNotFoundException,
+    405: CmisNotSupportedException,
+    409: CmisUpdateConflictException,
+    500: CmisRuntimeException,
+}
+
+
+def raise_for_status(soap_response: requests.Response, url: str) -> None:
+    """Raise the CMIS exception for the status of an unsuccessful response"""
+    if soap_response.ok:
+        return
+
+    exception_class = STATUS_EXCEPTIONS.get(
+        soap_response.status_code, CmisBaseException
+    )
+    raise exception_class(
+        status=soap_response.status_code,
+        url=url,
+        message=soap_response.text,
+        code=soap_response.status_code,
+    )
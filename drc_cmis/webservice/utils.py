@@ -1,23 +1,27 @@
 import logging
 import mimetypes
-import re
 import uuid
 from datetime import timedelta
-from io import BytesIO
-from typing import List, Optional, Tuple
+from typing import BinaryIO, Iterable, List, Optional, Tuple, Union
 from xml.dom import minidom
 
 from django.utils import timezone
 
-from cmislib.util import parsePropValue
-
-from drc_cmis.models import UrlMapping
+from drc_cmis.cache import ConfigSnapshot, get_config_snapshot
+from drc_cmis.instrumentation import measure_parsing
+from drc_cmis.utils.matching import PatternMatcher
 from drc_cmis.utils.utils import get_random_string
 
+from .decoder import iter_objects_from_xml
+from .mtom import read_attachment
+
 logger = logging.getLogger(__name__)
 
 
-def extract_object_properties_from_xml(xml_data: str, cmis_action: str) -> List[dict]:
+@measure_parsing
+def extract_object_properties_from_xml(
+    xml_data: Union[str, bytes], cmis_action: str
+) -> List[dict]:
     """Extract properties returned in a XML SOAP response.
 
     Function adapted from cmislib. It parses a XML response and extracts properties to a dictionary.
@@ -31,66 +35,17 @@ def extract_object_properties_from_xml(xml_data: str, cmis_action: str) -> List[
     For each document/folder in the response, a dictionary is created.
     All the dictionaries are then combined to a list.
 
-    :param xml_data: string, XML data
+    The response is decoded with a streaming parser, see
+    :mod:`drc_cmis.webservice.decoder`.
+
+    :param xml_data: string or bytes, XML data
     :param cmis_action: string, name of the CMIS action that was used in the request, e.g. createDocument
     :return: list of dictionaries with the properties.
     """
-
-    def extract_properties(xml_node: minidom.Element) -> dict:
-        """Extract properties in the <ns2:properties> tag of the provided node
-
-        :param xml_node: minidom.Element, parsed XML node
-        :return: dict, with the extracted properties.
-        """
-        properties = {}
-        for property_node in xml_node.getElementsByTagName("ns2:properties"):
-            for child_node in property_node.childNodes:
-                try:
-                    property_name = child_node.attributes["propertyDefinitionId"].value
-                except KeyError:
-                    continue
-
-                node_values = child_node.getElementsByTagName("ns2:value")
-                if len(node_values) == 0 or len(node_values[0].childNodes) == 0:
-                    properties[property_name] = {"value": None}
-                else:
-                    properties[property_name] = {
-                        "value": parsePropValue(
-                            node_values[0].childNodes[0].data, child_node.localName
-                        )
-                    }
-        return properties
-
-    parsed_xml = minidom.parseString(xml_data)
-
-    all_objects = []
-
-    # When creating documents and folders this extracts the objectId
-    for action_node in parsed_xml.getElementsByTagName(f"{cmis_action}Response"):
-        for child_node in action_node.childNodes:
-            node_name = child_node.nodeName
-
-            if node_name == "objectId":
-                extracted_properties = {
-                    node_name: {"value": child_node.firstChild.nodeValue}
-                }
-                all_objects.append({"properties": extracted_properties})
-            if node_name == "object":
-                extracted_properties = extract_properties(child_node)
-                all_objects.append({"properties": extracted_properties})
-            if node_name == "objects" or node_name == "parents":
-                if len(child_node.getElementsByTagName("objects")) > 0:
-                    for object_nodes in child_node.childNodes:
-                        if len(object_nodes.getElementsByTagName("ns2:properties")) > 0:
-                            extracted_properties = extract_properties(object_nodes)
-                            all_objects.append({"properties": extracted_properties})
-                elif len(child_node.getElementsByTagName("ns2:properties")) > 0:
-                    extracted_properties = extract_properties(child_node)
-                    all_objects.append({"properties": extracted_properties})
-
-    return all_objects
+    return list(iter_objects_from_xml(xml_data, cmis_action))
 
 
+@measure_parsing
 def extract_repository_ids_from_xml(xml_data: str) -> List:
     parsed_xml = minidom.parseString(xml_data)
 
@@ -98,6 +53,7 @@ def extract_repository_ids_from_xml(xml_data: str) -> List:
     return [node.firstChild.nodeValue for node in repository_id_nodes]
 
 
+@measure_parsing
 def extract_repo_info_from_xml(xml_data: str) -> dict:
     parsed_xml = minidom.parseString(xml_data)
 
@@ -116,13 +72,44 @@ def extract_repo_info_from_xml(xml_data: str) -> dict:
     return properties
 
 
-def extract_num_items(xml_data: str) -> int:
-    """Extract the number of items in the SOAP XML returned by a query"""
-    parsed_xml = minidom.parseString(xml_data)
-    folder_id_node = parsed_xml.getElementsByTagName("numItems")[0]
-    return int(folder_id_node.firstChild.nodeValue)
+@measure_parsing
+def extract_query_page_from_xml(
+    xml_data: Union[str, bytes], decode: bool = True
+) -> Tuple[List[dict], bool, Optional[int]]:
+    """Extract the objects and paging of the SOAP XML returned by a query
+
+    The XML is parsed once, with the streaming decoder (see
+    :func:`drc_cmis.webservice.decoder.iter_objects_from_xml`).
+
+    :param decode: whether to decode the properties of the objects. If not, the
+        objects have no properties, which is enough to count them.
+    :return: tuple of the objects, hasMoreItems and numItems (``None`` if it is not
+        returned)
+    """
+    paging = {}
+    objects = list(
+        iter_objects_from_xml(xml_data, "query", decode=decode, paging=paging)
+    )
+    num_items = paging.get("numItems")
+    return (
+        objects,
+        (paging.get("hasMoreItems") or "").strip() == "true",
+        int(num_items) if num_items is not None else None,
+    )
+
+
+def extract_num_items(xml_data: str) -> Optional[int]:
+    """Extract the number of items in the SOAP XML returned by a query
+
+    :return: the numItems, ``None`` if it is not returned
+    """
+    _objects, _has_more_items, num_items = extract_query_page_from_xml(
+        xml_data, decode=False
+    )
+    return num_items
 
 
+@measure_parsing
 def extract_content_stream_properties_from_xml(xml_data: str) -> dict:
     parsed_xml = minidom.parseString(xml_data)
 
@@ -138,17 +125,10 @@ def extract_content_stream_properties_from_xml(xml_data: str) -> dict:
     return properties
 
 
-# FIXME find a better way to do this
-def extract_content(soap_response_body: bytes) -> BytesIO:
-    content = re.search(
-        "Content-Disposition: attachment;.+?\r\n\r\n(.+?)\r\n--uuid:.+?--".encode(
-            "utf-8"
-        ),
-        soap_response_body,
-        re.DOTALL,
-    ).group(1)
-
-    return BytesIO(content)
+def extract_content(soap_response_body: bytes) -> BinaryIO:
+    """Extract the content of the MTOM attachment in a SOAP response"""
+    _envelope, content = read_attachment([soap_response_body])
+    return content
 
 
 def make_soap_envelope(
@@ -166,6 +146,10 @@ def make_soap_envelope(
     source_folder_id: Optional[str] = None,
     target_folder_id: Optional[str] = None,
     continue_on_failure: Optional[str] = None,
+    source_id: Optional[str] = None,
+    max_items: Optional[str] = None,
+    skip_count: Optional[str] = None,
+    path: Optional[str] = None,
 ) -> minidom.Document:
     """Create SOAP envelope from data provided
 
@@ -184,6 +168,10 @@ def make_soap_envelope(
     :param source_folder_id: str, folder objectId from which to copy a document
     :param target_folder_id: str, folder objectId to which to copy a document
     :param continue_on_failure: str, whether to continue deleting after an error in the deleteTree call
+    :param source_id: str, objectId of the document to copy with createDocumentFromSource
+    :param max_items: str, maximum number of results of a query to return
+    :param skip_count: str, number of results of a query to skip
+    :param path: str, path of the object to retrieve with getObjectByPath
     :return: minidom document
     """
 
@@ -274,6 +262,20 @@ def make_soap_envelope(
         repo_element.appendChild(repo_text)
         action_element.appendChild(repo_element)
 
+    # Source document, precedes the properties
+    if source_id is not None:
+        source_element = xml_doc.createElement("ns:sourceId")
+        source_text = xml_doc.createTextNode(str(source_id))
+        source_element.appendChild(source_text)
+        action_element.appendChild(source_element)
+
+    # Path of the object, relative to the root folder
+    if path is not None:
+        path_element = xml_doc.createElement("ns:path")
+        path_text = xml_doc.createTextNode(path)
+        path_element.appendChild(path_text)
+        action_element.appendChild(path_element)
+
     # All the properties
     if properties is not None:
         properties_element = xml_doc.createElement("ns:properties")
@@ -296,6 +298,19 @@ def make_soap_envelope(
         query_element.appendChild(query_text)
         action_element.appendChild(query_element)
 
+    # Paging of the query results
+    if max_items is not None:
+        max_items_element = xml_doc.createElement("ns:maxItems")
+        max_items_text = xml_doc.createTextNode(max_items)
+        max_items_element.appendChild(max_items_text)
+        action_element.appendChild(max_items_element)
+
+    if skip_count is not None:
+        skip_count_element = xml_doc.createElement("ns:skipCount")
+        skip_count_text = xml_doc.createTextNode(skip_count)
+        skip_count_element.appendChild(skip_count_text)
+        action_element.appendChild(skip_count_element)
+
     body_element.appendChild(action_element)
 
     # Folder ID
@@ -374,6 +389,7 @@ def make_soap_envelope(
     return xml_doc
 
 
+@measure_parsing
 def extract_xml_from_soap(soap_response, binary=False):
     soap_envelope_start = "<soap:Envelope"
     soap_envelope_end = "</soap:Envelope>"
@@ -400,46 +416,123 @@ class URLTooLongException(Exception):
     pass
 
 
-def shrink_url(long_url: str) -> str:
-    """Replace patterns in the long URL with the shorter one in the mapping"""
-    matching_pattern = find_matching_pattern(long_url, "long_pattern")
-    mapping = UrlMapping.objects.get(long_pattern=matching_pattern)
+class UrlMappings:
+    """
+    The URL mappings of a configuration snapshot, compiled for fast lookups.
+    """
+
+    def __init__(self, url_mappings: Tuple[Tuple[str, str], ...]):
+        self.long_to_short = dict(url_mappings)
+        self.short_to_long = {short: long for long, short in url_mappings}
+        self.matchers = {
+            "long_pattern": PatternMatcher(self.long_to_short),
+            "short_pattern": PatternMatcher(self.short_to_long),
+        }
+
+
+_url_mappings = None
+
+
+def get_url_mappings(snapshot: Optional[ConfigSnapshot] = None) -> UrlMappings:
+    """Return the compiled URL mappings, rebuilt whenever the configuration changes
+
+    :param snapshot: the configuration snapshot to take the URL mappings from.
+        Defaults to the current snapshot, which may have to be loaded from the
+        database.
+    """
+    global _url_mappings
+
+    if snapshot is None:
+        snapshot = get_config_snapshot()
+    compiled = _url_mappings
+    if compiled is None or compiled[0] != snapshot.version:
+        compiled = _url_mappings = (
+            snapshot.version,
+            UrlMappings(snapshot.url_mappings),
+        )
+    return compiled[1]
+
+
+def _shrink_url(long_url: str, url_mappings: UrlMappings) -> str:
+    matching_pattern = _find_matching_pattern(long_url, "long_pattern", url_mappings)
+    short_pattern = url_mappings.long_to_short[matching_pattern]
 
-    short_url = long_url.replace(mapping.long_pattern, mapping.short_pattern)
+    short_url = long_url.replace(matching_pattern, short_pattern)
 
     if len(short_url) > 100:
         raise URLTooLongException
 
-    return long_url.replace(mapping.long_pattern, mapping.short_pattern)
+    return short_url
 
 
-def expand_url(short_url: str) -> str:
-    """Replace patterns in the short URL with the longer one in the mapping"""
+def _expand_url(short_url: str, url_mappings: UrlMappings) -> str:
+    matching_pattern = _find_matching_pattern(short_url, "short_pattern", url_mappings)
+    long_pattern = url_mappings.short_to_long[matching_pattern]
 
-    matching_pattern = find_matching_pattern(short_url, "short_pattern")
-    mapping = UrlMapping.objects.get(short_pattern=matching_pattern)
+    return short_url.replace(matching_pattern, long_pattern)
 
-    return short_url.replace(mapping.short_pattern, mapping.long_pattern)
 
+def _find_matching_pattern(url: str, field: str, url_mappings: UrlMappings) -> str:
+    matching_pattern = url_mappings.matchers[field].find(url)
+    if matching_pattern is None:
+        raise NoURLMappingException
+    return matching_pattern
 
-def find_matching_pattern(url: str, field: str = None) -> str:
-    from drc_cmis.models import CMISConfig
 
-    if field is None:
-        field = "long_pattern"
+def shrink_url(long_url: str, snapshot: Optional[ConfigSnapshot] = None) -> str:
+    """Replace patterns in the long URL with the shorter one in the mapping"""
+    return _shrink_url(long_url, get_url_mappings(snapshot))
 
-    config = CMISConfig.get_solo()
 
-    patterns = config.urlmapping_set.values_list(field, flat=True)
+def expand_url(short_url: str, snapshot: Optional[ConfigSnapshot] = None) -> str:
+    """Replace patterns in the short URL with the longer one in the mapping"""
+    return _expand_url(short_url, get_url_mappings(snapshot))
+
+
+def shrink_urls(
+    long_urls: Iterable[str], snapshot: Optional[ConfigSnapshot] = None
+) -> List[str]:
+    """Shrink several URLs at once, using the same URL mappings for all of them"""
+    long_urls = list(long_urls)
+    url_mappings = get_url_mappings(snapshot)
+    shrunk = {}
+    for long_url in long_urls:
+        if long_url not in shrunk:
+            shrunk[long_url] = _shrink_url(long_url, url_mappings)
+    return [shrunk[long_url] for long_url in long_urls]
+
+
+def expand_urls(
+    short_urls: Iterable[str],
+    skip_unmapped: bool = False,
+    snapshot: Optional[ConfigSnapshot] = None,
+) -> List[Optional[str]]:
+    """Expand several URLs at once, using the same URL mappings for all of them
+
+    :param short_urls: the URLs to expand
+    :param skip_unmapped: return ``None`` for URLs without a matching mapping, rather
+    than raising :class:`NoURLMappingException`
+    :param snapshot: the configuration snapshot with the URL mappings, see
+        :func:`get_url_mappings`
+    :return: list with the expanded URLs, in the same order
+    """
+    short_urls = list(short_urls)
+    url_mappings = get_url_mappings(snapshot)
+    expanded = {}
+    for short_url in short_urls:
+        if short_url in expanded:
+            continue
+        try:
+            expanded[short_url] = _expand_url(short_url, url_mappings)
+        except NoURLMappingException:
+            if not skip_unmapped:
+                raise
+            expanded[short_url] = None
+    return [expanded[short_url] for short_url in short_urls]
 
-    matching_patterns = []
-    for pattern in patterns:
-        if pattern in url:
-            matching_patterns.append(pattern)
 
-    if len(matching_patterns) == 0:
-        raise NoURLMappingException
-    elif len(matching_patterns) > 1:
-        return sorted(matching_patterns, key=len, reverse=True)[0]
-    else:
-        return matching_patterns[0]
+def find_matching_pattern(url: str, field: str = None) -> str:
+    """Return the longest (long or short) pattern of the URL mappings occurring in the URL"""
+    if field is None:
+        field = "long_pattern"
+    return _find_matching_pattern(url, field, get_url_mappings())
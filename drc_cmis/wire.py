@@ -0,0 +1,98 @@
+"""
+Logging of the messages exchanged with the DMS.
+
+The messages are logged at ``DEBUG`` level on the ``drc_cmis.wire`` logger. They
+are wrapped in :class:`PrettyXML`, which is only formatted when a handler
+actually emits the record, so that the pretty-printing costs nothing when the
+logger is disabled.
+
+Enable it in the ``LOGGING`` setting, for example:
+
+.. code-block:: python
+
+    "loggers": {
+        "drc_cmis.wire": {"handlers": ["console"], "level": "DEBUG"},
+    }
+"""
+
+import logging
+import re
+from typing import Union
+from xml.dom import minidom
+from xml.parsers.expat import ExpatError
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_SIZE = 64 * 1024
+
+REDACTED = "********"
+
+PASSWORD_RE = re.compile(r"(<(?:\w+:)?Password\b[^>]*>)[^<]*(</(?:\w+:)?Password>)")
+
+# the SOAP envelope within a (multipart) message
+ENVELOPE_RE = re.compile(rb"<(\w+:)?Envelope\b.*</\1Envelope>", re.DOTALL)
+
+
+def get_max_size() -> Union[int, None]:
+    return getattr(settings, "CMIS_WIRE_LOG_MAX_SIZE", DEFAULT_MAX_SIZE)
+
+
+def redact(xml: str) -> str:
+    """Hide the WS-Security password in the XML"""
+    return PASSWORD_RE.sub(rf"\g<1>{REDACTED}\g<2>", xml)
+
+
+def truncate(text: str, max_size: Union[int, None]) -> str:
+    if max_size is None or len(text) <= max_size:
+        return text
+    return f"{text[:max_size]}... ({len(text) - max_size} more characters)"
+
+
+class PrettyXML:
+    """
+    XML to log, pretty-printed once it is formatted.
+
+    If the XML is part of a multipart message, only the SOAP envelope is logged.
+
+    :param xml: a string, bytes, or an object with a ``toxml()`` method, like a
+        SOAP envelope.
+    """
+
+    def __init__(self, xml):
+        self.xml = xml
+
+    def __str__(self):
+        xml = self.xml
+        if hasattr(xml, "toxml"):
+            xml = xml.toxml()
+        if isinstance(xml, str):
+            xml = xml.encode("utf-8")
+
+        envelope = ENVELOPE_RE.search(xml)
+        if envelope is not None:
+            xml = envelope.group(0)
+        xml = xml.decode("utf-8", errors="replace")
+
+        xml = redact(xml)
+        max_size = get_max_size()
+        # don't bother parsing messages that will be truncated anyway
+        if max_size is None or len(xml) <= max_size:
+            try:
+                xml = minidom.parseString(xml).toprettyxml()
+            except ExpatError:
+                pass
+
+        return truncate(xml, max_size)
+
+
+def log_request(url: str, soap_envelope) -> None:
+    """Log the SOAP envelope sent to the DMS"""
+    logger.debug("Request to %s:\n%s", url, PrettyXML(soap_envelope))
+
+
+def log_response(url: str, status_code: int, body: Union[str, bytes]) -> None:
+    """Log the SOAP envelope in a response of the DMS"""
+    logger.debug("Response (%s) from %s:\n%s", status_code, url, PrettyXML(body))
@@ -1,5 +1,6 @@
 import os
 
+from drc_cmis.cache import invalidate_config
 from drc_cmis.client_builder import get_cmis_client
 from drc_cmis.models import CMISConfig, Vendor
 
@@ -34,6 +35,8 @@ class DMSMixin:
 
     def setUp(self):
         super().setUp()
+        # the transaction rollback of the previous test does not send any signals
+        invalidate_config()
         self.cmis_client = get_cmis_client()
         self.cmis_client.delete_cmis_folders_in_base()
 
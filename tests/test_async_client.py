@@ -0,0 +1,323 @@
+import io
+import os
+from urllib.parse import parse_qs, unquote
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+import httpx
+from asgiref.sync import async_to_sync
+
+from drc_cmis.browser.async_client import AsyncCMISDRCClient
+from drc_cmis.cache import invalidate_config
+from drc_cmis.models import CMISConfig, UrlMapping
+from drc_cmis.utils.exceptions import DocumentExistsError
+from drc_cmis.webservice.async_client import AsyncSOAPCMISClient
+
+from .test_copy import CONTENT, document_properties
+from .test_folder_cache import BASE_URL, CACHES, folder_json
+from .test_mtom import RESPONSE_CONTENT_TYPE, make_response
+
+RESPONSES_DIR = os.path.join(os.path.dirname(__file__), "responses")
+
+SOAP_BASE_URL = "http://dms.local/alfresco/cmisws"
+
+SOAP_REPOSITORY_INFO = (
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<soap:Body><getRepositoryInfoResponse "
+    'xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/" '
+    'xmlns:ns2="http://docs.oasis-open.org/ns/cmis/core/200908/">'
+    "<repositoryInfo><ns2:repositoryId>repo</ns2:repositoryId>"
+    "<ns2:vendorName>Alfresco</ns2:vendorName></repositoryInfo>"
+    "<ns2:rootFolderId>workspace://root</ns2:rootFolderId>"
+    "</getRepositoryInfoResponse></soap:Body></soap:Envelope>"
+)
+
+SOAP_EMPTY_QUERY = (
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<soap:Body><queryResponse><objects>"
+    "<hasMoreItems>false</hasMoreItems><numItems>0</numItems>"
+    "</objects></queryResponse></soap:Body></soap:Envelope>"
+)
+
+
+def read_response(name: str) -> str:
+    with open(os.path.join(RESPONSES_DIR, name)) as response_file:
+        return response_file.read()
+
+
+class AsyncClientTestMixin:
+    """Runs the client against a ``httpx.MockTransport`` that calls :meth:`respond`"""
+
+    client_class = None
+
+    def setUp(self):
+        super().setUp()
+        caches["cmis"].clear()
+        self.addCleanup(caches["cmis"].clear)
+        invalidate_config()
+        self.requests = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await request.aread()
+            self.requests.append(request)
+            return self.respond(request)
+
+        http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.addCleanup(async_to_sync(http_client.aclose))
+        self.client = self.client_class(http_client=http_client)
+
+    def respond(self, request: httpx.Request) -> httpx.Response:
+        raise NotImplementedError
+
+    def run(self, result=None):
+        with override_settings(CACHES=CACHES, CMIS_CACHE="cmis"):
+            return super().run(result)
+
+
+class AsyncBrowserClientTests(AsyncClientTestMixin, TestCase):
+    client_class = AsyncCMISDRCClient
+
+    def setUp(self):
+        super().setUp()
+        CMISConfig.objects.create(client_url=BASE_URL, binding="BROWSER")
+        self.content_response = httpx.Response(200, content=CONTENT)
+        self.documents = [document_properties("workspace://1;1.0")]
+
+    def respond(self, request):
+        if request.method == "GET":
+            if str(request.url) == BASE_URL:
+                return httpx.Response(
+                    200,
+                    json={
+                        "-default-": {"vendorName": "Alfresco", "rootFolderId": "root"}
+                    },
+                )
+            if request.url.params.get("cmisaction") == "content":
+                return self.content_response
+            path = unquote(request.url.path.split("/browser/root", 1)[1])
+            return httpx.Response(200, json=folder_json(path, path.split("/")[-1]))
+
+        if request.headers["Content-Type"].startswith("multipart/form-data"):
+            return httpx.Response(
+                200, json={"properties": document_properties("workspace://1;1.0")}
+            )
+
+        data = self.form_data(request)
+        if data["cmisaction"] == "query":
+            return httpx.Response(
+                200,
+                json={
+                    "results": [{"properties": props} for props in self.documents],
+                    "hasMoreItems": False,
+                    "numItems": len(self.documents),
+                },
+            )
+        if data["cmisaction"] == "checkOut":
+            return httpx.Response(
+                200,
+                json={
+                    "properties": document_properties(
+                        "workspace://1;pwc",
+                        **{"drc:document__lock": {"value": "", "type": "string"}},
+                    )
+                },
+            )
+        return httpx.Response(
+            200, json={"properties": document_properties(data["objectId"])}
+        )
+
+    @staticmethod
+    def form_data(request: httpx.Request) -> dict:
+        return {
+            key: value[0] for key, value in parse_qs(request.content.decode()).items()
+        }
+
+    def test_prepare(self):
+        async_to_sync(self.client.prepare)()
+        async_to_sync(self.client.prepare)()
+
+        self.assertEqual(self.client.vendor, "Alfresco")
+        self.assertEqual(self.client.root_folder_id, "root")
+        # the repository info is fetched once
+        self.assertEqual(len(self.requests), 1)
+
+    def test_query(self):
+        documents = async_to_sync(self.client.query)(
+            "Document", lhs=["drc:document__titel = '%s'"], rhs=["Document"]
+        )
+
+        self.assertEqual(
+            [document.objectId for document in documents], ["workspace://1;1.0"]
+        )
+        self.assertEqual(
+            self.form_data(self.requests[-1])["statement"],
+            "SELECT * FROM drc:document WHERE drc:document__titel = 'Document'",
+        )
+
+    def test_create_document(self):
+        self.documents = []
+
+        document = async_to_sync(self.client.create_document)(
+            identification="DOC-1",
+            bronorganisatie="159351741",
+            data={"titel": "Document", "bestandsnaam": "document.txt"},
+            content=io.BytesIO(CONTENT),
+        )
+
+        self.assertEqual(document.objectId, "workspace://1;1.0")
+        create_request = self.form_data(self.requests[-2])
+        self.assertEqual(create_request["cmisaction"], "createDocument")
+        self.assertTrue(create_request["objectId"].startswith("/DRC/"))
+        self.assertIn(CONTENT, self.requests[-1].content)
+
+    def test_create_existing_document(self):
+        with self.assertRaises(DocumentExistsError):
+            async_to_sync(self.client.create_document)(
+                identification="DOC-1", bronorganisatie="159351741", data={}
+            )
+
+    def test_get_content_stream_range(self):
+        document = self.client.document_type({"properties": self.documents[0]})
+
+        # the DMS ignores the range
+        with async_to_sync(self.client.get_content_stream)(
+            document, byte_range=(5, 8)
+        ) as content:
+            self.assertEqual(content.read(), CONTENT[5:9])
+
+        self.assertEqual(self.requests[-1].headers["Range"], "bytes=5-8")
+
+    def test_lock_document(self):
+        async_to_sync(self.client.lock_document)(
+            "4bb6f4c4-8a2c-4a5b-9a5c-2c7a5b8e4f11", "lock-value"
+        )
+
+        checkout, update = map(self.form_data, self.requests[-2:])
+        self.assertEqual(checkout["cmisaction"], "checkOut")
+        self.assertEqual(update["cmisaction"], "update")
+        self.assertEqual(update["objectId"], "workspace://1;pwc")
+        self.assertIn("lock-value", update.values())
+
+
+class AsyncSOAPClientTests(AsyncClientTestMixin, TestCase):
+    client_class = AsyncSOAPCMISClient
+
+    def setUp(self):
+        super().setUp()
+        self.config = CMISConfig.objects.create(
+            client_url=SOAP_BASE_URL, binding="WEBSERVICE", main_repo_id="repo"
+        )
+
+    def respond(self, request):
+        body = request.content.decode("utf-8", errors="replace")
+        if "<ns:getRepositoryInfo>" in body:
+            return httpx.Response(200, text=SOAP_REPOSITORY_INFO)
+        if "<ns:query>" in body:
+            return httpx.Response(200, text=SOAP_EMPTY_QUERY)
+        if "<ns:createDocument>" in body:
+            return httpx.Response(
+                200, text=read_response("alfresco-soap-create-document.xml")
+            )
+        if "<ns:getObject>" in body:
+            return httpx.Response(
+                200, text=read_response("alfresco-soap-get-object.xml")
+            )
+        if "<ns:getContentStream>" in body:
+            return httpx.Response(
+                200,
+                content=make_response(CONTENT),
+                headers={"Content-Type": RESPONSE_CONTENT_TYPE},
+            )
+        return httpx.Response(500, text=f"unexpected request: {body}")
+
+    def test_prepare(self):
+        async_to_sync(self.client.prepare)()
+
+        self.assertEqual(self.client.vendor, "Alfresco")
+        self.assertEqual(self.client.root_folder_id, "workspace://root")
+        self.assertEqual(
+            str(self.requests[0].url), f"{SOAP_BASE_URL}/RepositoryService"
+        )
+
+    def test_query(self):
+        documents = async_to_sync(self.client.query)(
+            "Document", lhs=["drc:document__titel = '%s'"], rhs=["Document"]
+        )
+
+        self.assertEqual(documents, [])
+        self.assertIn(
+            "<ns:statement>SELECT * FROM drc:document "
+            "WHERE drc:document__titel = 'Document'</ns:statement>",
+            self.requests[-1].content.decode(),
+        )
+
+    def test_create_document(self):
+        folder = self.client.folder_type(
+            {"properties": {"objectId": {"value": "workspace://folder"}}}
+        )
+
+        document = async_to_sync(self.client.create_document)(
+            identification="DOC-1",
+            bronorganisatie="159351741",
+            data={"titel": "Document", "bestandsnaam": "document.txt"},
+            content=io.BytesIO(CONTENT),
+            folder=folder,
+        )
+
+        self.assertEqual(document.uuid, "8e2b8f4a-57b5-4c0a-9c3f-2b9bd5f10001")
+        create_request = self.requests[-2].content
+        self.assertIn(b"<ns:folderId>workspace://folder</ns:folderId>", create_request)
+        self.assertIn(CONTENT, create_request)
+
+    def test_get_content_stream(self):
+        document = async_to_sync(self.client.get_object)("workspace://1")
+
+        with async_to_sync(self.client.get_content_stream)(document) as content:
+            self.assertEqual(content.read(), CONTENT)
+
+        self.assertEqual(str(self.requests[-1].url), f"{SOAP_BASE_URL}/ObjectService")
+
+    @override_settings(CMIS_URL_MAPPING_ENABLED=True, CMIS_CONFIG_CACHE_TTL=0)
+    def test_expired_snapshot_is_not_reloaded_in_the_event_loop(self):
+        # the snapshot expires right after prepare(): loading it again in the event
+        # loop would raise SynchronousOnlyOperation
+        UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/catalogi/",
+            short_pattern="https://oz.nl/",
+            config=self.config,
+        )
+        informatieobjecttype = (
+            "https://openzaak.utrechtproeftuin.nl/catalogi/informatieobjecttypen/1"
+        )
+        folder = self.client.folder_type(
+            {"properties": {"objectId": {"value": "workspace://folder"}}}
+        )
+
+        document = async_to_sync(self.client.create_document)(
+            identification="DOC-1",
+            bronorganisatie="159351741",
+            data={
+                "titel": "Document",
+                "informatieobjecttype": informatieobjecttype,
+            },
+            folder=folder,
+        )
+
+        self.assertEqual(document.uuid, "8e2b8f4a-57b5-4c0a-9c3f-2b9bd5f10001")
+        self.assertIn(
+            b"https://oz.nl/informatieobjecttypen/1</ns1:value>",
+            self.requests[-2].content,
+        )
+
+        async_to_sync(self.client.query)(
+            "Document",
+            lhs=["drc:document__informatieobjecttype = '%s'"],
+            rhs=[informatieobjecttype],
+        )
+
+        self.assertIn(
+            b"WHERE drc:document__informatieobjecttype = "
+            b"'https://oz.nl/informatieobjecttypen/1'</ns:statement>",
+            self.requests[-1].content,
+        )
@@ -0,0 +1,253 @@
+import re
+import threading
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import requests_mock
+from freezegun import freeze_time
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.cache import invalidate_config
+from drc_cmis.models import CMISConfig, UrlMapping
+from drc_cmis.utils.bulk import NewDocument, iter_batches
+from drc_cmis.utils.exceptions import DocumentExistsError
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import Folder as SOAPFolder
+
+from .test_copy import JSON_HEADERS, document_properties
+from .test_decoder import read_response
+from .test_folder_cache import BASE_URL, CACHES, folder_json
+
+
+class IterBatchesTests(SimpleTestCase):
+    def test_batches(self):
+        self.assertEqual(
+            list(iter_batches(range(5), 2)),
+            [[0, 1], [2, 3], [4]],
+        )
+
+    def test_items_are_read_lazily(self):
+        batches = iter_batches(iter(range(5)), 2)
+
+        self.assertEqual(next(batches), [0, 1])
+
+
+@freeze_time("2026-10-17T12:00:00Z")
+@override_settings(CACHES=CACHES, CMIS_CACHE="cmis", CMIS_BULK_BATCH_SIZE=3)
+@requests_mock.Mocker()
+class BrowserCreateDocumentsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["cmis"].clear()
+        self.addCleanup(caches["cmis"].clear)
+        invalidate_config()
+        CMISConfig.objects.create(client_url=BASE_URL, binding="BROWSER")
+        self.client = CMISDRCClient()
+        self.client._repository_info = {
+            "vendorName": "Alfresco",
+            "rootFolderId": "root",
+        }
+        # load the configuration, which the threads share
+        self.client.config
+
+        self.created = []
+        self.statements = []
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def dms_response(self, request, context):
+        if request.headers["Content-Type"].startswith("multipart/form-data"):
+            return {"properties": document_properties("workspace://1;1.0")}
+
+        data = {key: value[0] for key, value in parse_qs(request.text).items()}
+        if data["cmisaction"] == "query":
+            self.statements.append(data["statement"])
+            existing = document_properties(
+                "workspace://2;1.0",
+                **{
+                    "drc:document__identificatie": {
+                        "value": "DOC-2",
+                        "type": "string",
+                    },
+                    "drc:document__bronorganisatie": {
+                        "value": "123456782",
+                        "type": "string",
+                    },
+                },
+            )
+            results = (
+                [{"properties": existing}] if "'DOC-2'" in data["statement"] else []
+            )
+            return {"results": results, "numItems": len(results), "hasMoreItems": False}
+
+        assert data["cmisaction"] == "createDocument"
+        assert data["objectId"] == "root/DRC/2026/10/17"
+        with self.lock:
+            self.created.append(data)
+            self.threads.add(threading.current_thread())
+        return {"properties": document_properties(f"workspace://{len(self.created)}")}
+
+    def mock_dms(self, m):
+        m.post(BASE_URL, json=self.dms_response, headers=JSON_HEADERS)
+        m.post(f"{BASE_URL}/root", json=self.dms_response, headers=JSON_HEADERS)
+        m.get(
+            re.compile(f"{BASE_URL}/root/"),
+            json=folder_json("root/DRC/2026/10/17", "17"),
+            headers=JSON_HEADERS,
+        )
+
+    def test_create_documents(self, m):
+        self.mock_dms(m)
+        documents = [
+            NewDocument(f"DOC-{index}", "123456782", {"titel": f"Document {index}"})
+            for index in range(1, 6)
+        ]
+        # the same document twice in the input
+        documents.append(documents[0])
+
+        results = list(self.client.create_documents(documents, max_workers=2))
+
+        self.assertEqual(sorted(result.index for result in results), list(range(6)))
+        failed = sorted(result.index for result in results if not result.ok)
+        self.assertEqual(failed, [1, 5])
+        for result in results:
+            if not result.ok:
+                self.assertIsInstance(result.error, DocumentExistsError)
+                self.assertIsNone(result.document)
+        self.assertEqual(len(self.created), 4)
+
+        # one query per batch of documents
+        self.assertEqual(len(self.statements), 2)
+        self.assertIn(
+            "drc:document__identificatie IN ('DOC-1', 'DOC-2', 'DOC-3')",
+            self.statements[0],
+        )
+        # the folder is resolved once
+        self.assertEqual(
+            len([request for request in m.request_history if request.method == "GET"]),
+            1,
+        )
+        # the documents are created in the worker threads
+        self.assertNotIn(threading.current_thread(), self.threads)
+
+    def test_errors_are_reported_per_document(self, m):
+        self.mock_dms(m)
+        documents = [
+            NewDocument("DOC-1", "123456782", {"titel": "Document"}),
+            # no title
+            NewDocument("DOC-3", "123456782", {}),
+        ]
+
+        results = sorted(self.client.create_documents(documents))
+
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].document.objectId, "workspace://1;1.0")
+        self.assertIsInstance(results[1].error, KeyError)
+
+    def test_folder_deleted_during_creation(self, m):
+        self.mock_dms(m)
+        responses = [
+            {
+                "json": {"exception": "objectNotFound", "message": "17"},
+                "status_code": 404,
+                "headers": JSON_HEADERS,
+            },
+            {"json": self.dms_response, "headers": JSON_HEADERS},
+        ]
+        m.post(
+            f"{BASE_URL}/root",
+            additional_matcher=lambda request: "createDocument" in request.text,
+            response_list=responses,
+        )
+        documents = [
+            NewDocument(f"DOC-{index}", "123456782", {"titel": "Document"})
+            for index in (1, 3)
+        ]
+
+        results = list(self.client.create_documents(documents, max_workers=1))
+
+        self.assertTrue(all(result.ok for result in results))
+        # the folder is resolved again once, for the retry
+        self.assertEqual(
+            len([request for request in m.request_history if request.method == "GET"]),
+            2,
+        )
+
+
+@override_settings(CMIS_URL_MAPPING_ENABLED=True, CMIS_BULK_BATCH_SIZE=3)
+class SOAPCreateDocumentsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        config = CMISConfig.objects.create(
+            client_url="http://dms.local/alfresco/cmisws", binding="WEBSERVICE"
+        )
+        UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/catalogi/",
+            short_pattern="https://oz.nl/",
+            config=config,
+        )
+        self.client = SOAPCMISClient()
+        self.client._main_repo_id = "repo"
+        self.client._repository_info = {"vendorName": "Alfresco"}
+        self.folder = SOAPFolder(
+            {"properties": {"cmis:objectId": {"value": "workspace://folder"}}}
+        )
+        self.statements = []
+
+    def dms_response(self, path, soap_envelope, attachments=None):
+        if "<ns:query>" in soap_envelope:
+            self.statements.append(
+                soap_envelope.split("<ns:statement>")[1].split("</ns:statement>")[0]
+            )
+            return (
+                '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+                "<soap:Body><queryResponse><objects><hasMoreItems>false</hasMoreItems>"
+                "<numItems>0</numItems></objects></queryResponse></soap:Body>"
+                "</soap:Envelope>"
+            )
+        if "<ns:createDocument>" in soap_envelope:
+            return read_response("alfresco-soap-create-document.xml")
+        return read_response("alfresco-soap-get-object.xml")
+
+    def test_create_documents(self):
+        documents = [
+            NewDocument(f"DOC-{index}", "123456782", {"titel": f"Document {index}"})
+            for index in range(1, 4)
+        ]
+
+        with patch.object(
+            SOAPCMISClient, "request", side_effect=self.dms_response
+        ), patch.object(
+            SOAPCMISClient, "get_or_create_other_folder", return_value=self.folder
+        ):
+            results = list(self.client.create_documents(documents, max_workers=2))
+
+        self.assertEqual([result.error for result in results], [None] * 3)
+        self.assertIn(
+            "drc:document__identificatie IN ('DOC-1', 'DOC-2', 'DOC-3')",
+            self.statements[0],
+        )
+
+    def test_query_statement_shrinks_url_placeholders_only(self):
+        statement = self.client.build_query_statement(
+            "document",
+            lhs=[
+                "drc:document__identificatie IN ('%s', '%s')",
+                "drc:document__informatieobjecttype = '%s'",
+            ],
+            rhs=[
+                "DOC-1",
+                "DOC-2",
+                "https://openzaak.utrechtproeftuin.nl/catalogi/api/v1/iot/1",
+            ],
+        )
+
+        self.assertIn(
+            "drc:document__identificatie IN ('DOC-1', 'DOC-2') AND "
+            "drc:document__informatieobjecttype = 'https://oz.nl/api/v1/iot/1'",
+            statement,
+        )
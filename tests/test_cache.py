@@ -0,0 +1,53 @@
+from django.test import TestCase, override_settings
+
+from drc_cmis.cache import get_config, get_config_snapshot, invalidate_config
+from drc_cmis.models import CMISConfig, UrlMapping
+
+
+class ConfigCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+
+    def test_snapshot_is_reused(self):
+        snapshot = get_config_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_config_snapshot(), snapshot)
+            self.assertIs(get_config(), snapshot.config)
+
+    def test_save_config_invalidates_snapshot(self):
+        snapshot = get_config_snapshot()
+
+        config = CMISConfig.get_solo()
+        config.zaak_folder_path = "/{{ zaaktype }}/"
+        config.save()
+
+        new_snapshot = get_config_snapshot()
+        self.assertGreater(new_snapshot.version, snapshot.version)
+        self.assertEqual(new_snapshot.config.zaak_folder_path, "/{{ zaaktype }}/")
+
+    def test_url_mapping_changes_invalidate_snapshot(self):
+        config = CMISConfig.get_solo()
+        self.assertEqual(get_config_snapshot().url_mappings, ())
+
+        mapping = UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/zaken/",
+            short_pattern="https://oz.nl/",
+            config=config,
+        )
+        self.assertEqual(
+            get_config_snapshot().url_mappings,
+            (("https://openzaak.utrechtproeftuin.nl/zaken/", "https://oz.nl/"),),
+        )
+
+        mapping.delete()
+        self.assertEqual(get_config_snapshot().url_mappings, ())
+
+    @override_settings(CMIS_CONFIG_CACHE_TTL=0)
+    def test_expired_snapshot_is_reloaded(self):
+        snapshot = get_config_snapshot()
+
+        new_snapshot = get_config_snapshot()
+
+        self.assertGreater(new_snapshot.version, snapshot.version)
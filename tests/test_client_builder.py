@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.browser.drc_document import Document as BrowserDocument
+from drc_cmis.cache import invalidate_config
+from drc_cmis.client_builder import get_cmis_client, get_shared_client
+from drc_cmis.models import CMISConfig
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import (
+    Document as SOAPDocument,
+    Folder as SOAPFolder,
+)
+
+
+class SharedClientTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+
+    def test_client_is_shared_within_thread(self):
+        CMISConfig.objects.create(binding="WEBSERVICE")
+
+        client = get_cmis_client()
+
+        self.assertIsInstance(client, SOAPCMISClient)
+        self.assertIs(get_cmis_client(), client)
+
+    def test_client_is_not_shared_between_threads(self):
+        client = get_shared_client(CMISDRCClient)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_client = executor.submit(get_shared_client, CMISDRCClient).result()
+
+        self.assertIsNot(other_client, client)
+
+    def test_new_client_after_config_change(self):
+        client = get_shared_client(SOAPCMISClient)
+
+        config = CMISConfig.get_solo()
+        config.client_url = "http://localhost:8082/alfresco/cmisws"
+        config.save()
+
+        self.assertIsNot(get_shared_client(SOAPCMISClient), client)
+
+    def test_objects_use_given_client(self):
+        soap_client = SOAPCMISClient()
+        browser_client = CMISDRCClient()
+
+        soap_document = SOAPDocument({"properties": {}}, client=soap_client)
+        browser_document = BrowserDocument({"properties": {}}, client=browser_client)
+
+        self.assertIs(soap_document.client, soap_client)
+        self.assertIs(browser_document.client, browser_client)
+
+    def test_objects_default_to_shared_client(self):
+        soap_document = SOAPDocument({"properties": {}})
+        browser_document = BrowserDocument({"properties": {}})
+
+        self.assertIs(soap_document.client, get_shared_client(SOAPCMISClient))
+        self.assertIs(browser_document.client, get_shared_client(CMISDRCClient))
+
+    def test_queried_folders_use_client_of_folder(self):
+        client = MagicMock()
+        folder = SOAPFolder(
+            {"properties": {"cmis:objectId": {"value": "workspace://1"}}},
+            client=client,
+        )
+        children = [{"properties": {"cmis:name": {"value": "child"}}}]
+
+        with patch("drc_cmis.webservice.drc_document.extract_xml_from_soap"), patch(
+            "drc_cmis.webservice.drc_document.extract_object_properties_from_xml",
+            return_value=children,
+        ):
+            child_folders = folder.get_children_folders()
+            child_folder = folder.get_child_folder("child")
+
+        self.assertIs(child_folders[0].client, client)
+        self.assertIs(child_folder.client, client)
@@ -1,6 +1,16 @@
+import socket
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
-from drc_cmis.connections import get_session, use_cmis_connection_pool
+from django.test import override_settings
+
+from drc_cmis.connections import (
+    DEFAULT_CONNECTION_POOL,
+    ExpiringHTTPConnectionPool,
+    close_old_session,
+    get_session,
+    use_cmis_connection_pool,
+)
 
 
 def test_no_wrapped_block(requests_mock):
@@ -82,3 +92,109 @@ def test_closed_session_is_new_instance():
 
     session2 = get_session()
     assert session2 is not session1
+
+
+def test_connections_outlive_the_block(requests_mock):
+    requests_mock.get("https://example.com")
+
+    with use_cmis_connection_pool() as session1:
+        adapter = session1.get_adapter("https://example.com")
+        session1.get("https://example.com")
+
+    with patch.object(adapter.poolmanager, "clear") as mock_clear:
+        with use_cmis_connection_pool() as session2:
+            assert session2 is not session1
+            assert session2.get_adapter("https://example.com") is adapter
+
+        mock_clear.assert_not_called()
+
+
+def test_pool_is_shared_by_threads():
+    adapter = get_session().get_adapter("https://example.com")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        session = executor.submit(get_session).result()
+
+    assert session is not get_session()
+    assert session.get_adapter("https://example.com") is adapter
+
+
+@override_settings(
+    CMIS_CONNECTION_POOL={
+        "MAX_CONNECTIONS_PER_HOST": 64,
+        "KEEP_ALIVE_TIMEOUT": 5,
+        "MAX_CONNECTION_AGE": None,
+    }
+)
+def test_pool_settings():
+    close_old_session()
+    adapter = get_session().get_adapter("https://example.com")
+    pool = adapter.poolmanager.connection_from_url("https://example.com")
+
+    assert adapter._pool_connections == DEFAULT_CONNECTION_POOL["POOL_SIZE"]
+    assert adapter._pool_maxsize == 64
+    assert pool.pool.maxsize == 64
+    assert pool.keep_alive_timeout == 5
+    assert pool.max_connection_age is None
+
+    close_old_session()
+
+
+def test_setting_change_closes_connections():
+    adapter = get_session().get_adapter("https://example.com")
+
+    with patch.object(adapter.poolmanager, "clear") as mock_clear:
+        with override_settings(CMIS_CONNECTION_POOL={"POOL_SIZE": 1}):
+            mock_clear.assert_called_once()
+
+    close_old_session()
+    assert get_session().get_adapter("https://example.com") is not adapter
+
+
+class TestExpiringConnectionPool:
+    def get_connected(self, pool):
+        conn = pool._get_conn()
+        conn.sock, peer = socket.socketpair()
+        self.sockets += [conn.sock, peer]
+        return conn
+
+    def setup_method(self):
+        self.sockets = []
+        self.pool = ExpiringHTTPConnectionPool("dms.local", maxsize=1)
+        self.pool.keep_alive_timeout = 15
+        self.pool.max_connection_age = 300
+
+    def teardown_method(self):
+        self.pool.close()
+        for sock in self.sockets:
+            sock.close()
+
+    def test_connection_is_reused(self):
+        with patch("drc_cmis.connections.monotonic", return_value=100):
+            conn = self.get_connected(self.pool)
+            self.pool._put_conn(conn)
+
+        with patch("drc_cmis.connections.monotonic", return_value=110):
+            assert self.pool._get_conn() is conn
+            assert conn.sock is not None
+
+    def test_idle_connection_is_closed(self):
+        with patch("drc_cmis.connections.monotonic", return_value=100):
+            conn = self.get_connected(self.pool)
+            self.pool._put_conn(conn)
+
+        with patch("drc_cmis.connections.monotonic", return_value=116):
+            assert self.pool._get_conn() is conn
+            assert conn.sock is None
+            assert conn.cmis_connected_at == 116
+
+    def test_old_connection_is_closed(self):
+        with patch("drc_cmis.connections.monotonic", return_value=100):
+            conn = self.get_connected(self.pool)
+
+        for now in range(110, 420, 10):
+            with patch("drc_cmis.connections.monotonic", return_value=now):
+                self.pool._put_conn(conn)
+                assert self.pool._get_conn() is conn
+        assert conn.sock is None
+        assert conn.cmis_connected_at == 410
@@ -0,0 +1,260 @@
+import io
+from unittest.mock import patch
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler
+from django.http.multipartparser import MultiPartParser
+from django.test import SimpleTestCase, TestCase
+
+import requests_mock
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.browser.drc_document import Document, Folder
+from drc_cmis.browser.multipart import FormDataBody
+from drc_cmis.cache import invalidate_config
+from drc_cmis.models import CMISConfig
+from drc_cmis.utils.exceptions import CmisRuntimeException
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import (
+    Document as SOAPDocument,
+    Folder as SOAPFolder,
+)
+
+from .test_mtom import NonSeekableStream
+
+CONTENT = b"some file content"
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def document_properties(object_id: str, **properties) -> dict:
+    return {
+        "cmis:objectId": {"value": object_id, "type": "id"},
+        "cmis:objectTypeId": {"value": "D:drc:document", "type": "id"},
+        "cmis:name": {"value": "document", "type": "string"},
+        "drc:document__uuid": {
+            "value": "4bb6f4c4-8a2c-4a5b-9a5c-2c7a5b8e4f11",
+            "type": "string",
+        },
+        "drc:document__titel": {"value": "Document", "type": "string"},
+        "drc:document__bestandsnaam": {"value": "document.txt", "type": "string"},
+        "drc:document__auteur": {"value": "auteur", "type": "string"},
+        **properties,
+    }
+
+
+class FormDataBodyTests(SimpleTestCase):
+    def parse(self, body: FormDataBody):
+        content = b"".join(body)
+        meta = {"CONTENT_TYPE": body.content_type, "CONTENT_LENGTH": len(content)}
+        handlers = [MemoryFileUploadHandler()]
+        return MultiPartParser(meta, io.BytesIO(content), handlers).parse()
+
+    def test_body(self):
+        content = io.BytesIO(CONTENT)
+        content.read()
+
+        body = FormDataBody(
+            {"cmisaction": "setContent", "objectId": "workspace://1", "empty": None},
+            {'file "1".txt': ('file "1".txt', content, "text/plain")},
+        )
+
+        data, files = self.parse(body)
+        self.assertEqual(
+            data.dict(), {"cmisaction": "setContent", "objectId": "workspace://1"}
+        )
+        uploaded_file = files["file %221%22.txt"]
+        self.assertEqual(uploaded_file.name, "file %221%22.txt")
+        self.assertEqual(uploaded_file.content_type, "text/plain")
+        self.assertEqual(uploaded_file.read(), CONTENT)
+        self.assertEqual(body.len, len(b"".join(body)))
+
+    def test_unknown_size(self):
+        body = FormDataBody({}, {"file": ("file", NonSeekableStream(CONTENT))})
+
+        self.assertFalse(hasattr(body, "len"))
+        self.assertEqual(self.parse(body)[1]["file"].read(), CONTENT)
+
+
+@requests_mock.Mocker()
+class BrowserCopyDocumentTests(TestCase):
+    base_url = (
+        "http://dms.local/alfresco/api/-default-/public/cmis/versions/1.1/browser"
+    )
+    url = f"{base_url}/root"
+
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        CMISConfig.objects.create(client_url=self.base_url, binding="BROWSER")
+        self.client = CMISDRCClient()
+        self.document = Document(
+            {"properties": document_properties("workspace://1;1.0")}, client=self.client
+        )
+        self.folder = Folder(
+            {"properties": {"cmis:objectId": {"value": "workspace://2", "type": "id"}}},
+            client=self.client,
+        )
+        self.copy_json = {"properties": document_properties("workspace://3;1.0")}
+
+    def test_server_side_copy(self, m):
+        m.post(self.url, json=self.copy_json, headers=JSON_HEADERS)
+
+        copy = self.client.copy_document(self.document, self.folder)
+
+        self.assertEqual(copy.objectId, "workspace://3;1.0")
+        self.assertEqual(m.call_count, 1)
+        data = m.last_request.text
+        self.assertIn("cmisaction=createDocumentFromSource", data)
+        self.assertIn("sourceId=workspace%3A%2F%2F1%3B1.0", data)
+        self.assertIn("objectId=workspace%3A%2F%2F2", data)
+        self.assertIn("Document+-+copy", data)
+        # the other properties are copied by the DMS
+        self.assertNotIn("auteur", data)
+
+    def test_fallback_streams_content(self, m):
+        uploaded = []
+
+        def set_content(request, context):
+            # the body is read while the request is sent
+            uploaded.append(b"".join(request.body))
+            return self.copy_json
+
+        m.post(
+            self.url,
+            [
+                {"status_code": 405, "json": {"exception": "notSupported"}},
+                {"json": self.copy_json, "headers": JSON_HEADERS},
+                {"json": set_content, "headers": JSON_HEADERS},
+                {"json": self.copy_json, "headers": JSON_HEADERS},
+            ],
+        )
+        m.get(self.url, content=CONTENT)
+
+        copy = self.client.copy_document(self.document, self.folder)
+
+        self.assertEqual(copy.objectId, "workspace://3;1.0")
+        self.assertFalse(self.client.server_side_copy)
+        create_request, set_content_request = m.request_history[-2:]
+        self.assertIn("cmisaction=createDocument&", create_request.text)
+        self.assertIn("auteur", create_request.text)
+        self.assertIsInstance(set_content_request.body, FormDataBody)
+        self.assertIn(CONTENT, uploaded[0])
+
+        # the DMS is not asked to copy the document again
+        m.reset_mock()
+        self.client.copy_document(self.document, self.folder)
+
+        methods = [request.method for request in m.request_history]
+        self.assertEqual(methods, ["GET", "POST", "POST"])
+
+
+class SOAPCopyDocumentTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        CMISConfig.objects.create(
+            client_url="http://dms.local/alfresco/cmisws", binding="WEBSERVICE"
+        )
+        self.client = SOAPCMISClient()
+        self.client._main_repo_id = "repo"
+        self.document = SOAPDocument(
+            {"properties": document_properties("workspace://1;1.0")}, client=self.client
+        )
+        self.folder = SOAPFolder(
+            {"properties": {"cmis:objectId": {"value": "workspace://2", "type": "id"}}},
+            client=self.client,
+        )
+
+        patcher = patch.object(SOAPDocument, "get_document", side_effect=lambda id: id)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_server_side_copy(self):
+        response = (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            "<soap:Body><createDocumentFromSourceResponse>"
+            "<objectId>workspace://3;1.0</objectId>"
+            "</createDocumentFromSourceResponse></soap:Body></soap:Envelope>"
+        )
+
+        with patch.object(
+            SOAPCMISClient, "request", return_value=response
+        ) as mock_request:
+            copy_id = self.client.copy_document(self.document, self.folder)
+
+        self.assertEqual(copy_id, "workspace://3;1.0")
+        envelope = mock_request.call_args[1]["soap_envelope"]
+        self.assertIn(
+            "<ns:repositoryId>repo</ns:repositoryId>"
+            "<ns:sourceId>workspace://1;1.0</ns:sourceId><ns:properties>",
+            envelope,
+        )
+        self.assertIn("<ns:folderId>workspace://2</ns:folderId>", envelope)
+        self.assertNotIn("auteur", envelope)
+        self.assertNotIn("attachments", mock_request.call_args[1])
+
+    @requests_mock.Mocker()
+    def test_fallback_streams_content(self, m):
+        # the DMS reports the CMIS error in a SOAP fault, with status 500
+        fault = (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            "<soap:Body><soap:Fault><faultcode>soap:Server</faultcode>"
+            "<faultstring>Operation not supported</faultstring><detail>"
+            '<cmisFault xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/">'
+            "<type>notSupported</type><code>0</code>"
+            "<message>Operation not supported</message></cmisFault>"
+            "</detail></soap:Fault></soap:Body></soap:Envelope>"
+        )
+        response = (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            "<soap:Body><createDocumentResponse>"
+            "<objectId>workspace://3;1.0</objectId>"
+            "</createDocumentResponse></soap:Body></soap:Envelope>"
+        )
+        bodies = []
+
+        def dms_response(request, context):
+            body = request.body
+            # the body with the content is streamed
+            bodies.append(body if isinstance(body, bytes) else b"".join(body))
+            if len(bodies) == 1:
+                context.status_code = 500
+                return fault
+            return response
+
+        m.post("http://dms.local/alfresco/cmisws/ObjectService", text=dms_response)
+        content = io.BytesIO(CONTENT)
+
+        with patch.object(SOAPDocument, "get_content_stream", return_value=content):
+            copy_id = self.client.copy_document(self.document, self.folder)
+
+        self.assertEqual(copy_id, "workspace://3;1.0")
+        self.assertFalse(self.client.server_side_copy)
+        self.assertEqual(len(bodies), 2)
+        self.assertIn(b"<ns:createDocumentFromSource>", bodies[0])
+        self.assertIn(b"<ns:createDocument>", bodies[1])
+        self.assertIn(b"auteur", bodies[1])
+        self.assertIn(CONTENT, bodies[1])
+        self.assertTrue(content.closed)
+
+    @requests_mock.Mocker()
+    def test_other_faults_are_raised(self, m):
+        fault = (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            "<soap:Body><soap:Fault><faultcode>soap:Server</faultcode>"
+            "<faultstring>Permission denied</faultstring><detail>"
+            '<cmisFault xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/">'
+            "<type>permissionDenied</type><code>0</code>"
+            "<message>Permission denied</message></cmisFault>"
+            "</detail></soap:Fault></soap:Body></soap:Envelope>"
+        )
+        m.post(
+            "http://dms.local/alfresco/cmisws/ObjectService",
+            text=fault,
+            status_code=500,
+        )
+
+        with self.assertRaises(CmisRuntimeException):
+            self.client.copy_document(self.document, self.folder)
+
+        self.assertTrue(self.client.server_side_copy)
@@ -0,0 +1,152 @@
+import datetime
+import os
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from drc_cmis.webservice.decoder import iter_objects_from_xml
+from drc_cmis.webservice.utils import extract_object_properties_from_xml
+
+from .utils import MOCK_FILES_DIR
+
+
+def read_response(name: str) -> str:
+    with open(os.path.join(MOCK_FILES_DIR, name)) as response_file:
+        return response_file.read()
+
+
+class StreamingDecoderTests(TestCase):
+    def test_query_response(self):
+        response = read_response("alfresco-soap-query.xml")
+
+        objects = extract_object_properties_from_xml(response, "query")
+
+        self.assertEqual(len(objects), 3)
+        properties = objects[0]["properties"]
+        self.assertEqual(
+            properties["cmis:objectId"]["value"],
+            "workspace://SpacesStore/0f9a26a8-a8a4-4b0a-8f6e-4d6b1b1b0001;1.0",
+        )
+        self.assertEqual(properties["cmis:name"]["value"], "detailed summary-0001")
+        self.assertEqual(
+            properties["drc:document__titel"]["value"], "detailed summary & more"
+        )
+        self.assertIs(properties["cmis:isLatestVersion"]["value"], True)
+        self.assertEqual(properties["cmis:contentStreamLength"]["value"], 17)
+        self.assertEqual(properties["drc:document__versie"]["value"], 1.0)
+        self.assertEqual(
+            properties["cmis:creationDate"]["value"],
+            datetime.datetime(
+                2020,
+                7,
+                27,
+                12,
+                26,
+                8,
+                287000,
+                tzinfo=datetime.timezone(datetime.timedelta(hours=2)),
+            ),
+        )
+        self.assertIsNone(properties["drc:document__verzenddatum"]["value"])
+        self.assertIsNone(properties["drc:document__indicatiegebruiksrecht"]["value"])
+        self.assertEqual(
+            objects[2]["properties"]["cmis:name"]["value"], "detailed summary-0003"
+        )
+
+    def test_get_children_response(self):
+        response = read_response("alfresco-soap-get-children.xml")
+
+        objects = extract_object_properties_from_xml(response, "getChildren")
+
+        self.assertEqual(
+            [obj["properties"]["cmis:name"]["value"] for obj in objects],
+            ["folder-1", "folder-2"],
+        )
+
+    def test_get_object_response(self):
+        response = read_response("alfresco-soap-get-object.xml")
+
+        objects = extract_object_properties_from_xml(response, "getObject")
+
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(
+            objects[0]["properties"]["cmis:objectTypeId"]["value"], "D:drc:document"
+        )
+
+    def test_get_object_parents_response(self):
+        response = read_response("alfresco-soap-get-object-parents.xml")
+
+        objects = extract_object_properties_from_xml(response, "getObjectParents")
+
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(objects[0]["properties"]["cmis:name"]["value"], "folder-1")
+
+    def test_create_document_response(self):
+        response = read_response("alfresco-soap-create-document.xml")
+
+        objects = extract_object_properties_from_xml(response, "createDocument")
+
+        self.assertEqual(
+            objects,
+            [
+                {
+                    "properties": {
+                        "objectId": {
+                            "value": "workspace://SpacesStore/0f9a26a8-a8a4-4b0a-8f6e-4d6b1b1b0001;1.0"
+                        }
+                    }
+                }
+            ],
+        )
+
+    def test_other_action_is_ignored(self):
+        response = read_response("alfresco-soap-query.xml")
+
+        self.assertEqual(extract_object_properties_from_xml(response, "getObject"), [])
+
+    def test_namespace_prefix_is_irrelevant(self):
+        response = read_response("alfresco-soap-query.xml")
+        expected = extract_object_properties_from_xml(response, "query")
+
+        response = response.replace("xmlns:ns2=", "xmlns:cmis=").replace(
+            "ns2:", "cmis:"
+        )
+
+        self.assertEqual(
+            extract_object_properties_from_xml(response, "query"), expected
+        )
+
+    def test_response_fed_in_small_chunks(self):
+        response = read_response("alfresco-soap-query.xml")
+        expected = extract_object_properties_from_xml(response, "query")
+
+        with patch("drc_cmis.webservice.decoder.CHUNK_SIZE", 7):
+            objects = list(iter_objects_from_xml(response.encode("utf-8"), "query"))
+
+        self.assertEqual(objects, expected)
+
+    def test_properties_without_nested_objects_are_merged(self):
+        response = (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+            '<getObjectParentsResponse xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/" '
+            'xmlns:ns2="http://docs.oasis-open.org/ns/cmis/core/200908/"><parents>'
+            '<object><ns2:properties><ns2:propertyString propertyDefinitionId="cmis:name">'
+            "<ns2:value>first</ns2:value></ns2:propertyString></ns2:properties></object>"
+            '<object><ns2:properties><ns2:propertyString propertyDefinitionId="cmis:path">'
+            "<ns2:value>/second</ns2:value></ns2:propertyString></ns2:properties></object>"
+            "</parents></getObjectParentsResponse></soap:Body></soap:Envelope>"
+        )
+
+        objects = extract_object_properties_from_xml(response, "getObjectParents")
+
+        self.assertEqual(
+            objects,
+            [
+                {
+                    "properties": {
+                        "cmis:name": {"value": "first"},
+                        "cmis:path": {"value": "/second"},
+                    }
+                }
+            ],
+        )
@@ -0,0 +1,150 @@
+import datetime
+import uuid
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+
+from drc_cmis.models import CMISConfig
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.drc_document import Gebruiksrechten
+from drc_cmis.webservice.envelope import render_soap_envelope
+from drc_cmis.webservice.utils import make_soap_envelope
+
+SOAP_RESPONSE = (
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<soap:Body><deleteObjectResponse/></soap:Body></soap:Envelope>"
+)
+
+
+@patch("uuid.uuid4", return_value=uuid.UUID(int=1))
+@patch(
+    "django.utils.timezone.now",
+    return_value=datetime.datetime(2020, 7, 27, 12, 0, tzinfo=datetime.timezone.utc),
+)
+class TemplateEnvelopeTests(TestCase):
+    def assertSameEnvelope(self, **kwargs):
+        dom_envelope = make_soap_envelope(**kwargs)
+        rendered_envelope = render_soap_envelope(**kwargs)
+
+        self.assertEqual(rendered_envelope.toxml(), dom_envelope.toxml())
+        self.assertEqual(
+            rendered_envelope.toxml(encoding="utf-8"),
+            dom_envelope.toxml(encoding="utf-8"),
+        )
+
+    def test_without_body_elements(self, *mocks):
+        self.assertSameEnvelope(cmis_action="getRepositories", auth=("admin", "admin"))
+
+    def test_query(self, *mocks):
+        self.assertSameEnvelope(
+            cmis_action="query",
+            auth=("admin", "admin"),
+            repository_id="d6b1c8b8-1f4b-4f5a-a2e3-9f2a7a4bd0c5",
+            statement="SELECT * FROM drc:document WHERE drc:document__titel = 'a & b'",
+        )
+
+    def test_create_document(self, *mocks):
+        properties = {
+            f"drc:document__property{index}": {
+                "type": "propertyString",
+                "value": f"value {index}",
+            }
+            for index in range(30)
+        }
+
+        self.assertSameEnvelope(
+            cmis_action="createDocument",
+            auth=("admin", "admin"),
+            repository_id="d6b1c8b8-1f4b-4f5a-a2e3-9f2a7a4bd0c5",
+            folder_id="workspace://SpacesStore/0f9a26a8-a8a4-4b0a-8f6e-4d6b1b1b0001",
+            properties=properties,
+            content_id=str(uuid.UUID(int=2)),
+            content_filename="filename.txt",
+        )
+
+    def test_all_elements(self, *mocks):
+        self.assertSameEnvelope(
+            cmis_action="checkIn",
+            auth=("admin", "admin"),
+            repository_id=1,
+            properties={},
+            object_id="workspace://SpacesStore/0f9a26a8-a8a4-4b0a-8f6e-4d6b1b1b0001",
+            content_id="content",
+            content_filename="unknown",
+            major="true",
+            checkin_comment="comment",
+            source_folder_id="source",
+            target_folder_id="target",
+            continue_on_failure="false",
+            source_id="workspace://SpacesStore/0f9a26a8-a8a4-4b0a-8f6e-4d6b1b1b0002",
+            path="/DRC/2026",
+            statement="SELECT * FROM drc:document",
+            max_items="100",
+            skip_count="200",
+        )
+
+    def test_get_object_by_path(self, *mocks):
+        self.assertSameEnvelope(
+            cmis_action="getObjectByPath",
+            auth=("admin", "admin"),
+            repository_id="d6b1c8b8-1f4b-4f5a-a2e3-9f2a7a4bd0c5",
+            path="/DRC/zaaktype-Melding & Klacht-1/2026",
+        )
+
+    def test_values_are_escaped(self, *mocks):
+        self.assertSameEnvelope(
+            cmis_action="createDocument",
+            auth=("a<d>min", "p&s\"w'd"),
+            properties={
+                'drc:"name"': {"type": "propertyString", "value": "<a & b>"},
+                "drc:empty": {"type": "propertyString", "value": ""},
+            },
+            content_id='c"id&',
+            content_filename="<file>.txt",
+        )
+
+        envelope = render_soap_envelope(
+            cmis_action="query", auth=("admin", "admin"), statement="a < b & c"
+        )
+        self.assertIn("<ns:statement>a &lt; b &amp; c</ns:statement>", envelope.toxml())
+
+    def test_pretty_xml(self, *mocks):
+        kwargs = {
+            "cmis_action": "getObject",
+            "auth": ("admin", "admin"),
+            "repository_id": "1",
+            "object_id": "2",
+        }
+
+        self.assertEqual(
+            render_soap_envelope(**kwargs).toprettyxml(),
+            make_soap_envelope(**kwargs).toprettyxml(),
+        )
+
+
+class EnvelopeBuilderTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        CMISConfig.objects.create(binding="WEBSERVICE", main_repo_id="1")
+
+    def test_default_builder(self):
+        self.assertIs(SOAPCMISClient().envelope_builder, render_soap_envelope)
+
+    def test_builder_is_selectable_per_client(self):
+        client = SOAPCMISClient()
+        client.envelope_builder = Mock(wraps=make_soap_envelope)
+        client.request = Mock(return_value=SOAP_RESPONSE)
+
+        Gebruiksrechten(
+            {"properties": {"cmis:objectId": {"value": "2"}}}, client=client
+        ).delete_object()
+
+        client.envelope_builder.assert_called_once()
+        self.assertEqual(
+            client.envelope_builder.call_args.kwargs["cmis_action"], "deleteObject"
+        )
+        self.assertIn(
+            "<ns:objectId>2</ns:objectId>",
+            client.request.call_args.kwargs["soap_envelope"],
+        )
+        self.assertIs(SOAPCMISClient().envelope_builder, render_soap_envelope)
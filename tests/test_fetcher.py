@@ -2,9 +2,12 @@ import os
 from unittest import skipIf
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 
+from drc_cmis.browser.fetcher import BrowserRepositoryInfoFetcher
 from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.fetcher import SOAPRepositoryInfoFetcher
 
 from .mixins import DMSMixin
 
@@ -42,3 +45,76 @@ class RepoInfoFetcherTests(DMSMixin, TestCase):
         client2.repository_info
 
         assert mock_post.call_count == 2
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "cmis": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    },
+    CMIS_CACHE="cmis",
+)
+class RepoInfoCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["cmis"].clear()
+        self.addCleanup(caches["cmis"].clear)
+
+    @patch("requests.Session.get")
+    def test_browser_repo_info_caching(self, mock_get):
+        mock_get.return_value.ok = True
+        mock_get.return_value.headers = {"Content-Type": "application/json"}
+        mock_get.return_value.json.return_value = {
+            "-default-": {"vendorName": "Alfresco", "rootFolderId": "root"}
+        }
+        fetcher = BrowserRepositoryInfoFetcher()
+
+        repo_info = fetcher.fetch("http://dms.local/browser", "admin", "admin")
+
+        self.assertEqual(repo_info["vendorName"], "Alfresco")
+        mock_get.assert_called_once()
+
+        # fetch it again - no extra calls should be made
+        fetcher.fetch("http://dms.local/browser", "admin", "admin")
+        BrowserRepositoryInfoFetcher().fetch(
+            "http://dms.local/browser", "admin", "admin"
+        )
+
+        mock_get.assert_called_once()
+
+        # different user
+        fetcher.fetch("http://dms.local/browser", "other", "other")
+
+        self.assertEqual(mock_get.call_count, 2)
+
+        # explicitly invalidated
+        fetcher.invalidate("http://dms.local/browser", "admin")
+        fetcher.fetch("http://dms.local/browser", "admin", "admin")
+
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("requests.Session.post")
+    def test_soap_repo_info_invalidation(self, mock_post):
+        mock_post.return_value.content = SOAP_RESPONSE
+        fetcher = SOAPRepositoryInfoFetcher()
+
+        fetcher.fetch("1", "http://dms.local/cmisws", "admin", "admin")
+        fetcher.fetch("1", "http://dms.local/cmisws", "admin", "admin")
+
+        mock_post.assert_called_once()
+
+        fetcher.invalidate("1", "http://dms.local/cmisws", "admin")
+        fetcher.fetch("1", "http://dms.local/cmisws", "admin", "admin")
+
+        self.assertEqual(mock_post.call_count, 2)
+
+    @override_settings(CMIS_REPOSITORY_INFO_CACHE_TTL=0)
+    @patch("requests.Session.post")
+    def test_repo_info_ttl(self, mock_post):
+        mock_post.return_value.content = SOAP_RESPONSE
+        fetcher = SOAPRepositoryInfoFetcher()
+
+        fetcher.fetch("1", "http://dms.local/cmisws", "admin", "admin")
+        fetcher.fetch("1", "http://dms.local/cmisws", "admin", "admin")
+
+        self.assertEqual(mock_post.call_count, 2)
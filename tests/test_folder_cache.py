@@ -0,0 +1,505 @@
+import datetime
+import io
+import re
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import parse_qs, unquote
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import requests_mock
+from freezegun import freeze_time
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.cache import (
+    FolderCacheScope,
+    FolderPathCache,
+    FolderPathLock,
+    invalidate_config,
+)
+from drc_cmis.client import is_name_conflict
+from drc_cmis.models import CMISConfig
+from drc_cmis.utils.exceptions import (
+    CmisRuntimeException,
+    CmisUpdateConflictException,
+)
+from drc_cmis.webservice.client import SOAPCMISClient
+
+from .test_copy import JSON_HEADERS, document_properties
+
+BASE_URL = "http://dms.local/alfresco/api/-default-/public/cmis/versions/1.1/browser"
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "cmis": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+def folder_json(object_id: str, name: str) -> dict:
+    return {
+        "properties": {
+            "cmis:objectId": {"value": object_id, "type": "id"},
+            "cmis:objectTypeId": {"value": "cmis:folder", "type": "id"},
+            "cmis:name": {"value": name, "type": "string"},
+            "cmis:creationDate": {"value": 1602936000000, "type": "datetime"},
+        }
+    }
+
+
+class FakeFolderRepository:
+    """Answers the folder requests of the browser binding, like a DMS"""
+
+    in_folder_re = re.compile(r"IN_FOLDER\('([^']*)'\) AND cmis:name = '([^']*)'")
+
+    def __init__(self, create_delay: float = 0):
+        self.folders = {"root": "root"}
+        self.actions = []
+        self.create_delay = create_delay
+        self.lock = threading.Lock()
+
+    def __call__(self, request, context):
+        if request.method == "GET":
+            self.actions.append("getObjectByPath")
+            object_id = unquote(request.url.split("/browser/", 1)[1].split("?")[0])
+            if object_id not in self.folders:
+                context.status_code = 404
+                return {"exception": "objectNotFound", "message": object_id}
+            return folder_json(object_id, self.folders[object_id])
+
+        if request.headers["Content-Type"].startswith("multipart/form-data"):
+            self.actions.append("setContent")
+            return {"properties": document_properties("workspace://1;1.0")}
+
+        data = {key: value[0] for key, value in parse_qs(request.text).items()}
+        self.actions.append(data["cmisaction"])
+
+        if data["cmisaction"] == "createFolder":
+            if data["objectId"] not in self.folders:
+                context.status_code = 404
+                return {"exception": "objectNotFound", "message": data["objectId"]}
+            object_id = f"{data['objectId']}/{data['propertyValue[0]']}"
+            time.sleep(self.create_delay)
+            with self.lock:
+                if object_id in self.folders:
+                    context.status_code = 409
+                    return {"exception": "contentAlreadyExists", "message": object_id}
+                self.folders[object_id] = data["propertyValue[0]"]
+            return folder_json(object_id, data["propertyValue[0]"])
+
+        if data["cmisaction"] == "createDocument":
+            if data["objectId"] not in self.folders:
+                context.status_code = 404
+                return {"exception": "objectNotFound", "message": data["objectId"]}
+            return {"properties": document_properties("workspace://1;1.0")}
+
+        if data["cmisaction"] == "deleteTree":
+            return {}
+
+        match = self.in_folder_re.search(data["statement"])
+        if match:
+            object_id = "/".join(match.groups())
+        else:
+            object_id = "root"
+        results = (
+            [folder_json(object_id, self.folders[object_id])]
+            if object_id in self.folders
+            else []
+        )
+        return {"results": results, "numItems": len(results), "hasMoreItems": False}
+
+
+@override_settings(CACHES=CACHES, CMIS_CACHE="cmis")
+class FolderPathCacheTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["cmis"].clear()
+        self.addCleanup(caches["cmis"].clear)
+
+    @freeze_time("2026-10-17T23:59:30Z")
+    def test_timeout_ends_with_the_day(self):
+        self.assertEqual(FolderPathCache().get_timeout(), 30)
+        self.assertEqual(
+            FolderPathCache().get_timeout(datetime.date(2026, 10, 18)), 24 * 3600 + 30
+        )
+
+    def test_invalidate(self):
+        cache = FolderPathCache()
+        folder = SimpleNamespace(**folder_json("workspace://1", "DRC"))
+        scope = FolderCacheScope(BASE_URL, "-default-", "admin")
+        other_user = FolderCacheScope(BASE_URL, "-default-", "other")
+        other_repository = FolderCacheScope(BASE_URL, "archive", "admin")
+        cache.set_many(scope, {"/DRC": folder})
+        cache.set_many(other_user, {"/DRC": folder})
+        cache.set_many(other_repository, {"/DRC": folder})
+
+        cache.invalidate(scope)
+
+        self.assertEqual(cache.get_many(scope, ["/DRC"]), {})
+        # the folders of the repository are forgotten for all users
+        self.assertEqual(cache.get_many(other_user, ["/DRC"]), {})
+        self.assertEqual(
+            cache.get_many(other_repository, ["/DRC"]),
+            {
+                "/DRC": {
+                    "properties": {
+                        "cmis:objectId": {"value": "workspace://1", "type": "id"},
+                        "cmis:objectTypeId": {"value": "cmis:folder", "type": "id"},
+                        "cmis:name": {"value": "DRC", "type": "string"},
+                    }
+                }
+            },
+        )
+
+    def test_scopes_are_separate(self):
+        cache = FolderPathCache()
+        folder = SimpleNamespace(**folder_json("workspace://1", "DRC"))
+        cache.set_many(
+            FolderCacheScope(BASE_URL, "-default-", "admin"), {"/DRC": folder}
+        )
+
+        for scope in [
+            FolderCacheScope(BASE_URL, "-default-", "other"),
+            FolderCacheScope(BASE_URL, "archive", "admin"),
+            FolderCacheScope("http://other.local", "-default-", "admin"),
+        ]:
+            with self.subTest(scope=scope):
+                self.assertEqual(cache.get_many(scope, ["/DRC"]), {})
+
+
+@override_settings(
+    CACHES=CACHES,
+    CMIS_CACHE="cmis",
+    CMIS_FOLDER_LOCK_BACKEND="cache",
+    CMIS_FOLDER_LOCK_TIMEOUT=0.1,
+)
+class FolderPathLockTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["cmis"].clear()
+        self.addCleanup(caches["cmis"].clear)
+
+    def test_cache_lock(self):
+        lock = FolderPathLock()
+        other_process_lock = FolderPathLock()
+
+        with lock(BASE_URL, "/DRC/2026") as locked:
+            self.assertTrue(locked)
+            with other_process_lock(BASE_URL, "/DRC/2027") as other_locked:
+                self.assertTrue(other_locked)
+
+        with other_process_lock(BASE_URL, "/DRC/2026") as other_locked:
+            self.assertTrue(other_locked)
+
+    def test_cache_lock_expires(self):
+        other_process_lock = FolderPathLock()
+        key = other_process_lock.get_cache_key(BASE_URL, "/DRC/2026")
+        held_lock = FolderPathLock()(BASE_URL, "/DRC/2026")
+        held_lock.__enter__()
+
+        with other_process_lock(BASE_URL, "/DRC/2026") as other_locked:
+            # the lock is taken over when it expires
+            self.assertTrue(other_locked)
+            token = caches["cmis"].get(key)
+
+            # the expired lock doesn't release the lock of the other process
+            held_lock.__exit__(None, None, None)
+            self.assertEqual(caches["cmis"].get(key), token)
+
+    @override_settings(CMIS_FOLDER_LOCK_BACKEND=None)
+    def test_no_lock(self):
+        lock = FolderPathLock()
+
+        with lock(BASE_URL, "/DRC/2026") as locked:
+            self.assertFalse(locked)
+
+    @override_settings(CMIS_FOLDER_LOCK_BACKEND="redis")
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            with FolderPathLock()(BASE_URL, "/DRC/2026"):
+                pass
+
+
+@freeze_time("2026-10-17T12:00:00Z")
+@override_settings(CACHES=CACHES, CMIS_CACHE="cmis")
+@requests_mock.Mocker()
+class BrowserFolderResolutionTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        caches["cmis"].clear()
+        self.addCleanup(caches["cmis"].clear)
+        invalidate_config()
+        CMISConfig.objects.create(client_url=BASE_URL, binding="BROWSER")
+        self.client = CMISDRCClient()
+        self.client._repository_info = {
+            "vendorName": "Alfresco",
+            "rootFolderId": "root",
+        }
+        self.repository = FakeFolderRepository()
+        # load the configuration, which the clients share
+        self.client.config
+
+    def mock_repository(self, m):
+        m.post(BASE_URL, json=self.repository, headers=JSON_HEADERS)
+        m.post(f"{BASE_URL}/root", json=self.repository, headers=JSON_HEADERS)
+        m.get(
+            re.compile(f"{BASE_URL}/root/"), json=self.repository, headers=JSON_HEADERS
+        )
+
+    def test_resolved_folders_are_cached(self, m):
+        self.mock_repository(m)
+
+        folder = self.client.get_or_create_other_folder()
+
+        self.assertEqual(folder.objectId, "root/DRC/2026/10/17")
+        self.assertEqual(folder.name, "17")
+        # the missing folders are found by path and created
+        self.assertEqual(
+            self.repository.actions, ["getObjectByPath"] * 4 + ["createFolder"] * 4
+        )
+
+        m.reset_mock()
+        folder = self.client.get_or_create_other_folder()
+
+        self.assertEqual(folder.objectId, "root/DRC/2026/10/17")
+        self.assertEqual(m.call_count, 0)
+
+    def test_existing_folder_is_found_with_one_request(self, m):
+        self.mock_repository(m)
+        for object_id in ["root/DRC", "root/DRC/2026", "root/DRC/2026/10"]:
+            self.repository.folders[object_id] = object_id.rsplit("/", 1)[1]
+        self.repository.folders["root/DRC/2026/10/17"] = "17"
+
+        folder = self.client.get_or_create_other_folder()
+
+        self.assertEqual(folder.objectId, "root/DRC/2026/10/17")
+        self.assertEqual(self.repository.actions, ["getObjectByPath"])
+        self.assertIn("cmisselector=object", m.last_request.url)
+
+    def test_missing_tail_is_resolved(self, m):
+        self.mock_repository(m)
+        self.client.get_or_create_other_folder()
+        self.repository.actions.clear()
+        config = CMISConfig.get_solo()
+        config.other_folder_path = "/DRC/{{ year }}/{{ month }}/{{ day }}/Other/"
+        config.save()
+
+        folder = self.client.get_or_create_other_folder()
+
+        # the path up to the day folder is cached
+        self.assertEqual(folder.objectId, "root/DRC/2026/10/17/Other")
+        self.assertEqual(self.repository.actions, ["getObjectByPath", "createFolder"])
+
+    def test_delete_tree_invalidates(self, m):
+        self.mock_repository(m)
+        folder = self.client.get_or_create_other_folder()
+
+        folder.delete_tree()
+        self.repository.actions.clear()
+        self.client.get_or_create_other_folder()
+
+        self.assertEqual(self.repository.actions, ["getObjectByPath"])
+
+    def test_failed_delete_tree_invalidates(self, m):
+        self.mock_repository(m)
+        folder = self.client.get_or_create_other_folder()
+        m.post(
+            f"{BASE_URL}/root",
+            status_code=500,
+            json={"exception": "runtime", "message": "partially deleted"},
+        )
+
+        with self.assertRaises(CmisRuntimeException):
+            folder.delete_tree()
+        self.repository.actions.clear()
+        self.mock_repository(m)
+        self.client.get_or_create_other_folder()
+
+        self.assertEqual(self.repository.actions, ["getObjectByPath"])
+
+    def test_concurrently_created_folder_is_used(self, m):
+        self.mock_repository(m)
+        self.client.get_or_create_other_folder()
+        # another worker creates the day folder after it was looked up
+        del self.repository.folders["root/DRC/2026/10/17"]
+        caches["cmis"].clear()
+        get_folder_by_path = self.client.get_folder_by_path
+
+        def get_folder_by_path_and_create(path):
+            folder = get_folder_by_path(path)
+            self.repository.folders["root/DRC/2026/10/17"] = "17"
+            return folder
+
+        with patch.object(
+            self.client, "get_folder_by_path", side_effect=get_folder_by_path_and_create
+        ):
+            folder = self.client.get_or_create_other_folder()
+
+        self.assertEqual(folder.objectId, "root/DRC/2026/10/17")
+        self.assertEqual(
+            self.repository.actions[-4:],
+            ["getObjectByPath", "getObjectByPath", "createFolder", "getObjectByPath"],
+        )
+        # the folder of the other worker is cached
+        m.reset_mock()
+        self.client.get_or_create_other_folder()
+        self.assertEqual(m.call_count, 0)
+
+    @override_settings(CMIS_FOLDER_LOCK_BACKEND="process")
+    def test_path_is_created_once(self, m):
+        self.repository.create_delay = 0.01
+        self.mock_repository(m)
+
+        threads = [
+            threading.Thread(target=self.client.get_or_create_other_folder)
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.repository.actions.count("createFolder"), 4)
+
+    def test_prewarm_folders(self, m):
+        self.mock_repository(m)
+        m.get(
+            BASE_URL,
+            json={"-default-": {"vendorName": "Alfresco", "rootFolderId": "root"}},
+            headers=JSON_HEADERS,
+        )
+        stdout = io.StringIO()
+
+        call_command("prewarm_cmis_folders", "--days", "2", stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), "Prepared 3 folders\n")
+        for day in ["17", "18", "19"]:
+            self.assertIn(f"root/DRC/2026/10/{day}", self.repository.folders)
+
+        m.reset_mock()
+        with freeze_time("2026-10-19T23:00:00Z"):
+            folder = self.client.get_or_create_other_folder()
+
+        self.assertEqual(folder.objectId, "root/DRC/2026/10/19")
+        self.assertEqual(m.call_count, 0)
+
+    def test_prewarm_zaak_folders(self, m):
+        self.mock_repository(m)
+        config = CMISConfig.get_solo()
+        config.zaak_folder_path = (
+            "/ZAKEN/{{ year }}/{{ month }}/{{ zaaktype }}/{{ zaak }}/"
+        )
+        config.save()
+
+        folders = self.client.prewarm_folders(days=1)
+
+        self.assertEqual(
+            [folder.objectId for folder in folders],
+            [
+                "root/DRC/2026/10/17",
+                "root/ZAKEN/2026/10",
+                "root/DRC/2026/10/18",
+                "root/ZAKEN/2026/10",
+            ],
+        )
+
+    def test_deleted_folder_is_revalidated(self, m):
+        self.mock_repository(m)
+        self.client.get_or_create_other_folder()
+        # the day folder is deleted outside of the adapter
+        del self.repository.folders["root/DRC/2026/10/17"]
+        self.repository.actions.clear()
+
+        document = self.client.create_document(
+            identification="", bronorganisatie="", data={"titel": "doc"}, content=None
+        )
+
+        self.assertEqual(document.objectId, "workspace://1;1.0")
+        self.assertEqual(
+            self.repository.actions,
+            ["createDocument"]
+            + ["getObjectByPath"] * 2
+            + ["createFolder", "createDocument", "setContent"],
+        )
+
+
+class NameConflictTests(SimpleTestCase):
+    def test_soap_fault(self):
+        exc = CmisRuntimeException(
+            status=500,
+            url="",
+            message="<cmisFault><type>contentAlreadyExists</type></cmisFault>",
+            code=500,
+        )
+
+        self.assertTrue(is_name_conflict(exc))
+
+    def test_other_error(self):
+        exc = CmisUpdateConflictException(
+            status=409, url="", message="Conflict", code="updateConflict"
+        )
+
+        self.assertFalse(is_name_conflict(exc))
+
+
+class RetryWithFreshFoldersTests(SimpleTestCase):
+    def test_other_errors_are_not_retried(self):
+        calls = []
+
+        def action():
+            calls.append(None)
+            raise CmisRuntimeException(
+                status=500, url="", message="Something went wrong", code="runtime"
+            )
+
+        with self.assertRaises(CmisRuntimeException):
+            CMISDRCClient().retry_with_fresh_folders(action)
+
+        self.assertEqual(len(calls), 1)
+
+
+class SOAPFolderByPathTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        CMISConfig.objects.create(
+            client_url="http://dms.local/alfresco/cmisws", binding="WEBSERVICE"
+        )
+        self.client = SOAPCMISClient()
+        self.client._main_repo_id = "repo"
+
+    def test_folder_exists(self):
+        response = (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            "<soap:Body><getObjectByPathResponse><object>"
+            "<properties xmlns='http://docs.oasis-open.org/ns/cmis/core/200908/'>"
+            "<propertyId propertyDefinitionId='cmis:objectId'>"
+            "<value>workspace://1</value></propertyId>"
+            "<propertyId propertyDefinitionId='cmis:baseTypeId'>"
+            "<value>cmis:folder</value></propertyId>"
+            "</properties></object></getObjectByPathResponse>"
+            "</soap:Body></soap:Envelope>"
+        )
+
+        with patch.object(
+            SOAPCMISClient, "request", return_value=response
+        ) as mock_request:
+            folder = self.client.get_folder_by_path("/DRC/2026")
+
+        self.assertEqual(folder.objectId, "workspace://1")
+        self.assertIn(
+            "<ns:getObjectByPath><ns:repositoryId>repo</ns:repositoryId>"
+            "<ns:path>/DRC/2026</ns:path></ns:getObjectByPath>",
+            mock_request.call_args[1]["soap_envelope"],
+        )
+
+    def test_folder_does_not_exist(self):
+        not_found = CmisRuntimeException(
+            status=500, url="", message="objectNotFound: /DRC/2026", code="runtime"
+        )
+
+        with patch.object(SOAPCMISClient, "request", side_effect=not_found):
+            self.assertIsNone(self.client.get_folder_by_path("/DRC/2026"))
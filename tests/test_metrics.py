@@ -0,0 +1,253 @@
+import socket
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+import prometheus_client
+import requests
+import requests_mock
+
+from drc_cmis.browser.request import Request
+from drc_cmis.instrumentation import (
+    BROWSER,
+    RoundTrip,
+    get_soap_action,
+    parsing,
+    register_vendor,
+    round_trip,
+)
+from drc_cmis.metrics import (
+    MetricsSink,
+    PrometheusSink,
+    StatsdSink,
+    get_metrics_sinks,
+    reset_metrics_sinks,
+)
+from drc_cmis.webservice.request import SOAPRequest
+from drc_cmis.webservice.utils import extract_xml_from_soap
+
+from .test_copy import JSON_HEADERS
+
+URL = "http://dms.local/metrics/browser"
+
+
+class RecordingSink(MetricsSink):
+    def __init__(self):
+        self.round_trips = []
+        self.parse_durations = []
+
+    def record_round_trip(self, trip):
+        self.round_trips.append(
+            (trip.binding, trip.action, trip.status_label, trip.vendor)
+        )
+
+    def record_parsing(self, trip, duration):
+        self.parse_durations.append((trip.action, duration))
+
+
+class FailingSink(MetricsSink):
+    def record_round_trip(self, trip):
+        raise RuntimeError("the metrics backend is down")
+
+
+@override_settings(CMIS_METRICS_SINKS=[{"BACKEND": "tests.test_metrics.RecordingSink"}])
+class InstrumentationTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        reset_metrics_sinks()
+        self.sink = get_metrics_sinks()[0]
+        vendors = patch.dict("drc_cmis.instrumentation._vendors", clear=True)
+        vendors.start()
+        self.addCleanup(vendors.stop)
+
+    @requests_mock.Mocker()
+    def test_browser(self, m):
+        register_vendor(URL, "Alfresco")
+        m.post(URL, json={"results": []}, headers=JSON_HEADERS)
+
+        Request().post_request(URL, {"cmisaction": "query"}, "admin", "admin")
+
+        self.assertEqual(
+            self.sink.round_trips, [("browser", "query", "200", "Alfresco")]
+        )
+        self.assertEqual([action for action, _ in self.sink.parse_durations], ["query"])
+
+    @requests_mock.Mocker()
+    def test_browser_selector(self, m):
+        m.get(URL, status_code=404, json={"exception": "objectNotFound"})
+
+        with self.assertRaises(Exception):
+            Request().get_request(URL, "admin", "admin", {"cmisselector": "object"})
+
+        self.assertEqual(self.sink.round_trips, [("browser", "object", "404", "")])
+
+    @requests_mock.Mocker()
+    def test_connection_error(self, m):
+        m.get(URL, exc=requests.ConnectionError)
+
+        with self.assertRaises(requests.ConnectionError):
+            Request().get_request(URL, "admin", "admin")
+
+        self.assertEqual(
+            self.sink.round_trips, [("browser", "repositoryInfo", "error", "")]
+        )
+
+    @requests_mock.Mocker()
+    def test_soap(self, m):
+        m.post(f"{URL}/DiscoveryService", text="<soap:Envelope></soap:Envelope>")
+        envelope = (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/">'
+            "<soapenv:Header/><soapenv:Body><ns:query><ns:statement>SELECT"
+            "</ns:statement></ns:query></soapenv:Body></soapenv:Envelope>"
+        )
+
+        response = SOAPRequest(URL).request("DiscoveryService", envelope)
+        extract_xml_from_soap(response)
+
+        self.assertEqual(self.sink.round_trips, [("webservice", "query", "200", "")])
+        self.assertEqual([action for action, _ in self.sink.parse_durations], ["query"])
+
+    def test_parsing_after_the_block_is_not_attributed(self):
+        with round_trip(BROWSER, "query", URL):
+            with parsing():
+                pass
+
+        with parsing():
+            pass
+        extract_xml_from_soap("<soap:Envelope></soap:Envelope>")
+
+        self.assertEqual([action for action, _ in self.sink.parse_durations], ["query"])
+
+    @override_settings(
+        CMIS_METRICS_SINKS=[
+            {"BACKEND": "tests.test_metrics.FailingSink"},
+            {"BACKEND": "tests.test_metrics.RecordingSink"},
+        ]
+    )
+    @requests_mock.Mocker()
+    def test_failing_sink(self, m):
+        m.get(URL, content=b"content", headers={"Content-Type": "text/plain"})
+
+        with self.assertLogs("drc_cmis.instrumentation", "ERROR"):
+            content = Request().get_request(URL, "admin", "admin")
+
+        self.assertEqual(content, b"content")
+        self.assertEqual(len(get_metrics_sinks()[1].round_trips), 1)
+
+
+class SoapActionTests(SimpleTestCase):
+    def test_action(self):
+        self.assertEqual(
+            get_soap_action(
+                "<soapenv:Envelope><soapenv:Header><ns:query/></soapenv:Header>"
+                "<soapenv:Body>\n<ns:getObject><ns:objectId>1</ns:objectId>"
+                "</ns:getObject></soapenv:Body></soapenv:Envelope>"
+            ),
+            "getObject",
+        )
+
+    def test_no_body(self):
+        self.assertEqual(get_soap_action("<soapenv:Envelope/>"), "")
+
+
+def make_round_trip(status=200, action="checkOut") -> RoundTrip:
+    with round_trip(BROWSER, action, "http://dms.local/statsd") as trip:
+        trip.status = status
+        trip.request_bytes = 100
+        trip.response_bytes = 2000
+    return trip
+
+
+class StatsdSinkTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.settimeout(5)
+        self.addCleanup(self.server.close)
+        self.port = self.server.getsockname()[1]
+
+    def receive(self) -> list:
+        return self.server.recv(4096).decode("utf-8").split("\n")
+
+    def test_round_trip(self):
+        sink = StatsdSink(host="127.0.0.1", port=self.port, prefix="cmis")
+
+        sink.record_round_trip(make_round_trip())
+
+        metrics = self.receive()
+        self.assertRegex(
+            metrics[0], r"^cmis\.browser\.checkOut\.request\.duration:[\d.]+\|ms$"
+        )
+        self.assertEqual(
+            metrics[1:],
+            [
+                "cmis.browser.checkOut.request.bytes:100|c",
+                "cmis.browser.checkOut.response.bytes:2000|c",
+            ],
+        )
+
+    def test_tags(self):
+        sink = StatsdSink(host="127.0.0.1", port=self.port, tags=True)
+
+        sink.record_round_trip(make_round_trip(status=409))
+
+        metrics = self.receive()
+        tags = "|#binding:browser,action:checkOut,status:409,vendor:"
+        self.assertTrue(metrics[0].startswith("drc_cmis.request.duration:"))
+        self.assertTrue(metrics[0].endswith(tags))
+        self.assertEqual(metrics[1], f"drc_cmis.request.errors:1|c{tags}")
+
+    def test_parsing(self):
+        sink = StatsdSink(host="127.0.0.1", port=self.port)
+
+        sink.record_parsing(make_round_trip(action="query"), 0.0025)
+
+        self.assertEqual(
+            self.receive(), ["drc_cmis.browser.query.parse.duration:2.500|ms"]
+        )
+
+
+class PrometheusSinkTests(SimpleTestCase):
+    def get_sample_value(self, name, **labels):
+        return prometheus_client.REGISTRY.get_sample_value(
+            f"drc_cmis_test_{name}", labels
+        )
+
+    def test_round_trip(self):
+        sink = PrometheusSink(namespace="drc_cmis_test")
+        labels = {
+            "binding": "browser",
+            "action": "checkOut",
+            "status": "200",
+            "vendor": "",
+        }
+        count = self.get_sample_value("request_duration_seconds_count", **labels) or 0
+        sent = self.get_sample_value("request_bytes_total", **labels) or 0
+
+        sink.record_round_trip(make_round_trip())
+
+        self.assertEqual(
+            self.get_sample_value("request_duration_seconds_count", **labels),
+            count + 1,
+        )
+        self.assertEqual(
+            self.get_sample_value("request_bytes_total", **labels), sent + 100
+        )
+
+    def test_sinks_share_the_metrics(self):
+        sink1 = PrometheusSink(namespace="drc_cmis_test")
+        sink2 = PrometheusSink(namespace="drc_cmis_test")
+
+        self.assertIs(sink1.duration, sink2.duration)
+
+    def test_parsing(self):
+        sink = PrometheusSink(namespace="drc_cmis_test")
+        labels = {"binding": "browser", "action": "query"}
+        count = self.get_sample_value("parse_duration_seconds_count", **labels) or 0
+
+        sink.record_parsing(make_round_trip(action="query"), 0.001)
+
+        self.assertEqual(
+            self.get_sample_value("parse_duration_seconds_count", **labels), count + 1
+        )
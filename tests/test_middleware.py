@@ -0,0 +1,219 @@
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+import httpx
+import requests_mock
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
+from drc_cmis.browser.async_request import AsyncRequest
+from drc_cmis.browser.request import Request
+from drc_cmis.connections import get_session
+from drc_cmis.instrumentation import (
+    assert_max_cmis_calls,
+    collect_cmis_stats,
+    get_cmis_stats,
+    record_cmis_calls,
+    round_trip,
+)
+from drc_cmis.middleware import CMISConnectionPoolMiddleware
+from drc_cmis.utils.query import QueryPage, iter_query_pages
+from drc_cmis.webservice.request import SOAPRequest
+
+from .test_copy import JSON_HEADERS
+
+URL = "http://dms.local/browser"
+
+
+class CollectStatsTests(SimpleTestCase):
+    @requests_mock.Mocker()
+    def test_browser_round_trips(self, m):
+        m.get(URL, json={"ok": True}, headers=JSON_HEADERS)
+        m.post(URL, json={"ok": True}, headers=JSON_HEADERS)
+
+        with collect_cmis_stats() as stats:
+            Request().get_request(URL, "admin", "admin")
+            Request().post_request(URL, {"cmisaction": "query"}, "admin", "admin")
+
+        self.assertEqual(stats.round_trips, 2)
+        self.assertEqual(stats.request_bytes, len("cmisaction=query"))
+        self.assertEqual(stats.response_bytes, 2 * len(b'{"ok": true}'))
+        self.assertGreater(stats.duration, 0)
+
+    @requests_mock.Mocker()
+    def test_soap_round_trip(self, m):
+        m.post(f"{URL}/ObjectService", text="<soap:Envelope/>")
+
+        with collect_cmis_stats() as stats:
+            SOAPRequest(URL).request("ObjectService", "<soapenv:Envelope/>")
+
+        self.assertEqual(stats.round_trips, 1)
+        self.assertGreater(stats.request_bytes, len("<soapenv:Envelope/>"))
+        self.assertEqual(stats.response_bytes, len("<soap:Envelope/>"))
+
+    def test_nested(self):
+        with collect_cmis_stats() as outer:
+            with round_trip():
+                pass
+            with collect_cmis_stats() as inner:
+                with round_trip():
+                    pass
+            self.assertIs(get_cmis_stats(), outer)
+
+        self.assertIsNone(get_cmis_stats())
+        self.assertEqual(inner.round_trips, 1)
+        self.assertEqual(outer.round_trips, 2)
+
+    def test_prefetched_pages(self):
+        def fetch_page(max_items, skip_count):
+            with round_trip():
+                return QueryPage(
+                    objects=[{}] * max_items,
+                    has_more_items=skip_count < 20,
+                    num_items=30,
+                    object_count=max_items,
+                )
+
+        with collect_cmis_stats() as stats:
+            pages = list(iter_query_pages(fetch_page, 10))
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(stats.round_trips, 3)
+
+
+class RecordCallsTests(SimpleTestCase):
+    @requests_mock.Mocker()
+    def test_record(self, m):
+        m.get(URL, json={"ok": True}, headers=JSON_HEADERS)
+        m.post(URL, json={"ok": True}, headers=JSON_HEADERS)
+
+        with record_cmis_calls() as recorder:
+            Request().get_request(URL, "admin", "admin", {"cmisselector": "object"})
+            Request().post_request(URL, {"cmisaction": "query"}, "admin", "admin")
+
+        self.assertEqual(recorder.actions, ["object", "query"])
+        self.assertEqual(
+            [trip.operation for trip in recorder],
+            ["Request.get_request", "Request.post_request"],
+        )
+        calls = recorder.format_calls().split("\n")
+        self.assertEqual(len(calls), 4)
+        self.assertRegex(calls[0], r"^Request.get_request: 1 call, [\d.]+ ms$")
+        self.assertRegex(calls[1], r"^  \+[\d.]+ ms browser object 200 [\d.]+ ms$")
+
+    def test_nested(self):
+        with record_cmis_calls() as outer:
+            with round_trip(action="getObject"):
+                pass
+            with record_cmis_calls() as inner:
+                with round_trip(action="query"):
+                    pass
+
+        self.assertEqual(inner.actions, ["query"])
+        self.assertEqual(outer.actions, ["getObject", "query"])
+
+    def test_assert_max_cmis_calls(self):
+        with assert_max_cmis_calls(2):
+            with round_trip(action="getObject"):
+                pass
+
+        with self.assertRaisesMessage(
+            AssertionError, "2 CMIS calls were made, expected at most 1:"
+        ) as context:
+            with assert_max_cmis_calls(1):
+                with round_trip(action="getObject"):
+                    pass
+                with round_trip(action="getObjectParents"):
+                    pass
+
+        self.assertIn("getObjectParents", str(context.exception))
+
+
+class CMISConnectionPoolMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    @requests_mock.Mocker()
+    def test_sync(self, m):
+        m.get(URL, json={"ok": True}, headers=JSON_HEADERS)
+        sessions = []
+
+        def view(request):
+            sessions.append(get_session())
+            Request().get_request(URL, "admin", "admin")
+            sessions.append(get_session())
+            Request().get_request(URL, "admin", "admin")
+            return HttpResponse()
+
+        request = self.factory.get("/")
+        response = CMISConnectionPoolMiddleware(view)(request)
+
+        self.assertIs(sessions[0], sessions[1])
+        # the session is closed at the end of the request
+        self.assertIsNot(get_session(), sessions[0])
+        self.assertEqual(request.cmis_stats.round_trips, 2)
+        self.assertNotIn("X-CMIS-Round-Trips", response)
+
+    @override_settings(CMIS_STATS_HEADERS=True)
+    @requests_mock.Mocker()
+    def test_headers(self, m):
+        m.get(URL, content=b"content", headers={"Content-Type": "text/plain"})
+
+        def view(request):
+            Request().get_request(URL, "admin", "admin")
+            return HttpResponse()
+
+        response = CMISConnectionPoolMiddleware(view)(self.factory.get("/"))
+
+        self.assertEqual(response["X-CMIS-Round-Trips"], "1")
+        self.assertEqual(response["X-CMIS-Request-Bytes"], "0")
+        self.assertEqual(response["X-CMIS-Response-Bytes"], "7")
+        self.assertIn("X-CMIS-Duration", response)
+
+    @override_settings(CMIS_STATS_HEADERS=True)
+    def test_async(self):
+        async def handler(request):
+            return httpx.Response(200, json={"ok": True})
+
+        async def view(request):
+            async with httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ) as http_client:
+                await AsyncRequest(http_client).get_request(URL, "admin", "admin")
+            return HttpResponse()
+
+        middleware = CMISConnectionPoolMiddleware(view)
+        request = self.factory.get("/")
+        response = async_to_sync(middleware)(request)
+
+        self.assertTrue(middleware.is_async)
+        self.assertTrue(iscoroutinefunction(middleware))
+        self.assertEqual(request.cmis_stats.round_trips, 1)
+        self.assertEqual(response["X-CMIS-Round-Trips"], "1")
+
+    @override_settings(CMIS_SLOW_REQUEST_THRESHOLD=0)
+    @requests_mock.Mocker()
+    def test_slow_request(self, m):
+        m.get(URL, json={"ok": True}, headers=JSON_HEADERS)
+
+        def view(request):
+            Request().get_request(URL, "admin", "admin")
+            return HttpResponse()
+
+        with self.assertLogs("drc_cmis.middleware", "WARNING") as logs:
+            CMISConnectionPoolMiddleware(view)(self.factory.get("/documents"))
+
+        self.assertIn("Slow request GET /documents", logs.output[0])
+        self.assertIn("1 CMIS calls", logs.output[0])
+        self.assertIn("browser repositoryInfo 200", logs.output[0])
+
+    @override_settings(CMIS_SLOW_REQUEST_THRESHOLD=0, CMIS_SLOW_REQUEST_SAMPLE_RATE=0)
+    def test_slow_request_not_sampled(self):
+        with patch("drc_cmis.middleware.logger") as logger:
+            CMISConnectionPoolMiddleware(lambda request: HttpResponse())(
+                self.factory.get("/")
+            )
+
+        logger.warning.assert_not_called()
@@ -0,0 +1,250 @@
+import io
+
+from django.test import SimpleTestCase, override_settings
+
+import requests_mock
+
+from drc_cmis.utils.exceptions import CmisNoValidResponse, CmisObjectNotFoundException
+from drc_cmis.webservice.mtom import (
+    CHUNK_SIZE,
+    InvalidMultipartMessage,
+    MTOMBody,
+    MultipartReader,
+    read_attachment,
+)
+from drc_cmis.webservice.request import SOAPRequest
+
+BOUNDARY = "------=_Part_52_1132425564.1594208078802"
+
+ENVELOPE_HEADERS = {
+    "Content-Type": 'application/xop+xml; charset=UTF-8; type="application/soap+xml"',
+    "Content-ID": "<rootpart@soapui.org>",
+}
+
+ENVELOPE = '<?xml version="1.0" ?><soapenv:Envelope/>'
+
+RESPONSE_BOUNDARY = "uuid:b4e1dca5-7b02-4697-a602-8650e3e41ce4"
+
+RESPONSE_CONTENT_TYPE = (
+    f'multipart/related; type="application/xop+xml"; boundary="{RESPONSE_BOUNDARY}"; '
+    'start="<root.message@cxf.apache.org>"; start-info="text/xml"'
+)
+
+
+def make_response(content: bytes, content_id: str = "1009d1c8-1@docs.oasis-open.org"):
+    return (
+        (
+            f"\r\n--{RESPONSE_BOUNDARY}\r\n"
+            'Content-Type: application/xop+xml; charset=UTF-8; type="text/xml"\r\n'
+            "Content-ID: <root.message@cxf.apache.org>\r\n\r\n"
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+            "<getContentStreamResponse><contentStream><stream>"
+            '<xop:Include xmlns:xop="http://www.w3.org/2004/08/xop/include" '
+            'href="cid:1009d1c8-1%40docs.oasis-open.org"/>'
+            "</stream></contentStream></getContentStreamResponse></soap:Body></soap:Envelope>"
+            f"\r\n--{RESPONSE_BOUNDARY}\r\n"
+            "Content-Type: text/plain\r\n"
+            "Content-ID: <other@docs.oasis-open.org>\r\n\r\n"
+            "other content"
+            f"\r\n--{RESPONSE_BOUNDARY}\r\n"
+            "Content-Type: text/plain\r\n"
+            f"Content-ID: <{content_id}>\r\n"
+            'Content-Disposition: attachment;name="summary.txt"\r\n\r\n'
+        ).encode("utf-8")
+        + content
+        + f"\r\n--{RESPONSE_BOUNDARY}--".encode("utf-8")
+    )
+
+
+def split(data: bytes, size: int):
+    return [data[start : start + size] for start in range(0, len(data), size)]
+
+
+class NonSeekableStream(io.RawIOBase):
+    """A stream that can only be read once, like a request body"""
+
+    def __init__(self, content: bytes):
+        self.content = io.BytesIO(content)
+        self.read_sizes = []
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        return self.content.read(size)
+
+
+class MTOMBodyTests(SimpleTestCase):
+    def test_body(self):
+        content = io.BytesIO(b"some file content")
+        content.read()
+
+        body = MTOMBody(BOUNDARY, ENVELOPE_HEADERS, ENVELOPE, [("cid-1", content)])
+
+        self.assertEqual(
+            b"".join(body),
+            (
+                f"\n{BOUNDARY}\n"
+                'Content-Type: application/xop+xml; charset=UTF-8; type="application/soap+xml"\n'
+                "Content-ID: <rootpart@soapui.org>\n"
+                f"\n{ENVELOPE}\n\n"
+                f"{BOUNDARY}\n"
+                "Content-Type: application/octet-stream\n"
+                "Content-Transfer-Encoding: binary\n"
+                "Content-ID: <cid-1>\n"
+                "\n"
+                "some file content"
+                f"{BOUNDARY}--\n"
+            ).encode("utf-8"),
+        )
+        self.assertEqual(body.len, len(b"".join(body)))
+
+    def test_without_attachments(self):
+        body = MTOMBody(BOUNDARY, ENVELOPE_HEADERS, ENVELOPE)
+
+        self.assertTrue(
+            b"".join(body).endswith(f"{ENVELOPE}\n\n{BOUNDARY}--\n".encode())
+        )
+        self.assertEqual(body.len, len(b"".join(body)))
+
+    def test_attachment_is_read_in_chunks(self):
+        content = NonSeekableStream(b"x" * (3 * CHUNK_SIZE + 1))
+
+        body = MTOMBody(BOUNDARY, ENVELOPE_HEADERS, ENVELOPE, [("cid-1", content)])
+
+        chunks = list(body)
+        self.assertFalse(hasattr(body, "len"))
+        # envelope part, attachment header, content chunks, closing boundary
+        self.assertEqual(b"".join(chunks[2:-1]), b"x" * (3 * CHUNK_SIZE + 1))
+        self.assertEqual(max(len(chunk) for chunk in chunks[2:-1]), CHUNK_SIZE)
+        self.assertEqual(set(content.read_sizes), {CHUNK_SIZE})
+
+
+class MultipartReaderTests(SimpleTestCase):
+    def test_parts(self):
+        response = make_response(b"some file content")
+
+        parts = [
+            (headers, b"".join(body))
+            for headers, body in MultipartReader(split(response, 5), RESPONSE_BOUNDARY)
+        ]
+
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(parts[1][0]["content-id"], "<other@docs.oasis-open.org>")
+        self.assertEqual(parts[1][1], b"other content")
+        self.assertEqual(parts[2][1], b"some file content")
+
+    def test_boundary_from_body(self):
+        response = make_response(b"some file content")
+
+        parts = list(MultipartReader([response]))
+
+        self.assertEqual(len(parts), 3)
+
+    def test_incomplete_message(self):
+        response = make_response(b"some file content")[:-50]
+
+        with self.assertRaises(InvalidMultipartMessage):
+            list(MultipartReader([response], RESPONSE_BOUNDARY))
+
+
+class ReadAttachmentTests(SimpleTestCase):
+    def test_attachment_referred_to_by_envelope(self):
+        content = bytes(range(256)) * 1000
+        response = make_response(content)
+
+        for chunk_size in (1, 7, 1000, len(response)):
+            with self.subTest(chunk_size=chunk_size):
+                envelope, attachment = read_attachment(
+                    split(response, chunk_size), RESPONSE_BOUNDARY
+                )
+
+                self.assertTrue(envelope.startswith(b"<soap:Envelope"))
+                self.assertEqual(attachment.read(), content)
+
+    def test_attachment_not_found(self):
+        response = make_response(b"some file content", content_id="unknown")
+
+        with self.assertRaises(InvalidMultipartMessage):
+            read_attachment([response], RESPONSE_BOUNDARY)
+
+    @override_settings(CMIS_CONTENT_MAX_MEMORY_SIZE=10)
+    def test_large_attachment_is_written_to_disk(self):
+        response = make_response(b"some file content")
+
+        _envelope, attachment = read_attachment([response], RESPONSE_BOUNDARY)
+
+        self.assertTrue(attachment._rolled)
+        self.assertEqual(attachment.read(), b"some file content")
+
+
+@requests_mock.Mocker()
+class SOAPRequestBodyTests(SimpleTestCase):
+    def test_body_is_streamed(self, m):
+        m.post("http://dms.local/cmisws/ObjectService", text="<ok/>")
+        content = io.BytesIO(b"some file content")
+
+        SOAPRequest("http://dms.local/cmisws").request(
+            "ObjectService", ENVELOPE, attachments=[("cid-1", content)]
+        )
+
+        request_body = m.last_request.body
+        self.assertIsInstance(request_body, MTOMBody)
+        self.assertEqual(
+            m.last_request.headers["Content-Length"],
+            str(len(b"".join(request_body))),
+        )
+
+    def test_unknown_size_uses_chunked_encoding(self, m):
+        m.post("http://dms.local/cmisws/ObjectService", text="<ok/>")
+        content = NonSeekableStream(b"some file content")
+
+        SOAPRequest("http://dms.local/cmisws").request(
+            "ObjectService", ENVELOPE, attachments=[("cid-1", content)]
+        )
+
+        self.assertEqual(m.last_request.headers["Transfer-Encoding"], "chunked")
+        self.assertNotIn("Content-Length", m.last_request.headers)
+
+
+@requests_mock.Mocker()
+class SOAPRequestContentTests(SimpleTestCase):
+    def test_request_content(self, m):
+        m.post(
+            "http://dms.local/cmisws/ObjectService",
+            content=make_response(b"some file content"),
+            headers={"Content-Type": RESPONSE_CONTENT_TYPE},
+        )
+
+        content = SOAPRequest("http://dms.local/cmisws").request_content(
+            "ObjectService", ENVELOPE
+        )
+
+        self.assertEqual(content.read(), b"some file content")
+
+    def test_error_response(self, m):
+        m.post(
+            "http://dms.local/cmisws/ObjectService",
+            status_code=404,
+            text="Not found",
+        )
+
+        with self.assertRaises(CmisObjectNotFoundException) as context:
+            SOAPRequest("http://dms.local/cmisws").request_content(
+                "ObjectService", ENVELOPE
+            )
+
+        self.assertEqual(context.exception.message, "Not found")
+
+    def test_invalid_response(self, m):
+        m.post(
+            "http://dms.local/cmisws/ObjectService",
+            content=b"<soap:Envelope/>",
+            headers={"Content-Type": "text/xml"},
+        )
+
+        with self.assertRaises(CmisNoValidResponse):
+            SOAPRequest("http://dms.local/cmisws").request_content(
+                "ObjectService", ENVELOPE
+            )
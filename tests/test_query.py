@@ -0,0 +1,356 @@
+import threading
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import requests_mock
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.cache import invalidate_config
+from drc_cmis.models import CMISConfig
+from drc_cmis.utils.exceptions import DocumentExistsError, PropertyNotSelectedError
+from drc_cmis.utils.query import QueryPage, format_select, iter_query_pages
+from drc_cmis.webservice.client import SOAPCMISClient
+from drc_cmis.webservice.utils import extract_num_items, extract_query_page_from_xml
+
+from .test_copy import JSON_HEADERS, document_properties
+
+TOTAL = 25
+
+
+class FakeRepository:
+    """Returns pages of TOTAL objects, like a DMS"""
+
+    def __init__(self):
+        self.requests = []
+
+    def fetch_page(self, max_items, skip_count):
+        self.requests.append((max_items, skip_count, threading.current_thread()))
+        end = TOTAL if max_items is None else min(skip_count + max_items, TOTAL)
+        objects = [{"index": index} for index in range(skip_count, end)]
+        return QueryPage(objects, has_more_items=end < TOTAL, num_items=TOTAL)
+
+
+class IterQueryPagesTests(SimpleTestCase):
+    def test_pages(self):
+        repository = FakeRepository()
+
+        pages = list(iter_query_pages(repository.fetch_page, 10))
+
+        self.assertEqual([len(page.objects) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [(max_items, skip) for max_items, skip, _ in repository.requests],
+            [(10, 0), (10, 10), (10, 20)],
+        )
+
+    def test_next_page_is_prefetched(self):
+        repository = FakeRepository()
+
+        pages = iter_query_pages(repository.fetch_page, 10)
+        next(pages)
+        # the consumer is still handling the first page
+        *_, thread = repository.requests[0]
+        self.assertIs(thread, threading.current_thread())
+
+        list(pages)
+
+        self.assertEqual(len(repository.requests), 3)
+        for *_, thread in repository.requests[1:]:
+            self.assertIsNot(thread, threading.current_thread())
+
+    def test_without_prefetch(self):
+        repository = FakeRepository()
+
+        pages = list(iter_query_pages(repository.fetch_page, 10, prefetch=False))
+
+        self.assertEqual(len(pages), 3)
+        for *_, thread in repository.requests:
+            self.assertIs(thread, threading.current_thread())
+
+    def test_stops_at_empty_page(self):
+        def fetch_page(max_items, skip_count):
+            return QueryPage([], has_more_items=True)
+
+        self.assertEqual(len(list(iter_query_pages(fetch_page, 10))), 1)
+
+
+class FormatSelectTests(SimpleTestCase):
+    def test_all_properties(self):
+        self.assertEqual(format_select(None), "*")
+
+    def test_object_id_is_always_selected(self):
+        self.assertEqual(
+            format_select(["drc:document__titel", "cmis:objectId"]),
+            "cmis:objectId, drc:document__titel",
+        )
+
+
+class ExtractQueryPageTests(SimpleTestCase):
+    xml = (
+        '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+        "<soap:Body>"
+        '<queryResponse xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/"'
+        ' xmlns:ns2="http://docs.oasis-open.org/ns/cmis/core/200908/"><objects>'
+        '<objects><ns2:properties><ns2:propertyId propertyDefinitionId="cmis:objectId">'
+        "<ns2:value>workspace://1</ns2:value></ns2:propertyId></ns2:properties></objects>"
+        '<objects><ns2:properties><ns2:propertyId propertyDefinitionId="cmis:name">'
+        "<ns2:value>hasMoreItems</ns2:value></ns2:propertyId></ns2:properties></objects>"
+        "<hasMoreItems>true</hasMoreItems><numItems>42</numItems>"
+        "</objects></queryResponse></soap:Body></soap:Envelope>"
+    )
+
+    def test_paging(self):
+        objects, has_more_items, num_items = extract_query_page_from_xml(self.xml)
+
+        self.assertEqual(
+            objects,
+            [
+                {"properties": {"cmis:objectId": {"value": "workspace://1"}}},
+                {"properties": {"cmis:name": {"value": "hasMoreItems"}}},
+            ],
+        )
+        self.assertEqual((has_more_items, num_items), (True, 42))
+
+    def test_no_paging(self):
+        xml = (
+            '<queryResponse xmlns="http://docs.oasis-open.org/ns/cmis/messaging/200908/">'
+            "<objects><hasMoreItems>false</hasMoreItems></objects></queryResponse>"
+        )
+
+        self.assertEqual(extract_query_page_from_xml(xml), ([], False, None))
+
+    def test_count_objects_without_decoding(self):
+        objects, has_more_items, num_items = extract_query_page_from_xml(
+            self.xml, decode=False
+        )
+
+        self.assertEqual(objects, [{"properties": {}}, {"properties": {}}])
+        self.assertEqual((has_more_items, num_items), (True, 42))
+
+    def test_num_items(self):
+        self.assertEqual(extract_num_items(self.xml), 42)
+
+
+@requests_mock.Mocker()
+class BrowserQueryTests(TestCase):
+    base_url = (
+        "http://dms.local/alfresco/api/-default-/public/cmis/versions/1.1/browser"
+    )
+
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        CMISConfig.objects.create(client_url=self.base_url, binding="BROWSER")
+        self.client = CMISDRCClient()
+
+    def query_response(self, request, context):
+        data = {key: value[0] for key, value in parse_qs(request.text).items()}
+        skip_count = int(data.get("skipCount", 0))
+        max_items = int(data.get("maxItems", TOTAL))
+        end = min(skip_count + max_items, TOTAL)
+        return {
+            "results": [
+                {"properties": document_properties(f"workspace://{index}")}
+                for index in range(skip_count, end)
+            ],
+            "hasMoreItems": end < TOTAL,
+            "numItems": TOTAL,
+        }
+
+    def test_query_iter(self, m):
+        m.post(self.base_url, json=self.query_response, headers=JSON_HEADERS)
+
+        documents = list(self.client.query_iter("Document", page_size=10))
+
+        self.assertEqual(
+            [document.objectId for document in documents],
+            [f"workspace://{index}" for index in range(TOTAL)],
+        )
+        requests = [parse_qs(request.text) for request in m.request_history]
+        self.assertEqual(
+            [(request["maxItems"], request["skipCount"]) for request in requests],
+            [(["10"], ["0"]), (["10"], ["10"]), (["10"], ["20"])],
+        )
+        self.assertEqual(requests[0]["statement"], ["SELECT * FROM drc:document"])
+
+    @override_settings(CMIS_QUERY_PAGE_SIZE=20)
+    def test_default_page_size(self, m):
+        m.post(self.base_url, json=self.query_response, headers=JSON_HEADERS)
+
+        self.assertEqual(len(list(self.client.query_iter("Document"))), TOTAL)
+        self.assertEqual(m.call_count, 2)
+
+    def test_query_is_not_paged(self, m):
+        m.post(self.base_url, json=self.query_response, headers=JSON_HEADERS)
+
+        self.assertEqual(len(self.client.query("Document")), TOTAL)
+        self.assertNotIn("maxItems", m.last_request.text)
+
+    def test_select(self, m):
+        properties = document_properties("workspace://1")
+        m.post(
+            self.base_url,
+            json={
+                "results": [
+                    {
+                        "properties": {
+                            "cmis:objectId": properties["cmis:objectId"],
+                            "drc:document__titel": properties["drc:document__titel"],
+                        }
+                    }
+                ]
+            },
+            headers=JSON_HEADERS,
+        )
+
+        (document,) = self.client.query("Document", select=["drc:document__titel"])
+
+        self.assertEqual(
+            parse_qs(m.last_request.text)["statement"],
+            ["SELECT cmis:objectId, drc:document__titel FROM drc:document"],
+        )
+        self.assertEqual(document.titel, "Document")
+        with self.assertRaises(PropertyNotSelectedError):
+            document.auteur
+        self.assertIsNone(getattr(document, "auteur", None))
+
+    def test_check_document_exists(self, m):
+        m.post(
+            self.base_url,
+            json={"results": [{"properties": document_properties("workspace://1")}]},
+            headers=JSON_HEADERS,
+        )
+
+        with self.assertRaises(DocumentExistsError):
+            self.client.check_document_exists("DOC-1", "123456782")
+
+        data = parse_qs(m.last_request.text)
+        self.assertTrue(data["statement"][0].startswith("SELECT cmis:objectId FROM"))
+        self.assertEqual(data["maxItems"], ["1"])
+
+    def test_exists(self, m):
+        m.post(self.base_url, json=self.query_response, headers=JSON_HEADERS)
+
+        self.assertTrue(self.client.exists("Document"))
+
+        m.post(self.base_url, json={"results": []}, headers=JSON_HEADERS)
+
+        self.assertFalse(self.client.exists("Document"))
+
+    def test_count(self, m):
+        m.post(self.base_url, json=self.query_response, headers=JSON_HEADERS)
+
+        self.assertEqual(self.client.count("Document"), TOTAL)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(parse_qs(m.last_request.text)["maxItems"], ["1"])
+
+    @override_settings(CMIS_QUERY_PAGE_SIZE=10)
+    def test_count_without_num_items(self, m):
+        def query_response(request, context):
+            response = self.query_response(request, context)
+            del response["numItems"]
+            return response
+
+        m.post(self.base_url, json=query_response, headers=JSON_HEADERS)
+
+        self.assertEqual(self.client.count("Document"), TOTAL)
+        # 1 + 10 + 10 + 4 results
+        self.assertEqual(m.call_count, 4)
+
+
+class SOAPQueryTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        CMISConfig.objects.create(
+            client_url="http://dms.local/alfresco/cmisws", binding="WEBSERVICE"
+        )
+        self.client = SOAPCMISClient()
+        self.client._main_repo_id = "repo"
+
+    @staticmethod
+    def query_response(path, soap_envelope):
+        skip_count = int(soap_envelope.split("<ns:skipCount>")[1].split("<")[0])
+        max_items = int(soap_envelope.split("<ns:maxItems>")[1].split("<")[0])
+        end = min(skip_count + max_items, TOTAL)
+        objects = "".join(
+            "<objects><properties xmlns='http://docs.oasis-open.org/ns/cmis/core/200908/'>"
+            f"<propertyId propertyDefinitionId='cmis:objectId'>"
+            f"<value>workspace://{index}</value></propertyId>"
+            "</properties></objects>"
+            for index in range(skip_count, end)
+        )
+        return (
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+            f"<soap:Body><queryResponse><objects>{objects}"
+            f"<hasMoreItems>{'true' if end < TOTAL else 'false'}</hasMoreItems>"
+            f"<numItems>{TOTAL}</numItems>"
+            "</objects></queryResponse></soap:Body></soap:Envelope>"
+        )
+
+    def test_query_iter(self):
+        with patch.object(
+            SOAPCMISClient, "request", side_effect=self.query_response
+        ) as mock_request:
+            folders = list(self.client.query_iter("Folder", page_size=10))
+
+        self.assertEqual(
+            [folder.objectId for folder in folders],
+            [f"workspace://{index}" for index in range(TOTAL)],
+        )
+        self.assertEqual(mock_request.call_count, 3)
+        envelope = mock_request.call_args[1]["soap_envelope"]
+        self.assertIn(
+            "<ns:statement>SELECT * FROM cmis:folder</ns:statement>"
+            "<ns:maxItems>10</ns:maxItems><ns:skipCount>20</ns:skipCount>",
+            envelope,
+        )
+
+    def test_get_document_select(self):
+        response = self.query_response(
+            "DiscoveryService", "<ns:maxItems>1</ns:maxItems><ns:skipCount>0<"
+        )
+
+        with patch.object(
+            SOAPCMISClient, "request", return_value=response
+        ) as mock_request:
+            document = self.client.get_document(
+                "4bb6f4c4-8a2c-4a5b-9a5c-2c7a5b8e4f11", select=["drc:document__titel"]
+            )
+
+        self.assertIn(
+            "<ns:statement>SELECT cmis:objectId, drc:document__titel, cmis:versionLabel "
+            "FROM drc:document WHERE",
+            mock_request.call_args[1]["soap_envelope"],
+        )
+        self.assertEqual(document.objectId, "workspace://0")
+        with self.assertRaises(PropertyNotSelectedError):
+            document.auteur
+
+    def test_check_document_exists(self):
+        response = self.query_response(
+            "DiscoveryService", "<ns:maxItems>1</ns:maxItems><ns:skipCount>0<"
+        )
+
+        with patch.object(
+            SOAPCMISClient, "request", return_value=response
+        ) as mock_request, self.assertRaises(DocumentExistsError):
+            self.client.check_document_exists("DOC-1", "123456782")
+
+        envelope = mock_request.call_args[1]["soap_envelope"]
+        self.assertIn("<ns:statement>SELECT cmis:objectId FROM", envelope)
+        self.assertIn("<ns:maxItems>1</ns:maxItems>", envelope)
+
+    def test_exists_does_not_decode_objects(self):
+        response = self.query_response(
+            "DiscoveryService", "<ns:maxItems>1</ns:maxItems><ns:skipCount>0<"
+        )
+
+        with patch.object(SOAPCMISClient, "request", return_value=response), patch(
+            "drc_cmis.webservice.client.extract_object_properties_from_xml"
+        ) as mock_extract:
+            self.assertTrue(self.client.exists("Document"))
+            self.assertEqual(self.client.count("Document"), TOTAL)
+
+        mock_extract.assert_not_called()
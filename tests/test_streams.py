@@ -0,0 +1,184 @@
+import io
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+import requests
+import requests_mock
+from asgiref.sync import async_to_sync
+
+from drc_cmis.browser.client import CMISDRCClient
+from drc_cmis.browser.drc_document import Document
+from drc_cmis.cache import invalidate_config
+from drc_cmis.models import CMISConfig
+from drc_cmis.utils.exceptions import CmisObjectNotFoundException
+from drc_cmis.utils.streams import (
+    ResponseStream,
+    aiter_chunks,
+    aslice_chunks,
+    aspool_chunks,
+    iter_file,
+    slice_chunks,
+)
+
+CONTENT = b"0123456789" * 10
+
+
+class SliceChunksTests(SimpleTestCase):
+    def test_slices(self):
+        chunks = [CONTENT[start : start + 7] for start in range(0, len(CONTENT), 7)]
+
+        for start, end in [(0, None), (0, 0), (5, 20), (7, 13), (95, None), (95, 200)]:
+            with self.subTest(start=start, end=end):
+                expected = CONTENT[start : None if end is None else end + 1]
+                self.assertEqual(b"".join(slice_chunks(chunks, start, end)), expected)
+
+    def test_stops_reading_after_end(self):
+        chunks = iter([b"abc", b"def", b"ghi"])
+
+        self.assertEqual(b"".join(slice_chunks(chunks, 1, 4)), b"bcde")
+        self.assertEqual(list(chunks), [b"ghi"])
+
+
+async def async_chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def join_async_chunks(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+class AsyncChunksTests(SimpleTestCase):
+    chunks = [CONTENT[start : start + 7] for start in range(0, len(CONTENT), 7)]
+
+    def test_slices(self):
+        for start, end in [(0, None), (0, 0), (5, 20), (7, 13), (95, None), (95, 200)]:
+            with self.subTest(start=start, end=end):
+                sliced = async_to_sync(join_async_chunks)(
+                    aslice_chunks(async_chunks(self.chunks), start, end)
+                )
+                self.assertEqual(
+                    sliced, b"".join(slice_chunks(self.chunks, start, end))
+                )
+
+    @override_settings(CMIS_CONTENT_MAX_MEMORY_SIZE=20)
+    def test_spool_to_disk(self):
+        spooled_file = async_to_sync(aspool_chunks)(async_chunks(self.chunks))
+
+        with spooled_file:
+            # the content didn't fit in memory
+            self.assertTrue(spooled_file._rolled)
+            self.assertEqual(spooled_file.read(), CONTENT)
+
+    def test_iterate_file(self):
+        chunks = aiter_chunks(iter_file(io.BytesIO(CONTENT)))
+
+        self.assertEqual(async_to_sync(join_async_chunks)(chunks), CONTENT)
+
+
+@requests_mock.Mocker()
+class ResponseStreamTests(SimpleTestCase):
+    def get_stream(self, m, **kwargs):
+        m.get("http://dms.local/content", content=CONTENT, **kwargs)
+        response = requests.get("http://dms.local/content", stream=True)
+        return ResponseStream(response)
+
+    def test_read(self, m):
+        stream = self.get_stream(m)
+
+        self.assertEqual(stream.read(5), b"01234")
+        self.assertEqual(stream.read(), CONTENT[5:])
+        self.assertEqual(stream.read(), b"")
+
+    def test_iterate(self, m):
+        stream = self.get_stream(m)
+
+        stream.read(3)
+
+        self.assertEqual(b"".join(stream), CONTENT[3:])
+
+    def test_content_length(self, m):
+        stream = self.get_stream(m, headers={"Content-Length": str(len(CONTENT))})
+
+        self.assertEqual(stream.content_length, len(CONTENT))
+
+    def test_close_releases_response(self, m):
+        stream = self.get_stream(m)
+
+        with stream:
+            pass
+
+        self.assertTrue(stream.closed)
+        self.assertTrue(stream.response.raw.closed)
+
+
+@requests_mock.Mocker()
+class BrowserContentStreamTests(TestCase):
+    url = (
+        "http://dms.local/alfresco/api/-default-/public/cmis/versions/1.1/browser/root"
+    )
+
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+        CMISConfig.objects.create(
+            client_url="http://dms.local/alfresco/api/-default-/public/cmis/versions/1.1/browser",
+            binding="BROWSER",
+        )
+        self.document = Document(
+            {"properties": {"cmis:objectId": {"value": "workspace://1", "type": "id"}}},
+            client=CMISDRCClient(),
+        )
+
+    def test_content_is_spooled(self, m):
+        m.get(self.url, content=CONTENT)
+
+        content = self.document.get_content_stream()
+
+        self.assertEqual(content.read(), CONTENT)
+        content.seek(0)
+        self.assertEqual(content.read(5), b"01234")
+        self.assertEqual(
+            m.last_request.qs,
+            {"objectid": ["workspace://1"], "cmisaction": ["content"]},
+        )
+
+    def test_stream(self, m):
+        m.get(self.url, content=CONTENT)
+
+        with self.document.get_content_stream(stream=True) as content:
+            self.assertIsInstance(content, ResponseStream)
+            self.assertEqual(content.read(), CONTENT)
+
+    def test_byte_range(self, m):
+        m.get(self.url, content=CONTENT[10:20], status_code=206)
+
+        with self.document.get_content_stream(
+            stream=True, byte_range=(10, 19)
+        ) as content:
+            self.assertEqual(content.read(), CONTENT[10:20])
+
+        self.assertEqual(m.last_request.headers["Range"], "bytes=10-19")
+
+    def test_byte_range_ignored_by_dms(self, m):
+        m.get(self.url, content=CONTENT, headers={"Content-Length": str(len(CONTENT))})
+
+        with self.document.get_content_stream(
+            stream=True, byte_range=(90, None)
+        ) as content:
+            self.assertEqual(content.content_length, 10)
+            self.assertEqual(content.read(), CONTENT[90:])
+
+        self.assertEqual(m.last_request.headers["Range"], "bytes=90-")
+
+    def test_error(self, m):
+        m.get(
+            self.url,
+            status_code=404,
+            json={"exception": "objectNotFound", "message": "Object not found"},
+        )
+
+        with self.assertRaises(CmisObjectNotFoundException) as context:
+            self.document.get_content_stream()
+
+        self.assertEqual(context.exception.message, "Object not found")
@@ -2,18 +2,23 @@ import os
 import re
 import uuid
 from unittest import skipIf
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
+from drc_cmis.cache import invalidate_config
 from drc_cmis.models import CMISConfig, UrlMapping
-from drc_cmis.webservice.drc_document import Document
+from drc_cmis.utils.matching import PatternMatcher
+from drc_cmis.webservice.drc_document import Document, expand_url_attributes
 from drc_cmis.webservice.utils import (
     NoURLMappingException,
     expand_url,
+    expand_urls,
     extract_content,
     extract_repository_ids_from_xml,
     make_soap_envelope,
     shrink_url,
+    shrink_urls,
 )
 
 from .mixins import DMSMixin
@@ -66,6 +71,10 @@ class UrlMappingTests(TestCase):
             other_folder_path="/TestDRC/",
         )
 
+    def setUp(self):
+        super().setUp()
+        invalidate_config()
+
     def test_shorten_url(self):
         config = CMISConfig.get_solo()
 
@@ -130,6 +139,144 @@ class UrlMappingTests(TestCase):
             "https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaakinformatieobjecten/fc345347-3115-4f0a-8808-e392d66e1886",
         )
 
+    def test_url_mapping_lookups_do_no_queries(self):
+        config = CMISConfig.get_solo()
+        UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/zaken/",
+            short_pattern="https://oz.nl/",
+            config=config,
+        )
+        shrink_url("https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaken/1")
+
+        with self.assertNumQueries(0):
+            shrink_url("https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaken/2")
+            expand_url("https://oz.nl/api/v1/zaken/2")
+
+    def test_url_mapping_changes_are_picked_up(self):
+        config = CMISConfig.get_solo()
+        mapping = UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/zaken/",
+            short_pattern="https://oz.nl/",
+            config=config,
+        )
+        long_url = "https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaken/1"
+        self.assertEqual(shrink_url(long_url), "https://oz.nl/api/v1/zaken/1")
+
+        mapping.short_pattern = "https://z.nl/"
+        mapping.save()
+
+        self.assertEqual(shrink_url(long_url), "https://z.nl/api/v1/zaken/1")
+
+    def test_shrink_and_expand_urls(self):
+        config = CMISConfig.get_solo()
+        UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/zaken/",
+            short_pattern="https://oz.nl/",
+            config=config,
+        )
+        UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/catalogi/",
+            short_pattern="https://oc.nl/",
+            config=config,
+        )
+        long_urls = [
+            "https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaken/1",
+            "https://openzaak.utrechtproeftuin.nl/catalogi/api/v1/zaaktypen/1",
+            "https://openzaak.utrechtproeftuin.nl/zaken/api/v1/zaken/1",
+        ]
+
+        short_urls = shrink_urls(iter(long_urls))
+
+        self.assertEqual(
+            short_urls,
+            [
+                "https://oz.nl/api/v1/zaken/1",
+                "https://oc.nl/api/v1/zaaktypen/1",
+                "https://oz.nl/api/v1/zaken/1",
+            ],
+        )
+        self.assertEqual(expand_urls(short_urls), long_urls)
+
+    def test_expand_urls_unmapped(self):
+        short_urls = ["https://oz.nl/api/v1/zaken/1"]
+
+        with self.assertRaises(NoURLMappingException):
+            expand_urls(short_urls)
+
+        self.assertEqual(expand_urls(short_urls, skip_unmapped=True), [None])
+
+    @override_settings(CMIS_URL_MAPPING_ENABLED=True)
+    def test_expand_url_attributes(self):
+        config = CMISConfig.get_solo()
+        UrlMapping.objects.create(
+            long_pattern="https://openzaak.utrechtproeftuin.nl/catalogi/",
+            short_pattern="https://oc.nl/",
+            config=config,
+        )
+        documents = [
+            Document(
+                {
+                    "properties": {
+                        "drc:document__informatieobjecttype": {"value": short_url}
+                    }
+                }
+            )
+            for short_url in [
+                "https://oc.nl/api/v1/informatieobjecttypen/1",
+                "https://unmapped.nl/api/v1/informatieobjecttypen/2",
+                None,
+            ]
+        ]
+
+        expand_url_attributes(documents)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                documents[0].informatieobjecttype,
+                "https://openzaak.utrechtproeftuin.nl/catalogi/api/v1/informatieobjecttypen/1",
+            )
+            self.assertIsNone(documents[2].informatieobjecttype)
+        with self.assertRaises(NoURLMappingException):
+            documents[1].informatieobjecttype
+
+
+class PatternMatcherTests(TestCase):
+    # check the automaton rather than the pattern-by-pattern scan
+    scan_threshold = 0
+
+    def setUp(self):
+        super().setUp()
+        patcher = patch.object(PatternMatcher, "scan_threshold", self.scan_threshold)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_longest_match(self):
+        matcher = PatternMatcher(
+            ["http://o.nl/", "http://o.nl/zaken/", "http://o.nl/besluiten/"]
+        )
+
+        self.assertEqual(matcher.find("http://o.nl/zaken/api/v1"), "http://o.nl/zaken/")
+        self.assertEqual(matcher.find("http://o.nl/catalogi/api/v1"), "http://o.nl/")
+        self.assertIsNone(matcher.find("http://other.nl/zaken/api/v1"))
+
+    def test_match_anywhere_in_string(self):
+        matcher = PatternMatcher(["abcd", "bc", "cdef"])
+
+        self.assertEqual(matcher.find("xxbcdefxx"), "cdef")
+        self.assertEqual(matcher.find("xxabcxx"), "bc")
+        self.assertEqual(matcher.find("xxabcdxx"), "abcd")
+
+    def test_match_through_failure_links(self):
+        matcher = PatternMatcher(["she", "he", "hers"])
+
+        self.assertEqual(matcher.find("ushers"), "hers")
+        self.assertEqual(matcher.find("usher"), "she")
+
+    def test_equal_length_patterns_keep_order(self):
+        matcher = PatternMatcher(["b.nl", "a.nl"])
+
+        self.assertEqual(matcher.find("http://a.nl/http://b.nl/"), "b.nl")
+
 
 @skipIf(
     os.getenv("CMIS_BINDING") != "WEBSERVICE",
@@ -196,3 +343,41 @@ class WebserviceContentTests(DMSMixin, TestCase):
         self.assertIn(
             "<ns:mimeType>application/octet-stream</ns:mimeType>", soap_envelope.toxml()
         )
+
+
+class PatternMatcherScanTests(PatternMatcherTests):
+    scan_threshold = PatternMatcher.scan_threshold
+
+
+class PatternMatcherThresholdTests(TestCase):
+    def test_automaton_is_built_when_the_threshold_is_crossed(self):
+        few = PatternMatcher([f"http://o{i}.nl/" for i in range(10)])
+        many = PatternMatcher(
+            [f"http://o{i}.nl/" for i in range(PatternMatcher.scan_threshold + 1)]
+            + ["http://o1.nl/zaken/"]
+        )
+
+        self.assertEqual(few.find("http://o1.nl/zaken/api/v1"), "http://o1.nl/")
+        self.assertEqual(many.find("http://o1.nl/zaken/api/v1"), "http://o1.nl/zaken/")
+        self.assertIsNone(many.find("http://other.nl/zaken/api/v1"))
+        self.assertIsNone(few._automaton)
+        self.assertIsNotNone(many._automaton)
+
+    def test_automaton_is_only_shared_when_complete(self):
+        matcher = PatternMatcher(
+            [f"http://o{i}.nl/" for i in range(PatternMatcher.scan_threshold + 1)]
+        )
+        build_failure_links = PatternMatcher._build_failure_links
+        seen_while_building = []
+
+        def build_and_look(*args):
+            # what another thread walking the matcher would see
+            seen_while_building.append(matcher._automaton)
+            build_failure_links(*args)
+
+        with patch.object(
+            PatternMatcher, "_build_failure_links", staticmethod(build_and_look)
+        ):
+            self.assertEqual(matcher.find("http://o7.nl/zaken"), "http://o7.nl/")
+
+        self.assertEqual(seen_while_building, [None])
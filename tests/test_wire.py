@@ -0,0 +1,103 @@
+import logging
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+import requests_mock
+
+from drc_cmis.webservice.envelope import render_soap_envelope
+from drc_cmis.webservice.request import SOAPRequest
+from drc_cmis.wire import PrettyXML
+
+SOAP_RESPONSE = (
+    "--uuid:2a3f1c1e-1a0b-4d3c-9a5e-7f6d5c4b3a21\r\n"
+    'Content-Type: application/xop+xml; charset=UTF-8; type="text/xml"\r\n\r\n'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<soap:Body><deleteObjectResponse/></soap:Body></soap:Envelope>\r\n"
+    "--uuid:2a3f1c1e-1a0b-4d3c-9a5e-7f6d5c4b3a21--"
+)
+
+
+class PrettyXMLTests(SimpleTestCase):
+    def test_pretty_prints_envelope(self):
+        envelope = render_soap_envelope(
+            cmis_action="getObject", auth=("admin", "admin"), object_id="1"
+        )
+
+        formatted = str(PrettyXML(envelope))
+
+        self.assertTrue(formatted.startswith('<?xml version="1.0" ?>\n'))
+        self.assertIn("\t\t\t<ns:objectId>1</ns:objectId>\n", formatted)
+
+    def test_password_is_redacted(self):
+        envelope = render_soap_envelope(
+            cmis_action="getObject", auth=("admin", "s3cr3t")
+        )
+
+        formatted = str(PrettyXML(envelope))
+
+        self.assertNotIn("s3cr3t", formatted)
+        self.assertIn("<wsse:Username>admin</wsse:Username>", formatted)
+        self.assertIn(">********</wsse:Password>", formatted)
+
+    def test_only_envelope_of_multipart_message(self):
+        formatted = str(PrettyXML(SOAP_RESPONSE.encode("utf-8")))
+
+        self.assertNotIn("uuid:", formatted)
+        self.assertIn("<deleteObjectResponse/>", formatted)
+
+    def test_no_xml(self):
+        self.assertEqual(
+            str(PrettyXML(b"Internal Server Error")), "Internal Server Error"
+        )
+
+    @override_settings(CMIS_WIRE_LOG_MAX_SIZE=20)
+    def test_size_is_capped(self):
+        with patch("drc_cmis.wire.minidom.parseString") as mock_parse:
+            formatted = str(PrettyXML("<a>" + "x" * 100 + "</a>"))
+
+        mock_parse.assert_not_called()
+        self.assertEqual(formatted, f"<a>{'x' * 17}... (87 more characters)")
+
+    @override_settings(CMIS_WIRE_LOG_MAX_SIZE=None)
+    def test_size_is_not_capped(self):
+        formatted = str(PrettyXML("<a>" + "x" * 100_000 + "</a>"))
+
+        self.assertIn("x" * 100_000, formatted)
+
+
+@requests_mock.Mocker()
+class WireLoggingTests(SimpleTestCase):
+    def test_not_formatted_when_disabled(self, m):
+        wire_logger = logging.getLogger("drc_cmis.wire")
+        self.addCleanup(wire_logger.setLevel, wire_logger.level)
+        wire_logger.setLevel(logging.INFO)
+        m.post("http://dms.local/cmisws/ObjectService", text=SOAP_RESPONSE)
+        envelope = render_soap_envelope(cmis_action="deleteObject", auth=("a", "b"))
+
+        with patch("drc_cmis.wire.PrettyXML.__str__") as mock_str:
+            SOAPRequest("http://dms.local/cmisws").request(
+                "ObjectService", envelope.toxml()
+            )
+
+        mock_str.assert_not_called()
+
+    def test_request_and_response_are_logged(self, m):
+        m.post("http://dms.local/cmisws/ObjectService", text=SOAP_RESPONSE)
+        envelope = render_soap_envelope(
+            cmis_action="deleteObject", auth=("admin", "s3cr3t")
+        )
+
+        with self.assertLogs("drc_cmis.wire", level=logging.DEBUG) as logs:
+            SOAPRequest("http://dms.local/cmisws").request(
+                "ObjectService", envelope.toxml()
+            )
+
+        request_log, response_log = logs.output
+        self.assertIn("Request to http://dms.local/cmisws/ObjectService", request_log)
+        self.assertIn("<ns:deleteObject/>", request_log)
+        self.assertNotIn("s3cr3t", request_log)
+        self.assertIn(
+            "Response (200) from http://dms.local/cmisws/ObjectService", response_log
+        )
+        self.assertIn("<deleteObjectResponse/>", response_log)